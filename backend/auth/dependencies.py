@@ -1,8 +1,8 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from ..models.auth import User, UserRole, UserStatus
-from ..auth.security import verify_token
+from ..auth.security import verify_token, verify_file_signature
 from ..database import database
 # Additional imports for admin auth
 import os
@@ -180,18 +180,64 @@ async def get_current_admin_account(credentials: HTTPAuthorizationCredentials =
     except (jwt.InvalidTokenError, jwt.DecodeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+def _ensure_admin_permission(admin: dict, permission: AdminPermission) -> dict:
+    admin_role = AdminRole(admin["role"])
+    if permission not in get_admin_permissions(admin_role):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Insufficient permissions. Required: {permission.value}"
+        )
+    return admin
+
 def require_permission(permission: AdminPermission):
     """Dependency to require specific admin permission (admin-management system)."""
     def check_permission(admin: dict = Depends(get_current_admin_account)):
-        admin_role = AdminRole(admin["role"])
-        if permission not in get_admin_permissions(admin_role):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Insufficient permissions. Required: {permission.value}"
-            )
-        return admin
+        return _ensure_admin_permission(admin, permission)
+    return check_permission
+
+# =============================
+# File download auth
+# =============================
+def has_signed_file_url(request: Request) -> bool:
+    """Whether the request carries a valid signed URL for its own path (see sign_file_path)."""
+    return verify_file_signature(
+        request.url.path, request.query_params.get("expires"), request.query_params.get("signature")
+    )
+
+_optional_bearer = HTTPBearer(auto_error=False)
+
+def _require_credentials(credentials: Optional[HTTPAuthorizationCredentials]) -> HTTPAuthorizationCredentials:
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return credentials
+
+def require_file_permission(permission: AdminPermission):
+    """Like require_permission, but also accepts a signed URL for the file.
+
+    Returns None for a signed request: the admin who signed it already passed this check.
+    """
+    async def check_permission(
+        request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(_optional_bearer)
+    ) -> Optional[dict]:
+        if has_signed_file_url(request):
+            return None
+        admin = await get_current_admin_account(_require_credentials(credentials))
+        return _ensure_admin_permission(admin, permission)
     return check_permission
 
+async def get_current_user_for_file(
+    request: Request, credentials: Optional[HTTPAuthorizationCredentials] = Depends(_optional_bearer)
+) -> Optional[User]:
+    """get_current_user for raw file URLs: a Bearer header, or a signed URL (then None, as the
+    user it was signed for already passed the route's ownership check)."""
+    if has_signed_file_url(request):
+        return None
+    return await get_current_user(_require_credentials(credentials))
+
 def create_admin_access_token(admin_id: str, username: str, role: str) -> str:
     """Create admin JWT access token (admin-management system)."""
     payload = {
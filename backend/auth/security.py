@@ -3,7 +3,11 @@ from typing import Optional
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
+from urllib.parse import quote
+import hashlib
+import hmac
 import secrets
+import time
 import os
 
 # Password hashing
@@ -14,6 +18,8 @@ SECRET_KEY = os.getenv("SECRET_KEY", secrets.token_urlsafe(32))
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 30  # 30 days for refresh tokens
+# Lifetime of signed file URLs handed to <img src>
+FILE_URL_TTL_SEC = int(os.getenv("FILE_URL_TTL_SEC", "300"))
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash."""
@@ -252,4 +258,26 @@ def verify_email_verification_token(token: str) -> dict:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid email verification token"
-        )
\ No newline at end of file
+        )
+
+
+def _file_signature(path: str, expires: int) -> str:
+    message = f"{path}\n{expires}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def sign_file_path(path: str, ttl_sec: int = FILE_URL_TTL_SEC) -> str:
+    """A URL for exactly ``path`` that works without credentials for ``ttl_sec`` seconds."""
+    expires = int(time.time()) + ttl_sec
+    return f"{quote(path)}?expires={expires}&signature={_file_signature(path, expires)}"
+
+
+def verify_file_signature(path: str, expires: Optional[str], signature: Optional[str]) -> bool:
+    """True if ``signature`` was issued by sign_file_path for ``path`` and has not expired."""
+    try:
+        expires_at = int(expires or "")
+    except ValueError:
+        return False
+    if not signature or expires_at < time.time():
+        return False
+    return hmac.compare_digest(signature, _file_signature(path, expires_at))
@@ -1,7 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime, timedelta, timezone
 import os
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import re
 import logging
 import uuid
@@ -9,6 +11,7 @@ import certifi
 import asyncio
 import functools
 import time
+from collections import defaultdict
 
 try:
     from .models.notifications import (
@@ -21,6 +24,17 @@ try:
         ReviewStats, ReviewType, ReviewStatus
     )
     from .models.admin import AdminRole, AdminStatus, AdminActivityType
+    from .utils.delta_sync import delta_filter
+    from .index_manifest import sync_indexes, verify_indexes, missing_required, startup_mode as index_startup_mode
+    from .services.id_allocator import (
+        get_allocator, UNIQUE_INDEXES as ALLOCATOR_INDEXES, to_base36, duplicate_key_field, ID_COLLISION_RETRIES
+    )
+    from .services import (
+        wallet_ledger, platform_stats, stats_counters, notification_rollups, job_search, tradesperson_directory,
+        user_search, job_feeds, interest_jobs
+    )
+    from .services.platform_stats import platform_stats_cache
+    from .services.counter_buffer import counter_buffer
 except ImportError:
     from models.notifications import (
         Notification, NotificationPreferences, NotificationChannel,
@@ -32,9 +46,25 @@ except ImportError:
         ReviewStats, ReviewType, ReviewStatus
     )
     from models.admin import AdminRole, AdminStatus, AdminActivityType
+    from utils.delta_sync import delta_filter
+    from index_manifest import sync_indexes, verify_indexes, missing_required, startup_mode as index_startup_mode
+    from services.id_allocator import (
+        get_allocator, UNIQUE_INDEXES as ALLOCATOR_INDEXES, to_base36, duplicate_key_field, ID_COLLISION_RETRIES
+    )
+    from services import (
+        wallet_ledger, platform_stats, stats_counters, notification_rollups, job_search, tradesperson_directory,
+        user_search, job_feeds, interest_jobs
+    )
+    from services.platform_stats import platform_stats_cache
+    from services.counter_buffer import counter_buffer
 
 logger = logging.getLogger(__name__)
 
+# Quotes a job accepts; jobs.quotes_count is kept by create_quote
+MAX_QUOTES_PER_JOB = 5
+# After an allocator unique index fails to build, inserts fail fast for this long before it is tried again
+ALLOCATOR_INDEX_RETRY_SEC = float(os.getenv("ALLOCATOR_INDEX_RETRY_SEC", "60"))
+
 def time_it(func):
     """Decorator to log execution time of async database methods"""
     @functools.wraps(func)
@@ -59,6 +89,10 @@ class Database:
         self.client = None
         self.database = None
         self.connected = False
+        self._index_task: Optional[asyncio.Task] = None
+        # (collection, field) allocator unique indexes known to exist, and when a failed build may be retried
+        self._allocator_indexes_ok: set = set()
+        self._allocator_index_retry_at: Dict[tuple, float] = {}
         self._memory = {"phone_otps": [], "email_otps": [], "users": {}}
         self._geo_cache: Dict[str, Dict[str, Any]] = {}
         self._geo_rate: Dict[str, Any] = {
@@ -130,202 +164,42 @@ class Database:
             self.database = self.client[db_name]
             self.connected = True
             logger.info("Connected to MongoDB")
-            # Ensure required indexes at startup
-            try:
-                # Users: unique id index
-                await self.database.users.create_index(
-                    [("id", 1)],
-                    name="unique_user_uuid",
-                    unique=True,
-                    partialFilterExpression={"id": {"$type": "string"}}
-                )
-
-                # Users: unique email index
-                await self.database.users.create_index(
-                    [("email", 1)],
-                    name="unique_email",
-                    unique=True,
-                    partialFilterExpression={"email": {"$type": "string"}}
-                )
-
-                # Users: unique public_id index for short shareable IDs
-                try:
-                    await self.database.users.create_index(
-                        [("public_id", 1)],
-                        name="unique_public_id",
-                        unique=True,
-                        partialFilterExpression={"public_id": {"$type": "string"}}
-                    )
-                except Exception as idx_err:
-                    logger.warning(f"Failed to ensure users public_id index: {idx_err}")
-                # Users: unique short numeric user_id index
-                try:
-                    await self.database.users.create_index(
-                        [("user_id", 1)],
-                        name="unique_user_id",
-                        unique=True,
-                        partialFilterExpression={"user_id": {"$type": "string"}}
-                    )
-                except Exception as idx_err:
-                    logger.warning(f"Failed to ensure users user_id index: {idx_err}")
-
-                # Jobs: compound indexes to optimize common queries and sorts
-                await self.database.jobs.create_index(
-                    [("id", 1)],
-                    name="unique_job_uuid",
-                    unique=True,
-                    partialFilterExpression={"id": {"$type": "string"}}
-                )
-                await self.database.jobs.create_index(
-                    [("created_at", -1)],
-                    name="jobs_createdAt_only"
-                )
-                await self.database.jobs.create_index(
-                    [("status", 1), ("created_at", -1)],
-                    name="jobs_status_createdAt"
-                )
-                await self.database.jobs.create_index(
-                    [("homeowner_id", 1), ("created_at", -1)],
-                    name="jobs_homeownerId_createdAt"
-                )
-                await self.database.jobs.create_index(
-                    [("homeowner.id", 1), ("created_at", -1)],
-                    name="jobs_homeownerDotId_createdAt"
-                )
-                await self.database.jobs.create_index(
-                    [("category", 1), ("created_at", -1)],
-                    name="jobs_category_createdAt"
-                )
-                await self.database.jobs.create_index(
-                    [("title", 1), ("created_at", -1)],
-                    name="jobs_title_createdAt"
-                )
-
-                # Messages: indexes for conversation queries and read-status updates
-                await self.database.messages.create_index(
-                    [("id", 1)],
-                    name="unique_message_uuid",
-                    unique=True,
-                    partialFilterExpression={"id": {"$type": "string"}}
-                )
-                await self.database.messages.create_index(
-                    [("conversation_id", 1), ("created_at", 1)],
-                    name="messages_conversation_createdAt"
-                )
-                await self.database.messages.create_index(
-                    [("conversation_id", 1), ("sender_type", 1), ("status", 1)],
-                    name="messages_conversation_sender_status"
-                )
-                await self.database.pending_jobs.create_index(
-                    [("user_id", 1), ("created_at", -1)],
-                    name="pending_jobs_user_createdAt"
-                )
-                await self.database.pending_jobs.create_index(
-                    [("expires_at", 1)],
-                    expireAfterSeconds=0,
-                    name="pending_jobs_expire"
-                )
-
-                # Newsletter subscribers: unique email index
-                try:
-                    await self.database.newsletter_subscribers.create_index(
-                        [("email", 1)],
-                        name="newsletter_unique_email",
-                        unique=True,
-                        partialFilterExpression={"email": {"$type": "string"}}
-                    )
-                except Exception as idx_err:
-                    logger.warning(f"Failed to ensure newsletter_subscribers index: {idx_err}")
-
-                # Performance Optimization Indexes
-                try:
-                    # Text indexes for jobs (essential for $regex queries)
-                    await self.database.jobs.create_index(
-                        [("title", "text"), ("category", "text")],
-                        name="jobs_text_search"
-                    )
-                    
-                    # Compound indexes for filtering
-                    await self.database.jobs.create_index(
-                        [("status", 1), ("category", 1), ("created_at", -1)],
-                        name="jobs_status_category_createdAt"
-                    )
-                    
-                    # CRITICAL INDEX for public job listing queries (status + expires_at + created_at)
-                    # This is essential because get_jobs() queries with: status='active' AND expires_at > now
-                    await self.database.jobs.create_index(
-                        [("status", 1), ("expires_at", 1), ("created_at", -1)],
-                        name="jobs_status_expiresAt_createdAt"
-                    )
-
-                    # Quotes indexes
-                    await self.database.quotes.create_index([("job_id", 1)], name="quotes_job_id")
-                    await self.database.quotes.create_index([("tradesperson_id", 1)], name="quotes_tradesperson_id")
-                    await self.database.quotes.create_index([("job_id", 1), ("tradesperson_id", 1)], name="quotes_job_tradesperson")
-                    
-                    # Interests: unique id index
-                    await self.database.interests.create_index(
-                        [("id", 1)],
-                        name="unique_interest_uuid",
-                        unique=True,
-                        partialFilterExpression={"id": {"$type": "string"}}
-                    )
-                    # Interests: index by job_id and tradesperson_id for faster counts and lookups
-                    await self.database.interests.create_index([("job_id", 1)], name="interests_job_id")
-                    await self.database.interests.create_index([("tradesperson_id", 1)], name="interests_tradesperson_id")
-                    # Job Question Answers: index by job_id
-                    await self.database.job_question_answers.create_index([("job_id", 1)], name="job_qa_job_id")
-                    # Reviews: unique id and index by job_id and artisan_id
-                    await self.database.reviews.create_index(
-                        [("id", 1)],
-                        name="unique_review_uuid",
-                        unique=True,
-                        partialFilterExpression={"id": {"$type": "string"}}
-                    )
-                    await self.database.reviews.create_index([("job_id", 1)], name="reviews_job_id")
-                    await self.database.reviews.create_index([("artisan_id", 1)], name="reviews_artisan_id")
-                    # Notifications: index by user_id and status
-                    await self.database.notifications.create_index([("user_id", 1), ("status", 1)], name="notifications_user_status")
-                    
-                    # Tradespeople Verifications: index for pending list and status queries
-                    try:
-                        await self.database.tradespeople_verifications.create_index(
-                            [("status", 1), ("submitted_at", -1)],
-                            name="verifications_status_submitted"
-                        )
-                        await self.database.tradespeople_verifications.create_index(
-                            [("user_id", 1), ("status", 1)],
-                            name="verifications_user_status"
-                        )
-                        # Add index for nested filename searches
-                        await self.database.tradespeople_verifications.create_index(
-                            "documents_base64.filename",
-                            name="idx_docs_filename"
-                        )
-                        await self.database.tradespeople_verifications.create_index(
-                            "work_photos_base64.filename",
-                            name="idx_work_photos_filename"
-                        )
-                        await self.database.tradespeople_verifications.create_index(
-                            "partner_id_documents_base64.filename",
-                            name="idx_partner_ids_filename"
-                        )
-                    except Exception as idx_err:
-                        logger.warning(f"Failed to ensure tradespeople_verifications indexes: {idx_err}")
-
-                    logger.info("Performance optimization indexes ensured successfully")
-                except Exception as idx_err:
-                    logger.warning(f"Failed to ensure performance indexes: {idx_err}")
-
-                logger.info("Database indexes ensured successfully")
-            except Exception as e:
-                logger.error(f"Failed to ensure database indexes: {e}")
+            # Indexes are declared in index_manifest and built by `python -m backend.tools.indexes sync`
+            # in the deploy step; startup checks for drift in the background so readiness never waits on builds
+            mode = index_startup_mode()
+            if mode != "off":
+                self._index_task = asyncio.create_task(self._check_indexes(mode))
         except Exception as e:
             self.connected = False
             logger.error(f"MongoDB connection failed: {e}")
             # Allow app to continue running without database connection
 
+    async def _check_indexes(self, mode: str):
+        try:
+            await self._ensure_allocator_indexes()
+            if mode == "sync":
+                summary = await sync_indexes(self.database)
+                created = sum(len(o["created"]) for o in summary.values())
+                failed = sum(len(o["failed"]) for o in summary.values())
+                logger.info(f"Background index sync finished: {created} created, {failed} failed")
+            elif not await verify_indexes(self.database):
+                # The deploy step normally builds these; without them duplicates and $text slip through
+                missing = await missing_required(self.database)
+                if missing:
+                    names = [name for collection_names in missing.values() for name in collection_names]
+                    logger.warning(f"Building missing required indexes: {', '.join(names)}")
+                    summary = await sync_indexes(self.database, list(missing), names=names)
+                    failed = [name for o in summary.values() for name in o["failed"]]
+                    if failed:
+                        logger.error(f"Required indexes could not be built: {', '.join(failed)}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Index manifest check failed: {e}")
+
     async def close_mongo_connection(self):
+        if self._index_task is not None and not self._index_task.done():
+            self._index_task.cancel()
         if self.client:
             self.client.close()
             logger.info("MongoDB connection closed")
@@ -388,16 +262,33 @@ class Database:
         """Create a new user"""
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot create user")
-        # Ensure short numeric user_id exists (4 digits). Mirror into public_id for compatibility.
+        # Ensure short numeric user_id exists (4+ digits). Mirror into public_id for compatibility.
+        allocated = False
         try:
             if not user_data.get("user_id"):
                 short_id = await self.generate_user_short_id(digits=4)
                 user_data["user_id"] = short_id
                 user_data.setdefault("public_id", short_id)
+                allocated = True
         except Exception as e:
             logger.warning(f"Failed to generate user_id for user: {e}")
-        result = await self.database.users.insert_one(user_data)
+        user_data["search"] = user_search.search_fields(user_data)
+        directory = tradesperson_directory.directory_fields(user_data)
+        if directory:
+            user_data["directory"] = directory
+
+        async def reallocate(doc: dict):
+            old_id = doc["user_id"]
+            doc["user_id"] = await self.generate_user_short_id(digits=4)
+            if doc.get("public_id") == old_id:
+                doc["public_id"] = doc["user_id"]
+
+        if allocated:
+            result = await self._insert_with_allocated_id(self.database.users, user_data, "user_id", reallocate)
+        else:
+            result = await self.database.users.insert_one(user_data)
         user_data['_id'] = str(result.inserted_id)
+        await platform_stats.user_created(self.database, user_data)
         return user_data
 
     @time_it
@@ -442,8 +333,23 @@ class Database:
             {"id": user_id},
             {"$set": update_data}
         )
+        if result.modified_count and (tradesperson_directory.touches(update_data) or user_search.touches(update_data)):
+            await self._refresh_user_search_keys(user_id)
         return result.modified_count > 0
 
+    async def _refresh_user_search_keys(self, user_id: str) -> None:
+        """Recompute a user's admin search keys and directory keys after a profile change."""
+        try:
+            fields = tradesperson_directory.SOURCE_FIELDS + user_search.SOURCE_FIELDS + ("directory", "search")
+            user = await self.database.users.find_one({"id": user_id}, {f: 1 for f in fields})
+            if not user:
+                return
+            update = user_search.key_update(user)
+            if update:
+                await self.database.users.update_one({"_id": user["_id"]}, update)
+        except Exception as e:
+            logger.warning(f"Failed to refresh search keys for user {user_id}: {e}")
+
     async def update_user_last_login(self, user_id: str):
         """Update user's last login timestamp"""
         if self.database is None:
@@ -871,118 +777,76 @@ class Database:
 
     # Job operations
     async def generate_job_id(self, digits: int = 6) -> str:
-        """Generate a unique numeric job ID with fixed length.
+        """Allocate a numeric job ID, zero-padded to at least ``digits``.
 
-        Uses an atomic counter in the `counters` collection to avoid collisions
-        under concurrency. Wraps within the available range and skips any
-        currently-used IDs by probing forward until a free slot is found.
+        IDs come from this worker's reserved block (services.id_allocator);
+        past 10^digits they grow longer instead of wrapping. Uniqueness is
+        enforced by the jobs.id unique index in create_job.
         """
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot generate job ID")
-
-        max_value = (10 ** digits) - 1
-
-        # Atomically increment counter and get current sequence
-        counter = await self.database.counters.find_one_and_update(
-            {"_id": "jobs"},
-            {"$inc": {"seq": 1}},
-            upsert=True,
-            return_document=True
-        )
-
-        seq = int(counter.get("seq", 1))
-        # Constrain to range and avoid 0 by starting at 1
-        seq = (seq % (max_value + 1)) or 1
-        candidate = f"{seq:0{digits}d}"
-
-        # If wrap-around hits an existing ID, probe forward up to the range size
-        for _ in range(max_value):
-            exists = await self.database.jobs.find_one({"id": candidate})
-            if not exists:
-                return candidate
-            # Move to next sequence value in range
-            seq = (seq + 1) % (max_value + 1)
-            if seq == 0:
-                seq = 1
-            candidate = f"{seq:0{digits}d}"
-
-        raise RuntimeError("Unable to generate unique job ID")
+        seq = await get_allocator("jobs").next(self.database.counters)
+        return f"{seq:0{digits}d}"
 
     async def generate_user_public_id(self, length: int = 7) -> str:
-        """Generate a short, unique public ID for users.
-
-        Uses an atomic counter in the `counters` collection, converts the
-        sequence to base36, and probes forward to avoid collisions.
-        """
+        """Allocate a base36 public ID for users, left-padded to ``length``."""
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot generate user public_id")
-
-        # Atomically increment counter and get current sequence
-        counter = await self.database.counters.find_one_and_update(
-            {"_id": "users_public_id"},
-            {"$inc": {"seq": 1}},
-            upsert=True,
-            return_document=True
-        )
-
-        seq = int(counter.get("seq", 1))
-
-        # Base36 conversion
-        def to_base36(num: int) -> str:
-            chars = "0123456789abcdefghijklmnopqrstuvwxyz"
-            if num <= 0:
-                return "0"
-            s = []
-            while num:
-                num, rem = divmod(num, 36)
-                s.append(chars[rem])
-            return "".join(reversed(s))
-
-        candidate = to_base36(seq).rjust(length, "0")[:length].lower()
-
-        # Probe forward until unique
-        for _ in range(36 ** length):
-            exists = await self.database.users.find_one({"public_id": candidate})
-            if not exists:
-                return candidate
-            seq += 1
-            candidate = to_base36(seq).rjust(length, "0")[:length].lower()
-
-        raise RuntimeError("Unable to generate unique user public_id")
+        seq = await get_allocator("users_public_id").next(self.database.counters)
+        return to_base36(seq).rjust(length, "0")
 
     async def generate_user_short_id(self, digits: int = 4) -> str:
-        """Generate a unique numeric user_id with fixed length (default 4)."""
+        """Allocate a numeric user_id, zero-padded to at least ``digits``.
+
+        The legacy 4-digit space was recycled; new IDs start above it
+        (USER_SHORT_ID_FLOOR) so they never collide with existing users.
+        """
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot generate user_id")
+        seq = await get_allocator("users_short_id").next(self.database.counters)
+        return f"{seq:0{digits}d}"
 
-        max_value = 10 ** digits
-        wrap_threshold = max_value * 2
-
-        # Atomically increment counter and get current sequence
-        counter = await self.database.counters.find_one_and_update(
-            {"_id": "users_short_id"},
-            {"$inc": {"seq": 1}},
-            upsert=True,
-            return_document=True
-        )
-
-        seq = int(counter.get("seq", 1))
+    async def _ensure_allocator_index(self, collection: str, field: str) -> bool:
+        """Check the unique index behind allocated ``collection.field`` values exists, building it if missing.
 
-        # Wrap sequence periodically
-        if seq >= wrap_threshold:
-            await self.database.counters.update_one({"_id": "users_short_id"}, {"$set": {"seq": 1}})
-            seq = 1
-
-        # Probe forward until unique
-        for _ in range(max_value):
-            candidate_num = seq % max_value
-            candidate = f"{candidate_num:0{digits}d}"
-            exists = await self.database.users.find_one({"user_id": candidate})
-            if not exists:
-                return candidate
-            seq += 1
+        A failed build is not retried for ALLOCATOR_INDEX_RETRY_SEC, so inserts fail fast meanwhile.
+        """
+        key = (collection, field)
+        if key in self._allocator_indexes_ok:
+            return True
+        if time.monotonic() < self._allocator_index_retry_at.get(key, 0):
+            return False
+        name = ALLOCATOR_INDEXES[key]
+        if name not in await self.database[collection].index_information():
+            logger.warning(f"Allocator unique index missing, building: {name}")
+            summary = await sync_indexes(self.database, [collection], names=[name])
+            if summary.get(collection, {}).get("failed"):
+                logger.error(f"Allocator unique index could not be built: {name}")
+                self._allocator_index_retry_at[key] = time.monotonic() + ALLOCATOR_INDEX_RETRY_SEC
+                return False
+        self._allocator_indexes_ok.add(key)
+        self._allocator_index_retry_at.pop(key, None)
+        return True
 
-        raise RuntimeError("Unable to generate unique user_id")
+    async def _ensure_allocator_indexes(self) -> bool:
+        """Run _ensure_allocator_index for every allocated field (startup index check)."""
+        results = [await self._ensure_allocator_index(c, f) for c, f in ALLOCATOR_INDEXES]
+        return all(results)
+
+    async def _insert_with_allocated_id(self, collection, doc: dict, field: str, reallocate) -> Any:
+        """insert_one, calling ``reallocate(doc)`` when the unique index on ``field`` rejects the value."""
+        # Without the unique index a collision would insert silently instead of raising
+        if not await self._ensure_allocator_index(collection.name, field):
+            raise RuntimeError(f"Unique index on {collection.name}.{field} is missing; run the index sync")
+        for _ in range(ID_COLLISION_RETRIES):
+            try:
+                return await collection.insert_one(doc)
+            except DuplicateKeyError as e:
+                if duplicate_key_field(e) != field:
+                    raise
+                logger.info(f"{collection.name}.{field} {doc.get(field)!r} already taken; allocating another")
+                await reallocate(doc)
+        raise RuntimeError(f"Unable to allocate a unique {collection.name}.{field}")
 
     async def create_pending_job(self, user_id: str, job_data: dict, expires_at: datetime) -> dict:
         if self.database is None:
@@ -1035,13 +899,23 @@ class Database:
     async def create_job(self, job_data: dict) -> dict:
         # Set expiration date (30 days from now)
         job_data['expires_at'] = datetime.utcnow() + timedelta(days=30)
-        result = await self.database.jobs.insert_one(job_data)
+        if str(job_data.get('id', '')).isdigit():
+            # Allocated job number: rely on the unique index and take the next one if it's taken
+            async def reallocate(doc: dict):
+                doc['id'] = await self.generate_job_id(digits=6)
+            result = await self._insert_with_allocated_id(self.database.jobs, job_data, "id", reallocate)
+        else:
+            result = await self.database.jobs.insert_one(job_data)
         job_data['_id'] = str(result.inserted_id)
+        await platform_stats.job_created(self.database, job_data)
+        await stats_counters.inserted(self.database, "jobs", job_data)
         return job_data
     
     async def update_job(self, job_id: str, update_data: dict) -> bool:
         """Update a job by ID"""
         try:
+            if stats_counters.touches("jobs", update_data) or interest_jobs.touches(update_data):
+                return await self._set_job_fields(job_id, update_data)
             result = await self.database.jobs.update_one(
                 {"id": job_id},
                 {"$set": update_data}
@@ -1070,18 +944,10 @@ class Database:
         is_homeowner_query = 'homeowner.email' in query or 'homeowner_id' in query
         
         if not is_homeowner_query:
-            # For public job listings, only show active and non-expired jobs
+            # For public job listings, only show active jobs (expired ones are swept to
+            # status "expired" by services/job_expiry.py)
             if 'status' not in query:
                 query['status'] = 'active'
-            
-            # Handle jobs that might not have an expires_at field or have it as None
-            # Only add expires_at filter if it's not already in the query
-            if 'expires_at' not in query:
-                query['$or'] = [
-                    {'expires_at': {'$gt': datetime.utcnow()}},
-                    {'expires_at': {'$exists': False}},
-                    {'expires_at': None}
-                ]
         
         try:
             cursor = self.database.jobs.find(query).sort("created_at", -1).skip(skip).limit(limit)
@@ -1189,11 +1055,29 @@ class Database:
 
     async def update_job_approval_status(self, job_id: str, approval_data: dict) -> bool:
         """Update job approval status with admin details"""
-        result = await self.database.jobs.update_one(
+        if not await self._set_job_fields(job_id, approval_data):
+            return False
+        decision = {"active": "jobs.approved", "rejected": "jobs.rejected"}.get(approval_data.get("status"))
+        if decision:
+            await stats_counters.record(self.database, decision, when=approval_data.get("approved_at"))
+        return True
+
+    async def _set_job_fields(self, job_id: str, fields: dict) -> bool:
+        """$set fields on a job, feeding status and fee changes to the stats counters and the job's interests"""
+        previous = await self.database.jobs.find_one_and_update(
             {"id": job_id},
-            {"$set": approval_data}
+            {"$set": fields},
+            projection=stats_counters.projection("jobs")
         )
-        return result.modified_count > 0
+        if previous is None:
+            return False
+        if "status" in fields:
+            await platform_stats.job_status_changed(self.database, previous.get("status"), fields["status"])
+            if previous.get("status") == "active" and getattr(fields["status"], "value", fields["status"]) != "active":
+                await job_feeds.remove_jobs(self.database, [job_id])
+        await interest_jobs.sync(self.database, [job_id], fields, now=fields.get("updated_at"))
+        await stats_counters.updated(self.database, "jobs", previous, fields)
+        return True
 
     async def get_job_interests_count(self, job_id: str) -> int:
         """Get count of interests for a specific job"""
@@ -1205,69 +1089,23 @@ class Database:
 
     @time_it
     async def get_jobs_statistics_admin(self) -> dict:
-        """Get comprehensive job statistics for admin dashboard (optimized)"""
-        today_start = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
-        today_end = today_start + timedelta(days=1)
-        
-        pipeline = [
-            {
-                "$group": {
-                    "_id": None,
-                    "total_jobs": {"$sum": 1},
-                    "pending_jobs": {"$sum": {"$cond": [{"$eq": ["$status", "pending_approval"]}, 1, 0]}},
-                    "active_jobs": {"$sum": {"$cond": [{"$eq": ["$status", "active"]}, 1, 0]}},
-                    "rejected_jobs": {"$sum": {"$cond": [{"$eq": ["$status", "rejected"]}, 1, 0]}},
-                    "expired_jobs": {"$sum": {"$cond": [{"$eq": ["$status", "expired"]}, 1, 0]}},
-                    "completed_jobs": {"$sum": {"$cond": [{"$eq": ["$status", "completed"]}, 1, 0]}},
-                    "approved_today": {
-                        "$sum": {
-                            "$cond": [
-                                {
-                                    "$and": [
-                                        {"$eq": ["$status", "active"]},
-                                        {"$gte": ["$approved_at", today_start]},
-                                        {"$lt": ["$approved_at", today_end]}
-                                    ]
-                                },
-                                1,
-                                0
-                            ]
-                        }
-                    },
-                    "rejected_today": {
-                        "$sum": {
-                            "$cond": [
-                                {
-                                    "$and": [
-                                        {"$eq": ["$status", "rejected"]},
-                                        {"$gte": ["$approved_at", today_start]},
-                                        {"$lt": ["$approved_at", today_end]}
-                                    ]
-                                },
-                                1,
-                                0
-                            ]
-                        }
-                    }
-                }
-            }
-        ]
-        
-        result = await self.database.jobs.aggregate(pipeline).to_list(1)
+        """Get comprehensive job statistics for admin dashboard (from stats_counters rollups)"""
+        totals, today = await asyncio.gather(
+            stats_counters.totals(self.database, ["jobs.total", "jobs.status."]),
+            stats_counters.on_day(self.database, ["jobs.approved", "jobs.rejected"])
+        )
+        by_status = stats_counters.breakdown(totals, "jobs.status")
         
-        if result:
-            return result[0]
-        else:
-            return {
-                "total_jobs": 0,
-                "pending_jobs": 0,
-                "active_jobs": 0,
-                "rejected_jobs": 0,
-                "expired_jobs": 0,
-                "completed_jobs": 0,
-                "approved_today": 0,
-                "rejected_today": 0
-            }
+        return {
+            "total_jobs": int(totals.get("jobs.total", 0)),
+            "pending_jobs": by_status.get("pending_approval", 0),
+            "active_jobs": by_status.get("active", 0),
+            "rejected_jobs": by_status.get("rejected", 0),
+            "expired_jobs": by_status.get("expired", 0),
+            "completed_jobs": by_status.get("completed", 0),
+            "approved_today": int(today.get("jobs.approved", 0)),
+            "rejected_today": int(today.get("jobs.rejected", 0))
+        }
 
     async def get_jobs_count_admin(self, status: str = None) -> int:
         """Get total count of jobs for pagination"""
@@ -1411,6 +1249,8 @@ class Database:
         if not update_data:
             return False
         
+        if stats_counters.touches("jobs", update_data) or interest_jobs.touches(update_data):
+            return await self._set_job_fields(job_id, update_data)
         result = await self.database.jobs.update_one(
             {"id": job_id},
             {"$set": update_data}
@@ -1420,28 +1260,18 @@ class Database:
 
     async def update_job_status_admin(self, job_id: str, status: str) -> bool:
         """Update job status (admin only)"""
-        result = await self.database.jobs.update_one(
-            {"id": job_id},
-            {"$set": {
-                "status": status,
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        return result.modified_count > 0
+        return await self._set_job_fields(job_id, {
+            "status": status,
+            "updated_at": datetime.utcnow()
+        })
 
     async def soft_delete_job_admin(self, job_id: str) -> bool:
         """Soft delete job (admin only)"""
-        result = await self.database.jobs.update_one(
-            {"id": job_id},
-            {"$set": {
-                "status": "deleted",
-                "deleted_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow()
-            }}
-        )
-        
-        return result.modified_count > 0
+        return await self._set_job_fields(job_id, {
+            "status": "deleted",
+            "deleted_at": datetime.utcnow(),
+            "updated_at": datetime.utcnow()
+        })
 
     async def delete_job_completely(self, job_id: str) -> dict:
         """Hard-delete a job and all related data from the platform.
@@ -1452,6 +1282,11 @@ class Database:
         Returns a dict with delete counts for each collection.
         """
         try:
+            await self.record_conversation_tombstones({"job_id": job_id})
+            job_counters = await self.database.jobs.find_one(
+                {"id": job_id}, dict(stats_counters.projection("jobs"), interests_count=1)
+            )
+
             # Prepare all delete tasks
             delete_tasks = {
                 "jobs": self.database.jobs.delete_one({"id": job_id}),
@@ -1463,6 +1298,7 @@ class Database:
                 "messages": self.database.messages.delete_many({"job_id": job_id}),
                 "conversations": self.database.conversations.delete_many({"job_id": job_id}),
                 "notifications": self.database.notifications.delete_many({"job_id": job_id}),
+                "job_feeds": self.database.job_feeds.delete_many({"job_id": job_id}),
             }
 
             # Run all deletions in parallel
@@ -1477,11 +1313,43 @@ class Database:
                 else:
                     final_results[f"{key}_deleted"] = res.deleted_count
 
+            if job_counters and final_results.get("jobs_deleted"):
+                await platform_stats.job_deleted(self.database, job_counters)
+                await stats_counters.deleted(self.database, "jobs", job_counters)
+                await stats_counters.record(
+                    self.database, "jobs.interests", -(job_counters.get("interests_count") or 0)
+                )
+
             return final_results
         except Exception as e:
             logger.error(f"Error in delete_job_completely for {job_id}: {e}")
             raise
 
+    async def find_orphaned_jobs(self, min_age_days: int = 0, limit: int = 0) -> List[dict]:
+        """Jobs whose homeowner no longer exists (or that never recorded one).
+
+        The owner is ``homeowner_id``, else ``homeowner.id`` / ``homeowner.user_id``,
+        resolved against ``users.id`` with one ``$lookup`` instead of a count per job.
+        """
+        match = {}
+        if min_age_days and min_age_days > 0:
+            match["created_at"] = {"$lt": datetime.utcnow() - timedelta(days=min_age_days)}
+        pipeline = [
+            {"$match": match},
+            {"$project": {"_id": 0, "id": 1, "title": 1, "status": 1, "created_at": 1, "homeowner_id": 1,
+                          "owner": {"$ifNull": ["$homeowner_id", "$homeowner.id", "$homeowner.user_id"]}}},
+            {"$lookup": {"from": "users", "let": {"owner": "$owner"}, "as": "owner_user", "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$id", "$$owner"]}}},
+                {"$project": {"_id": 1}},
+                {"$limit": 1},
+            ]}},
+            {"$match": {"owner_user": {"$size": 0}}},
+            {"$project": {"owner_user": 0}},
+        ]
+        if limit and limit > 0:
+            pipeline.append({"$limit": limit})
+        return await self.database.jobs.aggregate(pipeline).to_list(length=None)
+
     @time_it
     async def get_jobs_count(self, filters: dict = None) -> int:
         query = filters or {}
@@ -1491,10 +1359,9 @@ class Database:
         is_homeowner_query = 'homeowner.email' in query or 'homeowner_id' in query
         
         if not is_homeowner_query:
-            # For public job listings, only show active and non-expired jobs
+            # For public job listings, only show active jobs (same filter as get_jobs)
             if 'status' not in query:
                 query['status'] = 'active'
-            query['expires_at'] = {'$gt': datetime.utcnow()}
         
         try:
             return await asyncio.wait_for(self.database.jobs.count_documents(query), timeout=10.0)
@@ -1502,14 +1369,65 @@ class Database:
             logger.warning(f"get_jobs_count timeout; returning 0")
             return 0
 
-    async def update_job_quotes_count(self, job_id: str):
-        quotes_count = await self.database.quotes.count_documents({"job_id": job_id})
-        await self.database.jobs.update_one(
-            {"id": job_id},
-            {"$set": {"quotes_count": quotes_count, "updated_at": datetime.utcnow()}}
+    # Tradesperson operations
+    async def search_tradespeople_directory(self, search: Optional[str] = None, trade: Optional[str] = None,
+                                            state: Optional[str] = None, location: Optional[str] = None,
+                                            min_rating: Optional[float] = None, sort_by: str = "rating",
+                                            skip: int = 0, limit: int = 50) -> Tuple[List[dict], int, dict]:
+        """Directory page, total and trade/state/rating-band facet counts.
+
+        The page is read through the users_directory_* indexes while the
+        facet aggregation runs alongside it.
+        """
+        try:
+            from .models.nigerian_states import NIGERIAN_STATES
+            from .models.trade_categories import NIGERIAN_TRADE_CATEGORIES
+        except ImportError:
+            from models.nigerian_states import NIGERIAN_STATES
+            from models.trade_categories import NIGERIAN_TRADE_CATEGORIES
+        parts = tradesperson_directory.filters(
+            search=search, trade=trade, state=state, location=location,
+            min_rating=min_rating, known_states=NIGERIAN_STATES,
+        )
+        query = tradesperson_directory.combined(parts, "base", "trade", "state", "rating")
+        sort = tradesperson_directory.SORTS.get(sort_by, tradesperson_directory.SORTS["rating"])
+        page, rows = await asyncio.gather(
+            self.database.users.find(query, {"directory": 0, "password_hash": 0})
+                .sort(sort).skip(skip).limit(limit).to_list(length=limit),
+            self.database.users.aggregate(tradesperson_directory.facet_pipeline(parts)).to_list(length=1),
         )
+        labels = {tradesperson_directory.normalize(c): c for c in NIGERIAN_TRADE_CATEGORIES}
+        total, facets = tradesperson_directory.format_facets(rows[0] if rows else {}, labels)
+        return page, total, facets
+
+    async def get_tradespeople_listing_stats(self, tradesperson_ids: List[str]) -> Dict[str, dict]:
+        """Portfolio, review and completed-job counts for a page of tradespeople in three queries."""
+        if not tradesperson_ids:
+            return {}
+        portfolio, reviews, jobs = await asyncio.gather(
+            self.database.portfolio.aggregate([
+                {"$match": {"tradesperson_id": {"$in": tradesperson_ids}}},
+                {"$group": {"_id": "$tradesperson_id", "count": {"$sum": 1}}},
+            ]).to_list(length=None),
+            self.database.reviews.aggregate([
+                {"$match": {"reviewee_id": {"$in": tradesperson_ids}}},
+                {"$group": {"_id": "$reviewee_id", "count": {"$sum": 1}, "avg_rating": {"$avg": "$rating"}}},
+            ]).to_list(length=None),
+            self.database.jobs.aggregate([
+                {"$match": {"assigned_tradesperson_id": {"$in": tradesperson_ids}, "status": "completed"}},
+                {"$group": {"_id": "$assigned_tradesperson_id", "count": {"$sum": 1}}},
+            ]).to_list(length=None),
+        )
+        stats = {tid: {"portfolio_items": 0, "total_reviews": 0, "avg_rating": None, "completed_jobs": 0}
+                 for tid in tradesperson_ids}
+        for row in portfolio:
+            stats[row["_id"]]["portfolio_items"] = row["count"]
+        for row in reviews:
+            stats[row["_id"]].update(total_reviews=row["count"], avg_rating=row["avg_rating"])
+        for row in jobs:
+            stats[row["_id"]]["completed_jobs"] = row["count"]
+        return stats
 
-    # Tradesperson operations
     async def create_tradesperson(self, tradesperson_data: dict) -> dict:
         result = await self.database.tradespeople.insert_one(tradesperson_data)
         tradesperson_data['_id'] = str(result.inserted_id)
@@ -1574,10 +1492,51 @@ class Database:
 
     # Quote operations
     async def create_quote(self, quote_data: dict) -> dict:
-        result = await self.database.quotes.insert_one(quote_data)
+        """Insert a quote, taking one of the job's MAX_QUOTES_PER_JOB slots.
+
+        ``quotes_count`` on the job is incremented before the insert, conditionally, so
+        concurrent quotes can't overfill a job; a failed insert gives the slot back.
+        A second quote by the same tradesperson is rejected by ``quotes_tradesperson_job``.
+        """
+        job_id = quote_data.get("job_id")
+        reserved = await self.database.jobs.update_one(
+            {"id": job_id, "quotes_count": {"$not": {"$gte": MAX_QUOTES_PER_JOB}}},
+            {"$inc": {"quotes_count": 1}, "$set": {"updated_at": datetime.utcnow()}}
+        )
+        if not reserved.modified_count:
+            raise Exception("This job has reached the maximum number of quotes")
+        try:
+            result = await self.database.quotes.insert_one(quote_data)
+        except Exception as e:
+            await self.database.jobs.update_one({"id": job_id}, {"$inc": {"quotes_count": -1}})
+            if isinstance(e, DuplicateKeyError) and duplicate_key_field(e) == "tradesperson_id":
+                raise Exception("You have already quoted for this job") from e
+            raise
         quote_data['_id'] = str(result.inserted_id)
         return quote_data
 
+    async def has_quoted(self, job_id: str, tradesperson_id: str) -> bool:
+        return await self.database.quotes.find_one(
+            {"tradesperson_id": tradesperson_id, "job_id": job_id}, {"_id": 1}
+        ) is not None
+
+    async def _quoted_job_ids(self, tradesperson_id: str) -> List[str]:
+        """Jobs the tradesperson has quoted on, read from quotes_tradesperson_job alone"""
+        docs = await self.database.quotes.find(
+            {"tradesperson_id": tradesperson_id}, {"_id": 0, "job_id": 1}
+        ).to_list(length=None)
+        return list({d["job_id"] for d in docs if d.get("job_id")})
+
+    async def _quoting_filter(self, tradesperson_id: str, trade_categories: List[str]) -> dict:
+        """Active jobs in the tradesperson's categories with a free quote slot, minus those already quoted"""
+        match_query = {"status": "active", "quotes_count": {"$not": {"$gte": MAX_QUOTES_PER_JOB}}}
+        if trade_categories:
+            match_query["category"] = {"$in": trade_categories}
+        quoted = await self._quoted_job_ids(tradesperson_id)
+        if quoted:
+            match_query["id"] = {"$nin": quoted}
+        return match_query
+
     async def get_quote_by_id(self, quote_id: str) -> Optional[dict]:
         quote = await self.database.quotes.find_one({"id": quote_id})
         if quote:
@@ -1736,44 +1695,15 @@ class Database:
             }
 
     async def get_jobs_for_quoting(self, tradesperson_id: str, trade_categories: List[str], skip: int = 0, limit: int = 10) -> List[dict]:
-        """Get jobs available for a tradesperson to quote on (optimized)"""
-        # Build query for jobs in tradesperson's categories
-        match_query = {
-            "status": "active",
-            "expires_at": {"$gt": datetime.utcnow()}
-        }
-        
-        if trade_categories:
-            # Use $in for faster matching
-            match_query["category"] = {"$in": trade_categories}
-        
-        # Get jobs and exclude ones already quoted on
+        """Get jobs available for a tradesperson to quote on, newest first.
+
+        ``quotes_count`` is kept on the job by ``create_quote`` and the tradesperson's own
+        quotes are excluded by id, so pages are exact and no quotes are joined per request.
+        """
+        match_query = await self._quoting_filter(tradesperson_id, trade_categories)
         pipeline = [
             {"$match": match_query},
             {"$sort": {"created_at": -1}},
-            {"$limit": 100}, # Limit early to improve lookup performance
-            {"$lookup": {
-                "from": "quotes",
-                "localField": "id",
-                "foreignField": "job_id",
-                "as": "all_quotes"
-            }},
-            {"$addFields": {
-                "quotes_count": {"$size": "$all_quotes"},
-                "has_quoted": {
-                    "$anyElementTrue": {
-                        "$map": {
-                            "input": "$all_quotes",
-                            "as": "q",
-                            "in": {"$eq": ["$$q.tradesperson_id", tradesperson_id]}
-                        }
-                    }
-                }
-            }},
-            {"$match": {
-                "has_quoted": False,
-                "quotes_count": {"$lt": 5}
-            }},
             {"$skip": skip},
             {"$limit": limit},
             {"$project": {
@@ -1787,7 +1717,7 @@ class Database:
                 "timeline": 1,
                 "created_at": 1,
                 "expires_at": 1,
-                "quotes_count": 1,
+                "quotes_count": {"$ifNull": ["$quotes_count", 0]},
                 "homeowner": {
                     "name": "$homeowner.name",
                     "location": "$location"
@@ -1799,52 +1729,13 @@ class Database:
         return jobs
 
     async def get_available_jobs_count_for_quoting(self, tradesperson_id: str, trade_categories: List[str]) -> int:
-        """Count available jobs for a tradesperson (optimized)"""
-        match_query = {
-            "status": "active",
-            "expires_at": {"$gt": datetime.utcnow()}
-        }
-        
-        if trade_categories:
-            match_query["category"] = {"$in": trade_categories}
-        
-        pipeline = [
-            {"$match": match_query},
-            {"$limit": 100}, # Limit to improve lookup performance
-            {"$lookup": {
-                "from": "quotes",
-                "localField": "id",
-                "foreignField": "job_id",
-                "as": "all_quotes"
-            }},
-            {"$addFields": {
-                "quotes_count": {"$size": "$all_quotes"},
-                "has_quoted": {
-                    "$anyElementTrue": {
-                        "$map": {
-                            "input": "$all_quotes",
-                            "as": "q",
-                            "in": {"$eq": ["$$q.tradesperson_id", tradesperson_id]}
-                        }
-                    }
-                }
-            }},
-            {"$match": {
-                "has_quoted": False,
-                "quotes_count": {"$lt": 5}
-            }},
-            {"$count": "total"}
-        ]
-        
-        result = await self.database.jobs.aggregate(pipeline).to_list(1)
-        return result[0]["total"] if result else 0
+        """Count the jobs ``get_jobs_for_quoting`` pages through"""
+        match_query = await self._quoting_filter(tradesperson_id, trade_categories)
+        return await self.database.jobs.count_documents(match_query)
 
     async def update_job_status(self, job_id: str, status: str):
         """Update job status"""
-        await self.database.jobs.update_one(
-            {"id": job_id},
-            {"$set": {"status": status, "updated_at": datetime.utcnow()}}
-        )
+        await self._set_job_fields(job_id, {"status": status, "updated_at": datetime.utcnow()})
 
     async def get_quotes_count_by_job(self, job_id: str) -> int:
         return await self.database.quotes.count_documents({"job_id": job_id})
@@ -1880,49 +1771,37 @@ class Database:
 
     # Statistics operations
     async def get_platform_stats(self) -> dict:
+        """Platform totals from the materialized platform_stats document"""
         # If database is not connected, return safe defaults
         if not self.connected or self.database is None:
-            try:
-                from models.trade_categories import NIGERIAN_TRADE_CATEGORIES
-            except Exception:
-                NIGERIAN_TRADE_CATEGORIES = []
-            custom_data = await self.get_custom_trades()
-            custom_trades = custom_data.get("trades", []) if custom_data else []
-            total_categories = len(set(NIGERIAN_TRADE_CATEGORIES + custom_trades))
-            return {
-                "total_tradespeople": 0,
-                "total_categories": total_categories,
-                "total_reviews": 0,
-                "average_rating": 0.0,
-                "total_jobs": 0,
-                "active_jobs": 0
-            }
+            stats = platform_stats.to_response(None)
+            stats["total_categories"] = await self._count_trade_categories()
+            return stats
+
+        doc = platform_stats_cache.snapshot
+        if doc is None:
+            doc = await self.database.platform_stats.find_one({"_id": platform_stats.STATS_DOC_ID})
+        if doc is None:
+            await self.reconcile_platform_stats()
+            doc = await self.database.platform_stats.find_one({"_id": platform_stats.STATS_DOC_ID})
+        return platform_stats.to_response(doc)
+
+    async def reconcile_platform_stats(self) -> dict:
+        """Recount platform_stats from the source collections; returns the drift corrected"""
+        return await platform_stats.reconcile(self.database, await self._count_trade_categories())
+
+    async def refresh_platform_categories(self):
+        """Refresh total_categories on platform_stats after the trade list changes"""
+        try:
+            await self.database.platform_stats.update_one(
+                {"_id": platform_stats.STATS_DOC_ID},
+                {"$set": {"total_categories": await self._count_trade_categories(), "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Failed to refresh platform category count: {e}")
 
-        # Total tradespeople from users collection
-        total_tradespeople = await self.database.users.count_documents({"role": "tradesperson"})
-        
-        # Total reviews
-        total_reviews = await self.database.reviews.count_documents({})
-        
-        # Average rating
-        pipeline = [
-            {"$group": {
-                "_id": None,
-                "avg_rating": {"$avg": "$rating"}
-            }}
-        ]
-        
-        result = await self.database.reviews.aggregate(pipeline).to_list(1)
-        average_rating = round(result[0]['avg_rating'], 1) if result else 0.0
-        
-        # Total jobs
-        total_jobs = await self.database.jobs.count_documents({})
-        
-        # Active jobs
-        active_jobs = await self.database.jobs.count_documents({
-            "status": "active"
-        })
-        
+    async def _count_trade_categories(self) -> int:
         # Get total available categories from static trade categories
         try:
             from models.trade_categories import NIGERIAN_TRADE_CATEGORIES
@@ -1932,9 +1811,11 @@ class Database:
             
             # Combine static and custom trades
             all_trades = list(set(NIGERIAN_TRADE_CATEGORIES + custom_trades))
-            total_categories = len(all_trades)
+            return len(all_trades)
         except Exception as e:
             logger.error(f"Error getting categories count: {e}")
+            if self.database is None:
+                return 0
             # Fallback: count unique categories from tradespeople
             users_with_categories = await self.database.users.find(
                 {"role": "tradesperson", "trade_categories": {"$exists": True, "$ne": None}},
@@ -1946,16 +1827,7 @@ class Database:
                 trade_categories = user.get("trade_categories", [])
                 if trade_categories:
                     all_categories.update(trade_categories)
-            total_categories = len(all_categories)
-
-        return {
-            "total_tradespeople": total_tradespeople,
-            "total_categories": total_categories,
-            "total_reviews": total_reviews,
-            "average_rating": average_rating,
-            "total_jobs": total_jobs,
-            "active_jobs": active_jobs
-        }
+            return len(all_categories)
 
     # Category operations
     async def get_categories_with_counts(self) -> List[dict]:
@@ -2154,8 +2026,8 @@ class Database:
         return datetime.utcnow()
 
     # Interest Management Methods (Lead Generation System)
-    async def create_interest(self, interest_data: dict) -> dict:
-        """Create a new interest record"""
+    async def create_interest(self, interest_data: dict, job: Optional[dict] = None) -> dict:
+        """Create a new interest record, carrying the job fields the tradesperson's views list"""
         # Check if tradesperson already showed interest in this job
         existing_interest = await self.interests_collection.find_one({
             "job_id": interest_data["job_id"],
@@ -2165,6 +2037,10 @@ class Database:
         if existing_interest:
             raise Exception("Already showed interest in this job")
         
+        if job is None:
+            job = await self.database.jobs.find_one({"id": interest_data["job_id"]}, interest_jobs.JOB_PROJECTION)
+        if job:
+            interest_data.update(interest_jobs.snapshot(job))
         await self.interests_collection.insert_one(interest_data)
         
         # Update job's interests_count
@@ -2172,6 +2048,7 @@ class Database:
             {"id": interest_data["job_id"]},
             {"$inc": {"interests_count": 1}}
         )
+        await stats_counters.record(self.database, "jobs.interests")
         
         return interest_data
 
@@ -2260,54 +2137,14 @@ class Database:
         return interested
 
     @time_it
-    async def get_tradesperson_interests(self, tradesperson_id: str) -> List[dict]:
-        """Get all interests for a tradesperson"""
-        pipeline = [
-            {"$match": {"tradesperson_id": tradesperson_id}},
-            {
-                "$lookup": {
-                    "from": "jobs",
-                    "localField": "job_id",
-                    "foreignField": "id",
-                    "as": "job"
-                }
-            },
-            {"$unwind": "$job"},
-            {
-                "$project": {
-                    "id": 1,
-                    "job_id": 1,
-                    "status": 1,
-                    "created_at": 1,
-                    "contact_shared_at": 1,
-                    "payment_made_at": 1,
-                    "job_title": "$job.title",
-                    "job_location": "$job.location",
-                    "job_status": "$job.status",
-                    "homeowner_name": "$job.homeowner.name",
-                    "contact_shared": {"$eq": ["$status", "contact_shared"]},
-                    "payment_made": {"$eq": ["$status", "paid_access"]},
-                    "access_fee_coins": "$job.access_fee_coins",
-                    "access_fee_naira": "$job.access_fee_naira"
-                }
-            },
-            {"$sort": {"created_at": -1}}
-        ]
-        
-        interests = await self.interests_collection.aggregate(pipeline).to_list(length=None)
-        
-        # Convert ObjectId to string and set default access fees
-        for interest in interests:
-            if '_id' in interest:
-                interest['_id'] = str(interest['_id'])
-            
-            # Set default access fees if not present or null
-            if not interest.get("access_fee_naira") or interest.get("access_fee_naira") is None:
-                interest["access_fee_naira"] = 1000
-            if not interest.get("access_fee_coins") or interest.get("access_fee_coins") is None:
-                interest["access_fee_coins"] = 10
-        
-        return interests
+    async def get_tradesperson_interests(
+        self, tradesperson_id: str, skip: int = 0, limit: Optional[int] = 20
+    ) -> List[dict]:
+        """Get a page of a tradesperson's interests, newest first (job fields are stored on the interest)"""
+        return await interest_jobs.page(self.database, tradesperson_id, skip=skip, limit=limit)
+
+    async def get_tradesperson_interests_count(self, tradesperson_id: str, job_status: Optional[str] = None) -> int:
+        return await interest_jobs.count(self.database, tradesperson_id, job_status)
 
     async def get_contact_details(self, job_id: str, tradesperson_id: str) -> dict:
         """Get homeowner contact details for paid access"""
@@ -2392,6 +2229,7 @@ class Database:
         review_dict["_id"] = review_dict["id"]
         
         await self.reviews_collection.insert_one(review_dict)
+        await platform_stats.review_created(self.database, review.rating)
         
         # Update user's review summary
         await self._update_user_review_summary(review.reviewee_id)
@@ -2764,8 +2602,50 @@ class Database:
         notification_dict["_id"] = notification_dict["id"]
         
         await self.notifications_collection.insert_one(notification_dict)
+        await notification_rollups.created(self.database, notification_dict)
         return notification
 
+    async def create_notifications(self, notifications: List[Notification]) -> List[Notification]:
+        """Create many notifications with one insert and one rollup write"""
+        if not notifications:
+            return notifications
+        docs = [dict(n.dict(), _id=n.id) for n in notifications]
+        await self.notifications_collection.insert_many(docs, ordered=False)
+        deltas = defaultdict(int)
+        for doc in docs:
+            deltas[notification_rollups.bucket_key(doc)] += 1
+        await notification_rollups.apply(self.database, deltas)
+        return notifications
+
+    async def record_notification_deliveries(self, notifications: List[Notification]) -> None:
+        """Store the outcome of delivering notifications created as pending, in one bulk write"""
+        if not notifications:
+            return
+        now = datetime.now(timezone.utc)
+        await self.notifications_collection.bulk_write([
+            UpdateOne({"_id": n.id, "status": NotificationStatus.PENDING.value}, {"$set": {
+                "status": n.status, "sent_at": n.sent_at, "subject": n.subject, "content": n.content, "updated_at": now
+            }})
+            for n in notifications
+        ], ordered=False)
+        deltas = defaultdict(int)
+        for n in notifications:
+            before = dict(n.dict(), status=NotificationStatus.PENDING.value)
+            for key, amount in notification_rollups.moved([before], n.status).items():
+                deltas[key] += amount
+        await notification_rollups.apply(self.database, deltas)
+
+    async def get_notification_preferences_for_users(self, user_ids: List[str]) -> Dict[str, NotificationPreferences]:
+        """Preferences for many users in one read; users without stored preferences get the defaults"""
+        found = {}
+        async for doc in self.notification_preferences_collection.find({"user_id": {"$in": list(user_ids)}}):
+            doc["id"] = str(doc.pop("_id"))
+            found[doc["user_id"]] = NotificationPreferences(**doc)
+        return {
+            user_id: found.get(user_id) or NotificationPreferences(id=str(uuid.uuid4()), user_id=user_id)
+            for user_id in user_ids
+        }
+
     async def get_user_notification_preferences(self, user_id: str) -> NotificationPreferences:
         """Get user notification preferences, create defaults if not exist"""
         preferences = await self.notification_preferences_collection.find_one({"user_id": user_id})
@@ -2811,11 +2691,22 @@ class Database:
             query["status"] = status
         return await self.notifications_collection.count_documents(query)
 
-    async def get_user_notifications(self, user_id: str, limit: int = 50, offset: int = 0) -> List[Notification]:
-        """Get notifications for a user with pagination"""
-        cursor = self.notifications_collection.find(
-            {"user_id": user_id}
-        ).sort("created_at", -1).skip(offset).limit(limit)
+    async def get_user_notifications(
+        self, user_id: str, limit: int = 50, offset: int = 0, since=None
+    ) -> List[Notification]:
+        """Get notifications for a user with pagination.
+
+        With ``since`` (a decoded sync key, or () for a full sync), returns
+        notifications changed after it in (updated_at, id) order instead.
+        """
+        if since is not None:
+            cursor = self.notifications_collection.find(
+                delta_filter({"user_id": user_id}, since or None)
+            ).sort([("updated_at", 1), ("id", 1)]).limit(limit)
+        else:
+            cursor = self.notifications_collection.find(
+                {"user_id": user_id}
+            ).sort("created_at", -1).skip(offset).limit(limit)
         
         notifications = []
         async for doc in cursor:
@@ -2831,83 +2722,86 @@ class Database:
         if delivered_at:
             update_data["delivered_at"] = delivered_at
         
-        result = await self.notifications_collection.update_one(
-            {"_id": notification_id},
-            {"$set": update_data}
+        return await self._set_notification_status({"_id": notification_id}, update_data) is not None
+
+    async def _set_notification_status(self, query: dict, update: dict) -> Optional[dict]:
+        """Apply ``update`` (which sets ``status``) to one notification and move its rollup count.
+
+        Returns the notification as it was before the update, or None if none matched.
+        """
+        before = await self.notifications_collection.find_one_and_update(
+            query, update if any(k.startswith("$") for k in update) else {"$set": update},
+            projection=notification_rollups.PROJECTION
         )
-        
-        return result.modified_count > 0
+        if before is not None:
+            status = update.get("$set", update)["status"]
+            await notification_rollups.status_changed(self.database, before, status)
+        return before
 
     async def mark_notification_as_read(self, notification_id: str, user_id: str) -> bool:
         """Mark a specific notification as read for a user"""
-        result = await self.notifications_collection.update_one(
+        before = await self._set_notification_status(
             {"_id": notification_id, "user_id": user_id},
-            {"$set": {"status": "read", "read_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc)}}
+            {"status": "read", "read_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc)}
         )
-        return result.modified_count > 0
+        return before is not None
 
-    async def mark_all_notifications_as_read(self, user_id: str) -> int:
-        """Mark all notifications as read for a user"""
-        result = await self.notifications_collection.update_many(
-            {"user_id": user_id, "status": {"$ne": "read"}},
-            {"$set": {"status": "read", "read_at": datetime.now(timezone.utc), "updated_at": datetime.now(timezone.utc)}}
-        )
-        return result.modified_count
+    async def mark_all_notifications_as_read(self, user_id: str, batch_size: int = 500) -> int:
+        """Mark all notifications as read for a user, ``batch_size`` at a time.
+
+        Each update stamps the documents it changes with this call's marker and the
+        status they had, so the rollups move exactly those even when another request
+        marks some of the same notifications read concurrently.
+        """
+        query = {"user_id": user_id, "status": {"$ne": "read"}}
+        marker = str(uuid.uuid4())
+        marked = 0
+        while True:
+            batch = await self.notifications_collection.find(query, {"_id": 1}).limit(batch_size).to_list(batch_size)
+            ids = [doc["_id"] for doc in batch]
+            if not ids:
+                break
+            now = datetime.now(timezone.utc)
+            await self.notifications_collection.update_many(dict(query, _id={"$in": ids}), [{"$set": {
+                "read_marker": marker, "read_from": "$status", "status": "read", "read_at": now, "updated_at": now
+            }}])
+            changed = await self.notifications_collection.find(
+                {"_id": {"$in": ids}, "read_marker": marker}, dict(notification_rollups.PROJECTION, read_from=1)
+            ).to_list(len(ids))
+            await notification_rollups.apply(self.database, notification_rollups.moved(
+                [dict(doc, status=doc["read_from"]) for doc in changed], "read"
+            ))
+            marked += len(changed)
+            if len(ids) < batch_size:
+                break
+        return marked
 
     async def delete_notification(self, notification_id: str, user_id: str) -> bool:
         """Delete a specific notification for a user"""
-        result = await self.notifications_collection.delete_one(
-            {"_id": notification_id, "user_id": user_id}
+        doc = await self.notifications_collection.find_one_and_delete(
+            {"_id": notification_id, "user_id": user_id}, projection=notification_rollups.PROJECTION
         )
-        return result.deleted_count > 0
+        if doc is not None:
+            await notification_rollups.removed(self.database, doc)
+            await self.record_tombstones("notifications", [(user_id, notification_id)])
+        return doc is not None
 
     async def get_notification_stats(self) -> Dict[str, Any]:
-        """Get notification delivery statistics"""
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$status",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
-        
-        status_counts = {}
-        async for doc in self.notifications_collection.aggregate(pipeline):
-            status_counts[doc["_id"]] = doc["count"]
+        """Get notification delivery statistics (counts from notification_rollups)"""
+        rows = await notification_rollups.counts(self.database, ("status", "type", "channel"))
+        status_counts: Dict[str, int] = defaultdict(int)
+        by_type: Dict[str, int] = defaultdict(int)
+        by_channel: Dict[str, int] = defaultdict(int)
+        for (status, notification_type, channel), count in rows.items():
+            status_counts[status] += count
+            by_type[notification_type] += count
+            by_channel[channel] += count
         
         # Calculate delivery rate
         total_sent = status_counts.get("sent", 0) + status_counts.get("delivered", 0)
         total_attempts = sum(status_counts.values())
         delivery_rate = (total_sent / total_attempts * 100) if total_attempts > 0 else 0
         
-        # Get stats by type and channel
-        type_pipeline = [
-            {
-                "$group": {
-                    "_id": "$type",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
-        
-        channel_pipeline = [
-            {
-                "$group": {
-                    "_id": "$channel",
-                    "count": {"$sum": 1}
-                }
-            }
-        ]
-        
-        by_type = {}
-        async for doc in self.notifications_collection.aggregate(type_pipeline):
-            by_type[doc["_id"]] = doc["count"]
-        
-        by_channel = {}
-        async for doc in self.notifications_collection.aggregate(channel_pipeline):
-            by_channel[doc["_id"]] = doc["count"]
-        
         # Get recent failures
         recent_failures = []
         cursor = self.notifications_collection.find(
@@ -2926,8 +2820,8 @@ class Database:
         return {
             "total_sent": total_sent,
             "delivery_rate": round(delivery_rate, 2),
-            "by_type": by_type,
-            "by_channel": by_channel,
+            "by_type": dict(by_type),
+            "by_channel": dict(by_channel),
             "recent_failures": recent_failures
         }
 
@@ -2966,22 +2860,8 @@ class Database:
             return None
 
     async def create_wallet(self, user_id: str) -> dict:
-        """Create a new wallet for user"""
-        wallet_data = {
-            "id": str(uuid.uuid4()),
-            "user_id": user_id,
-            "balance_coins": 0,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow()
-        }
-        
-        # Check if wallet already exists
-        existing = await self.wallets_collection.find_one({"user_id": user_id})
-        if existing:
-            return existing
-            
-        await self.wallets_collection.insert_one(wallet_data)
-        return wallet_data
+        """Create a new wallet for user (returns the existing one if present)"""
+        return await wallet_ledger.ensure_wallet(self.database, user_id)
 
     async def get_wallet_by_user_id(self, user_id: str) -> Optional[dict]:
         """Get wallet by user ID"""
@@ -3039,20 +2919,13 @@ class Database:
             }}
         ]
         
-        # 2. Job stats: Total jobs and total interests
-        job_pipeline = [
-            {"$group": {
-                "_id": None,
-                "total_jobs": {"$sum": 1},
-                "total_interests": {"$sum": {"$ifNull": ["$interests_count", 0]}},
-                "total_access_fee_naira": {"$sum": {"$ifNull": ["$access_fee_naira", 1500]}}
-            }}
-        ]
+        # 2. Job stats: Total jobs, interests and access fees from the daily rollups
+        job_metrics = ["jobs.total", "jobs.interests", "jobs.access_fee_naira"]
         
         # 3. Verification stats: Pending counts from both collections
         tasks = [
             self.wallet_transactions_collection.aggregate(wallet_pipeline).to_list(length=1),
-            self.database.jobs.aggregate(job_pipeline).to_list(length=1),
+            stats_counters.totals(self.database, job_metrics),
             self.user_verifications_collection.count_documents({"status": "pending"}),
             self.tradespeople_verifications_collection.count_documents({"status": "pending"})
         ]
@@ -3060,7 +2933,11 @@ class Database:
         results = await asyncio.gather(*tasks)
         
         wallet_res = results[0][0] if results[0] else {"count": 0, "total_naira": 0, "total_coins": 0}
-        job_res = results[1][0] if results[1] else {"total_jobs": 0, "total_interests": 0, "total_access_fee_naira": 0}
+        job_res = {
+            "total_jobs": int(results[1].get("jobs.total", 0)),
+            "total_interests": int(results[1].get("jobs.interests", 0)),
+            "total_access_fee_naira": results[1].get("jobs.access_fee_naira", 0)
+        }
         pending_verifications_count = results[2]
         pending_trades_verifications_count = results[3]
         
@@ -3119,32 +2996,19 @@ class Database:
         return requests
 
     async def confirm_wallet_funding(self, transaction_id: str, admin_id: str, admin_notes: str = "") -> bool:
-        """Confirm wallet funding request"""
-        # Get transaction
-        transaction = await self.wallet_transactions_collection.find_one({"id": transaction_id})
-        if not transaction or transaction["status"] != "pending":
-            return False
-        
-        # Update transaction status
-        result = await self.wallet_transactions_collection.update_one(
-            {"id": transaction_id},
+        """Confirm wallet funding request and credit the wallet exactly once"""
+        settled = await wallet_ledger.settle_pending(
+            self.client,
+            self.database,
+            transaction_id,
             {
-                "$set": {
-                    "status": "confirmed",
-                    "processed_by": admin_id,
-                    "admin_notes": admin_notes,
-                    "processed_at": datetime.utcnow()
-                }
+                "status": "confirmed",
+                "processed_by": admin_id,
+                "admin_notes": admin_notes,
+                "processed_at": datetime.utcnow()
             }
         )
-        
-        if result.modified_count > 0:
-            # Add coins to wallet
-            coins_to_add = transaction["amount_coins"]
-            await self.update_wallet_balance(transaction["user_id"], coins_to_add)
-            return True
-        
-        return False
+        return settled is not None
 
     async def reject_wallet_funding(self, transaction_id: str, admin_id: str, admin_notes: str = "") -> bool:
         """Reject wallet funding request"""
@@ -3162,31 +3026,29 @@ class Database:
         return result.modified_count > 0
 
     async def deduct_access_fee(self, user_id: str, job_id: str, access_fee_coins: int) -> bool:
-        """Deduct access fee from wallet and create transaction record"""
-        # Check wallet balance
-        wallet = await self.get_wallet_by_user_id(user_id)
-        if wallet["balance_coins"] < access_fee_coins:
-            return False
-        
-        # Deduct coins
-        success = await self.update_wallet_balance(user_id, -access_fee_coins)
-        if not success:
+        """Deduct access fee from wallet and create transaction record.
+
+        Charged at most once per (user, job): a retried request returns True
+        without deducting again.
+        """
+        try:
+            await wallet_ledger.post(
+                self.client,
+                self.database,
+                user_id,
+                -access_fee_coins,
+                idempotency_key=f"access_fee:{user_id}:{job_id}",
+                entry={
+                    "transaction_type": "access_fee_deduction",
+                    "amount_coins": access_fee_coins,
+                    "amount_naira": access_fee_coins * 100,  # Convert to naira
+                    "status": "confirmed",
+                    "description": "Access fee for job contact details",
+                    "reference": job_id,
+                }
+            )
+        except wallet_ledger.InsufficientFunds:
             return False
-        
-        # Create transaction record
-        transaction_data = {
-            "wallet_id": wallet["id"],
-            "user_id": user_id,
-            "transaction_type": "access_fee_deduction",
-            "amount_coins": access_fee_coins,
-            "amount_naira": access_fee_coins * 100,  # Convert to naira
-            "status": "confirmed",
-            "description": f"Access fee for job contact details",
-            "reference": job_id,
-            "processed_at": datetime.utcnow()
-        }
-        
-        await self.create_wallet_transaction(transaction_data)
         return True
 
     # ==========================================
@@ -3197,17 +3059,11 @@ class Database:
         """Update job access fee (admin only)"""
         access_fee_coins = access_fee_naira // 100  # Convert to coins
         
-        result = await self.database.jobs.update_one(
-            {"id": job_id},
-            {
-                "$set": {
-                    "access_fee_naira": access_fee_naira,
-                    "access_fee_coins": access_fee_coins,
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-        return result.modified_count > 0
+        return await self._set_job_fields(job_id, {
+            "access_fee_naira": access_fee_naira,
+            "access_fee_coins": access_fee_coins,
+            "updated_at": datetime.utcnow()
+        })
 
     @time_it
     async def get_jobs_with_access_fees(self, skip: int = 0, limit: int = 20) -> List[dict]:
@@ -3531,13 +3387,21 @@ class Database:
     async def get_jobs_for_tradesperson(self, tradesperson_id: str, skip: int = 0, limit: int = 50,
                                       latitude: float = None, longitude: float = None, 
                                       max_distance_km: float = None) -> List[dict]:
-        """Get jobs filtered by tradesperson's skills and location preferences with optional overrides"""
+        """Get jobs filtered by tradesperson's skills and location preferences with optional overrides.
+
+        Reads the materialized feed (services/job_feeds.py) unless the request overrides the
+        location or the tradesperson has no trades; those are computed live as before.
+        """
         try:
             # Get tradesperson details
             tradesperson = await self.get_user_by_id(tradesperson_id)
             if not tradesperson:
                 # Fallback to all jobs if tradesperson not found
                 return await self.get_available_jobs(skip=skip, limit=limit)
+
+            overridden = latitude is not None or longitude is not None or max_distance_km is not None
+            if not overridden and job_feeds.trades_of(tradesperson):
+                return await self._read_job_feed(tradesperson, skip, limit)
             
             # Build the job filter based on tradesperson profile
             job_filter = {"status": "active"}
@@ -3593,22 +3457,34 @@ class Database:
             # Fallback to general available jobs
             return await self.get_available_jobs(skip=skip, limit=limit)
 
+    async def _read_job_feed(self, tradesperson: dict, skip: int, limit: int) -> List[dict]:
+        """A page of the tradesperson's materialized feed, newest first, with ``distance_km``."""
+        tradesperson_id = tradesperson.get("id")
+        await job_feeds.ensure(self.database, tradesperson)
+        entries = await job_feeds.page(self.database, tradesperson_id, skip, limit)
+        if not entries:
+            return []
+        jobs = await self.database.jobs.find(
+            {"id": {"$in": [e["job_id"] for e in entries]}, "status": "active"}
+        ).to_list(length=len(entries))
+        by_id = {job["id"]: job for job in jobs}
+        page = []
+        for feed_entry in entries:
+            job = by_id.get(feed_entry["job_id"])
+            if job:
+                job["_id"] = str(job["_id"])
+                job["distance_km"] = feed_entry.get("distance_km")
+                page.append(job)
+        return page
+
     @time_it
     async def get_jobs_near_location_with_skills(self, latitude: float, longitude: float, 
                                                max_distance_km: float, skill_categories: List[str],
                                                skip: int = 0, limit: int = 50) -> List[dict]:
         """Get jobs near location matching skills, including jobs without coordinates (optimized)."""
         try:
-            # Base filter: active jobs only, non-expired (most important for performance)
-            # Handle jobs that might not have an expires_at field
-            base_filter = {
-                "status": "active",
-                "$or": [
-                    {"expires_at": {"$gt": datetime.utcnow()}},
-                    {"expires_at": {"$exists": False}},
-                    {"expires_at": None}
-                ]
-            }
+            # Base filter: active jobs only (expired ones are swept out of "active")
+            base_filter = {"status": "active"}
 
             # Build skills filter using both category and title (consistent with get_jobs_for_tradesperson)
             combined_filter = base_filter
@@ -3682,14 +3558,7 @@ class Database:
             try:
                 cursor = (
                     self.database.jobs
-                    .find({
-                        "status": "active",
-                        "$or": [
-                            {"expires_at": {"$gt": datetime.utcnow()}},
-                            {"expires_at": {"$exists": False}},
-                            {"expires_at": None}
-                        ]
-                    })
+                    .find({"status": "active"})
                     .sort("created_at", -1)
                     .skip(skip)
                     .limit(limit)
@@ -3721,21 +3590,21 @@ class Database:
         skip: int = 0,
         limit: int = 50,
     ) -> List[dict]:
-        """Search active, non-expired jobs with optional text/category filters and optional location radius (optimized)."""
+        """Search active, non-expired jobs with optional text/category filters and optional location radius (optimized).
+
+        With a search query results are relevance-ranked ($text on jobs_text_search_weighted) and the
+        radius only filters; without one they are newest first, or nearest first with a location.
+        """
         try:
-            # Base filter: public active jobs that haven't expired
-            base_filter: Dict[str, Any] = {
-                "status": "active",
-                "expires_at": {"$gt": datetime.utcnow()},
-            }
+            # Base filter: public active jobs
+            base_filter: Dict[str, Any] = {"status": "active"}
 
-            # Text search on title/description - AVOID if possible (slow on large collections)
-            if search_query and len(search_query.strip()) >= 2:
-                search_pattern = {"$regex": search_query, "$options": "i"}
-                base_filter["$or"] = [
-                    {"title": search_pattern},
-                    {"description": search_pattern},
-                ]
+            # Ranked text search on title/category/description
+            ranked = job_search.is_searchable(search_query)
+            if ranked:
+                base_filter.update(job_search.text_filter(search_query))
+            projection = job_search.SCORE_PROJECTION if ranked else None
+            order = job_search.RANKED_SORT if ranked else [("created_at", -1)]
 
             # Category filter (exact, faster than regex)
             if category:
@@ -3750,8 +3619,8 @@ class Database:
                 
                 cursor = (
                     self.database.jobs
-                    .find(base_filter)
-                    .sort("created_at", -1)
+                    .find(base_filter, projection)
+                    .sort(order)
                     .skip(skip)
                     .limit(fetch_limit)
                 )
@@ -3764,6 +3633,7 @@ class Database:
 
                 jobs_within_distance: List[Dict[str, Any]] = []
                 jobs_without_coords: List[Dict[str, Any]] = []
+                kept: List[Dict[str, Any]] = []
 
                 # Process jobs synchronously (faster than parallel for small batches)
                 for job in raw_jobs:
@@ -3787,10 +3657,15 @@ class Database:
                             # Ensure distance is at least 0.1 to avoid "0.0" display
                             job["distance_km"] = max(0.1, round(dist, 2))
                             jobs_within_distance.append(job)
+                            kept.append(job)
                     else:
                         job["distance_km"] = None
                         jobs_without_coords.append(job)
+                        kept.append(job)
 
+                if ranked:
+                    # Keep relevance order; the radius only filters
+                    return kept[:limit]
                 # Sort by distance, then recency
                 jobs_within_distance.sort(key=lambda x: x.get("distance_km", float("inf")))
                 combined = jobs_within_distance + jobs_without_coords
@@ -3799,8 +3674,8 @@ class Database:
                 # No location, just fetch and paginate
                 cursor = (
                     self.database.jobs
-                    .find(base_filter)
-                    .sort("created_at", -1)
+                    .find(base_filter, projection)
+                    .sort(order)
                     .skip(skip)
                     .limit(limit)
                 )
@@ -3822,6 +3697,54 @@ class Database:
             logger.error(f"Error in search_jobs_with_location: {e}")
             return []
 
+    async def search_jobs_text(
+        self,
+        search_query: Optional[str] = None,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 10,
+    ) -> Tuple[List[dict], int]:
+        """Relevance-ranked search over public (active, non-expired) jobs. Returns (page, total)."""
+        query: Dict[str, Any] = {"status": "active"}
+        ranked = job_search.is_searchable(search_query)
+        if ranked:
+            query.update(job_search.text_filter(search_query))
+        if category:
+            query["category"] = category
+        if location:
+            query["location"] = {"$regex": re.escape(location), "$options": "i"}
+
+        cursor = self.database.jobs.find(query, job_search.SCORE_PROJECTION if ranked else None)
+        sort = job_search.RANKED_SORT if ranked else [("created_at", -1), ("_id", 1)]
+        cursor = cursor.sort(sort).skip(skip).limit(limit)
+        try:
+            jobs, total = await asyncio.wait_for(
+                asyncio.gather(cursor.to_list(length=limit), self.database.jobs.count_documents(query)),
+                timeout=10.0,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("search_jobs_text timeout after 10 seconds; returning empty")
+            return [], 0
+        for job in jobs:
+            job_id_str = str(job["_id"])
+            job["_id"] = job_id_str
+            if "id" not in job:
+                job["id"] = job_id_str
+        return jobs, total
+
+    async def suggest_job_search_terms(self, text: str, limit: int = 8) -> List[str]:
+        """Prefix / typo-tolerant completions for the job search box."""
+        suggestions = job_search.job_suggestions
+        if suggestions.stale:
+            try:
+                from .models.trade_categories import NIGERIAN_TRADE_CATEGORIES
+            except ImportError:
+                from models.trade_categories import NIGERIAN_TRADE_CATEGORIES
+            custom = await self.get_custom_trades()
+            await suggestions.refresh(self.database, NIGERIAN_TRADE_CATEGORIES + ((custom or {}).get("trades") or []))
+        return suggestions.suggest(text, limit)
+
     @time_it
     async def _process_job_data(self, job: dict) -> dict:
         """Process and enrich job data with additional information"""
@@ -3875,7 +3798,13 @@ class Database:
         return self.database.tradespeople_verifications
 
     async def generate_referral_code(self, user_id: str) -> str:
-        """Generate unique referral code for user"""
+        """Generate unique referral code for user.
+
+        The code is the first letters of the user's name plus a sequence number
+        from the referral_codes allocator. Sequence numbers start above 9999, so
+        new codes can't clash with legacy NAME + 4-digit codes. The unique index
+        on referral_codes.code settles anything else.
+        """
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot generate referral code")
         # Get user info for code generation
@@ -3883,56 +3812,35 @@ class Database:
         if not user:
             raise ValueError("User not found")
         
-        # Generate code based on name + random numbers
-        base_name = user["name"].split()[0].upper()[:4]  # First 4 letters of first name
-        
-        # Find unique code
-        import random
-        for _ in range(10):  # Try 10 times
-            random_num = random.randint(1000, 9999)
-            code = f"{base_name}{random_num}"
-            
-            # Check if code exists
-            existing = await self.referral_codes_collection.find_one({"code": code})
-            if not existing:
-                # Create referral code record
-                referral_code_data = {
-                    "id": str(uuid.uuid4()),
-                    "user_id": user_id,
-                    "code": code,
-                    "is_active": True,
-                    "created_at": datetime.utcnow(),
-                    "uses_count": 0
-                }
-                
-                await self.referral_codes_collection.insert_one(referral_code_data)
-                
-                # Update user record
-                await self.users_collection.update_one(
-                    {"id": user_id},
-                    {"$set": {"referral_code": code}}
-                )
-                
-                return code
-        
-        # Fallback to UUID if no unique code found
-        fallback_code = str(uuid.uuid4())[:8].upper()
+        # Letters only, so the numeric suffix boundary is unambiguous
+        first_name = (user.get("name") or "").split()[0] if (user.get("name") or "").split() else ""
+        base_name = re.sub(r"[^A-Z]", "", first_name.upper())[:4] or "SH"
+
+        async def next_code() -> str:
+            seq = await get_allocator("referral_codes").next(self.database.counters)
+            return f"{base_name}{seq}"
+
+        async def reallocate(doc: dict):
+            doc["code"] = await next_code()
+
         referral_code_data = {
             "id": str(uuid.uuid4()),
             "user_id": user_id,
-            "code": fallback_code,
+            "code": await next_code(),
             "is_active": True,
             "created_at": datetime.utcnow(),
             "uses_count": 0
         }
-        
-        await self.referral_codes_collection.insert_one(referral_code_data)
+        await self._insert_with_allocated_id(self.referral_codes_collection, referral_code_data, "code", reallocate)
+        code = referral_code_data["code"]
+
+        # Update user record
         await self.users_collection.update_one(
             {"id": user_id},
-            {"$set": {"referral_code": fallback_code}}
+            {"$set": {"referral_code": code}}
         )
         
-        return fallback_code
+        return code
 
     async def record_referral(self, referrer_code: str, referred_user_id: str) -> bool:
         """Record a referral when someone signs up with a referral code"""
@@ -4097,56 +4005,48 @@ class Database:
         # Award 5 coins to referrer
         coins_to_award = 5
         referrer_id = referral["referrer_id"]
-        
-        # Get or create referrer's wallet
-        wallet = await self.get_wallet_by_user_id(referrer_id)
-        
-        # Add referral coins to wallet
-        await self.wallets_collection.update_one(
-            {"user_id": referrer_id},
-            {
-                "$inc": {"balance_coins": coins_to_award},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
-        )
-        
-        # Create transaction record
-        transaction_data = {
-            "wallet_id": wallet["id"],
-            "user_id": referrer_id,
-            "transaction_type": "referral_reward",
-            "amount_coins": coins_to_award,
-            "amount_naira": coins_to_award * 100,
-            "status": "confirmed",
-            "description": f"Referral reward for successful referral",
-            "reference": verified_user_id,
-            "processed_at": datetime.utcnow()
-        }
-        
-        await self.create_wallet_transaction(transaction_data)
-        
-        # Update referral record
-        await self.referrals_collection.update_one(
-            {"id": referral["id"]},
-            {
-                "$set": {
-                    "status": "verified",
-                    "coins_earned": coins_to_award,
-                    "verified_at": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            }
-        )
-        
-        # Update referrer's stats
-        await self.users_collection.update_one(
-            {"id": referrer_id},
-            {
-                "$inc": {
-                    "total_referrals": 1,
-                    "referral_coins_earned": coins_to_award
-                }
-            }
+
+        async def mark_verified(session):
+            # Referral status and referrer stats commit together with the credit
+            result = await self.referrals_collection.update_one(
+                {"id": referral["id"], "status": "pending"},
+                {
+                    "$set": {
+                        "status": "verified",
+                        "coins_earned": coins_to_award,
+                        "verified_at": datetime.utcnow(),
+                        "updated_at": datetime.utcnow()
+                    }
+                },
+                session=session
+            )
+            if result.modified_count:
+                await self.users_collection.update_one(
+                    {"id": referrer_id},
+                    {
+                        "$inc": {
+                            "total_referrals": 1,
+                            "referral_coins_earned": coins_to_award
+                        }
+                    },
+                    session=session
+                )
+
+        await wallet_ledger.post(
+            self.client,
+            self.database,
+            referrer_id,
+            coins_to_award,
+            idempotency_key=f"referral_reward:{referral['id']}",
+            entry={
+                "transaction_type": "referral_reward",
+                "amount_coins": coins_to_award,
+                "amount_naira": coins_to_award * 100,
+                "status": "confirmed",
+                "description": "Referral reward for successful referral",
+                "reference": verified_user_id,
+            },
+            then=mark_verified
         )
 
     async def get_user_referral_stats(self, user_id: str) -> dict:
@@ -4413,11 +4313,8 @@ class Database:
                 "tin": payload.get("tin") or existing.get("tin"),
                 "designated_partners": payload.get("designated_partners") or existing.get("designated_partners"),
                 "documents": merged_docs,
-                "documents_base64": payload.get("documents_base64") or existing.get("documents_base64") or [],
                 "work_photos": merged_work_photos,
-                "work_photos_base64": payload.get("work_photos_base64") or existing.get("work_photos_base64") or [],
                 "partner_id_documents": merged_partner_ids,
-                "partner_id_documents_base64": payload.get("partner_id_documents_base64") or existing.get("partner_id_documents_base64") or [],
                 "updated_at": datetime.utcnow(),
             }
             await self.tradespeople_verifications_collection.update_one(
@@ -4448,11 +4345,8 @@ class Database:
             "tin": payload.get("tin"),
             "designated_partners": payload.get("designated_partners"),
             "documents": payload.get("documents", {}),
-            "documents_base64": payload.get("documents_base64", []),
             "work_photos": payload.get("work_photos", []),
-            "work_photos_base64": payload.get("work_photos_base64", []),
             "partner_id_documents": payload.get("partner_id_documents", []),
-            "partner_id_documents_base64": payload.get("partner_id_documents_base64", []),
             "status": "pending",
             "submitted_at": datetime.utcnow(),
             "updated_at": datetime.utcnow(),
@@ -4469,24 +4363,54 @@ class Database:
             pass
         return record["id"]
 
+    # ==========================================
+    # BLOB METADATA
+    # ==========================================
+
+    @property
+    def blobs_collection(self):
+        """Access to blob metadata collection"""
+        if self.database is None:
+            raise RuntimeError("Database unavailable: blobs collection not accessible")
+        return self.database.blobs
+
+    async def upsert_blob_record(self, record: Dict[str, Any]) -> None:
+        """Create or replace the (namespace, filename) -> sha256 mapping"""
+        await self.blobs_collection.update_one(
+            {"namespace": record["namespace"], "filename": record["filename"]},
+            {
+                "$set": record,
+                "$setOnInsert": {"id": str(uuid.uuid4()), "created_at": datetime.utcnow()},
+            },
+            upsert=True
+        )
+
+    async def get_blob_record(self, namespace: str, filename: str) -> Optional[dict]:
+        """Get blob metadata by namespace and filename"""
+        if self.database is None:
+            return None
+        return await self.blobs_collection.find_one(
+            {"namespace": namespace, "filename": filename},
+            {"_id": 0}
+        )
+
     async def get_tradespeople_file_base64(self, filename: str) -> Optional[dict]:
-        """Return stored base64 for a tradespeople verification file by filename.
-        Searches documents_base64, work_photos_base64, partner_id_documents_base64.
+        """Return legacy embedded base64 for a tradespeople verification file by filename.
+        Only used for records not yet moved to the blob store by tools/migrate_blobs.py.
         """
         if self.database is None:
             raise RuntimeError("Database unavailable: cannot query tradespeople verifications")
-        cursor = self.tradespeople_verifications_collection.find({
-            "status": {"$in": ["pending", "verified"]}
-        }).sort("submitted_at", -1)
-        async for v in cursor:
-            for key in ("documents_base64", "work_photos_base64", "partner_id_documents_base64"):
-                items = v.get(key) or []
-                for item in items:
-                    try:
-                        if item and item.get("filename") == filename and item.get("base64"):
-                            return item
-                    except Exception:
-                        continue
+        keys = ("documents_base64", "work_photos_base64", "partner_id_documents_base64")
+        v = await self.tradespeople_verifications_collection.find_one(
+            {"$or": [{f"{key}.filename": filename} for key in keys]},
+            {key: {"$elemMatch": {"filename": filename}} for key in keys},
+        )
+        if not v:
+            return None
+        for key in keys:
+            for item in v.get(key) or []:
+                if item and item.get("base64"):
+                    return item
         return None
 
     async def get_user_tradesperson_verification_status(self, user_id: str) -> dict:
@@ -4628,10 +4552,9 @@ class Database:
     # ==========================================
     
     @time_it
-    async def get_all_users_for_admin(self, skip: int = 0, limit: int = 50, role: str = None, status: str = None, search: str = None):
-        """Get all users with filtering for admin dashboard (optimized)"""
-        import asyncio
-        # Build query filter
+    @staticmethod
+    def _admin_users_query(role: str = None, status: str = None, search: str = None) -> dict:
+        """Admin user list filter; searches are routed to indexed lookups (services/user_search.py)"""
         query = {}
         
         if role:
@@ -4643,16 +4566,17 @@ class Database:
             # Default to active users if no status specified
             query["status"] = {"$ne": "deleted"}
             
-        if search:
-            query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"email": {"$regex": search, "$options": "i"}},
-                {"phone": {"$regex": search, "$options": "i"}},
-                {"skills": {"$regex": search, "$options": "i"}},
-                {"user_id": {"$regex": f"^{search}$", "$options": "i"}},
-                {"public_id": {"$regex": f"^{search}$", "$options": "i"}},
-                {"id": {"$regex": search, "$options": "i"}}
-            ]
+        search_clause = user_search.query_for(search)
+        if search_clause:
+            query.update(search_clause)
+        return query
+
+    async def get_all_users_for_admin(
+        self, skip: int = 0, limit: int = 50, role: str = None, status: str = None, search: str = None
+    ):
+        """Get all users with filtering for admin dashboard (optimized)"""
+        import asyncio
+        query = self._admin_users_query(role=role, status=status, search=search)
         
         # Get users with pagination
         users_cursor = self.users_collection.find(query).skip(skip).limit(limit).sort("created_at", -1)
@@ -4736,23 +4660,7 @@ class Database:
 
     async def get_users_total_count_filtered(self, role: str = None, status: str = None, search: str = None):
         """Get total count of users matching filters for admin dashboard pagination"""
-        query = {}
-        if role:
-            query["role"] = role
-        if status:
-            query["status"] = status
-        else:
-            query["status"] = {"$ne": "deleted"}
-        if search:
-            query["$or"] = [
-                {"name": {"$regex": search, "$options": "i"}},
-                {"email": {"$regex": search, "$options": "i"}},
-                {"phone": {"$regex": search, "$options": "i"}},
-                {"skills": {"$regex": search, "$options": "i"}},
-                {"user_id": {"$regex": f"^{search}$", "$options": "i"}},
-                {"public_id": {"$regex": f"^{search}$", "$options": "i"}},
-                {"id": {"$regex": search, "$options": "i"}},
-            ]
+        query = self._admin_users_query(role=role, status=status, search=search)
         return await self.users_collection.count_documents(query)
     
     async def get_total_users_count(self):
@@ -5076,6 +4984,14 @@ class Database:
             except Exception as e:
                 logger.warning(f"Error collecting job IDs for user {user_id}: {e}")
 
+            # Quote slots this user's quotes hold on other homeowners' jobs
+            quoted_jobs = await self.database.quotes.aggregate([
+                {"$match": {"tradesperson_id": user_id}},
+                {"$group": {"_id": "$job_id", "count": {"$sum": 1}}}
+            ]).to_list(length=None)
+
+            await self.record_conversation_tombstones({"participants": user_id})
+
             # 2. Prepare all deletion tasks
             delete_tasks = {
                 "jobs": self.database.jobs.delete_many({"$or": [{"homeowner_id": user_id}, {"homeowner.id": user_id}]}),
@@ -5113,6 +5029,11 @@ class Database:
                 elif hasattr(res, 'deleted_count') and res.deleted_count > 0:
                     logger.info(f"Deleted {res.deleted_count} records from {key} for user {user_id}")
 
+            if quoted_jobs and not isinstance(results_list[task_keys.index("quotes")], Exception):
+                await self.database.jobs.bulk_write([
+                    UpdateOne({"id": q["_id"]}, {"$inc": {"quotes_count": -q["count"]}}) for q in quoted_jobs
+                ], ordered=False)
+
             # Finally delete the user account(s)
             email = user.get("email")
             if email:
@@ -5420,6 +5341,7 @@ class Database:
                 return False
             
             await self.database.system_trades.insert_one(trade_doc)
+            await self.refresh_platform_categories()
             return True
         except Exception as e:
             print(f"Error adding trade: {e}")
@@ -5468,6 +5390,8 @@ class Database:
             modified = getattr(result, "modified_count", 0) > 0
             upserted = getattr(result, "upserted_id", None) is not None
             if matched or modified or upserted:
+                if upserted or old_name.lower() != new_name.lower():
+                    await self.refresh_platform_categories()
                 return True
 
             # Fallback: try matching by new_name in case existing record already uses new label
@@ -5487,6 +5411,8 @@ class Database:
         """Delete a trade category"""
         try:
             result = await self.database.system_trades.delete_one({"name": trade_name})
+            if result.deleted_count:
+                await self.refresh_platform_categories()
             return result.deleted_count > 0
         except Exception as e:
             print(f"Error deleting trade: {e}")
@@ -5557,15 +5483,26 @@ class Database:
             print(f"Error getting conversation: {e}")
             return None
     
-    async def get_user_conversations(self, user_id: str, user_type: str, skip: int = 0, limit: int = 20) -> List[dict]:
-        """Get all conversations for a user"""
+    async def get_user_conversations(
+        self, user_id: str, user_type: str, skip: int = 0, limit: int = 20, since=None
+    ) -> List[dict]:
+        """Get all conversations for a user.
+
+        With ``since`` (a decoded sync key, or () for a full sync), returns
+        conversations changed after it in (updated_at, id) order instead.
+        """
         try:
             if user_type == UserRole.HOMEOWNER.value:
                 query = {"homeowner_id": user_id}
             else:
                 query = {"tradesperson_id": user_id}
             
-            cursor = self.database.conversations.find(query).sort("last_message_at", -1).skip(skip).limit(limit)
+            if since is not None:
+                cursor = self.database.conversations.find(
+                    delta_filter(query, since or None)
+                ).sort([("updated_at", 1), ("id", 1)]).limit(limit)
+            else:
+                cursor = self.database.conversations.find(query).sort("last_message_at", -1).skip(skip).limit(limit)
             conversations = await cursor.to_list(length=limit)
             
             for conv in conversations:
@@ -5590,7 +5527,9 @@ class Database:
             await self._update_conversation_last_message(
                 message_data["conversation_id"], 
                 message_data["content"],
-                message_data["sender_type"]
+                message_data["sender_type"],
+                message_id=message_data.get("id"),
+                sent_at=message_data["created_at"]
             )
             
             return message_data
@@ -5599,12 +5538,23 @@ class Database:
             print(f"Error creating message: {e}")
             return None
     
-    async def get_conversation_messages(self, conversation_id: str, skip: int = 0, limit: int = 50) -> List[dict]:
-        """Get messages for a conversation"""
+    async def get_conversation_messages(
+        self, conversation_id: str, skip: int = 0, limit: int = 50, since=None
+    ) -> List[dict]:
+        """Get messages for a conversation.
+
+        With ``since`` (a decoded sync key, or () for a full sync), returns
+        messages created or changed after it in (updated_at, id) order instead.
+        """
         try:
-            cursor = self.database.messages.find(
-                {"conversation_id": conversation_id}
-            ).sort("created_at", 1).skip(skip).limit(limit)
+            if since is not None:
+                cursor = self.database.messages.find(
+                    delta_filter({"conversation_id": conversation_id}, since or None)
+                ).sort([("updated_at", 1), ("id", 1)]).limit(limit)
+            else:
+                cursor = self.database.messages.find(
+                    {"conversation_id": conversation_id}
+                ).sort("created_at", 1).skip(skip).limit(limit)
             
             messages = await cursor.to_list(length=limit)
             
@@ -5616,33 +5566,100 @@ class Database:
             print(f"Error getting conversation messages: {e}")
             return []
     
-    async def mark_messages_as_read(self, conversation_id: str, user_type: str) -> bool:
-        """Mark all messages in a conversation as read for a user"""
+    async def mark_messages_as_read(self, conversation_id: str, user_type: str) -> Optional[dict]:
+        """Advance the reader's watermark to the conversation's latest message.
+
+        A single-document update: ``last_read_at_<role>`` / ``last_read_message_id_<role>``
+        are copied from ``last_message_at`` / ``last_message_id`` atomically and the
+        unread counter is cleared. Per-message status is derived from the watermark at
+        read time (see apply_read_status). Returns the watermark, or None on failure.
+        """
         try:
-            # Update message status to read for messages not sent by this user
-            other_type = "homeowner" if user_type == UserRole.TRADESPERSON.value else "tradesperson"
-            
-            await self.database.messages.update_many(
-                {
-                    "conversation_id": conversation_id,
-                    "sender_type": other_type,
-                    "status": {"$ne": "read"}
-                },
-                {"$set": {"status": "read", "updated_at": datetime.now(timezone.utc)}}
-            )
-            
-            # Reset unread count for this user type
-            unread_field = f"unread_count_{user_type}"
-            await self.database.conversations.update_one(
+            role = getattr(user_type, "value", user_type)
+            read_at_field = f"last_read_at_{role}"
+            read_id_field = f"last_read_message_id_{role}"
+            unread_field = f"unread_count_{role}"
+            now = datetime.now(timezone.utc)
+            updated = await self.database.conversations.find_one_and_update(
                 {"id": conversation_id},
-                {"$set": {unread_field: 0}}
+                [{"$set": {
+                    read_at_field: {"$ifNull": ["$last_message_at", now]},
+                    read_id_field: {"$ifNull": ["$last_message_id", f"${read_id_field}"]},
+                    unread_field: 0,
+                    "updated_at": now,
+                }}],
+                projection={"_id": 0, read_at_field: 1, read_id_field: 1},
+                return_document=True,
             )
-            
-            return True
+            if not updated:
+                return None
+            return {
+                "last_read_at": updated.get(read_at_field),
+                "last_read_message_id": updated.get(read_id_field),
+            }
         except Exception as e:
             print(f"Error marking messages as read: {e}")
-            return False
+            return None
+
+    @staticmethod
+    def apply_read_status(messages: List[dict], conversation: dict) -> List[dict]:
+        """Set each message's status from the recipient's read watermark.
+
+        Conversations without a watermark (written before watermarks existed) keep
+        the stored per-message status.
+        """
+        watermarks = {}
+        for role in ("homeowner", "tradesperson"):
+            read_at = conversation.get(f"last_read_at_{role}")
+            if read_at is not None:
+                watermarks[role] = read_at.replace(tzinfo=None) if read_at.tzinfo else read_at
+        if not watermarks:
+            return messages
+        for msg in messages:
+            sender = getattr(msg.get("sender_type"), "value", msg.get("sender_type"))
+            recipient = "homeowner" if sender == UserRole.TRADESPERSON.value else "tradesperson"
+            read_at = watermarks.get(recipient)
+            created_at = msg.get("created_at")
+            if read_at is None or created_at is None:
+                continue
+            created_at = created_at.replace(tzinfo=None) if created_at.tzinfo else created_at
+            msg["status"] = "read" if created_at <= read_at else "sent"
+        return messages
     
+    # Delta-sync tombstones
+
+    async def record_tombstones(self, collection: str, entries: List[tuple]) -> None:
+        """Record deletions as (owner_id, doc_id) pairs so ?since= clients can drop them."""
+        now = datetime.now(timezone.utc)
+        docs = [
+            {"collection": collection, "owner_id": owner_id, "id": doc_id, "updated_at": now}
+            for owner_id, doc_id in entries
+            if owner_id and doc_id
+        ]
+        if not docs:
+            return
+        try:
+            await self.database.sync_tombstones.insert_many(docs, ordered=False)
+        except Exception as e:
+            logger.warning(f"Failed to record {collection} tombstones: {e}")
+
+    async def record_conversation_tombstones(self, query: dict) -> None:
+        """Tombstone every conversation matching query for both participants (call before deleting)."""
+        cursor = self.database.conversations.find(query, {"id": 1, "homeowner_id": 1, "tradesperson_id": 1})
+        entries = []
+        async for conv in cursor:
+            entries.append((conv.get("homeowner_id"), conv.get("id")))
+            entries.append((conv.get("tradesperson_id"), conv.get("id")))
+        await self.record_tombstones("conversations", entries)
+
+    async def get_tombstones(self, collection: str, owner_id: str, since=None, limit: int = 200) -> List[dict]:
+        """Deletions for owner_id after the sync key, in (updated_at, id) order."""
+        cursor = self.database.sync_tombstones.find(
+            delta_filter({"collection": collection, "owner_id": owner_id}, since or None),
+            {"_id": 0, "id": 1, "updated_at": 1},
+        ).sort([("updated_at", 1), ("id", 1)]).limit(limit)
+        return await cursor.to_list(length=limit)
+
     async def get_conversation_by_job_and_users(self, job_id: str, homeowner_id: str, tradesperson_id: str) -> Optional[dict]:
         """Get conversation by job and user IDs"""
         try:
@@ -5659,18 +5676,26 @@ class Database:
             print(f"Error getting conversation by job and users: {e}")
             return None
     
-    async def _update_conversation_last_message(self, conversation_id: str, message_content: str, sender_type: str):
+    async def _update_conversation_last_message(self, conversation_id: str, message_content: str, sender_type: str,
+                                                message_id: Optional[str] = None, sent_at: Optional[datetime] = None):
         """Update conversation with last message info and increment unread count"""
         try:
             # Increment unread count for the recipient
             recipient_unread_field = "unread_count_homeowner" if sender_type == UserRole.TRADESPERSON.value else "unread_count_tradesperson"
+            # The sender has implicitly read everything up to their own message
+            sender_role = getattr(sender_type, "value", sender_type)
+            sent_at = sent_at or datetime.now(timezone.utc)
             
             await self.database.conversations.update_one(
                 {"id": conversation_id},
                 {
                     "$set": {
                         "last_message": message_content,
-                        "last_message_at": datetime.now(timezone.utc),
+                        "last_message_at": sent_at,
+                        "last_message_id": message_id,
+                        f"last_read_at_{sender_role}": sent_at,
+                        f"last_read_message_id_{sender_role}": message_id,
+                        f"unread_count_{sender_role}": 0,
                         "updated_at": datetime.now(timezone.utc)
                     },
                     "$inc": {recipient_unread_field: 1}
@@ -6744,11 +6769,17 @@ We may update this Cookie Policy to reflect changes in technology or regulations
 
     async def get_notification_status_counts(self, filters: dict = None) -> Dict[str, int]:
         query = filters or {}
-        pipeline = [{"$match": query}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
         status_counts: Dict[str, int] = {}
-        async for doc in self.notifications_collection.aggregate(pipeline):
-            status_counts[doc.get("_id")] = int(doc.get("count", 0))
-        total = await self.notifications_collection.count_documents(query)
+        parsed = notification_rollups.parse_filters(query)
+        if parsed is not None:
+            equal, date_from, date_to = parsed
+            rows = await notification_rollups.counts(self.database, ("status",), equal, date_from, date_to)
+            status_counts = {status: count for (status,), count in rows.items()}
+        else:
+            pipeline = [{"$match": query}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+            async for doc in self.notifications_collection.aggregate(pipeline):
+                status_counts[doc.get("_id")] = int(doc.get("count", 0))
+        total = sum(status_counts.values())
         sent_total = status_counts.get("sent", 0) + status_counts.get("delivered", 0)
         failed_total = status_counts.get("failed", 0)
         pending_total = status_counts.get("pending", 0)
@@ -6829,12 +6860,8 @@ We may update this Cookie Policy to reflect changes in technology or regulations
                 # If not an ObjectId, try as string (UUID)
                 query = {"_id": notification_id}
             
-            result = await self.notifications_collection.update_one(query, {"$set": update_data})
             # Consider success if a document was matched, even if no fields changed
-            try:
-                return bool(getattr(result, "matched_count", 0) > 0)
-            except Exception:
-                return bool(getattr(result, "modified_count", 0) > 0)
+            return await self._set_notification_status(query, update_data) is not None
         except Exception as e:
             logger.error(f"Error updating notification status: {str(e)}")
             return False
@@ -6960,7 +6987,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
                     recipient_phone=recipient_phone
                 )
                 # Update original record with latest content/status/timestamps and increment resend_count
-                await self.notifications_collection.update_one(
+                await self._set_notification_status(
                     {"_id": doc["_id"]},
                     {
                         "$set": {
@@ -6976,7 +7003,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
                 return True
             except Exception as send_error:
                 logger.error(f"Error during resend delivery for {notification_id}: {str(send_error)}")
-                await self.notifications_collection.update_one(
+                await self._set_notification_status(
                     {"_id": doc["_id"]},
                     {
                         "$set": {
@@ -7004,8 +7031,13 @@ We may update this Cookie Policy to reflect changes in technology or regulations
             except (InvalidId, ValueError, TypeError):
                 # If not an ObjectId, try as string (UUID)
                 query = {"_id": notification_id}
-            result = await self.notifications_collection.delete_one(query)
-            return result.deleted_count > 0
+            doc = await self.notifications_collection.find_one_and_delete(
+                query, projection=dict(notification_rollups.PROJECTION, user_id=1, id=1)
+            )
+            await notification_rollups.removed(self.database, doc)
+            if doc and doc.get("user_id"):
+                await self.record_tombstones("notifications", [(doc["user_id"], doc.get("id") or str(doc["_id"]))])
+            return doc is not None
         except Exception as e:
             logger.error(f"Error deleting notification: {str(e)}")
             return False
@@ -7195,107 +7227,50 @@ We may update this Cookie Policy to reflect changes in technology or regulations
     # ==========================================
     
     async def get_notification_analytics(self, date_from: str = None, date_to: str = None) -> dict:
-        """Get comprehensive notification analytics"""
-        match_stage = {}
-        
-        if date_from or date_to:
-            date_filter = {}
-            if date_from:
-                date_filter["$gte"] = datetime.fromisoformat(date_from)
-            if date_to:
-                date_filter["$lte"] = datetime.fromisoformat(date_to)
-            match_stage["created_at"] = date_filter
-        
-        pipeline = [
-            {"$match": match_stage},
-            {
-                "$group": {
-                    "_id": None,
-                    "total_notifications": {"$sum": 1},
-                    "sent_count": {"$sum": {"$cond": [{"$eq": ["$status", "sent"]}, 1, 0]}},
-                    "delivered_count": {"$sum": {"$cond": [{"$eq": ["$status", "delivered"]}, 1, 0]}},
-                    "failed_count": {"$sum": {"$cond": [{"$eq": ["$status", "failed"]}, 1, 0]}},
-                    "pending_count": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
-                    "email_count": {"$sum": {"$cond": [{"$eq": ["$channel", "email"]}, 1, 0]}},
-                    "sms_count": {"$sum": {"$cond": [{"$eq": ["$channel", "sms"]}, 1, 0]}},
-                    "both_count": {"$sum": {"$cond": [{"$eq": ["$channel", "both"]}, 1, 0]}}
-                }
-            }
-        ]
-        
-        result = await self.notifications_collection.aggregate(pipeline).to_list(1)
+        """Get comprehensive notification analytics (from notification_rollups)"""
+        rows = await notification_rollups.counts(
+            self.database, ("status", "channel"),
+            date_from=datetime.fromisoformat(date_from) if date_from else None,
+            date_to=datetime.fromisoformat(date_to) if date_to else None,
+        )
+        analytics = {
+            "total_notifications": 0,
+            "sent_count": 0,
+            "delivered_count": 0,
+            "failed_count": 0,
+            "pending_count": 0,
+            "email_count": 0,
+            "sms_count": 0,
+            "both_count": 0,
+        }
+        for (status, channel), count in rows.items():
+            analytics["total_notifications"] += count
+            if status in ("sent", "delivered", "failed", "pending"):
+                analytics[f"{status}_count"] += count
+            if channel in ("email", "sms", "both"):
+                analytics[f"{channel}_count"] += count
         
-        if result:
-            analytics = result[0]
-            # Calculate delivery rate
-            total_sent = analytics["sent_count"] + analytics["delivered_count"]
-            analytics["delivery_rate"] = (total_sent / analytics["total_notifications"] * 100) if analytics["total_notifications"] > 0 else 0
-            return analytics
-        else:
-            return {
-                "total_notifications": 0,
-                "sent_count": 0,
-                "delivered_count": 0,
-                "failed_count": 0,
-                "pending_count": 0,
-                "email_count": 0,
-                "sms_count": 0,
-                "both_count": 0,
-                "delivery_rate": 0
-            }
+        # Calculate delivery rate
+        total_sent = analytics["sent_count"] + analytics["delivered_count"]
+        total = analytics["total_notifications"]
+        analytics["delivery_rate"] = (total_sent / total * 100) if total > 0 else 0
+        return analytics
     
     async def get_notification_delivery_report(self, notification_type: str = None, date_from: str = None, date_to: str = None) -> dict:
-        """Get detailed delivery report for notifications"""
-        match_stage = {}
-        
-        if notification_type:
-            match_stage["type"] = notification_type
-        
-        if date_from or date_to:
-            date_filter = {}
-            if date_from:
-                date_filter["$gte"] = datetime.fromisoformat(date_from)  
-            if date_to:
-                date_filter["$lte"] = datetime.fromisoformat(date_to)
-            match_stage["created_at"] = date_filter
-        
-        # Group by type and status
-        pipeline = [
-            {"$match": match_stage},
-            {
-                "$group": {
-                    "_id": {
-                        "type": "$type",
-                        "status": "$status",
-                        "channel": "$channel"
-                    },
-                    "count": {"$sum": 1}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$_id.type",
-                    "channels": {
-                        "$push": {
-                            "channel": "$_id.channel",
-                            "status": "$_id.status",
-                            "count": "$count"
-                        }
-                    }
-                }
-            }
-        ]
-        
-        results = await self.notifications_collection.aggregate(pipeline).to_list(length=None)
+        """Get detailed delivery report for notifications (from notification_rollups)"""
+        rows = await notification_rollups.counts(
+            self.database, ("type", "status", "channel"),
+            {"type": notification_type} if notification_type else None,
+            datetime.fromisoformat(date_from) if date_from else None,
+            datetime.fromisoformat(date_to) if date_to else None,
+        )
         
         # Format results
         report = {}
-        for result in results:
-            notification_type = result["_id"]
-            report[notification_type] = {
-                "channels": result["channels"],
-                "total": sum(channel["count"] for channel in result["channels"])
-            }
+        for (type_, status, channel), count in sorted(rows.items()):
+            entry = report.setdefault(type_, {"channels": [], "total": 0})
+            entry["channels"].append({"channel": channel, "status": status, "count": count})
+            entry["total"] += count
         
         return report
     
@@ -7592,6 +7567,11 @@ We may update this Cookie Policy to reflect changes in technology or regulations
         """Create admin activity log entry"""
         await self.database.admin_activities.insert_one(activity_data)
 
+    async def create_admin_activities(self, activities: List[dict]):
+        """Create many admin activity log entries in one insert"""
+        if activities:
+            await self.database.admin_activities.insert_many(activities, ordered=False)
+
     async def get_admin_activities(
         self,
         skip: int = 0,
@@ -7693,6 +7673,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
     async def create_content_item(self, content_data: dict) -> str:
         """Create a new content item"""
         result = await self.database.content_items.insert_one(content_data)
+        await stats_counters.inserted(self.database, "content_items", content_data)
         return content_data["id"]
 
     async def get_content_items(self, filters: dict = None, skip: int = 0, limit: int = 50) -> List[dict]:
@@ -7726,6 +7707,14 @@ We may update this Cookie Policy to reflect changes in technology or regulations
 
     async def update_content_item(self, content_id: str, update_data: dict) -> bool:
         """Update content item"""
+        if stats_counters.touches("content_items", update_data):
+            previous = await self.database.content_items.find_one_and_update(
+                {"id": content_id},
+                {"$set": update_data},
+                projection=stats_counters.projection("content_items")
+            )
+            await stats_counters.updated(self.database, "content_items", previous, update_data)
+            return previous is not None
         result = await self.database.content_items.update_one(
             {"id": content_id},
             {"$set": update_data}
@@ -7734,37 +7723,37 @@ We may update this Cookie Policy to reflect changes in technology or regulations
 
     async def bulk_update_content_items(self, content_ids: List[str], update_data: dict) -> int:
         """Bulk update content items"""
+        previous = []
+        if stats_counters.touches("content_items", update_data):
+            previous = await self.database.content_items.find(
+                {"id": {"$in": content_ids}}, stats_counters.projection("content_items")
+            ).to_list(length=len(content_ids))
         result = await self.database.content_items.update_many(
             {"id": {"$in": content_ids}},
             {"$set": update_data}
         )
+        if previous:
+            deltas = {}
+            for item in previous:
+                after = stats_counters.apply_set(item, update_data)
+                for metric, amount in stats_counters.diff("content_items", item, after).items():
+                    deltas[metric] = deltas.get(metric, 0) + amount
+            await stats_counters.add(self.database, deltas)
         return result.modified_count
 
     async def get_content_statistics(self) -> dict:
         """Get content statistics"""
         try:
-            # Total counts by status
-            total_content = await self.database.content_items.count_documents({})
-            published_content = await self.database.content_items.count_documents({"status": "published"})
-            draft_content = await self.database.content_items.count_documents({"status": "draft"})
-            scheduled_content = await self.database.content_items.count_documents({"status": "scheduled"})
-            archived_content = await self.database.content_items.count_documents({"status": "archived"})
-
-            # Content by type
-            type_pipeline = [
-                {"$group": {"_id": "$content_type", "count": {"$sum": 1}}}
-            ]
-            content_by_type = {}
-            async for doc in self.database.content_items.aggregate(type_pipeline):
-                content_by_type[doc["_id"]] = doc["count"]
-
-            # Content by category
-            category_pipeline = [
-                {"$group": {"_id": "$category", "count": {"$sum": 1}}}
-            ]
-            content_by_category = {}
-            async for doc in self.database.content_items.aggregate(category_pipeline):
-                content_by_category[doc["_id"]] = doc["count"]
+            # Counts by status, type and category from the daily rollups
+            totals = await stats_counters.totals(self.database, ["content."])
+            by_status = stats_counters.breakdown(totals, "content.status")
+            total_content = int(totals.get("content.total", 0))
+            published_content = by_status.get("published", 0)
+            draft_content = by_status.get("draft", 0)
+            scheduled_content = by_status.get("scheduled", 0)
+            archived_content = by_status.get("archived", 0)
+            content_by_type = stats_counters.breakdown(totals, "content.content_type")
+            content_by_category = stats_counters.breakdown(totals, "content.category")
 
             # Top performing content (by view count)
             top_performing_cursor = self.database.content_items.find(
@@ -7892,26 +7881,27 @@ We may update this Cookie Policy to reflect changes in technology or regulations
         return await self.database.media_files.count_documents(query)
 
     async def save_uploaded_file(self, file, folder: str = "general") -> str:
-        """Save uploaded file and return URL (placeholder implementation)"""
-        # This is a placeholder implementation
-        # In a real system, you would save to cloud storage (S3, etc.)
-        import os
-        import uuid
-        
-        # Create uploads directory if it doesn't exist
+        """Stream an uploaded file to disk in chunks and return its URL.
+
+        The size limit (MEDIA_UPLOAD_MAX_BYTES) is enforced while streaming and the
+        file is renamed into place atomically, so partial uploads are never visible.
+        """
+        try:
+            from .utils.uploads import stream_to_file
+        except ImportError:
+            from utils.uploads import stream_to_file
+
+        folder = os.path.basename(folder) or "general"
         upload_dir = f"/app/uploads/{folder}"
-        os.makedirs(upload_dir, exist_ok=True)
-        
+
         # Generate unique filename
-        file_extension = file.filename.split('.')[-1]
+        file_extension = (file.filename or "").split('.')[-1] or "bin"
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
         file_path = os.path.join(upload_dir, unique_filename)
-        
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
+
+        max_bytes = int(os.getenv("MEDIA_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+        await stream_to_file(file, file_path, max_bytes=max_bytes)
+
         # Return URL (in production, this would be a CDN URL)
         return f"/uploads/{folder}/{unique_filename}"
 
@@ -7934,23 +7924,23 @@ We may update this Cookie Policy to reflect changes in technology or regulations
 
     async def increment_content_view_count(self, content_id: str):
         """Increment view count for content item"""
-        await self.database.content_items.update_one(
-            {"id": content_id},
-            {"$inc": {"view_count": 1}}
-        )
+        await self._count_content_event(content_id, "view_count", "views")
 
     async def increment_content_like_count(self, content_id: str):
         """Increment like count for content item"""
-        await self.database.content_items.update_one(
-            {"id": content_id},
-            {"$inc": {"like_count": 1}}
-        )
+        await self._count_content_event(content_id, "like_count", "likes")
 
     async def increment_content_share_count(self, content_id: str):
         """Increment share count for content item"""
-        await self.database.content_items.update_one(
-            {"id": content_id},
-            {"$inc": {"share_count": 1}}
+        await self._count_content_event(content_id, "share_count", "shares")
+
+    async def _count_content_event(self, content_id: str, counter_field: str, analytics_field: str):
+        """Buffer one event on the item's running counter and its content_analytics day."""
+        day = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        await counter_buffer.incr(self.database, "content_items", content_id, counter_field)
+        await counter_buffer.incr(
+            self.database, "content_analytics", f"{content_id}|{day:%Y-%m-%d}", analytics_field,
+            id_field="_id", on_insert={"content_id": content_id, "date": day}
         )
 
     # Job Management Database Methods
@@ -7984,6 +7974,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
     async def create_job_application(self, application_data: dict) -> str:
         """Create a new job application"""
         result = await self.database.job_applications.insert_one(application_data)
+        await stats_counters.inserted(self.database, "job_applications", application_data)
         return application_data["id"]
 
     async def get_job_applications(self, filters: dict = None, skip: int = 0, limit: int = 50) -> List[dict]:
@@ -8013,79 +8004,38 @@ We may update this Cookie Policy to reflect changes in technology or regulations
     async def update_job_application(self, application_id: str, update_data: dict) -> bool:
         """Update job application"""
         update_data['updated_at'] = datetime.utcnow()
-        result = await self.database.job_applications.update_one(
+        previous = await self.database.job_applications.find_one_and_update(
             {"id": application_id},
-            {"$set": update_data}
+            {"$set": update_data},
+            projection=stats_counters.projection("job_applications")
         )
-        return result.modified_count > 0
+        await stats_counters.updated(self.database, "job_applications", previous, update_data)
+        return previous is not None
 
     async def increment_job_applications_count(self, job_id: str):
         """Increment applications count for a job posting"""
-        await self.database.content_items.update_one(
-            {"id": job_id, "content_type": "job_posting"},
-            {"$inc": {"settings.applications_count": 1}}
+        await counter_buffer.incr(
+            self.database, "content_items", job_id, "settings.applications_count",
+            match={"content_type": "job_posting"}
         )
 
     async def get_job_statistics(self) -> dict:
         """Get job posting and application statistics"""
         try:
-            # Job statistics
-            total_jobs = await self.database.content_items.count_documents({"content_type": "job_posting"})
-            active_jobs = await self.database.content_items.count_documents({
-                "content_type": "job_posting", 
-                "status": "published"
-            })
-            draft_jobs = await self.database.content_items.count_documents({
-                "content_type": "job_posting", 
-                "status": "draft"
-            })
-            
-            # Application statistics
-            total_applications = await self.database.job_applications.count_documents({})
-            
-            # Jobs by department aggregation
-            pipeline = [
-                {"$match": {"content_type": "job_posting"}},
-                {"$group": {
-                    "_id": "$settings.department",
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"count": -1}}
-            ]
-            
-            jobs_by_department = {}
-            async for doc in self.database.content_items.aggregate(pipeline):
-                if doc["_id"]:
-                    jobs_by_department[doc["_id"]] = doc["count"]
-            
-            # Jobs by type aggregation
-            pipeline = [
-                {"$match": {"content_type": "job_posting"}},
-                {"$group": {
-                    "_id": "$settings.job_type",
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"count": -1}}
-            ]
-            
-            jobs_by_type = {}
-            async for doc in self.database.content_items.aggregate(pipeline):
-                if doc["_id"]:
-                    jobs_by_type[doc["_id"]] = doc["count"]
-            
-            # Applications by status aggregation
-            pipeline = [
-                {"$group": {
-                    "_id": "$status",
-                    "count": {"$sum": 1}
-                }},
-                {"$sort": {"count": -1}}
-            ]
-            
-            applications_by_status = {}
-            async for doc in self.database.job_applications.aggregate(pipeline):
-                if doc["_id"]:
-                    applications_by_status[doc["_id"]] = doc["count"]
+            # Posting and application counts from the daily rollups
+            totals = await stats_counters.totals(self.database, ["job_postings.", "job_applications."])
+            by_status = stats_counters.breakdown(totals, "job_postings.status")
+            total_jobs = int(totals.get("job_postings.total", 0))
+            active_jobs = by_status.get("published", 0)
+            draft_jobs = by_status.get("draft", 0)
+            total_applications = int(totals.get("job_applications.total", 0))
+
+            def by_count(counts: dict) -> dict:
+                return dict(sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+
+            jobs_by_department = by_count(stats_counters.breakdown(totals, "job_postings.department"))
+            jobs_by_type = by_count(stats_counters.breakdown(totals, "job_postings.job_type"))
+            applications_by_status = by_count(stats_counters.breakdown(totals, "job_applications.status"))
             
             # Top jobs by application count
             pipeline = [
@@ -8171,6 +8121,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
         try:
             result = await self.database.hiring_status.insert_one(hiring_status_data)
             hiring_status_data['_id'] = str(result.inserted_id)
+            await stats_counters.inserted(self.database, "hiring_status", hiring_status_data)
             return hiring_status_data
         except Exception as e:
             logger.error(f"Error creating hiring status: {str(e)}")
@@ -8194,11 +8145,13 @@ We may update this Cookie Policy to reflect changes in technology or regulations
         """Update hiring status"""
         try:
             update_data['updated_at'] = datetime.utcnow()
-            result = await self.database.hiring_status.update_one(
+            previous = await self.database.hiring_status.find_one_and_update(
                 {"id": status_id},
-                {"$set": update_data}
+                {"$set": update_data},
+                projection=stats_counters.projection("hiring_status")
             )
-            return result.modified_count > 0
+            await stats_counters.updated(self.database, "hiring_status", previous, update_data)
+            return previous is not None
         except Exception as e:
             logger.error(f"Error updating hiring status: {str(e)}")
             return False
@@ -8208,6 +8161,7 @@ We may update this Cookie Policy to reflect changes in technology or regulations
         try:
             result = await self.database.hiring_feedback.insert_one(feedback_data)
             feedback_data['_id'] = str(result.inserted_id)
+            await stats_counters.inserted(self.database, "hiring_feedback", feedback_data)
             return feedback_data
         except Exception as e:
             logger.error(f"Error creating hiring feedback: {str(e)}")
@@ -8230,37 +8184,13 @@ We may update this Cookie Policy to reflect changes in technology or regulations
     async def get_hiring_statistics(self) -> dict:
         """Get hiring statistics for analytics"""
         try:
-            # Count total hiring status records
-            total_interactions = await self.database.hiring_status.count_documents({})
-            
-            # Count hired vs not hired
-            hired_count = await self.database.hiring_status.count_documents({"hired": True})
-            not_hired_count = await self.database.hiring_status.count_documents({"hired": False})
-            
-            # Count by job status
-            pipeline = [
-                {"$match": {"hired": True}},
-                {"$group": {
-                    "_id": "$job_status",
-                    "count": {"$sum": 1}
-                }}
-            ]
-            job_status_counts = {}
-            async for doc in self.database.hiring_status.aggregate(pipeline):
-                if doc["_id"]:
-                    job_status_counts[doc["_id"]] = doc["count"]
-            
-            # Count feedback by type
-            pipeline = [
-                {"$group": {
-                    "_id": "$feedback_type",
-                    "count": {"$sum": 1}
-                }}
-            ]
-            feedback_type_counts = {}
-            async for doc in self.database.hiring_feedback.aggregate(pipeline):
-                if doc["_id"]:
-                    feedback_type_counts[doc["_id"]] = doc["count"]
+            # Counts from the daily rollups
+            totals = await stats_counters.totals(self.database, ["hiring.", "hiring_feedback."])
+            total_interactions = int(totals.get("hiring.total", 0))
+            hired_count = int(totals.get("hiring.hired", 0))
+            not_hired_count = int(totals.get("hiring.not_hired", 0))
+            job_status_counts = stats_counters.breakdown(totals, "hiring.job_status")
+            feedback_type_counts = stats_counters.breakdown(totals, "hiring_feedback.type")
             
             return {
                 "total_interactions": total_interactions,
@@ -8282,67 +8212,50 @@ We may update this Cookie Policy to reflect changes in technology or regulations
                 "hiring_rate": 0
             }
 
-    async def get_completed_jobs_for_tradesperson(self, tradesperson_id: str):
-        """Get all completed jobs for a tradesperson where they showed interest"""
+    async def get_completed_jobs_for_tradesperson(self, tradesperson_id: str, skip: int = 0, limit: Optional[int] = 20):
+        """Get a page of completed jobs a tradesperson showed interest in, most recently completed first"""
         try:
-            # Get all interests for this tradesperson where the job is completed
-            pipeline = [
-                # Match interests for this tradesperson
-                {"$match": {"tradesperson_id": tradesperson_id}},
-                
-                # Lookup the job details
-                {"$lookup": {
-                    "from": "jobs",
-                    "localField": "job_id", 
-                    "foreignField": "id",
-                    "as": "job"
-                }},
-                
-                # Only include if job exists and is completed
-                {"$match": {
-                    "job.status": "completed",
-                    "job": {"$ne": []}
-                }},
-                
-                # Flatten the job array
-                {"$unwind": "$job"},
-                
-                # Project the fields we need (excluding ObjectId fields)
-                {"$project": {
-                    "_id": 0,  # Exclude the MongoDB _id field
-                    "id": "$id",
-                    "job_id": "$job_id",
-                    "job_title": "$job.title",
-                    "job_description": "$job.description",
-                    "job_category": "$job.category",
-                    "job_location": "$job.location",
-                    "job_budget_min": "$job.budget_min",
-                    "job_budget_max": "$job.budget_max",
-                    "job_timeline": "$job.timeline",
-                    "job_status": "$job.status",
-                    "homeowner_id": "$job.homeowner.id",
-                    "homeowner_name": "$job.homeowner.name",
-                    "homeowner_email": "$job.homeowner.email",
-                    "homeowner_phone": "$job.homeowner.phone",
-                    "status": "$status",
-                    "created_at": "$created_at",
-                    "updated_at": "$updated_at",
-                    "completed_at": "$job.completed_at",
-                    "access_fee_naira": "$job.access_fee_naira",
-                    "access_fee_coins": "$job.access_fee_coins",
-                    "payment_made_at": "$payment_made_at",
-                    "rating": {"$ifNull": ["$rating", None]}
-                }},
-                
-                # Sort by completion date (most recent first)
-                {"$sort": {"completed_at": -1, "updated_at": -1}}
-            ]
-            
+            # The page comes from interests_tradesperson_jobStatus_updatedAt; only its jobs are read
+            interests = await interest_jobs.page(self.database, tradesperson_id, "completed", skip=skip, limit=limit)
+            jobs = await self.database.jobs.find(
+                {"id": {"$in": [i["job_id"] for i in interests]}},
+                {"_id": 0, "id": 1, "title": 1, "description": 1, "category": 1, "location": 1, "budget_min": 1,
+                 "budget_max": 1, "timeline": 1, "status": 1, "homeowner": 1, "completed_at": 1,
+                 "access_fee_naira": 1, "access_fee_coins": 1}
+            ).to_list(len(interests))
+            jobs_by_id = {j["id"]: j for j in jobs}
+
             completed_jobs = []
-            async for job in self.database.interests.aggregate(pipeline):
+            for interest in interests:
+                job = jobs_by_id.get(interest["job_id"])
+                if not job:
+                    continue
+                homeowner = job.get("homeowner") or {}
                 # Clean the job data to ensure all fields are serializable
-                cleaned_job = self._clean_job_data(job)
-                completed_jobs.append(cleaned_job)
+                completed_jobs.append(self._clean_job_data({
+                    "id": interest.get("id"),
+                    "job_id": interest["job_id"],
+                    "job_title": job.get("title"),
+                    "job_description": job.get("description"),
+                    "job_category": job.get("category"),
+                    "job_location": job.get("location"),
+                    "job_budget_min": job.get("budget_min"),
+                    "job_budget_max": job.get("budget_max"),
+                    "job_timeline": job.get("timeline"),
+                    "job_status": job.get("status"),
+                    "homeowner_id": homeowner.get("id"),
+                    "homeowner_name": homeowner.get("name"),
+                    "homeowner_email": homeowner.get("email"),
+                    "homeowner_phone": homeowner.get("phone"),
+                    "status": interest.get("status"),
+                    "created_at": interest.get("created_at"),
+                    "updated_at": interest.get("updated_at"),
+                    "completed_at": job.get("completed_at"),
+                    "access_fee_naira": job.get("access_fee_naira"),
+                    "access_fee_coins": job.get("access_fee_coins"),
+                    "payment_made_at": interest.get("payment_made_at"),
+                    "rating": interest.get("rating"),
+                }))
             
             logger.info(f"Retrieved {len(completed_jobs)} completed jobs for tradesperson {tradesperson_id}")
             return completed_jobs
@@ -0,0 +1,417 @@
+"""
+Declarative index manifest for every MongoDB collection the backend queries.
+
+Each entry is the keyword form of ``create_index``: ``keys`` plus options such as
+``name``, ``unique``, ``partialFilterExpression`` or ``expireAfterSeconds``.
+Index names are the identity; changing an existing index means giving it a new
+name (or running ``sync --rebuild``) and listing the old name in ``RETIRED``,
+which every sync drops before building (a collection allows only one text index).
+
+Builds happen in the deploy step via ``python -m backend.tools.release`` (the
+container entrypoint, start.sh and Railway's preDeployCommand run it), or by
+hand with ``python -m backend.tools.indexes sync``.
+Startup compares the manifest with the live database in a background task (see
+``Database.connect_to_mongo``), so a cold start never waits on index builds;
+if a unique or text index is still missing there, that task builds it, since
+duplicate checks and search depend on it.
+"""
+
+import logging
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+try:
+    from .utils.delta_sync import TOMBSTONE_TTL_DAYS
+    from .services.scheduler import RUN_HISTORY_DAYS
+except ImportError:
+    from utils.delta_sync import TOMBSTONE_TTL_DAYS
+    from services.scheduler import RUN_HISTORY_DAYS
+
+logger = logging.getLogger(__name__)
+
+STRING_ID = {"id": {"$type": "string"}}
+
+# Expired OTPs and tokens are kept a day so verification still reports "expired", then dropped
+AUTH_EXPIRED_GRACE_SEC = 86400
+
+
+def _unique_uuid(name: str) -> Dict[str, Any]:
+    return {"keys": [("id", 1)], "name": name, "unique": True, "partialFilterExpression": STRING_ID}
+
+
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    "users": [
+        _unique_uuid("unique_user_uuid"),
+        {"keys": [("email", 1)], "name": "unique_email", "unique": True,
+         "partialFilterExpression": {"email": {"$type": "string"}}},
+        {"keys": [("public_id", 1)], "name": "unique_public_id", "unique": True,
+         "partialFilterExpression": {"public_id": {"$type": "string"}}},
+        {"keys": [("user_id", 1)], "name": "unique_user_id", "unique": True,
+         "partialFilterExpression": {"user_id": {"$type": "string"}}},
+        # Admin user list: newest first, optionally by role
+        {"keys": [("created_at", -1)], "name": "users_createdAt"},
+        {"keys": [("role", 1), ("created_at", -1)], "name": "users_role_createdAt"},
+        # Tradesperson directory (services/tradesperson_directory.py); the multikey
+        # trades and keys arrays cannot share one compound index
+        {"keys": [("role", 1), ("average_rating", -1), ("total_reviews", -1)], "name": "users_directory_rating"},
+        {"keys": [("role", 1), ("directory.trades", 1), ("directory.state", 1), ("average_rating", -1),
+                  ("total_reviews", -1)], "name": "users_directory_trade_state_rating"},
+        {"keys": [("role", 1), ("directory.state", 1), ("average_rating", -1), ("total_reviews", -1)],
+         "name": "users_directory_state_rating"},
+        {"keys": [("role", 1), ("directory.keys", 1)], "name": "users_directory_keys"},
+        # Admin user search (services/user_search.py), newest first
+        {"keys": [("search.prefixes", 1), ("created_at", -1)], "name": "users_search_prefixes_createdAt"},
+        {"keys": [("search.email", 1), ("created_at", -1)], "name": "users_search_email_createdAt"},
+        {"keys": [("search.phone", 1), ("created_at", -1)], "name": "users_search_phone_createdAt"},
+    ],
+    "jobs": [
+        _unique_uuid("unique_job_uuid"),
+        {"keys": [("created_at", -1)], "name": "jobs_createdAt_only"},
+        {"keys": [("status", 1), ("created_at", -1)], "name": "jobs_status_createdAt"},
+        {"keys": [("homeowner_id", 1), ("created_at", -1)], "name": "jobs_homeownerId_createdAt"},
+        {"keys": [("homeowner.id", 1), ("created_at", -1)], "name": "jobs_homeownerDotId_createdAt"},
+        {"keys": [("category", 1), ("created_at", -1)], "name": "jobs_category_createdAt"},
+        {"keys": [("title", 1), ("created_at", -1)], "name": "jobs_title_createdAt"},
+        # Ranked job search (services/job_search.py): title outweighs category outweighs description
+        {"keys": [("title", "text"), ("category", "text"), ("description", "text")],
+         "name": "jobs_text_search_weighted",
+         "weights": {"title": 10, "category": 5, "description": 1}, "default_language": "english"},
+        # Category listings; quotes_count lets the quoting feed skip full jobs in the index
+        {"keys": [("status", 1), ("category", 1), ("created_at", -1), ("quotes_count", 1)],
+         "name": "jobs_status_category_createdAt_quotes"},
+        # Public listing: status='active' AND expires_at > now, newest first
+        {"keys": [("status", 1), ("expires_at", 1), ("created_at", -1)], "name": "jobs_status_expiresAt_createdAt"},
+    ],
+    "messages": [
+        _unique_uuid("unique_message_uuid"),
+        {"keys": [("conversation_id", 1), ("created_at", 1)], "name": "messages_conversation_createdAt"},
+        {"keys": [("conversation_id", 1), ("updated_at", 1), ("id", 1)], "name": "messages_conversation_updatedAt_id"},
+    ],
+    "conversations": [
+        _unique_uuid("unique_conversation_uuid"),
+        {"keys": [("job_id", 1), ("homeowner_id", 1), ("tradesperson_id", 1)],
+         "name": "conversations_job_participants"},
+        {"keys": [("homeowner_id", 1), ("last_message_at", -1)], "name": "conversations_homeowner_lastMessageAt"},
+        {"keys": [("tradesperson_id", 1), ("last_message_at", -1)], "name": "conversations_tradesperson_lastMessageAt"},
+        {"keys": [("homeowner_id", 1), ("updated_at", 1), ("id", 1)], "name": "conversations_homeowner_updatedAt_id"},
+        {"keys": [("tradesperson_id", 1), ("updated_at", 1), ("id", 1)],
+         "name": "conversations_tradesperson_updatedAt_id"},
+    ],
+    "notifications": [
+        {"keys": [("user_id", 1), ("status", 1)], "name": "notifications_user_status"},
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "notifications_user_createdAt"},
+        {"keys": [("user_id", 1), ("updated_at", 1), ("id", 1)], "name": "notifications_user_updatedAt_id"},
+        # Partial-hour edges of rollup reports, rollup backfills and the recent-failures list
+        {"keys": [("created_at", -1)], "name": "notifications_createdAt"},
+        {"keys": [("status", 1), ("created_at", -1)], "name": "notifications_status_createdAt"},
+    ],
+    "sync_tombstones": [
+        {"keys": [("collection", 1), ("owner_id", 1), ("updated_at", 1), ("id", 1)],
+         "name": "tombstones_collection_owner_updatedAt_id"},
+        {"keys": [("updated_at", 1)], "name": "tombstones_ttl", "expireAfterSeconds": TOMBSTONE_TTL_DAYS * 86400},
+    ],
+    "pending_jobs": [
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "pending_jobs_user_createdAt"},
+        {"keys": [("expires_at", 1)], "name": "pending_jobs_expire", "expireAfterSeconds": 0},
+    ],
+    "newsletter_subscribers": [
+        {"keys": [("email", 1)], "name": "newsletter_unique_email", "unique": True,
+         "partialFilterExpression": {"email": {"$type": "string"}}},
+    ],
+    "quotes": [
+        {"keys": [("job_id", 1)], "name": "quotes_job_id"},
+        # A tradesperson's quoted job ids (the quoting feed's anti-join), read from the index alone;
+        # unique so a double submit can't take two of a job's quote slots
+        {"keys": [("tradesperson_id", 1), ("job_id", 1)], "name": "quotes_tradesperson_job", "unique": True},
+        {"keys": [("job_id", 1), ("tradesperson_id", 1)], "name": "quotes_job_tradesperson"},
+        {"keys": [("job_id", 1), ("created_at", -1)], "name": "quotes_job_createdAt"},
+    ],
+    "interests": [
+        _unique_uuid("unique_interest_uuid"),
+        {"keys": [("job_id", 1)], "name": "interests_job_id"},
+        {"keys": [("tradesperson_id", 1)], "name": "interests_tradesperson_id"},
+        {"keys": [("tradesperson_id", 1), ("created_at", -1)], "name": "interests_tradesperson_createdAt"},
+        # The tradesperson's interests by denormalized job status (services/interest_jobs.py)
+        {"keys": [("tradesperson_id", 1), ("job_status", 1), ("updated_at", -1)],
+         "name": "interests_tradesperson_jobStatus_updatedAt"},
+    ],
+    "job_question_answers": [
+        {"keys": [("job_id", 1)], "name": "job_qa_job_id"},
+    ],
+    "reviews": [
+        _unique_uuid("unique_review_uuid"),
+        {"keys": [("job_id", 1)], "name": "reviews_job_id"},
+        {"keys": [("artisan_id", 1)], "name": "reviews_artisan_id"},
+    ],
+    "tradespeople_verifications": [
+        {"keys": [("status", 1), ("submitted_at", -1)], "name": "verifications_status_submitted"},
+        {"keys": [("user_id", 1), ("status", 1)], "name": "verifications_user_status"},
+        # Legacy embedded-file lookups (see tools/migrate_blobs.py)
+        {"keys": [("documents_base64.filename", 1)], "name": "idx_docs_filename"},
+        {"keys": [("work_photos_base64.filename", 1)], "name": "idx_work_photos_filename"},
+        {"keys": [("partner_id_documents_base64.filename", 1)], "name": "idx_partner_ids_filename"},
+    ],
+    "blobs": [
+        {"keys": [("namespace", 1), ("filename", 1)], "name": "blobs_namespace_filename", "unique": True},
+        {"keys": [("sha256", 1)], "name": "blobs_sha256"},
+    ],
+    "wallets": [
+        {"keys": [("user_id", 1)], "name": "wallets_user_id_unique", "unique": True,
+         "partialFilterExpression": {"user_id": {"$type": "string"}}},
+    ],
+    "wallet_transactions": [
+        _unique_uuid("unique_wallet_transaction_uuid"),
+        {"keys": [("user_id", 1), ("created_at", -1)], "name": "wallet_tx_user_createdAt"},
+        {"keys": [("user_id", 1), ("transaction_type", 1), ("status", 1)], "name": "wallet_tx_user_type_status"},
+        # Admin funding queue: only pending rows are ever listed
+        {"keys": [("transaction_type", 1), ("created_at", -1)], "name": "wallet_tx_pending_type_createdAt",
+         "partialFilterExpression": {"status": "pending"}},
+        {"keys": [("proof_image", 1)], "name": "wallet_tx_proof_image",
+         "partialFilterExpression": {"proof_image": {"$type": "string"}}},
+        # Wallet ledger: one entry per operation, replays hit this index
+        {"keys": [("idempotency_key", 1)], "name": "wallet_tx_idempotency_key", "unique": True,
+         "partialFilterExpression": {"idempotency_key": {"$type": "string"}}},
+    ],
+    "stats_counters": [
+        # Dashboard rollups: one row per (metric, day), read by metric prefix or (metric, day)
+        {"keys": [("metric", 1), ("day", 1)], "name": "stats_counters_metric_day"},
+    ],
+    "notification_rollups": [
+        # Hourly buckets, read by hour range (optionally narrowed by type)
+        {"keys": [("hour", 1), ("type", 1), ("channel", 1), ("status", 1)], "name": "notification_rollups_hour_dims"},
+    ],
+    "referrals": [
+        {"keys": [("referrer_id", 1), ("created_at", -1)], "name": "referrals_referrer_createdAt"},
+        {"keys": [("referrer_id", 1), ("status", 1)], "name": "referrals_referrer_status"},
+        {"keys": [("referred_user_id", 1), ("status", 1)], "name": "referrals_referred_status"},
+    ],
+    "referral_codes": [
+        {"keys": [("code", 1)], "name": "referral_codes_code_unique", "unique": True,
+         "partialFilterExpression": {"code": {"$type": "string"}}},
+        {"keys": [("user_id", 1)], "name": "referral_codes_user_id"},
+    ],
+    "content_items": [
+        _unique_uuid("unique_content_item_uuid"),
+        {"keys": [("slug", 1), ("content_type", 1)], "name": "content_items_slug_type"},
+        {"keys": [("status", 1), ("created_at", -1)], "name": "content_items_status_createdAt"},
+        {"keys": [("content_type", 1), ("status", 1), ("created_at", -1)],
+         "name": "content_items_type_status_createdAt"},
+        {"keys": [("created_at", -1)], "name": "content_items_createdAt"},
+    ],
+    "content_analytics": [
+        # Daily view/like/share rows (_id "content_id|day"), read per item over a date range
+        {"keys": [("content_id", 1), ("date", 1)], "name": "content_analytics_content_date"},
+    ],
+    "portfolio": [
+        _unique_uuid("unique_portfolio_uuid"),
+        {"keys": [("tradesperson_id", 1), ("created_at", -1)], "name": "portfolio_tradesperson_createdAt"},
+        # Public gallery reads only ever touch is_public items
+        {"keys": [("created_at", -1)], "name": "portfolio_public_createdAt",
+         "partialFilterExpression": {"is_public": True}},
+        {"keys": [("category", 1), ("created_at", -1)], "name": "portfolio_public_category_createdAt",
+         "partialFilterExpression": {"is_public": True}},
+    ],
+    "hiring_status": [
+        _unique_uuid("unique_hiring_status_uuid"),
+        {"keys": [("job_id", 1), ("tradesperson_id", 1)], "name": "hiring_status_job_tradesperson"},
+        {"keys": [("hired", 1)], "name": "hiring_status_hired"},
+        # Due review reminders (services/review_reminders.py); only pending records carry the field
+        {"keys": [("review_reminder_at", 1)], "name": "hiring_status_review_reminder_at", "sparse": True},
+    ],
+    "password_reset_tokens": [
+        {"keys": [("token", 1)], "name": "password_reset_tokens_token"},
+        {"keys": [("user_id", 1), ("used", 1)], "name": "password_reset_tokens_user_used"},
+        {"keys": [("expires_at", 1)], "name": "password_reset_tokens_expire",
+         "expireAfterSeconds": AUTH_EXPIRED_GRACE_SEC},
+    ],
+    "email_verification_tokens": [
+        {"keys": [("token", 1)], "name": "email_verification_tokens_token"},
+        {"keys": [("user_id", 1), ("used", 1)], "name": "email_verification_tokens_user_used"},
+        {"keys": [("expires_at", 1)], "name": "email_verification_tokens_expire",
+         "expireAfterSeconds": AUTH_EXPIRED_GRACE_SEC},
+    ],
+    "phone_verification_otps": [
+        {"keys": [("user_id", 1), ("phone", 1), ("otp_code", 1)], "name": "phone_otps_user_phone_code"},
+        {"keys": [("expires_at", 1)], "name": "phone_otps_expire", "expireAfterSeconds": AUTH_EXPIRED_GRACE_SEC},
+    ],
+    "email_verification_otps": [
+        {"keys": [("user_id", 1), ("email", 1), ("otp_code", 1)], "name": "email_otps_user_email_code"},
+        {"keys": [("expires_at", 1)], "name": "email_otps_expire", "expireAfterSeconds": AUTH_EXPIRED_GRACE_SEC},
+    ],
+    "job_feeds": [
+        # Materialized tradesperson feeds (services/job_feeds.py): page reads, then removal by job
+        {"keys": [("tradesperson_id", 1), ("created_at", -1), ("job_id", -1)],
+         "name": "job_feeds_tradesperson_createdAt"},
+        {"keys": [("job_id", 1)], "name": "job_feeds_job_id"},
+    ],
+    "scheduler_runs": [
+        # Run history per task (services/scheduler.py), newest first
+        {"keys": [("task", 1), ("started_at", -1)], "name": "scheduler_runs_task_startedAt"},
+        {"keys": [("started_at", 1)], "name": "scheduler_runs_ttl", "expireAfterSeconds": RUN_HISTORY_DAYS * 86400},
+    ],
+}
+
+# Names of indexes the manifest used to declare under a different definition; sync drops them
+RETIRED: Dict[str, List[str]] = {
+    # Unweighted title/category text index, replaced by jobs_text_search_weighted
+    "jobs": ["jobs_text_search"],
+}
+
+# Options that define an index besides its keys; anything else (v, ns, background) is ignored in diffs
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "default_language")
+
+
+def _spec_key(spec: Dict[str, Any]) -> Any:
+    keys = spec["keys"]
+    if any(direction == "text" for _, direction in keys):
+        # Text indexes are stored as {_fts: 'text', _ftsx: 1} plus weights (1 unless given)
+        weights = spec.get("weights") or {}
+        fields = [field for field, direction in keys if direction == "text"]
+        return ("text", tuple(sorted((field, weights.get(field, 1)) for field in fields)))
+    return tuple((field, direction) for field, direction in keys)
+
+
+def _existing_key(info: Dict[str, Any]) -> Any:
+    key = info.get("key", {})
+    if "_fts" in key:
+        return ("text", tuple(sorted((field, int(weight)) for field, weight in (info.get("weights") or {}).items())))
+    return tuple((field, int(direction) if isinstance(direction, (int, float)) else direction)
+                 for field, direction in key.items())
+
+
+def _options(source: Dict[str, Any]) -> Dict[str, Any]:
+    opts = {k: source[k] for k in _COMPARED_OPTIONS if source.get(k) not in (None, False)}
+    if "expireAfterSeconds" in opts:
+        opts["expireAfterSeconds"] = int(opts["expireAfterSeconds"])
+    return opts
+
+
+async def diff_collection(db, collection: str) -> Dict[str, List[str]]:
+    """Compare one collection's live indexes with the manifest.
+
+    Returns ``{"missing", "changed", "extra"}`` lists of index names.
+    """
+    existing = {}
+    async for info in db[collection].list_indexes():
+        existing[info["name"]] = dict(info)
+    result = {"missing": [], "changed": [], "extra": []}
+    wanted = set()
+    for spec in INDEXES.get(collection, []):
+        name = spec["name"]
+        wanted.add(name)
+        info = existing.get(name)
+        if info is None:
+            result["missing"].append(name)
+        elif _existing_key(info) != _spec_key(spec) or _options(info) != _options(spec):
+            result["changed"].append(name)
+    result["extra"] = sorted(n for n in existing if n != "_id_" and n not in wanted)
+    return result
+
+
+async def diff_indexes(db, collections: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, List[str]]]:
+    report = {}
+    for collection in collections or INDEXES:
+        report[collection] = await diff_collection(db, collection)
+    return report
+
+
+async def sync_indexes(
+    db,
+    collections: Optional[Iterable[str]] = None,
+    rebuild: bool = False,
+    drop_extra: bool = False,
+    names: Optional[Iterable[str]] = None,
+) -> Dict[str, Dict[str, List[str]]]:
+    """Create missing indexes; optionally rebuild changed ones and drop unmanaged ones.
+
+    ``RETIRED`` indexes are always dropped first. ``names`` limits the missing
+    indexes built to those names.
+    Returns per-collection ``{"created", "rebuilt", "dropped", "failed"}`` name lists.
+    """
+    only = set(names) if names is not None else None
+    summary = {}
+    for collection in collections or INDEXES:
+        diff = await diff_collection(db, collection)
+        outcome = {"created": [], "rebuilt": [], "dropped": [], "failed": []}
+        for name in RETIRED.get(collection, []):
+            if name in diff["extra"]:
+                await db[collection].drop_index(name)
+                diff["extra"].remove(name)
+                outcome["dropped"].append(name)
+        specs = {spec["name"]: spec for spec in INDEXES[collection]}
+        to_build = [name for name in diff["missing"] if only is None or name in only]
+        if rebuild:
+            for name in diff["changed"]:
+                await db[collection].drop_index(name)
+                to_build.append(name)
+        for name in to_build:
+            spec = specs[name]
+            options = {k: v for k, v in spec.items() if k != "keys"}
+            try:
+                await db[collection].create_index(spec["keys"], **options)
+                outcome["rebuilt" if name in diff["changed"] else "created"].append(name)
+            except Exception as e:
+                logger.error(f"Failed to build index {collection}.{name}: {e}")
+                outcome["failed"].append(name)
+        if drop_extra:
+            for name in diff["extra"]:
+                await db[collection].drop_index(name)
+                outcome["dropped"].append(name)
+        summary[collection] = outcome
+    return summary
+
+
+async def verify_indexes(db) -> bool:
+    """Log any drift between the manifest and the database. Returns True when nothing is missing or changed."""
+    ok = True
+    for collection, diff in (await diff_indexes(db)).items():
+        if diff["missing"] or diff["changed"]:
+            ok = False
+            logger.warning(
+                f"Index drift on {collection}: missing={diff['missing']} changed={diff['changed']} "
+                f"(run: python -m backend.tools.indexes sync)"
+            )
+    if ok:
+        logger.info("Index manifest verified: all declared indexes present")
+    return ok
+
+
+def required(spec: Dict[str, Any]) -> bool:
+    """Unique and text indexes: without them writes stop rejecting duplicates and $text queries fail."""
+    return bool(spec.get("unique")) or any(direction == "text" for _, direction in spec["keys"])
+
+
+async def missing_required(db, collections: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+    """Required indexes the database lacks, by collection (collections with none are left out)."""
+    missing = {}
+    for collection, diff in (await diff_indexes(db, collections)).items():
+        names = [spec["name"] for spec in INDEXES[collection] if required(spec) and spec["name"] in diff["missing"]]
+        if names:
+            missing[collection] = names
+    return missing
+
+
+async def duplicate_keys(db, collection: str, name: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """Key values held by more than one document, which keep unique index ``name`` from building.
+
+    Returns up to ``limit`` ``{"key", "count"}`` entries, most duplicated first.
+    """
+    spec = next(s for s in INDEXES[collection] if s["name"] == name)
+    pipeline = [{"$match": spec["partialFilterExpression"]}] if spec.get("partialFilterExpression") else []
+    pipeline += [
+        # $group field names cannot contain dots
+        {"$group": {"_id": {field.replace(".", "_"): f"${field}" for field, _ in spec["keys"]},
+                    "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": limit},
+    ]
+    cursor = db[collection].aggregate(pipeline, allowDiskUse=True)
+    return [{"key": doc["_id"], "count": doc["count"]} async for doc in cursor]
+
+
+def startup_mode() -> str:
+    """INDEX_STARTUP_MODE: verify (default) logs drift and builds missing required indexes, sync builds
+    every missing index, both in the background; off skips."""
+    mode = os.getenv("INDEX_STARTUP_MODE", "verify").lower()
+    return mode if mode in ("verify", "sync", "off") else "verify"
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -187,6 +187,7 @@ class AdminActivityType(str, Enum):
     UPDATE_ACCESS_FEE = "update_access_fee"
     CONFIRM_PAYMENT = "confirm_payment"
     REJECT_PAYMENT = "reject_payment"
+    APPROVE_VERIFICATION = "approve_verification"
     DELETE_USER = "delete_user"
     SEND_NOTIFICATION = "send_notification"
     UPDATE_POLICY = "update_policy"
@@ -205,6 +206,14 @@ class AdminActivity(BaseModel):
     user_agent: Optional[str] = None
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+# Bulk moderation (services/bulk_moderation.py; at most MAX_ITEMS ids per request)
+class BulkModerationRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=500)
+    notes: str = ""
+
+class BulkJobModerationRequest(BulkModerationRequest):
+    action: Literal["approve", "reject"]
+
 # Helper functions for role management
 def get_admin_permissions(role: AdminRole) -> List[AdminPermission]:
     """Get all permissions for a given admin role"""
@@ -308,6 +308,8 @@ class PortfolioItem(BaseModel):
     description: Optional[str] = None
     category: PortfolioItemCategory
     image_url: str
+    thumbnail_url: Optional[str] = None
+    card_url: Optional[str] = None
     image_filename: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -44,6 +44,12 @@ class Conversation(BaseModel):
     last_message_at: Optional[datetime] = None
     unread_count_homeowner: int = 0
     unread_count_tradesperson: int = 0
+    # Read watermarks: everything up to these points has been read by that participant
+    last_message_id: Optional[str] = None
+    last_read_at_homeowner: Optional[datetime] = None
+    last_read_message_id_homeowner: Optional[str] = None
+    last_read_at_tradesperson: Optional[datetime] = None
+    last_read_message_id_tradesperson: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
@@ -55,11 +61,21 @@ class ConversationCreate(BaseModel):
 class ConversationList(BaseModel):
     conversations: List[Conversation]
     total: int
+    # Delta sync (?since=): ids removed since the token, the token for the next call,
+    # and reset=True when the token is too old and the client must resync from scratch.
+    # Changes just before next_since may be returned again; clients apply them by id.
+    deleted: List[str] = []
+    next_since: Optional[str] = None
+    has_more: bool = False
+    reset: bool = False
 
 class MessageList(BaseModel):
     messages: List[Message]
     total: int
     has_more: bool
+    deleted: List[str] = []
+    next_since: Optional[str] = None
+    reset: bool = False
 
 class ConversationSummary(BaseModel):
     id: str
@@ -99,8 +99,16 @@ class NotificationResponse(BaseModel):
 class NotificationHistory(BaseModel):
     """Notification history for a user"""
     notifications: List[Notification] = Field(default=[], description="List of notifications")
-    total: int = Field(..., description="Total notifications count")
-    unread: int = Field(..., description="Unread notifications count")
+    total: Optional[int] = Field(None, description="Total notifications count (omitted on unchanged delta syncs)")
+    unread: Optional[int] = Field(None, description="Unread notifications count (omitted on unchanged delta syncs)")
+    deleted: List[str] = Field(default=[], description="Notification ids deleted since the sync token")
+    next_since: Optional[str] = Field(
+        None,
+        description="Sync token to pass as ?since= on the next refresh; "
+                    "changes just before it may repeat, so apply them by id",
+    )
+    has_more: bool = Field(default=False, description="More changes are available after next_since")
+    reset: bool = Field(default=False, description="Sync token expired; refetch from scratch with since=0")
 
 # Request/Response models for API endpoints
 class UpdatePreferencesRequest(BaseModel):
@@ -7,9 +7,14 @@ import asyncio
 
 from ..database import database
 from ..models.base import JobAccessFeeUpdate, TransactionStatus
-from ..models.admin import AdminPermission
-from ..auth.dependencies import require_permission, get_current_admin_account
+from ..models.admin import AdminPermission, BulkModerationRequest, BulkJobModerationRequest
+from ..auth.dependencies import require_permission, require_file_permission, get_current_admin_account
+from ..auth.security import sign_file_path
 from ..models.reviews import ReviewStatus
+from ..services.blob_store import blob_store
+from ..services.scheduler import scheduler
+from ..services import bulk_moderation, job_feeds
+from ..utils.file_response import send_upload
 
 logger = logging.getLogger(__name__)
 
@@ -74,6 +79,14 @@ async def confirm_wallet_funding(
         "status": "confirmed"
     }
 
+@router.post("/wallet/bulk-confirm-funding")
+async def bulk_confirm_wallet_funding(
+    request: BulkModerationRequest,
+    admin: dict = Depends(require_permission(AdminPermission.MANAGE_WALLET_FUNDING))
+):
+    """Confirm up to 500 funding requests; returns one result per transaction id"""
+    return await bulk_moderation.confirm_funding(database, request.ids, admin, request.notes)
+
 @router.post("/wallet/reject-funding/{transaction_id}")
 async def reject_wallet_funding(
     transaction_id: str,
@@ -365,7 +378,8 @@ async def update_job_admin(
 @router.patch("/jobs/{job_id}/status")
 async def update_job_status_admin(
     job_id: str,
-    status: str
+    status: str,
+    background_tasks: BackgroundTasks
 ):
     """Update job status (activate, deactivate, complete, etc.)"""
     
@@ -384,6 +398,9 @@ async def update_job_status_admin(
     if not success:
         raise HTTPException(status_code=500, detail="Failed to update job status")
     
+    if status == "active" and existing_job.get("status") != "active":
+        background_tasks.add_task(job_feeds.fan_out, database.database, existing_job)
+    
     return {
         "message": "Job status updated successfully",
         "job_id": job_id,
@@ -577,6 +594,7 @@ async def approve_job(
             from .jobs import notify_matching_tradespeople_new_job
             updated_job = await database.get_job_by_id(job_id)
             if updated_job:
+                background_tasks.add_task(job_feeds.fan_out, database.database, updated_job)
                 background_tasks.add_task(notify_matching_tradespeople_new_job, updated_job)
         except Exception as e:
             logger.warning(f"Failed to enqueue matching job alerts: {str(e)}")
@@ -590,6 +608,31 @@ async def approve_job(
         "notes": notes
     }
 
+@router.post("/jobs/bulk-approve")
+async def bulk_approve_jobs(
+    request: BulkJobModerationRequest,
+    background_tasks: BackgroundTasks,
+    admin: dict = Depends(require_permission(AdminPermission.APPROVE_JOBS))
+):
+    """Approve or reject up to 500 pending jobs; returns one result per job id"""
+    report, notifications, approved_jobs = await bulk_moderation.moderate_jobs(
+        database, request.ids, request.action, admin, request.notes
+    )
+    background_tasks.add_task(bulk_moderation.deliver, database, notifications)
+    if approved_jobs:
+        background_tasks.add_task(_announce_approved_jobs, approved_jobs)
+    return report
+
+async def _announce_approved_jobs(jobs: List[dict]):
+    """Feed fan-out and matching-tradespeople alerts for newly approved jobs"""
+    from .jobs import notify_matching_tradespeople_new_job
+    for job in jobs:
+        try:
+            await job_feeds.fan_out(database.database, job)
+            await notify_matching_tradespeople_new_job(job)
+        except Exception as e:
+            logger.warning(f"Failed to announce approved job {job.get('id')}: {str(e)}")
+
 @router.get("/jobs/all-admin")
 async def get_all_jobs_admin(
     skip: int = 0,
@@ -819,29 +862,34 @@ async def get_admin_dashboard_stats():
 # PAYMENT PROOF VIEWING
 # ==========================================
 
+@router.get("/wallet/payment-proof/{filename}/url")
+async def sign_payment_proof_url(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_permission(AdminPermission.VIEW_PAYMENT_PROOFS))
+):
+    """A short-lived signed URL for a payment proof, for direct <img src> use."""
+    return {"url": sign_file_path(request.url.path[:-len("/url")])}
+
 @router.get("/wallet/payment-proof/{filename}")
-async def view_payment_proof(filename: str, admin: dict = Depends(require_permission(AdminPermission.VIEW_PAYMENT_PROOFS))):
-    """View payment proof image (admin only)"""
-    from fastapi.responses import FileResponse
-    import os
-    
-    base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
-    project_root_uploads = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
-    candidates = [
-        os.path.join(base_dir, "payment_proofs", filename),
-        os.path.join(project_root_uploads, "payment_proofs", filename),
-        os.path.join(os.getcwd(), "uploads", "payment_proofs", filename),
-        os.path.join("/app", "uploads", "payment_proofs", filename),
-    ]
-    for fp in candidates:
-        if os.path.exists(fp):
-            return FileResponse(fp, media_type="image/jpeg")
-    raise HTTPException(status_code=404, detail="Payment proof not found")
+async def view_payment_proof(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_file_permission(AdminPermission.VIEW_PAYMENT_PROOFS))
+):
+    """Stream payment proof image (admin only; Bearer header or signed URL)."""
+    return await send_upload(request, "payment_proofs", filename, not_found_detail="Payment proof not found")
 
-@router.get("/wallet/payment-proof-base64/{filename}")
+@router.get("/wallet/payment-proof-base64/{filename}", deprecated=True)
 async def view_payment_proof_base64(filename: str, admin: dict = Depends(require_permission(AdminPermission.VIEW_PAYMENT_PROOFS))):
     import os, base64
-    # Prefer DB-stored base64 if available
+    # Prefer blob store, then legacy DB-stored base64
+    try:
+        found = await blob_store.read("payment_proofs", filename)
+        if found:
+            return {"image_base64": base64.b64encode(found[1]).decode("utf-8")}
+    except Exception:
+        pass
     try:
         txn = await database.get_wallet_transaction_by_proof_image(filename)
         if txn and txn.get("proof_image_base64"):
@@ -1244,6 +1292,13 @@ async def activate_scheduled_policies():
         "activated_count": activated_count
     }
 
+@router.get("/scheduler")
+async def get_scheduler_status(admin: dict = Depends(require_permission(AdminPermission.VIEW_SYSTEM_STATS))):
+    """Periodic tasks: schedule, current lease holder, last outcome and recent runs"""
+    if database.database is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+    return {"tasks": await scheduler.status(database.database)}
+
 @router.post("/policies/initialize-defaults")
 async def initialize_default_policies(admin: dict = Depends(require_permission(AdminPermission.MANAGE_POLICIES))):
     created_count = await database.initialize_default_policies(admin["id"])
@@ -2173,6 +2228,14 @@ async def get_pending_verifications(skip: int = 0, limit: int = 20):
         }
     }
 
+@router.post("/verifications/bulk-approve")
+async def bulk_approve_verifications(
+    request: BulkModerationRequest,
+    admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))
+):
+    """Approve up to 500 pending identity verifications; returns one result per verification id"""
+    return await bulk_moderation.approve_verifications(database, request.ids, admin, request.notes)
+
 @router.post("/verifications/{verification_id}/approve")
 async def approve_verification(
     verification_id: str,
@@ -2249,25 +2312,37 @@ async def get_verification_details(verification_id: str):
     
     return verification
 
+@router.get("/verifications/document/{filename}/url")
+async def sign_verification_document_url(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))
+):
+    """A short-lived signed URL for a verification document, for direct <img src> use."""
+    return {"url": sign_file_path(request.url.path[:-len("/url")])}
+
 @router.get("/verifications/document/{filename}")
-async def view_verification_document(filename: str, admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))):
-    """View verification document image (admin only)"""
-    from fastapi.responses import FileResponse
-    import os
-    
-    base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
-    file_path = os.path.join(base_dir, "verification_documents", filename)
-    
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Verification document not found")
-    
-    return FileResponse(file_path, media_type="image/jpeg")
+async def view_verification_document(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_file_permission(AdminPermission.VERIFY_USERS))
+):
+    """Stream verification document image (admin only; Bearer header or signed URL)."""
+    return await send_upload(
+        request, "verification_documents", filename, not_found_detail="Verification document not found"
+    )
 
-@router.get("/verifications/document-base64/{filename}")
+@router.get("/verifications/document-base64/{filename}", deprecated=True)
 async def view_verification_document_base64(filename: str, admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))):
     """Return base64 for verification document, preferring DB-stored base64"""
     import os, base64
-    # Prefer DB base64
+    # Prefer blob store, then legacy DB base64
+    try:
+        found = await blob_store.read("verification_documents", filename)
+        if found:
+            return {"image_base64": base64.b64encode(found[1]).decode("utf-8")}
+    except Exception:
+        pass
     try:
         doc = await database.get_verification_by_document_filename(filename)
         if doc and doc.get("document_image_base64"):
@@ -2289,50 +2364,45 @@ async def view_verification_document_base64(filename: str, admin: dict = Depends
             return {"image_base64": base64.b64encode(data).decode("utf-8")}
     raise HTTPException(status_code=404, detail="Verification document not found")
 
-@router.get("/tradespeople-verifications/document/{filename}")
-async def view_tradespeople_verification_file(filename: str, admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))):
-    """Serve tradespeople verification files (images or PDFs) for admin review"""
-    from fastapi.responses import FileResponse
-    import os
-
-    # Resolve common locations where uploads may be stored across environments
-    base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
-    # Project root uploads (when running from backend directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    project_uploads = os.path.join(project_root, "uploads")
-
-    # Also check backend/uploads to cover cases where app was launched from backend dir
-    backend_uploads = os.path.join(project_root, "backend", "uploads")
-
-    candidates = [
-        os.path.join(base_dir, "tradespeople_verifications", filename),
-        os.path.join(project_uploads, "tradespeople_verifications", filename),
-        os.path.join(backend_uploads, "tradespeople_verifications", filename),
-        os.path.join(os.getcwd(), "uploads", "tradespeople_verifications", filename),
-        os.path.join("/app", "uploads", "tradespeople_verifications", filename),
-    ]
-
-    for fp in candidates:
-        if os.path.exists(fp):
-            ext = os.path.splitext(fp)[1].lower()
-            media_type = "application/octet-stream"
-            if ext in (".jpg", ".jpeg"):
-                media_type = "image/jpeg"
-            elif ext == ".png":
-                media_type = "image/png"
-            elif ext == ".pdf":
-                media_type = "application/pdf"
-            return FileResponse(fp, media_type=media_type)
+@router.get("/tradespeople-verifications/document/{filename}/url")
+async def sign_tradespeople_verification_file_url(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))
+):
+    """A short-lived signed URL for a tradespeople verification file, for direct <img src> / <iframe src> use."""
+    return {"url": sign_file_path(request.url.path[:-len("/url")])}
 
-    raise HTTPException(status_code=404, detail="Tradespeople verification file not found")
+@router.get("/tradespeople-verifications/document/{filename}")
+async def view_tradespeople_verification_file(
+    filename: str,
+    request: Request,
+    admin: dict = Depends(require_file_permission(AdminPermission.VERIFY_USERS))
+):
+    """Stream tradespeople verification files (images or PDFs) for admin review.
+    Bearer header or signed URL.
+    """
+    return await send_upload(
+        request, "tradespeople_verifications", filename, not_found_detail="Tradespeople verification file not found"
+    )
 
-@router.get("/tradespeople-verifications/document-base64/{filename}")
+@router.get("/tradespeople-verifications/document-base64/{filename}", deprecated=True)
 async def view_tradespeople_verification_file_base64(filename: str, admin: dict = Depends(require_permission(AdminPermission.VERIFY_USERS))):
     """Return base64 for tradespeople verification file, preferring DB-stored base64.
     Falls back to reading the file from disk if not stored in DB.
     """
     import os, base64
-    # Prefer DB base64
+    # Prefer blob store, then legacy DB-embedded base64
+    try:
+        found = await blob_store.read("tradespeople_verifications", filename)
+        if found:
+            meta, data = found
+            ct = meta.get("content_type") or "application/octet-stream"
+            b64_data = base64.b64encode(data).decode("utf-8")
+            return {"filename": filename, "content_type": ct, "image_base64": b64_data,
+                    "data_url": f"data:{ct};base64,{b64_data}"}
+    except Exception:
+        pass
     try:
         item = await database.get_tradespeople_file_base64(filename)
         if item and item.get("base64"):
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, UploadFile, File, Form
 from datetime import timedelta
 from ..models.auth import (
     UserLogin, LoginResponse, HomeownerRegistration, TradespersonRegistration,
@@ -20,6 +20,7 @@ from ..models.trade_categories import NIGERIAN_TRADE_CATEGORIES, validate_trade_
 from ..models.nigerian_states import NIGERIAN_STATES, validate_nigerian_state
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict, Any
+import asyncio
 import uuid
 import logging
 import os
@@ -33,6 +34,17 @@ try:
 except ImportError:
     from services.notifications import SendGridEmailService, MockEmailService, notification_service
 
+try:
+    from ..services.blob_store import blob_store
+    from ..services.image_pipeline import image_pipeline, PROCESSABLE_TYPES
+    from ..utils.file_response import send_image
+    from ..utils.uploads import stream_to_temp, stream_to_file, discard
+except ImportError:
+    from services.blob_store import blob_store
+    from services.image_pipeline import image_pipeline, PROCESSABLE_TYPES
+    from utils.file_response import send_image
+    from utils.uploads import stream_to_temp, stream_to_file, discard
+
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 BASE_UPLOADS = Path(os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads")))
@@ -867,27 +879,47 @@ async def upload_certification_image(
         allowed = {"image/jpeg", "image/png", "image/webp", "image/gif", "application/pdf"}
         if file.content_type not in allowed:
             raise HTTPException(status_code=400, detail="Unsupported file type")
-        data = await file.read()
         max_bytes = int(os.getenv("CERT_IMAGE_MAX_BYTES", "5242880"))
-        if len(data) > max_bytes:
-            raise HTTPException(status_code=413, detail="File too large")
-        ext = os.path.splitext(file.filename or "")[1].lower() or ".jpg"
-        name = f"{uuid.uuid4().hex}{ext}"
-        dest = CERT_UPLOAD_DIR / name
-        with open(dest, "wb") as f:
-            f.write(data)
+        content_type = file.content_type
+        if content_type in PROCESSABLE_TYPES:
+            # Re-encode images off the event loop; renditions are served on demand
+            name = f"{uuid.uuid4().hex}.jpg"
+            stored = await stream_to_temp(file, str(CERT_UPLOAD_DIR), max_bytes=max_bytes)
+            try:
+                size = await image_pipeline.save_master_file(stored["path"], str(CERT_UPLOAD_DIR / name))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                await discard(stored["path"])
+            content_type = "image/jpeg"
+        else:
+            ext = os.path.splitext(file.filename or "")[1].lower() or ".jpg"
+            name = f"{uuid.uuid4().hex}{ext}"
+            stored = await stream_to_file(file, str(CERT_UPLOAD_DIR / name), max_bytes=max_bytes)
+            size = stored["size"]
         url_path = f"/api/auth/certifications/image/{name}"
-        return {"filename": name, "content_type": file.content_type, "size": len(data), "url": url_path}
+        return {
+            "filename": name,
+            "content_type": content_type,
+            "size": size,
+            "url": url_path,
+            "thumbnail_url": f"{url_path}?size=thumb" if content_type == "image/jpeg" else None,
+        }
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload certification image: {str(e)}")
 
 @router.get("/certifications/image/{filename}")
-async def get_certification_image(filename: str):
+async def get_certification_image(
+    filename: str,
+    request: Request,
+    size: Optional[str] = Query(None, description="Rendition: thumb, card or full (omit for the stored file)"),
+    format: Optional[str] = Query(None, description="webp or jpeg (defaults to Accept negotiation)")
+):
     try:
-        from fastapi.responses import FileResponse
-        import os
+        if os.path.basename(filename) != filename:
+            raise HTTPException(status_code=400, detail="Invalid filename")
         
         # Priority 1: Use UPLOADS_DIR from environment
         env_uploads_dir = os.environ.get("UPLOADS_DIR")
@@ -916,17 +948,9 @@ async def get_certification_image(filename: str):
         
         for fp in candidates:
             if os.path.exists(fp):
-                ext = os.path.splitext(fp)[1].lower()
-                media_type = (
-                    "application/pdf" if ext == ".pdf" else (
-                        "image/jpeg" if ext in (".jpg", ".jpeg") else (
-                            "image/png" if ext == ".png" else (
-                                "image/webp" if ext == ".webp" else "application/octet-stream"
-                            )
-                        )
-                    )
-                )
-                return FileResponse(fp, media_type=media_type, headers={"Cache-Control": "public, max-age=3600"})
+                response = await send_image(request, fp, size=size, fmt=format)
+                response.headers["Cache-Control"] = "public, max-age=3600"
+                return response
         
         logger.warning(f"Certification image not found: {filename}. Checked: {candidates}")
         raise HTTPException(status_code=404, detail="Image not found")
@@ -1760,112 +1784,91 @@ async def submit_tradesperson_verification(
     base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
     upload_dir = os.path.join(base_dir, "tradespeople_verifications")
     os.makedirs(upload_dir, exist_ok=True)
+    verification_max_bytes = int(os.getenv("VERIFICATION_FILE_MAX_BYTES", "10485760"))
     async def _save_file(f: UploadFile):
         if not f:
             return None
         if not f.content_type:
             return None
-        fn = f.filename or str(uuid.uuid4())
-        fp = os.path.join(upload_dir, fn)
-        data = await f.read()
-        with open(fp, "wb") as out:
-            out.write(data)
+        original = os.path.basename(f.filename or "")
+        ext = os.path.splitext(original)[1].lower()
+        if not (ext[1:].isalnum() and len(ext) <= 10):
+            ext = ""
+        # Server-side name: client filenames collide across users ("IMG_0001.jpg")
+        fn = f"{current_user.id}_{uuid.uuid4().hex}{ext}"
+        content_type = f.content_type or "application/octet-stream"
+        stored = await stream_to_temp(f, upload_dir, max_bytes=verification_max_bytes)
         try:
-            import base64
-            b64 = base64.b64encode(data).decode("utf-8")
-        except Exception:
-            b64 = None
-        return {"filename": fn, "base64": b64, "content_type": f.content_type or "application/octet-stream"}
+            # Identical documents share one blob keyed by the streamed SHA-256
+            await blob_store.put_file(
+                "tradespeople_verifications", fn, stored["path"], stored["sha256"], stored["size"],
+                content_type, owner_id=current_user.id, original_filename=original or None,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to store verification file {fn} in blob store: {e}")
+            if await asyncio.to_thread(os.path.exists, stored["path"]):
+                await asyncio.to_thread(os.replace, stored["path"], os.path.join(upload_dir, fn))
+        return {"filename": fn, "original_filename": original or None, "content_type": content_type,
+                "size": stored["size"], "sha256": stored["sha256"]}
     docs: Dict[str, Any] = {}
-    documents_base64: List[Dict[str, Any]] = []
     if id_document:
         saved = await _save_file(id_document)
         if saved:
             docs["id_document"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if id_selfie:
         saved = await _save_file(id_selfie)
         if saved:
             docs["id_selfie"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if proof_of_address:
         saved = await _save_file(proof_of_address)
         if saved:
             docs["proof_of_address"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if trade_certificate:
         saved = await _save_file(trade_certificate)
         if saved:
             docs["trade_certificate"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if cac_certificate:
         saved = await _save_file(cac_certificate)
         if saved:
             docs["cac_certificate"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if cac_status_report:
         saved = await _save_file(cac_status_report)
         if saved:
             docs["cac_status_report"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if director_id_document:
         saved = await _save_file(director_id_document)
         if saved:
             docs["director_id_document"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if business_logo:
         saved = await _save_file(business_logo)
         if saved:
             docs["business_logo"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if bn_certificate:
         saved = await _save_file(bn_certificate)
         if saved:
             docs["bn_certificate"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if partnership_agreement:
         saved = await _save_file(partnership_agreement)
         if saved:
             docs["partnership_agreement"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if llp_certificate:
         saved = await _save_file(llp_certificate)
         if saved:
             docs["llp_certificate"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     if llp_agreement:
         saved = await _save_file(llp_agreement)
         if saved:
             docs["llp_agreement"] = saved["filename"]
-            if saved.get("base64"):
-                documents_base64.append(saved)
     work_files: List[str] = []
-    work_photos_base64: List[Dict[str, Any]] = []
     for wf in work_photos or []:
         saved = await _save_file(wf)
         if saved:
             work_files.append(saved["filename"])
-            if saved.get("base64"):
-                work_photos_base64.append(saved)
     partner_files: List[str] = []
-    partner_id_documents_base64: List[Dict[str, Any]] = []
     for pf in partner_id_documents or []:
         saved = await _save_file(pf)
         if saved:
             partner_files.append(saved["filename"])
-            if saved.get("base64"):
-                partner_id_documents_base64.append(saved)
     payload = {
         "user_id": current_user.id,
         "business_type": (business_type or "").strip(),
@@ -1878,11 +1881,8 @@ async def submit_tradesperson_verification(
         "tin": tin,
         "designated_partners": designated_partners,
         "documents": docs,
-        "documents_base64": documents_base64,
         "work_photos": work_files,
-        "work_photos_base64": work_photos_base64,
         "partner_id_documents": partner_files,
-        "partner_id_documents_base64": partner_id_documents_base64,
     }
     bt = payload["business_type"].lower()
     if bt.startswith("self") or bt.startswith("sole"):
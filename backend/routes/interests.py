@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, status, BackgroundTasks, Query, Response
+from typing import List, Optional
 from models import (
     InterestCreate, Interest, InterestedTradesperson, InterestResponse, 
     InterestStatus, ContactDetails, ShareContactResponse
@@ -10,6 +10,7 @@ from ..auth.dependencies import get_current_tradesperson, get_current_homeowner,
 from ..database import database
 from ..services.notifications import notification_service
 from datetime import datetime
+import asyncio
 import uuid
 import logging
 import os
@@ -53,7 +54,7 @@ async def show_interest(
         )
         
         # Save to database
-        result = await database.create_interest(interest.dict())
+        result = await database.create_interest(interest.dict(), job=job)
         
         # Get full tradesperson data for notification
         tradesperson_data = await database.get_user_by_id(current_user.id)
@@ -208,11 +209,21 @@ async def share_contact_details(
 
 @router.get("/my-interests", response_model=List[dict])
 async def get_my_interests(
-    current_user: User = Depends(get_current_tradesperson)
+    response: Response,
+    current_user: User = Depends(get_current_tradesperson),
+    page: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=100)
 ):
-    """Get tradesperson's interest history"""
+    """Get the tradesperson's interest history, or one page of it when ``page`` is given;
+    the total is in X-Total-Count"""
+    # Without a page the whole list is returned, as clients written before paging expect
+    skip, page_limit = ((page - 1) * limit, limit) if page else (0, None)
     try:
-        interests = await database.get_tradesperson_interests(current_user.id)
+        interests, total = await asyncio.gather(
+            database.get_tradesperson_interests(current_user.id, skip=skip, limit=page_limit),
+            database.get_tradesperson_interests_count(current_user.id)
+        )
+        response.headers["X-Total-Count"] = str(total)
         return interests
         
     except Exception as e:
@@ -448,13 +459,21 @@ async def _notify_payment_confirmation(tradesperson: dict, job: dict, interest_i
 
 @router.get("/completed-jobs", response_model=List[dict])
 async def get_completed_jobs(
-    current_user: User = Depends(get_current_tradesperson)
+    response: Response,
+    current_user: User = Depends(get_current_tradesperson),
+    page: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=100)
 ):
-    """Get all completed jobs for the current tradesperson"""
+    """Get completed jobs for the current tradesperson, or one page of them when ``page`` is given;
+    the total is in X-Total-Count"""
+    skip, page_limit = ((page - 1) * limit, limit) if page else (0, None)
     try:
-        # Get all interests where the job is completed and tradesperson has access
-        completed_jobs = await database.get_completed_jobs_for_tradesperson(current_user.id)
-        
+        # Interests whose job is completed, read by the denormalized job status
+        completed_jobs, total = await asyncio.gather(
+            database.get_completed_jobs_for_tradesperson(current_user.id, skip=skip, limit=page_limit),
+            database.get_tradesperson_interests_count(current_user.id, job_status="completed")
+        )
+        response.headers["X-Total-Count"] = str(total)
         return completed_jobs
         
     except Exception as e:
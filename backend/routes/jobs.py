@@ -26,6 +26,7 @@ from ..auth.security import (
 from ..models.auth import User, UserRole, UserStatus
 from ..database import database
 from ..services.notifications import notification_service
+from ..services import job_feeds
 try:
     from ..services.notifications import SendGridEmailService, MockEmailService
 except Exception:
@@ -321,6 +322,18 @@ async def search_jobs_with_location(
         logger.error(f"Error searching jobs with location: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to search jobs: {str(e)}")
 
+@router.get("/search-suggestions")
+async def get_search_suggestions(
+    q: str = Query(..., min_length=1, max_length=100, description="Partial search text"),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """Prefix and typo-tolerant completions for the job search box"""
+    try:
+        return {"query": q, "suggestions": await database.suggest_job_search_terms(q, limit)}
+    except Exception as e:
+        logger.error(f"Error getting search suggestions: {str(e)}")
+        return {"query": q, "suggestions": []}
+
 @router.get("/", response_model=JobsResponse)
 async def get_jobs(
     page: int = Query(1, ge=1),
@@ -374,25 +387,10 @@ async def search_jobs(
     try:
         skip = (page - 1) * limit
         
-        # Build search filters
-        filters = {}
-        
-        if q:
-            # Text search on title and description
-            filters['$or'] = [
-                {'title': {'$regex': q, '$options': 'i'}},
-                {'description': {'$regex': q, '$options': 'i'}}
-            ]
-        
-        if category:
-            filters['category'] = category
-            
-        if location:
-            filters['location'] = {'$regex': location, '$options': 'i'}
-        
-        # Get jobs and count
-        jobs = await database.get_jobs(skip=skip, limit=limit, filters=filters)
-        total_jobs = await database.get_jobs_count(filters=filters)
+        # Relevance-ranked when q is given, newest first otherwise
+        jobs, total_jobs = await database.search_jobs_text(
+            search_query=q, category=category, location=location, skip=skip, limit=limit
+        )
         
         # Convert to Job objects
         job_objects = [Job(**job) for job in jobs]
@@ -740,6 +738,8 @@ async def reopen_job(
         # Get updated job
         updated_job = await database.get_job_by_id(job_id)
         
+        background_tasks.add_task(job_feeds.fan_out, database.database, updated_job)
+        
         # Send notifications to interested tradespeople
         background_tasks.add_task(
             notify_interested_tradespeople_job_reopened,
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi import (
+    APIRouter, HTTPException, Depends, BackgroundTasks, UploadFile, File, Query, Request, WebSocket, WebSocketDisconnect
+)
+from fastapi.encoders import jsonable_encoder
+from fastapi.security import HTTPAuthorizationCredentials
 from ..models.messages import (
     Conversation, ConversationCreate, Message, MessageCreate,
     ConversationList, MessageList
 )
-from ..models.auth import User, UserRole
+from ..models.auth import User, UserRole, UserStatus
 from ..models.notifications import NotificationType
-from ..auth.dependencies import get_current_active_user, get_current_homeowner
+from ..auth.dependencies import get_current_active_user, get_current_homeowner, get_current_user
 from ..database import database
 from ..services.notifications import notification_service
+from ..services import review_reminders
+from ..services.image_pipeline import image_pipeline, PROCESSABLE_TYPES
+from ..services.realtime import realtime_hub, HEARTBEAT_INTERVAL_SEC, CLOSE_POLICY_VIOLATION
+from ..utils.file_response import send_image
+from ..utils.uploads import stream_to_temp, stream_to_file, discard
+from ..utils.delta_sync import parse_since, merge_delta, is_expired
 from datetime import datetime
+from typing import Optional
+import json
 import uuid
 import logging
 import os
@@ -38,27 +49,47 @@ async def upload_attachment(
     }
     if file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Unsupported file type")
-    data = await file.read()
     max_bytes = int(os.getenv("MESSAGE_ATTACHMENT_MAX_BYTES", "10485760"))
-    if len(data) > max_bytes:
-        raise HTTPException(status_code=413, detail="File too large")
-    ext = os.path.splitext(file.filename or "")[1].lower()
-    name = f"{uuid.uuid4().hex}{ext}"
-    dest = attachments_dir / name
-    with open(dest, "wb") as f:
-        f.write(data)
+    content_type = file.content_type
+    if content_type in PROCESSABLE_TYPES:
+        # Re-encode images off the event loop; chat thumbnails are served as renditions
+        name = f"{uuid.uuid4().hex}.jpg"
+        stored = await stream_to_temp(file, str(attachments_dir), max_bytes=max_bytes)
+        try:
+            size = await image_pipeline.save_master_file(stored["path"], str(attachments_dir / name))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        finally:
+            await discard(stored["path"])
+        content_type = "image/jpeg"
+    else:
+        ext = os.path.splitext(file.filename or "")[1].lower()
+        name = f"{uuid.uuid4().hex}{ext}"
+        stored = await stream_to_file(file, str(attachments_dir / name), max_bytes=max_bytes)
+        size = stored["size"]
     url_path = f"/api/messages/attachments/{name}"
-    return {"filename": name, "content_type": file.content_type, "size": len(data), "url": url_path}
+    return {
+        "filename": name,
+        "content_type": content_type,
+        "size": size,
+        "url": url_path,
+        "thumbnail_url": f"{url_path}?size=thumb" if content_type == "image/jpeg" else None,
+    }
 
 @router.get("/attachments/{filename}")
 async def get_attachment(
     filename: str,
+    request: Request,
+    size: Optional[str] = Query(None, description="Image rendition: thumb, card or full"),
+    format: Optional[str] = Query(None, description="webp or jpeg (defaults to Accept negotiation)"),
     current_user: User = Depends(get_current_active_user)
 ):
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
     path = attachments_dir / filename
     if not path.exists():
         raise HTTPException(status_code=404, detail="Attachment not found")
-    return FileResponse(path)
+    return await send_image(request, str(path), size=size, fmt=format)
 
 @router.post("/conversations", response_model=Conversation)
 async def create_conversation(
@@ -128,10 +159,33 @@ async def create_conversation(
 async def get_conversations(
     skip: int = 0,
     limit: int = 20,
+    since: Optional[str] = Query(
+        None, description="Sync token from next_since (0 for a full sync); returns only changes"
+    ),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get user's conversations"""
     try:
+        if since is not None:
+            try:
+                key = parse_since(since)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid sync token")
+            if is_expired(key):
+                return ConversationList(conversations=[], total=0, reset=True)
+            rows = await database.get_user_conversations(
+                user_id=current_user.id, user_type=current_user.role, limit=limit + 1, since=key
+            )
+            tombstones = await database.get_tombstones("conversations", current_user.id, since=key, limit=limit + 1)
+            page = merge_delta(rows, tombstones, limit)
+            return ConversationList(
+                conversations=[Conversation(**conv) for conv in page["items"]],
+                total=len(page["items"]),
+                deleted=page["deleted"],
+                next_since=page["next_since"] or since,
+                has_more=page["has_more"],
+            )
+
         conversations = await database.get_user_conversations(
             user_id=current_user.id,
             user_type=current_user.role,
@@ -146,6 +200,8 @@ async def get_conversations(
             total=len(conversation_objects)
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting conversations: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get conversations")
@@ -153,8 +209,12 @@ async def get_conversations(
 @router.get("/conversations/{conversation_id}/messages", response_model=MessageList)
 async def get_conversation_messages(
     conversation_id: str,
+    background_tasks: BackgroundTasks,
     skip: int = 0,
     limit: int = 50,
+    since: Optional[str] = Query(
+        None, description="Sync token from next_since (0 for a full sync); returns only changes"
+    ),
     current_user: User = Depends(get_current_active_user)
 ):
     """Get messages for a conversation"""
@@ -168,14 +228,38 @@ async def get_conversation_messages(
             current_user.id != conversation["tradesperson_id"]):
             raise HTTPException(status_code=403, detail="Access denied")
         
+        if since is not None:
+            try:
+                key = parse_since(since)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid sync token")
+            if is_expired(key):
+                return MessageList(messages=[], total=0, has_more=False, reset=True)
+            rows = await database.get_conversation_messages(conversation_id, limit=limit + 1, since=key)
+            page = merge_delta(rows, [], limit)
+            # Only write read state when the other party sent something still unread; rows
+            # repeated from the sync overlap window must not re-advance the watermark
+            if (any(msg.get("sender_id") != current_user.id for msg in page["items"])
+                    and _has_unread(conversation, current_user)):
+                await _advance_read_watermark(conversation, current_user, background_tasks)
+            database.apply_read_status(page["items"], conversation)
+            return MessageList(
+                messages=[Message(**msg) for msg in page["items"]],
+                total=len(page["items"]),
+                has_more=page["has_more"],
+                next_since=page["next_since"] or since,
+            )
+        
         messages = await database.get_conversation_messages(
             conversation_id=conversation_id,
             skip=skip,
             limit=limit
         )
         
-        # Mark messages as read
-        await database.mark_messages_as_read(conversation_id, current_user.role)
+        # Mark messages as read (a single conversation update, skipped when already caught up)
+        if _has_unread(conversation, current_user):
+            await _advance_read_watermark(conversation, current_user, background_tasks)
+        database.apply_read_status(messages, conversation)
         
         message_objects = [Message(**msg) for msg in messages]
         
@@ -238,7 +322,10 @@ async def send_message(
             message_content=message_data.content
         )
         
-        return Message(**result)
+        message_obj = Message(**result)
+        background_tasks.add_task(_publish_new_message, conversation, message_obj, recipient_id)
+        
+        return message_obj
         
     except HTTPException:
         raise
@@ -249,6 +336,7 @@ async def send_message(
 @router.put("/conversations/{conversation_id}/read")
 async def mark_conversation_as_read(
     conversation_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user)
 ):
     """Mark all messages in a conversation as read"""
@@ -262,10 +350,11 @@ async def mark_conversation_as_read(
             current_user.id != conversation["tradesperson_id"]):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        success = await database.mark_messages_as_read(conversation_id, current_user.role)
-        if not success:
+        watermark = await database.mark_messages_as_read(conversation_id, current_user.role)
+        if not watermark:
             raise HTTPException(status_code=500, detail="Failed to mark messages as read")
         
+        background_tasks.add_task(_publish_read_receipt, conversation, current_user, watermark)
         return {"message": "Messages marked as read"}
         
     except HTTPException:
@@ -352,6 +441,141 @@ async def get_or_create_conversation_for_job(
         logger.error(f"Error getting/creating conversation: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get or create conversation")
 
+# Real-time delivery
+
+def _other_participant(conversation: dict, user_id: str) -> str:
+    if user_id == conversation["homeowner_id"]:
+        return conversation["tradesperson_id"]
+    return conversation["homeowner_id"]
+
+async def _publish_new_message(conversation: dict, message: Message, recipient_id: str):
+    """Push a new message to both participants and the recipient's new unread count."""
+    await realtime_hub.publish(
+        [conversation["homeowner_id"], conversation["tradesperson_id"]],
+        {"type": "message.new", "conversation_id": conversation["id"], "message": jsonable_encoder(message)},
+    )
+    updated = await database.get_conversation_by_id(conversation["id"])
+    if updated:
+        recipient_role = "homeowner" if recipient_id == conversation["homeowner_id"] else "tradesperson"
+        await realtime_hub.publish(
+            [recipient_id],
+            {
+                "type": "conversation.unread",
+                "conversation_id": conversation["id"],
+                "unread_count": updated.get(f"unread_count_{recipient_role}", 0),
+                "last_message": updated.get("last_message"),
+                "last_message_at": jsonable_encoder(updated.get("last_message_at")),
+            },
+        )
+
+def _role_of(conversation: dict, user_id: str) -> str:
+    return "homeowner" if user_id == conversation["homeowner_id"] else "tradesperson"
+
+def _has_unread(conversation: dict, user: User) -> bool:
+    """True when the user's read watermark is behind the conversation's latest message."""
+    role = _role_of(conversation, user.id)
+    if conversation.get(f"unread_count_{role}", 0) > 0:
+        return True
+    last_id = conversation.get("last_message_id")
+    if last_id is None:
+        # Conversation predates watermarks; fall back to writing one
+        return conversation.get(f"last_read_at_{role}") is None
+    return conversation.get(f"last_read_message_id_{role}") != last_id
+
+async def _advance_read_watermark(conversation: dict, reader: User, background_tasks: BackgroundTasks) -> None:
+    """Move the reader's watermark forward and update the local conversation copy for status derivation."""
+    watermark = await database.mark_messages_as_read(conversation["id"], reader.role)
+    if not watermark:
+        return
+    role = _role_of(conversation, reader.id)
+    conversation[f"last_read_at_{role}"] = watermark["last_read_at"]
+    conversation[f"last_read_message_id_{role}"] = watermark["last_read_message_id"]
+    conversation[f"unread_count_{role}"] = 0
+    background_tasks.add_task(_publish_read_receipt, conversation, reader, watermark)
+
+async def _publish_read_receipt(conversation: dict, reader: User, watermark: Optional[dict] = None):
+    """Tell the other participant their messages were read and reset the reader's unread badge."""
+    watermark = watermark or {}
+    read_at = watermark.get("last_read_at") or datetime.utcnow()
+    await realtime_hub.publish(
+        [_other_participant(conversation, reader.id)],
+        {
+            "type": "message.read",
+            "conversation_id": conversation["id"],
+            "reader_id": reader.id,
+            "read_at": jsonable_encoder(read_at),
+            "last_read_message_id": watermark.get("last_read_message_id"),
+        },
+    )
+    await realtime_hub.publish(
+        [reader.id],
+        {"type": "conversation.unread", "conversation_id": conversation["id"], "unread_count": 0},
+    )
+
+async def _ws_mark_read(user: User, conversation_id: Optional[str]) -> Optional[str]:
+    """Handle a client 'read' frame. Returns an error string, or None on success."""
+    if not conversation_id:
+        return "conversation_id is required"
+    conversation = await database.get_conversation_by_id(conversation_id)
+    if not conversation:
+        return "Conversation not found"
+    if user.id not in (conversation["homeowner_id"], conversation["tradesperson_id"]):
+        return "Access denied"
+    watermark = await database.mark_messages_as_read(conversation_id, user.role)
+    if not watermark:
+        return "Failed to mark messages as read"
+    await _publish_read_receipt(conversation, user, watermark)
+    return None
+
+@router.websocket("/ws")
+async def messages_websocket(websocket: WebSocket, token: Optional[str] = Query(None)):
+    """Push channel for new messages, read receipts and unread counts.
+
+    Authenticate with the user's access token as ``?token=`` (browsers cannot set
+    headers on WebSocket requests). Client frames are JSON:
+    ``{"type": "ping"}``, ``{"type": "pong"}`` and ``{"type": "read", "conversation_id": ...}``.
+    The server sends ``{"type": "ping"}`` every heartbeat interval; clients that stay
+    silent past the idle timeout, or fall too far behind, are disconnected and should
+    reconnect and resync over REST.
+    """
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        user = await get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+        if user.status != UserStatus.ACTIVE:
+            raise HTTPException(status_code=403, detail="Inactive user account")
+    except HTTPException:
+        await websocket.close(code=CLOSE_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    conn = await realtime_hub.register(websocket, user.id)
+    conn.offer({"type": "ready", "user_id": user.id, "heartbeat_sec": HEARTBEAT_INTERVAL_SEC})
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            conn.touch()
+            try:
+                frame = json.loads(raw)
+            except ValueError:
+                conn.offer({"type": "error", "detail": "Invalid JSON"})
+                continue
+            kind = frame.get("type") if isinstance(frame, dict) else None
+            if kind == "ping":
+                conn.offer({"type": "pong"})
+            elif kind == "read":
+                error = await _ws_mark_read(user, frame.get("conversation_id"))
+                if error:
+                    conn.offer({"type": "error", "detail": error, "conversation_id": frame.get("conversation_id")})
+            elif kind != "pong":
+                conn.offer({"type": "error", "detail": "Unknown frame type"})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.warning(f"Realtime connection for user {user.id} ended with error: {e}")
+    finally:
+        await realtime_hub.unregister(conn)
+
 async def _notify_new_message(sender: User, recipient_id: str, conversation: dict, message_content: str):
     """Background task to notify recipient of new message"""
     try:
@@ -589,11 +813,16 @@ async def update_hiring_status(
             "created_at": datetime.utcnow(),
             "updated_at": datetime.utcnow()
         }
+        if hired:
+            # Picked up by the reviews.reminders scheduler task
+            reminder_at = review_reminders.first_reminder_at(job_status, hiring_status_data["created_at"])
+            if reminder_at:
+                hiring_status_data["review_reminder_at"] = reminder_at
         
         # Save to database
         await database.create_hiring_status(hiring_status_data)
         
-        # If hired and job is completed, schedule review reminder
+        # If hired and job is completed, invite a review now
         if hired and job_status == "completed":
             background_tasks.add_task(
                 _send_review_invitation,
@@ -602,15 +831,6 @@ async def update_hiring_status(
                 job,
                 immediate=True
             )
-        elif hired and job_status in ["not_started", "in_progress"]:
-            # Schedule future review reminders
-            background_tasks.add_task(
-                _schedule_review_reminders,
-                current_user,
-                tradesperson,
-                job,
-                job_status
-            )
         
         return {
             "message": "Hiring status updated successfully",
@@ -683,47 +903,14 @@ async def submit_hiring_feedback(
 async def _send_review_invitation(homeowner: User, tradesperson: dict, job: dict, immediate: bool = False):
     """Send review invitation to homeowner"""
     try:
-        # Get homeowner preferences
-        preferences = await database.get_user_notification_preferences(homeowner.id)
-        
-        # Prepare template data
-        template_data = {
-            "homeowner_name": homeowner.name or "Homeowner",
-            "tradesperson_name": tradesperson.get("business_name") or tradesperson.get("name", "Tradesperson"),
-            "job_title": job.get("title", "Job"),
-            "completion_date": datetime.utcnow().strftime("%B %d, %Y"),
-            "review_url": f"{os.environ.get('FRONTEND_URL', 'https://servicehub.ng')}/my-jobs?review={job['id']}"
-        }
-        
-        # Send notification
-        notification = await notification_service.send_notification(
-            user_id=homeowner.id,
-            notification_type=NotificationType.REVIEW_INVITATION,
-            template_data=template_data,
-            user_preferences=preferences,
-            recipient_email=homeowner.email,
-            recipient_phone=homeowner.phone
+        await review_reminders.send(
+            database,
+            NotificationType.REVIEW_INVITATION,
+            {"id": homeowner.id, "name": homeowner.name, "email": homeowner.email, "phone": homeowner.phone},
+            tradesperson,
+            job,
         )
-        
-        # Save notification to database
-        await database.create_notification(notification)
-        
         logger.info(f"✅ Review invitation sent to homeowner {homeowner.id}")
         
     except Exception as e:
         logger.error(f"❌ Failed to send review invitation: {str(e)}")
-
-async def _schedule_review_reminders(homeowner: User, tradesperson: dict, job: dict, job_status: str):
-    """Schedule future review reminders based on job status"""
-    try:
-        # For now, just log that we would schedule reminders
-        # In a real implementation, you'd use a task queue like Celery
-        logger.info(f"📅 Review reminders scheduled for job {job['id']} (status: {job_status})")
-        
-        # You could implement this with:
-        # - Database scheduled tasks
-        # - Celery with Redis/RabbitMQ
-        # - Background job processing
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to schedule review reminders: {str(e)}")
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
-from typing import List, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query
+from typing import List, Dict, Any, Optional
 from ..auth.dependencies import get_current_user
 from ..models.auth import User, UserRole
 from ..models.notifications import (
@@ -14,6 +14,7 @@ from ..models.notifications import (
 )
 from ..database import database
 from ..services.notifications import notification_service
+from ..utils.delta_sync import parse_since, merge_delta, is_expired
 import logging
 import os
 
@@ -55,6 +56,9 @@ async def update_notification_preferences(
 async def get_notification_history(
     limit: int = 50,
     offset: int = 0,
+    since: Optional[str] = Query(
+        None, description="Sync token from next_since (0 for a full sync); returns only changes"
+    ),
     current_user: User = Depends(get_current_user)
 ):
     """Get user's notification history with pagination (optimized)"""
@@ -62,6 +66,35 @@ async def get_notification_history(
         # Use parallel execution for counts and fetching
         import asyncio
         
+        if since is not None:
+            try:
+                key = parse_since(since)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid sync token")
+            if is_expired(key):
+                return NotificationHistory(reset=True)
+            rows, tombstones = await asyncio.gather(
+                database.get_user_notifications(current_user.id, limit=limit + 1, since=key),
+                database.get_tombstones("notifications", current_user.id, since=key, limit=limit + 1),
+            )
+            page = merge_delta([n.dict() for n in rows], tombstones, limit)
+            history = NotificationHistory(
+                notifications=page["items"],
+                deleted=page["deleted"],
+                next_since=page["next_since"] or since,
+                has_more=page["has_more"],
+            )
+            if page["items"] or page["deleted"]:
+                # Badge counts only change when something did
+                history.total, history.unread = await asyncio.gather(
+                    database.get_user_notifications_count(current_user.id),
+                    database.notifications_collection.count_documents({
+                        "user_id": current_user.id,
+                        "status": {"$in": ["sent", "pending"]}
+                    }),
+                )
+            return history
+        
         tasks = [
             database.get_user_notifications(current_user.id, limit=limit, offset=offset),
             database.get_user_notifications_count(current_user.id),
@@ -82,6 +115,8 @@ async def get_notification_history(
             total=total_count,
             unread=unread_count
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting notification history: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to get notification history")
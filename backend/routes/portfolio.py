@@ -1,18 +1,16 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, status
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Depends, Query, Request, status
 from typing import List, Optional
 import base64
 import os
 import uuid
-import shutil
 from pathlib import Path
-from PIL import Image
-import io
 
 from models import PortfolioItemCreate, PortfolioItem, PortfolioResponse, PortfolioItemCategory
 from ..models.auth import User
 from ..auth.dependencies import get_current_tradesperson, get_current_active_user
 from ..database import database
+from ..services.image_pipeline import image_pipeline
+from ..utils.file_response import send_image, upload_candidates
 
 router = APIRouter(prefix="/api/portfolio", tags=["portfolio"])
 
@@ -38,30 +36,6 @@ def validate_image_file(file: UploadFile) -> bool:
     
     return True
 
-def resize_image(image_data: bytes, max_width: int = 1200, max_height: int = 1200, quality: int = 85) -> bytes:
-    """Resize and optimize image"""
-    try:
-        # Open image
-        image = Image.open(io.BytesIO(image_data))
-        
-        # Convert RGBA to RGB if necessary
-        if image.mode == 'RGBA':
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[-1])
-            image = background
-        
-        # Resize if necessary
-        if image.width > max_width or image.height > max_height:
-            image.thumbnail((max_width, max_height), Image.Resampling.LANCZOS)
-        
-        # Save optimized image
-        output = io.BytesIO()
-        image.save(output, format='JPEG', quality=quality, optimize=True)
-        return output.getvalue()
-    
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid image file: {str(e)}")
-
 @router.post("/upload", response_model=PortfolioItem)
 async def upload_portfolio_image(
     title: str = Form(...),
@@ -83,19 +57,20 @@ async def upload_portfolio_image(
         if image_base64:
             b64 = image_base64.split(",")[-1]
             raw = base64.b64decode(b64)
-            optimized_content = resize_image(raw)
         else:
-            file_content = await file.read()
-            optimized_content = resize_image(file_content)
+            raw = await file.read()
         
         # Generate unique filename
         unique_filename = f"{uuid.uuid4()}.jpg"
         file_path = UPLOAD_DIR / unique_filename
         
-        # Save file
-        with open(file_path, "wb") as f:
-            f.write(optimized_content)
+        # Normalize off the event loop and save the master image; renditions are generated on demand
+        try:
+            await image_pipeline.save_master(raw, str(file_path))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
+        image_url = f"/api/portfolio/images/{unique_filename}"
         # Create portfolio item data
         portfolio_data = {
             "id": str(uuid.uuid4()),
@@ -103,7 +78,9 @@ async def upload_portfolio_image(
             "title": title,
             "description": description,
             "category": category,
-            "image_url": f"/api/portfolio/images/{unique_filename}",
+            "image_url": image_url,
+            "thumbnail_url": f"{image_url}?size=thumb",
+            "card_url": f"{image_url}?size=card",
             "image_filename": unique_filename,
             "created_at": database.get_current_time(),
             "updated_at": database.get_current_time(),
@@ -127,39 +104,20 @@ async def upload_portfolio_image(
         )
 
 @router.get("/images/{filename}")
-async def get_portfolio_image(filename: str):
-    """Serve portfolio images"""
-    # Resolve common locations where uploads may be stored across environments
-    base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
-    # Project root uploads (when running from backend directory)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    project_uploads = os.path.join(project_root, "uploads")
-
-    # Also check backend/uploads to cover cases where app was launched from backend dir
-    backend_uploads = os.path.join(project_root, "backend", "uploads")
-
-    candidates = [
-        os.path.join(base_dir, "portfolio", filename),
-        os.path.join(project_uploads, "portfolio", filename),
-        os.path.join(backend_uploads, "portfolio", filename),
-        os.path.join(os.getcwd(), "uploads", "portfolio", filename),
-        os.path.join("/app", "uploads", "portfolio", filename),
-    ]
-
-    for fp in candidates:
+async def get_portfolio_image(
+    filename: str,
+    request: Request,
+    size: Optional[str] = Query(None, description="Rendition: thumb, card or full (omit for the stored image)"),
+    format: Optional[str] = Query(None, description="webp or jpeg (defaults to Accept negotiation)")
+):
+    """Serve portfolio images, optionally as a cached rendition"""
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+    for fp in upload_candidates("portfolio", filename):
         if os.path.exists(fp):
-            # Determine media type by extension; default to JPEG as images are saved as .jpg
-            ext = os.path.splitext(fp)[1].lower()
-            media_type = "image/jpeg" if ext in (".jpg", ".jpeg") else (
-                "image/png" if ext == ".png" else (
-                    "image/webp" if ext == ".webp" else "application/octet-stream"
-                )
-            )
-            return FileResponse(
-                path=fp,
-                media_type=media_type,
-                headers={"Cache-Control": "public, max-age=3600"}
-            )
+            response = await send_image(request, fp, size=size, fmt=format)
+            response.headers["Cache-Control"] = "public, max-age=86400"
+            return response
 
     raise HTTPException(status_code=404, detail="Image not found")
 
@@ -262,8 +220,9 @@ async def delete_portfolio_item(
         if existing_item["tradesperson_id"] != current_user.id:
             raise HTTPException(status_code=403, detail="Not authorized to delete this item")
         
-        # Delete image file
+        # Delete image file and its cached renditions
         image_path = UPLOAD_DIR / existing_item["image_filename"]
+        await image_pipeline.delete_renditions(str(image_path))
         if image_path.exists():
             image_path.unlink()
         
@@ -3,8 +3,9 @@ from typing import List, Optional
 from ..models import QuoteCreate, Quote, QuotesResponse, Job
 from ..models.auth import User
 from ..auth.dependencies import get_current_active_user, get_current_tradesperson, get_current_homeowner
-from ..database import database
+from ..database import database, MAX_QUOTES_PER_JOB
 from datetime import datetime
+import asyncio
 import uuid
 
 router = APIRouter(prefix="/api/quotes", tags=["quotes"])
@@ -31,14 +32,12 @@ async def create_quote(
         if job['expires_at'] <= datetime.utcnow():
             raise HTTPException(status_code=400, detail="Job has expired")
         
-        # Check if tradesperson already quoted for this job
-        existing_quotes = await database.get_quotes_by_job(quote_data.job_id)
-        for quote in existing_quotes:
-            if quote['tradesperson_id'] == current_user.id:
-                raise HTTPException(status_code=400, detail="You have already quoted for this job")
+        # Check if tradesperson already quoted for this job (quotes_tradesperson_job enforces it under concurrency)
+        if await database.has_quoted(quote_data.job_id, current_user.id):
+            raise HTTPException(status_code=400, detail="You have already quoted for this job")
         
-        # Check quote limit (max 5 quotes per job)
-        if len(existing_quotes) >= 5:
+        # Check quote limit (create_quote enforces it atomically too)
+        if (job.get('quotes_count') or 0) >= MAX_QUOTES_PER_JOB:
             raise HTTPException(status_code=400, detail="This job has reached the maximum number of quotes")
         
         # Validate that tradesperson's skills match job category
@@ -60,12 +59,9 @@ async def create_quote(
         if isinstance(quote_dict['start_date'], str):
             quote_dict['start_date'] = datetime.fromisoformat(quote_dict['start_date'].replace('Z', '+00:00'))
         
-        # Save to database
+        # Save to database (also takes one of the job's quote slots)
         created_quote = await database.create_quote(quote_dict)
         
-        # Update job quotes count
-        await database.update_job_quotes_count(quote_data.job_id)
-        
         return Quote(**created_quote)
         
     except HTTPException:
@@ -242,17 +238,18 @@ async def get_available_jobs(
     try:
         skip = (page - 1) * limit
         
-        # Get jobs matching tradesperson's categories
-        available_jobs = await database.get_jobs_for_quoting(
-            tradesperson_id=current_user.id,
-            trade_categories=current_user.trade_categories or [],
-            skip=skip,
-            limit=limit
-        )
-        
-        total_jobs = await database.get_available_jobs_count_for_quoting(
-            tradesperson_id=current_user.id,
-            trade_categories=current_user.trade_categories or []
+        # Get jobs matching tradesperson's categories, and their exact total
+        available_jobs, total_jobs = await asyncio.gather(
+            database.get_jobs_for_quoting(
+                tradesperson_id=current_user.id,
+                trade_categories=current_user.trade_categories or [],
+                skip=skip,
+                limit=limit
+            ),
+            database.get_available_jobs_count_for_quoting(
+                tradesperson_id=current_user.id,
+                trade_categories=current_user.trade_categories or []
+            )
         )
         
         return {
@@ -17,6 +17,7 @@ try:
     from ..services.notifications import SendGridEmailService, MockEmailService
 except ImportError:
     from services.notifications import SendGridEmailService, MockEmailService
+from ..services.blob_store import blob_store
 
 router = APIRouter(prefix="/api/referrals", tags=["referrals"])
 
@@ -107,6 +108,13 @@ async def submit_verification_documents(
         
     except Exception as e:
         raise HTTPException(status_code=400, detail="Invalid image file")
+
+    try:
+        with open(file_path, "rb") as f:
+            await blob_store.put("verification_documents", filename, f.read(), "image/jpeg", owner_id=current_user.id)
+    except Exception:
+        # Non-fatal: file on disk remains available
+        pass
     
     # Submit verification
     verification_id = await database.submit_verification_documents(
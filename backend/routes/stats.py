@@ -9,18 +9,9 @@ router = APIRouter(prefix="/api/stats", tags=["statistics"])
 @router.get("", response_model=models.StatsResponse)
 @router.get("/", response_model=models.StatsResponse)
 async def get_platform_stats():
-    """Get platform statistics"""
+    """Get platform statistics (served from the materialized platform_stats document)"""
     try:
-        cache = get_cache()
-        ttl = int(os.getenv("STATS_CACHE_TTL_SEC", "60"))
-        key = "stats:platform"
-
-        cached = await cache.get_json(key)
-        if cached:
-            return models.StatsResponse(**cached)
-
         stats = await database.get_platform_stats()
-        await cache.set_json(key, stats, ttl=ttl)
         return models.StatsResponse(**stats)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -42,11 +42,12 @@ async def get_tradespeople(
     limit: int = Query(50, ge=1, le=100),  # Increased default limit from 12 to 50
     search: Optional[str] = None,
     trade: Optional[str] = None,
+    state: Optional[str] = None,
     location: Optional[str] = None,
     min_rating: Optional[float] = Query(None, ge=0, le=5),
     sort_by: Optional[str] = Query("rating", regex="^(rating|reviews|experience|recent)$")
 ):
-    """Get tradespeople with filters and search"""
+    """Get tradespeople with filters and search, plus trade/state/rating-band facet counts"""
     try:
         # Gracefully handle degraded mode when database is not connected
         if not getattr(database, "connected", False) or getattr(database, "database", None) is None:
@@ -57,91 +58,29 @@ async def get_tradespeople(
                 "total": 0,
                 "total_pages": total_pages,
                 "current_page": page,
-                "limit": limit
+                "limit": limit,
+                "facets": {"trades": [], "states": [], "rating_bands": {}}
             }
 
         skip = (page - 1) * limit
         
-        # Build filters for users collection where role is tradesperson
-        filters = {"role": "tradesperson"}  # Removed status filter to show all tradespeople
-        
-        # Search across name, business_name, bio, profession fields
-        if search:
-            search_pattern = {"$regex": search, "$options": "i"}
-            filters["$or"] = [
-                {"name": search_pattern},
-                {"business_name": search_pattern},
-                {"bio": search_pattern},
-                {"profession": search_pattern}
-            ]
-        
-        # Filter by trade/profession
-        if trade:
-            filters["profession"] = {"$regex": trade, "$options": "i"}
-            
-        # Filter by location (check city, state, location fields)
-        if location:
-            location_pattern = {"$regex": location, "$options": "i"}
-            filters["$or"] = filters.get("$or", []) + [
-                {"city": location_pattern},
-                {"state": location_pattern}, 
-                {"location": location_pattern}
-            ]
-        
-        # Filter by minimum rating
-        if min_rating is not None:
-            filters["average_rating"] = {"$gte": min_rating}
-        
-        # Build sort criteria
-        sort_criteria = []
-        if sort_by == "rating":
-            sort_criteria = [("average_rating", -1), ("total_reviews", -1)]
-        elif sort_by == "reviews":
-            sort_criteria = [("total_reviews", -1), ("average_rating", -1)]
-        elif sort_by == "experience":
-            sort_criteria = [("years_experience", -1), ("average_rating", -1)]
-        elif sort_by == "recent":
-            sort_criteria = [("created_at", -1)]
-        else:
-            sort_criteria = [("average_rating", -1)]
-        
-        # Get tradespeople from users collection using guarded accessor
-        users_collection = database.users_collection
-        cursor = users_collection.find(filters)
-        
-        # Apply sorting
-        for field, direction in sort_criteria:
-            cursor = cursor.sort(field, direction)
-            
-        # Apply pagination
-        cursor = cursor.skip(skip).limit(limit)
-        tradespeople_raw = await cursor.to_list(length=limit)
-        
-        # Get total count
-        total_count = await users_collection.count_documents(filters)
+        # Indexed directory search (services/tradesperson_directory.py)
+        tradespeople_raw, total_count, facets = await database.search_tradespeople_directory(
+            search=search, trade=trade, state=state, location=location,
+            min_rating=min_rating, sort_by=sort_by, skip=skip, limit=limit
+        )
+        stats = await database.get_tradespeople_listing_stats([tp.get("id", "") for tp in tradespeople_raw])
         
         # Transform data to match frontend expectations
         tradespeople = []
         for tp in tradespeople_raw:
-            # Calculate additional stats if needed
-            portfolio_count = await database.portfolio_collection.count_documents({"tradesperson_id": tp.get("id", "")})
-            reviews_count = await database.reviews_collection.count_documents({"reviewee_id": tp.get("id", "")})
-            completed_jobs = await database.database.jobs.count_documents({
-                "assigned_tradesperson_id": tp.get("id", ""),
-                "status": "completed"
-            })
+            tp_stats = stats.get(tp.get("id", ""), {})
+            reviews_count = tp_stats.get("total_reviews", 0)
             
             # Get average rating from reviews if not stored in user document
             avg_rating = tp.get("average_rating", 0)
-            if avg_rating == 0 and reviews_count > 0:
-                # Calculate average rating from reviews
-                reviews_pipeline = [
-                    {"$match": {"reviewee_id": tp.get("id", "")}},
-                    {"$group": {"_id": None, "avg_rating": {"$avg": "$rating"}}}
-                ]
-                rating_result = await database.reviews_collection.aggregate(reviews_pipeline).to_list(length=1)
-                if rating_result:
-                    avg_rating = round(rating_result[0]["avg_rating"], 1)
+            if avg_rating == 0 and reviews_count > 0 and tp_stats.get("avg_rating") is not None:
+                avg_rating = round(tp_stats["avg_rating"], 1)
             
             # Transform to expected format
             tradesperson_data = {
@@ -150,7 +89,9 @@ async def get_tradespeople(
                 "email": tp.get("email", ""),
                 "phone": tp.get("phone", ""),
                 "main_trade": tp.get("profession", ""),  # Map profession to main_trade
-                "trade_categories": [tp.get("profession", "")] if tp.get("profession") else [],
+                "trade_categories": (
+                    tp.get("trade_categories") or ([tp.get("profession", "")] if tp.get("profession") else [])
+                ),
                 "bio": tp.get("bio", ""),
                 "location": tp.get("location", ""),
                 "city": tp.get("city", ""),
@@ -162,8 +103,8 @@ async def get_tradespeople(
                 "profile_image": tp.get("profile_image", ""),
                 "average_rating": avg_rating,
                 "total_reviews": reviews_count,
-                "completed_jobs": completed_jobs,
-                "portfolio_items": portfolio_count,
+                "completed_jobs": tp_stats.get("completed_jobs", 0),
+                "portfolio_items": tp_stats.get("portfolio_items", 0),
                 "is_verified": tp.get("is_verified", False),
                 "created_at": tp.get("created_at"),
                 "response_time": 2,  # Default response time in hours
@@ -183,7 +124,8 @@ async def get_tradespeople(
             "total": total_count,
             "total_pages": total_pages,
             "current_page": page,
-            "limit": limit
+            "limit": limit,
+            "facets": facets
         }
         
     except Exception as e:
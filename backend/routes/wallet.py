@@ -1,4 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request
 from typing import List, Optional
 from datetime import datetime
 import base64
@@ -7,13 +7,16 @@ import os
 from PIL import Image
 import io
 
-from ..auth.dependencies import get_current_user, get_current_tradesperson
+from ..auth.dependencies import get_current_user, get_current_tradesperson, get_current_user_for_file
+from ..auth.security import sign_file_path
 from ..database import database
 from ..models.base import (
     Wallet, WalletTransaction, WalletFundingRequest, WalletResponse,
     TransactionType, TransactionStatus, BankDetails
 )
-from ..models.auth import User
+from ..models.auth import User, UserRole
+from ..services.blob_store import blob_store
+from ..utils.file_response import send_upload
 
 router = APIRouter(prefix="/api/wallet", tags=["wallet"])
 
@@ -117,15 +120,12 @@ async def fund_wallet(
         "proof_image": filename
     }
 
-    # Store base64 alongside transaction to avoid disk dependency
+    # Store proof in the blob store to avoid disk dependency without bloating the transaction
     try:
         if optimized_bytes is not None:
-            transaction_data["proof_image_base64"] = base64.b64encode(optimized_bytes).decode("utf-8")
-        elif proof_image_base64:
-            # Fallback to original provided base64 if optimized bytes couldn't be read
-            transaction_data["proof_image_base64"] = proof_image_base64.split(",")[-1]
+            await blob_store.put("payment_proofs", filename, optimized_bytes, "image/jpeg", owner_id=current_user.id)
     except Exception:
-        # Silently ignore base64 storage failures; file path remains available
+        # Non-fatal: file path remains available
         pass
     
     transaction = await database.create_wallet_transaction(transaction_data)
@@ -181,25 +181,40 @@ async def check_sufficient_balance(
         "shortfall_naira": max(0, (access_fee_coins - wallet["balance_coins"]) * 100)
     }
 
+async def _check_proof_owner(filename: str, current_user: Optional[User]) -> None:
+    """404 unless the proof is the user's own (or they are an admin). None means a signed URL."""
+    if current_user is None or current_user.role == UserRole.ADMIN or filename.startswith(f"{current_user.id}_"):
+        return
+    txn = await database.get_wallet_transaction_by_proof_image(filename)
+    if not txn or txn.get("user_id") != current_user.id:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+@router.get("/payment-proof/{filename}/url")
+async def sign_payment_proof_url(filename: str, request: Request, current_user: User = Depends(get_current_user)):
+    """A short-lived signed URL for the user's own payment proof, for direct <img src> use."""
+    await _check_proof_owner(filename, current_user)
+    return {"url": sign_file_path(request.url.path[:-len("/url")])}
+
 @router.get("/payment-proof/{filename}")
-async def serve_payment_proof(filename: str):
-    from fastapi.responses import FileResponse
-    base_dir = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
-    project_root_uploads = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "uploads")
-    candidates = [
-        os.path.join(base_dir, "payment_proofs", filename),
-        os.path.join(project_root_uploads, "payment_proofs", filename),
-        os.path.join(os.getcwd(), "uploads", "payment_proofs", filename),
-        os.path.join("/app", "uploads", "payment_proofs", filename),
-    ]
-    for fp in candidates:
-        if os.path.exists(fp):
-            return FileResponse(fp, media_type="image/jpeg")
-    raise HTTPException(status_code=404, detail="Image not found")
+async def serve_payment_proof(
+    filename: str,
+    request: Request,
+    current_user: Optional[User] = Depends(get_current_user_for_file)
+):
+    """Stream the user's own payment proof image (Bearer header or signed URL)."""
+    await _check_proof_owner(filename, current_user)
+    return await send_upload(request, "payment_proofs", filename, not_found_detail="Image not found")
 
-@router.get("/payment-proof-base64/{filename}")
-async def serve_payment_proof_base64(filename: str):
-    # Prefer DB-stored base64 if available
+@router.get("/payment-proof-base64/{filename}", deprecated=True)
+async def serve_payment_proof_base64(filename: str, current_user: Optional[User] = Depends(get_current_user_for_file)):
+    await _check_proof_owner(filename, current_user)
+    # Prefer blob store, then legacy DB-stored base64
+    try:
+        found = await blob_store.read("payment_proofs", filename)
+        if found:
+            return {"image_base64": base64.b64encode(found[1]).decode("utf-8")}
+    except Exception:
+        pass
     try:
         txn = await database.get_wallet_transaction_by_proof_image(filename)
         if txn and txn.get("proof_image_base64"):
@@ -53,6 +53,17 @@ async def lifespan(app: FastAPI):
             logger.warning("Database connection timed out during startup; running in degraded mode")
         if getattr(database, 'connected', False):
             logger.info("Connected to MongoDB")
+            try:
+                from .services.platform_stats import platform_stats_cache
+                await platform_stats_cache.start(database.database, database.reconcile_platform_stats)
+            except Exception as e:
+                logger.warning(f"Platform stats cache unavailable, reading from MongoDB: {e}")
+            from .services.counter_buffer import counter_buffer
+            counter_buffer.start(database.database)
+            from .services.scheduler import scheduler
+            from .services import scheduled_tasks
+            scheduled_tasks.register(scheduler, database)
+            scheduler.start(database.database)
         else:
             allow_degraded = os.getenv("ALLOW_DEGRADED_MODE", "true").lower() in ("1", "true", "yes")
             if not allow_degraded:
@@ -62,6 +73,31 @@ async def lifespan(app: FastAPI):
         logger.error(f"Database connect failed during startup: {e}")
     yield
     # Shutdown
+    try:
+        from .services.platform_stats import platform_stats_cache
+        await platform_stats_cache.stop()
+    except Exception as e:
+        logger.error(f"Error stopping platform stats cache: {e}")
+    try:
+        from .services.scheduler import scheduler
+        await scheduler.stop()
+    except Exception as e:
+        logger.error(f"Error stopping scheduler: {e}")
+    try:
+        from .services.counter_buffer import counter_buffer
+        await counter_buffer.stop()
+    except Exception as e:
+        logger.error(f"Error flushing buffered counters: {e}")
+    try:
+        from .services.realtime import realtime_hub
+        await realtime_hub.stop()
+    except Exception as e:
+        logger.error(f"Error stopping realtime hub: {e}")
+    try:
+        from .services.image_pipeline import image_pipeline
+        image_pipeline.shutdown()
+    except Exception as e:
+        logger.error(f"Error shutting down image pipeline: {e}")
     try:
         await database.close_mongo_connection()
         logger.info("MongoDB connection closed")
@@ -121,6 +157,8 @@ app.add_middleware(
     allow_origins=allowed_origins,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Paged list endpoints return their total here
+    expose_headers=["X-Total-Count"],
 )
 
 # Health check endpoint
@@ -0,0 +1,355 @@
+"""
+Content-addressed blob storage for uploaded files.
+
+Binary payloads (verification documents, work photos, payment proofs) are stored
+once per SHA-256 digest in a pluggable backend, and a small metadata record in
+the Mongo ``blobs`` collection maps ``(namespace, filename)`` to that digest.
+Lookups are a single indexed ``find_one`` instead of scanning embedded base64
+arrays inside verification or transaction documents.
+
+Backends:
+    local - sharded directories under ``BLOB_LOCAL_ROOT`` (default ``$UPLOADS_DIR/blobs``)
+    s3    - any S3-compatible store (AWS, DigitalOcean Spaces, MinIO) via boto3
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except Exception:
+    boto3 = None
+    ClientError = Exception
+
+try:
+    from ..database import database
+except ImportError:
+    from database import database
+
+logger = logging.getLogger(__name__)
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def shard_path(digest: str) -> str:
+    """Return the sharded relative path for a digest, e.g. ``ab/cd/abcd...``."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+class BlobBackend(ABC):
+    """Abstract storage backend keyed by SHA-256 digest."""
+
+    name = "abstract"
+
+    @abstractmethod
+    async def put(self, digest: str, data: bytes, content_type: str) -> None:
+        """Store bytes under digest (idempotent)."""
+
+    @abstractmethod
+    async def get(self, digest: str) -> Optional[bytes]:
+        """Return stored bytes, or None if missing."""
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool:
+        """Return True if the digest is stored."""
+
+    @abstractmethod
+    async def delete(self, digest: str) -> bool:
+        """Delete stored bytes. Returns True if something was removed."""
+
+    async def put_file(self, digest: str, src_path: str, content_type: str) -> None:
+        """Store a local file under digest and consume (move or delete) src_path.
+
+        Backends override this to avoid loading the file into memory.
+        """
+        def _read():
+            with open(src_path, "rb") as f:
+                return f.read()
+
+        try:
+            await self.put(digest, await asyncio.to_thread(_read), content_type)
+        finally:
+            await asyncio.to_thread(_remove_quietly, src_path)
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Filesystem path for the digest when the backend is disk-based."""
+        return None
+
+    async def presigned_url(self, digest: str, content_type: Optional[str] = None) -> Optional[str]:
+        """Short-lived direct download URL when the backend supports one."""
+        return None
+
+
+class LocalBlobBackend(BlobBackend):
+    """Filesystem backend using two levels of sharded directories."""
+
+    name = "local"
+
+    def __init__(self, root: Optional[str] = None):
+        uploads = os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
+        self.root = root or os.environ.get("BLOB_LOCAL_ROOT") or os.path.join(uploads, "blobs")
+        os.makedirs(self.root, exist_ok=True)
+
+    def local_path(self, digest: str) -> str:
+        return os.path.join(self.root, *shard_path(digest).split("/"))
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self.local_path(digest)
+        if os.path.exists(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as out:
+            out.write(data)
+        os.replace(tmp, path)
+
+    def _move(self, digest: str, src_path: str) -> None:
+        path = self.local_path(digest)
+        if os.path.exists(path):
+            # Already stored: identical content is deduplicated
+            _remove_quietly(src_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(src_path, path)
+
+    def _read(self, digest: str) -> Optional[bytes]:
+        path = self.local_path(digest)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _delete(self, digest: str) -> bool:
+        path = self.local_path(digest)
+        try:
+            os.remove(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    async def put(self, digest: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(self._write, digest, data)
+
+    async def put_file(self, digest: str, src_path: str, content_type: str) -> None:
+        await asyncio.to_thread(self._move, digest, src_path)
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, digest)
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(os.path.exists, self.local_path(digest))
+
+    async def delete(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._delete, digest)
+
+
+class S3BlobBackend(BlobBackend):
+    """S3-compatible backend. Set BLOB_S3_ENDPOINT_URL to target MinIO or Spaces."""
+
+    name = "s3"
+
+    def __init__(self, bucket: Optional[str] = None, prefix: Optional[str] = None, endpoint_url: Optional[str] = None):
+        if boto3 is None:
+            raise RuntimeError("boto3 is required for the s3 blob backend")
+        self.bucket = bucket or os.environ.get("BLOB_S3_BUCKET")
+        if not self.bucket:
+            raise ValueError("BLOB_S3_BUCKET is required for the s3 blob backend")
+        self.prefix = (prefix if prefix is not None else os.environ.get("BLOB_S3_PREFIX", "blobs")).strip("/")
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url or os.environ.get("BLOB_S3_ENDPOINT_URL") or None,
+            region_name=os.environ.get("BLOB_S3_REGION") or None,
+            aws_access_key_id=os.environ.get("BLOB_S3_ACCESS_KEY") or None,
+            aws_secret_access_key=os.environ.get("BLOB_S3_SECRET_KEY") or None,
+        )
+        if os.environ.get("BLOB_S3_CREATE_BUCKET", "false").lower() in ("1", "true", "yes"):
+            # Convenient for a local MinIO stand-in; production buckets are provisioned out of band
+            try:
+                self.client.head_bucket(Bucket=self.bucket)
+            except ClientError:
+                self.client.create_bucket(Bucket=self.bucket)
+
+    def object_key(self, digest: str) -> str:
+        key = shard_path(digest)
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def _exists(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(digest))
+            return True
+        except ClientError:
+            return False
+
+    def _put(self, digest: str, data: bytes, content_type: str) -> None:
+        if self._exists(digest):
+            return
+        self.client.put_object(
+            Bucket=self.bucket,
+            Key=self.object_key(digest),
+            Body=data,
+            ContentType=content_type or "application/octet-stream",
+        )
+
+    def _put_file(self, digest: str, src_path: str, content_type: str) -> None:
+        try:
+            if not self._exists(digest):
+                self.client.upload_file(
+                    src_path, self.bucket, self.object_key(digest),
+                    ExtraArgs={"ContentType": content_type or "application/octet-stream"},
+                )
+        finally:
+            _remove_quietly(src_path)
+
+    def _get(self, digest: str) -> Optional[bytes]:
+        try:
+            obj = self.client.get_object(Bucket=self.bucket, Key=self.object_key(digest))
+        except ClientError:
+            return None
+        return obj["Body"].read()
+
+    def _delete(self, digest: str) -> bool:
+        if not self._exists(digest):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(digest))
+        return True
+
+    def _presign(self, digest: str, content_type: Optional[str]) -> str:
+        params = {"Bucket": self.bucket, "Key": self.object_key(digest)}
+        if content_type:
+            params["ResponseContentType"] = content_type
+        expires = int(os.environ.get("BLOB_S3_URL_TTL_SEC", "300"))
+        return self.client.generate_presigned_url("get_object", Params=params, ExpiresIn=expires)
+
+    async def put(self, digest: str, data: bytes, content_type: str) -> None:
+        await asyncio.to_thread(self._put, digest, data, content_type)
+
+    async def presigned_url(self, digest: str, content_type: Optional[str] = None) -> Optional[str]:
+        return await asyncio.to_thread(self._presign, digest, content_type)
+
+    async def put_file(self, digest: str, src_path: str, content_type: str) -> None:
+        await asyncio.to_thread(self._put_file, digest, src_path, content_type)
+
+    async def get(self, digest: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, digest)
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._exists, digest)
+
+    async def delete(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._delete, digest)
+
+
+def get_blob_backend() -> BlobBackend:
+    """Build the backend selected by BLOB_BACKEND (local | s3)."""
+    kind = os.environ.get("BLOB_BACKEND", "local").lower()
+    if kind == "s3":
+        return S3BlobBackend()
+    return LocalBlobBackend()
+
+
+class BlobStore:
+    """Stores bytes in a backend and tracks them in the ``blobs`` collection."""
+
+    def __init__(self, backend: Optional[BlobBackend] = None):
+        self._backend = backend
+
+    @property
+    def backend(self) -> BlobBackend:
+        if self._backend is None:
+            self._backend = get_blob_backend()
+        return self._backend
+
+    async def put(
+        self,
+        namespace: str,
+        filename: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        original_filename: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Store data and map (namespace, filename) to its digest. Returns the metadata record.
+
+        ``filename`` must be unique within the namespace (callers generate it server-side);
+        the name the client uploaded is kept only as ``original_filename``.
+        """
+        digest = sha256_hex(data)
+        content_type = content_type or "application/octet-stream"
+        await self.backend.put(digest, data, content_type)
+        record = {
+            "namespace": namespace,
+            "filename": filename,
+            "sha256": digest,
+            "size": len(data),
+            "content_type": content_type,
+            "backend": self.backend.name,
+            "owner_id": owner_id,
+            "original_filename": original_filename,
+            "updated_at": datetime.utcnow(),
+        }
+        await database.upsert_blob_record(record)
+        return record
+
+    async def put_file(
+        self,
+        namespace: str,
+        filename: str,
+        src_path: str,
+        sha256: str,
+        size: int,
+        content_type: Optional[str] = None,
+        owner_id: Optional[str] = None,
+        original_filename: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Like put(), for a file already on disk with a precomputed digest.
+
+        src_path is consumed (moved into the backend or deleted).
+        """
+        content_type = content_type or "application/octet-stream"
+        await self.backend.put_file(sha256, src_path, content_type)
+        record = {
+            "namespace": namespace,
+            "filename": filename,
+            "sha256": sha256,
+            "size": size,
+            "content_type": content_type,
+            "backend": self.backend.name,
+            "owner_id": owner_id,
+            "original_filename": original_filename,
+            "updated_at": datetime.utcnow(),
+        }
+        await database.upsert_blob_record(record)
+        return record
+
+    async def get_meta(self, namespace: str, filename: str) -> Optional[Dict[str, Any]]:
+        return await database.get_blob_record(namespace, filename)
+
+    async def read(self, namespace: str, filename: str) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Return (metadata, bytes) for a stored file, or None if unknown."""
+        meta = await self.get_meta(namespace, filename)
+        if not meta:
+            return None
+        data = await self.backend.get(meta["sha256"])
+        if data is None:
+            logger.warning(f"Blob metadata present but content missing: {namespace}/{filename} ({meta['sha256']})")
+            return None
+        return meta, data
+
+
+blob_store = BlobStore()
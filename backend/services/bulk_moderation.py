@@ -0,0 +1,319 @@
+"""
+Bulk admin moderation: job approvals, wallet funding confirmations and
+identity verification approvals for up to MAX_ITEMS ids per request.
+
+Approving one at a time costs an HTTP call, a status update, a notification
+round trip and an activity insert per item. Here a batch is:
+
+* one read of every target;
+* one ordered ``bulk_write`` of conditional updates (only items still
+  pending match), each tagged with the batch id so the applied ones can be
+  read back. A concurrent moderator who got there first shows up as
+  ``not_pending``, not as an error. The item a write error stopped the
+  batch on, and every item after it, is ``failed``;
+* one ``insert_many`` of admin activities;
+* for jobs, one ``insert_many`` of homeowner notifications, recorded as
+  pending. ``deliver`` sends them afterwards (run it as a background task)
+  and stores the outcomes in one more bulk write.
+
+Funding confirmations credit wallets, which has to go through
+``wallet_ledger.settle_pending`` so that each credit happens exactly once.
+They are settled one ledger operation per item, SETTLE_CONCURRENCY at a
+time; only the read and the activity log are batched.
+
+Every function returns ``{"batch_id", "results", "summary"}`` where
+``results`` has one ``{"id", "status"}`` per distinct id, in request order.
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+try:
+    from ..models.admin import AdminActivity, AdminActivityType
+    from ..models.notifications import Notification, NotificationChannel, NotificationType
+except ImportError:
+    from models.admin import AdminActivity, AdminActivityType
+    from models.notifications import Notification, NotificationChannel, NotificationType
+
+from . import platform_stats, stats_counters
+
+logger = logging.getLogger(__name__)
+
+MAX_ITEMS = 500
+SETTLE_CONCURRENCY = 10
+DELIVERY_CONCURRENCY = 10
+
+# Per-item outcomes besides the applied status
+NOT_FOUND = "not_found"
+NOT_PENDING = "not_pending"
+FAILED = "failed"
+
+
+def unique_ids(ids: List[str]) -> List[str]:
+    """Distinct non-empty ids in request order."""
+    return list(dict.fromkeys(i for i in ids if i))
+
+
+def _report(batch_id: str, ids: List[str], outcomes: dict) -> dict:
+    results = [{"id": i, **outcomes[i]} for i in ids]
+    return {"batch_id": batch_id, "results": results, "summary": dict(Counter(r["status"] for r in results))}
+
+
+async def _apply(collection, ids: List[str], pending: dict, fields: dict, batch_id: str) -> Tuple[set, dict]:
+    """Conditionally update every id in one ordered bulk write.
+
+    Returns ``(applied, failed)``: the ids this batch changed, and an error for
+    each id the write failed on or, being ordered, never attempted after that.
+    """
+    if not ids:
+        return set(), {}
+    fields = dict(fields, moderation_batch_id=batch_id)
+    failed = {}
+    try:
+        await collection.bulk_write([UpdateOne({"id": i, **pending}, {"$set": fields}) for i in ids], ordered=True)
+    except BulkWriteError as e:
+        error = (e.details.get("writeErrors") or [{}])[0]
+        stopped_at = error.get("index", 0)
+        logger.warning(f"bulk moderation {batch_id}: write stopped at item {stopped_at}: {error.get('errmsg')}")
+        failed[ids[stopped_at]] = error.get("errmsg") or "write error"
+        failed.update({i: "not attempted after an earlier write error" for i in ids[stopped_at + 1:]})
+    applied = set(await collection.distinct("id", {"id": {"$in": ids}, "moderation_batch_id": batch_id}))
+    return applied, {i: error for i, error in failed.items() if i not in applied}
+
+
+def _outcome(item_id: str, applied: set, failed: dict, applied_status: str) -> dict:
+    if item_id in applied:
+        return {"status": applied_status}
+    if item_id in failed:
+        return {"status": FAILED, "error": failed[item_id]}
+    # The conditional update matched nothing: someone else processed it first
+    return {"status": NOT_PENDING}
+
+
+def _activities(admin: dict, activity_type: AdminActivityType, target_type: str, items: List[Tuple[str, str]],
+                batch_id: str, notes: str) -> List[dict]:
+    return [
+        AdminActivity(
+            admin_id=admin["id"],
+            admin_username=admin.get("username", ""),
+            activity_type=activity_type,
+            description=description,
+            target_id=target_id,
+            target_type=target_type,
+            metadata={"batch_id": batch_id, "notes": notes},
+        ).dict()
+        for target_id, description in items
+    ]
+
+
+def _classify(ids: List[str], found: dict, pending_status: str) -> Tuple[dict, List[str]]:
+    outcomes, candidates = {}, []
+    for i in ids:
+        if i not in found:
+            outcomes[i] = {"status": NOT_FOUND}
+        elif found[i].get("status") != pending_status:
+            outcomes[i] = {"status": NOT_PENDING, "current_status": found[i].get("status")}
+        else:
+            candidates.append(i)
+    return outcomes, candidates
+
+
+async def moderate_jobs(db, job_ids: List[str], action: str, admin: dict, notes: str = ""):
+    """Approve or reject pending jobs.
+
+    Returns ``(report, notifications, approved_jobs)``: the notifications to
+    ``deliver`` and, when approving, the jobs now active (for feed fan-out
+    and matching alerts).
+    """
+    ids = unique_ids(job_ids)
+    batch_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+    new_status, applied_status = ("active", "approved") if action == "approve" else ("rejected", "rejected")
+
+    jobs = {j["id"]: j async for j in db.database.jobs.find(
+        {"id": {"$in": ids}}, {"_id": 0, "id": 1, "status": 1, "title": 1, "homeowner": 1})}
+    outcomes, candidates = _classify(ids, jobs, "pending_approval")
+    applied, failed = await _apply(db.database.jobs, candidates, {"status": "pending_approval"}, {
+        "status": new_status,
+        "approved_by": admin["id"],
+        "approved_at": now,
+        "approval_notes": notes,
+        "updated_at": now,
+    }, batch_id)
+    for i in candidates:
+        outcomes[i] = _outcome(i, applied, failed, applied_status)
+
+    approved_jobs, notifications = [], []
+    if applied:
+        n = len(applied)
+        await platform_stats.bump(db.database, active_jobs=n if new_status == "active" else 0)
+        await stats_counters.add(db.database, {
+            "jobs.status.pending_approval": -n,
+            f"jobs.status.{new_status}": n,
+            f"jobs.{applied_status}": n,
+        })
+        done = [jobs[i] for i in candidates if i in applied]
+        await db.create_admin_activities(_activities(
+            admin, AdminActivityType.APPROVE_JOB if action == "approve" else AdminActivityType.REJECT_JOB, "job",
+            [(j["id"], f"{applied_status.capitalize()} job '{j.get('title', '')}'") for j in done], batch_id, notes,
+        ))
+        notifications = await _job_notifications(db, done, action, notes, now)
+        if new_status == "active":
+            approved_jobs = await db.database.jobs.find(
+                {"id": {"$in": list(applied)}, "status": "active"}, {"_id": 0}).to_list(n)
+    logger.info(f"bulk moderation {batch_id}: {len(applied)}/{len(ids)} job(s) {applied_status} by {admin['id']}")
+    return _report(batch_id, ids, outcomes), notifications, approved_jobs
+
+
+async def _job_notifications(db, jobs: List[dict], action: str, notes: str, now: datetime) -> List[Notification]:
+    """Record one pending notification per homeowner and job, in one insert."""
+    emails = list({(j.get("homeowner") or {}).get("email") for j in jobs} - {None})
+    homeowners = {u["email"]: u async for u in db.database.users.find(
+        {"email": {"$in": emails}}, {"_id": 0, "id": 1, "name": 1, "email": 1, "phone": 1})}
+    prefs = await db.get_notification_preferences_for_users([u["id"] for u in homeowners.values()])
+    notification_type = NotificationType.JOB_APPROVED if action == "approve" else NotificationType.JOB_REJECTED
+
+    notifications = []
+    for job in jobs:
+        homeowner = homeowners.get((job.get("homeowner") or {}).get("email"))
+        if not homeowner:
+            continue
+        title = job.get("title", "")
+        if action == "approve":
+            template_data = {"homeowner_name": homeowner.get("name", "Homeowner"), "job_title": title,
+                             "approved_at": now.strftime("%B %d, %Y"), "admin_notes": notes}
+            subject, content = f"Job Approved: {title}", f"Your job '{title}' was approved. Notes: {notes}"
+        else:
+            template_data = {"homeowner_name": homeowner.get("name", "Homeowner"), "job_title": title,
+                             "reviewed_at": now.strftime("%B %d, %Y"), "rejection_reason": notes}
+            subject = f"Job Requires Updates: {title}"
+            content = f"Your job '{title}' needs updates before approval. Reason: {notes}"
+        notifications.append(Notification(
+            id=str(uuid.uuid4()),
+            user_id=homeowner["id"],
+            type=notification_type,
+            channel=getattr(prefs[homeowner["id"]], notification_type.value, NotificationChannel.EMAIL),
+            recipient_email=homeowner.get("email"),
+            recipient_phone=homeowner.get("phone"),
+            subject=subject,
+            content=content,
+            metadata=template_data,
+        ))
+    try:
+        await db.create_notifications(notifications)
+    except Exception as e:
+        logger.warning(f"Failed to record {len(notifications)} moderation notification(s): {e}")
+        return []
+    return notifications
+
+
+async def deliver(db, notifications: List[Notification]) -> None:
+    """Send recorded notifications, DELIVERY_CONCURRENCY at a time, then store the outcomes."""
+    if not notifications:
+        return
+    try:
+        from .notifications import notification_service
+    except ImportError:
+        from services.notifications import notification_service
+
+    gate = asyncio.Semaphore(DELIVERY_CONCURRENCY)
+
+    async def one(notification):
+        async with gate:
+            return await notification_service.deliver(notification)
+
+    delivered = await asyncio.gather(*(one(n) for n in notifications))
+    try:
+        await db.record_notification_deliveries(delivered)
+    except Exception as e:
+        logger.warning(f"Failed to record delivery of {len(delivered)} notification(s): {e}")
+
+
+async def confirm_funding(db, transaction_ids: List[str], admin: dict, notes: str = "") -> dict:
+    """Confirm pending wallet funding requests, crediting each wallet exactly once."""
+    ids = unique_ids(transaction_ids)
+    batch_id = str(uuid.uuid4())
+    found = {t["id"]: t async for t in db.database.wallet_transactions.find(
+        {"id": {"$in": ids}}, {"_id": 0, "id": 1, "status": 1, "user_id": 1, "amount_coins": 1})}
+    outcomes, candidates = _classify(ids, found, "pending")
+
+    gate = asyncio.Semaphore(SETTLE_CONCURRENCY)
+
+    async def settle(transaction_id):
+        async with gate:
+            try:
+                ok = await db.confirm_wallet_funding(transaction_id, admin_id=admin["id"], admin_notes=notes)
+                return {"status": "confirmed"} if ok else {"status": NOT_PENDING}
+            except Exception as e:
+                logger.error(f"bulk moderation {batch_id}: funding {transaction_id} failed: {e}")
+                return {"status": FAILED, "error": str(e)}
+
+    for transaction_id, outcome in zip(candidates, await asyncio.gather(*(settle(t) for t in candidates))):
+        outcomes[transaction_id] = outcome
+
+    confirmed = [found[i] for i in candidates if outcomes[i]["status"] == "confirmed"]
+    await db.create_admin_activities(_activities(
+        admin, AdminActivityType.CONFIRM_PAYMENT, "wallet_transaction",
+        [(t["id"], f"Confirmed funding of {t.get('amount_coins')} coins for user {t.get('user_id')}")
+         for t in confirmed],
+        batch_id, notes,
+    ))
+    logger.info(
+        f"bulk moderation {batch_id}: {len(confirmed)}/{len(ids)} funding request(s) confirmed by {admin['id']}"
+    )
+    return _report(batch_id, ids, outcomes)
+
+
+async def approve_verifications(db, verification_ids: List[str], admin: dict, notes: str = "") -> dict:
+    """Approve pending identity verifications and mark their users verified."""
+    ids = unique_ids(verification_ids)
+    batch_id = str(uuid.uuid4())
+    now = datetime.utcnow()
+    found = {v["id"]: v async for v in db.database.user_verifications.find(
+        {"id": {"$in": ids}}, {"_id": 0, "id": 1, "status": 1, "user_id": 1})}
+    outcomes, candidates = _classify(ids, found, "pending")
+    applied, failed = await _apply(db.database.user_verifications, candidates, {"status": "pending"}, {
+        "status": "verified",
+        "admin_notes": notes,
+        "verified_by": admin["id"],
+        "verified_at": now,
+        "updated_at": now,
+    }, batch_id)
+    for i in candidates:
+        outcomes[i] = _outcome(i, applied, failed, "verified")
+
+    verified = [found[i] for i in candidates if i in applied]
+    user_ids = list({v["user_id"] for v in verified if v.get("user_id")})
+    if user_ids:
+        roles = {u["id"]: u.get("role") async for u in db.database.users.find(
+            {"id": {"$in": user_ids}}, {"_id": 0, "id": 1, "role": 1})}
+        homeowners = [u for u in user_ids if roles.get(u) == "homeowner"]
+        # identity_verified for every role; homeowners are also fully verified (tradespeople
+        # stay gated by business approval), as in Database.verify_user_documents
+        await db.database.users.bulk_write([
+            UpdateOne({"id": u}, {"$set": dict(
+                {"identity_verified": True, "updated_at": now}, **({"is_verified": True} if u in homeowners else {})
+            )})
+            for u in user_ids
+        ], ordered=True)
+        for user_id in homeowners:
+            # Referral rewards move coins through the wallet ledger, one user at a time
+            try:
+                await db._process_referral_rewards(user_id)
+            except Exception as e:
+                logger.error(f"bulk moderation {batch_id}: referral reward for {user_id} failed: {e}")
+
+    await db.create_admin_activities(_activities(
+        admin, AdminActivityType.APPROVE_VERIFICATION, "user_verification",
+        [(v["id"], f"Approved identity verification for user {v.get('user_id')}") for v in verified],
+        batch_id, notes,
+    ))
+    logger.info(f"bulk moderation {batch_id}: {len(verified)}/{len(ids)} verification(s) approved by {admin['id']}")
+    return _report(batch_id, ids, outcomes)
@@ -0,0 +1,148 @@
+"""
+Write-behind buffer for hot ``$inc`` counters.
+
+Public blog views, likes and shares and job-posting applications used to
+issue one ``update_one`` per event, so a popular post became a stream of
+writes to a single document. ``counter_buffer.incr`` instead adds the event
+to an in-process tally keyed by ``(collection, id, field)``; the tally is
+written as one unordered ``bulk_write`` per collection (one ``UpdateOne``
+per document, all of its fields in one ``$inc``) every
+COUNTER_FLUSH_INTERVAL_SEC seconds, or as soon as COUNTER_FLUSH_MAX_EVENTS
+events are pending, and on shutdown.
+
+Counters are therefore up to one interval behind, and a worker that dies
+without shutting down loses its pending tally. Updates that fail are put back
+and retried with the next flush. Until ``start`` has run (tools, tests,
+degraded mode) every increment is written through at once.
+"""
+
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL_SEC = float(os.getenv("COUNTER_FLUSH_INTERVAL_SEC", "5"))
+FLUSH_MAX_EVENTS = int(os.getenv("COUNTER_FLUSH_MAX_EVENTS", "500"))
+
+# (collection, id field, id) -> one document's pending increments
+Target = Tuple[str, str, str]
+
+
+class CounterBuffer:
+    def __init__(self, interval_sec: float = FLUSH_INTERVAL_SEC, max_events: int = FLUSH_MAX_EVENTS):
+        self.interval_sec = interval_sec
+        self.max_events = max_events
+        self._database = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._counts: Dict[Target, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._match: Dict[Target, dict] = {}
+        self._on_insert: Dict[Target, dict] = {}
+        self._events = 0
+
+    @property
+    def pending(self) -> int:
+        return self._events
+
+    async def incr(self, database, collection: str, doc_id: str, field: str, amount: int = 1, *,
+                   id_field: str = "id", match: Optional[dict] = None, on_insert: Optional[dict] = None) -> None:
+        """Count ``amount`` on ``field`` of the document whose ``id_field`` is ``doc_id``.
+
+        ``match`` narrows the update filter; with ``on_insert`` the document is
+        upserted with those fields when missing.
+        """
+        target = (collection, id_field, doc_id)
+        self._counts[target][field] += amount
+        if match:
+            self._match[target] = match
+        if on_insert:
+            self._on_insert[target] = on_insert
+        self._events += 1
+        if self._task is None:
+            await self.flush(database)
+        elif self._events >= self.max_events:
+            await self.flush()
+
+    def _ops(self, counts, matches, inserts) -> Dict[str, list]:
+        ops: Dict[str, list] = defaultdict(list)
+        for target, fields in counts.items():
+            collection, id_field, doc_id = target
+            fields = {f: n for f, n in fields.items() if n}
+            if not fields:
+                continue
+            update = {"$inc": fields}
+            if target in inserts:
+                update["$setOnInsert"] = inserts[target]
+            ops[collection].append((target, UpdateOne(
+                dict(matches.get(target, {}), **{id_field: doc_id}), update, upsert=target in inserts
+            )))
+        return ops
+
+    async def flush(self, database=None) -> int:
+        """Write every pending increment. Returns the number of events written."""
+        database = database if database is not None else self._database
+        if database is None or not self._events:
+            return 0
+        async with self._lock:
+            counts, matches, inserts, events = self._counts, self._match, self._on_insert, self._events
+            self._reset()
+            for collection, batch in self._ops(counts, matches, inserts).items():
+                try:
+                    await database[collection].bulk_write([op for _, op in batch], ordered=False)
+                except BulkWriteError as e:
+                    failed = [batch[err["index"]][0] for err in e.details.get("writeErrors", [])]
+                    logger.warning(f"counter flush to {collection}: {len(failed)} update(s) failed: {e}")
+                    self._requeue(failed, counts, matches, inserts)
+                except Exception as e:
+                    logger.warning(f"counter flush to {collection} failed, retrying next flush: {e}")
+                    self._requeue([target for target, _ in batch], counts, matches, inserts)
+            return events
+
+    def _requeue(self, targets, counts, matches, inserts) -> None:
+        for target in targets:
+            for field, amount in counts[target].items():
+                self._counts[target][field] += amount
+                self._events += 1
+            if target in matches:
+                self._match[target] = matches[target]
+            if target in inserts:
+                self._on_insert[target] = inserts[target]
+
+    def start(self, database) -> None:
+        self._database = database
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the background flusher and write what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_sec)
+            try:
+                # Shielded so stop() cannot cancel a flush halfway through its batch
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"counter flush failed: {e}")
+
+
+counter_buffer = CounterBuffer()
@@ -0,0 +1,114 @@
+"""
+Hi/lo allocation of sequential IDs (job numbers, user short ids, referral codes).
+
+Each worker reserves a block of ``ID_BLOCK_SIZE`` values from a ``counters``
+document with one atomic update and hands them out from memory, so an ID costs
+a round trip only once per block. Blocks never overlap between workers; values
+left in a block when a worker exits are simply skipped.
+
+Nothing is read before writing. Uniqueness is enforced by the collection's
+unique index (``UNIQUE_INDEXES``), and callers re-allocate on
+``DuplicateKeyError`` (only possible where legacy rows already occupy part of
+the space; see ``floor``). The database checks those indexes exist before the
+first allocated insert and refuses to insert without them.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Dict, Optional
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+ID_BLOCK_SIZE = int(os.getenv("ID_BLOCK_SIZE", "20"))
+# Attempts before giving up when inserts keep hitting existing IDs
+ID_COLLISION_RETRIES = int(os.getenv("ID_COLLISION_RETRIES", "50"))
+
+
+class BlockAllocator:
+    """Sequence values for one counter, reserved ``block_size`` at a time.
+
+    ``floor`` is the highest value treated as already used: the first
+    reservation lifts the counter above it, which is how new IDs are moved
+    past a legacy range whose counter was reset or wrapped.
+    """
+
+    def __init__(self, counter_id: str, block_size: int = ID_BLOCK_SIZE, floor: int = 0):
+        self.counter_id = counter_id
+        self.block_size = max(1, block_size)
+        self.floor = floor
+        self._next = 0
+        self._limit = 0
+        self._lock = asyncio.Lock()
+
+    async def _reserve(self, counters) -> None:
+        doc = await counters.find_one_and_update(
+            {"_id": self.counter_id},
+            [{"$set": {"seq": {"$add": [
+                {"$max": [{"$ifNull": ["$seq", 0]}, self.floor]},
+                self.block_size,
+            ]}}}],
+            upsert=True,
+            return_document=True,
+        )
+        high = int(doc["seq"])
+        self._next = high - self.block_size + 1
+        self._limit = high + 1
+
+    async def next(self, counters) -> int:
+        async with self._lock:
+            if self._next >= self._limit:
+                await self._reserve(counters)
+            value = self._next
+            self._next += 1
+            return value
+
+    def reset(self) -> None:
+        """Drop the in-memory block (e.g. after switching databases in tests)."""
+        self._next = self._limit = 0
+
+
+def to_base36(num: int) -> str:
+    chars = "0123456789abcdefghijklmnopqrstuvwxyz"
+    if num <= 0:
+        return "0"
+    out = []
+    while num:
+        num, rem = divmod(num, 36)
+        out.append(chars[rem])
+    return "".join(reversed(out))
+
+
+def duplicate_key_field(error: DuplicateKeyError) -> Optional[str]:
+    """The first field of the unique index that rejected an insert, if known."""
+    pattern = (error.details or {}).get("keyPattern") or {}
+    return next(iter(pattern), None)
+
+
+# Legacy spaces and how new IDs avoid them:
+#   jobs          6-digit, counter never reset -> continue it; IDs grow past 999999 instead of wrapping
+#   users_short_id 4-digit, counter was reset on wrap -> start above 9999
+#   users_public_id base36 from a monotonic counter -> continue it without truncation
+#   referral_codes NAME + 4 random digits -> NAME + sequence above 9999 (5+ digits)
+ALLOCATORS: Dict[str, BlockAllocator] = {
+    "jobs": BlockAllocator("jobs", floor=int(os.getenv("JOB_ID_FLOOR", "0"))),
+    "users_short_id": BlockAllocator("users_short_id", floor=int(os.getenv("USER_SHORT_ID_FLOOR", "9999"))),
+    "users_public_id": BlockAllocator("users_public_id"),
+    "referral_codes": BlockAllocator("referral_codes", floor=int(os.getenv("REFERRAL_CODE_FLOOR", "9999"))),
+}
+
+
+# The unique index that rejects a taken value for each allocated field; collisions surface only through it
+UNIQUE_INDEXES: Dict[tuple, str] = {
+    ("jobs", "id"): "unique_job_uuid",
+    ("users", "user_id"): "unique_user_id",
+    ("referral_codes", "code"): "referral_codes_code_unique",
+}
+
+
+def get_allocator(counter_id: str) -> BlockAllocator:
+    if counter_id not in ALLOCATORS:
+        ALLOCATORS[counter_id] = BlockAllocator(counter_id)
+    return ALLOCATORS[counter_id]
@@ -0,0 +1,208 @@
+"""
+Image processing pipeline for user uploads (portfolio, certifications, message images).
+
+Pillow decode/resize/encode is CPU-bound, so it runs in a process pool with a
+bounded number of in-flight jobs instead of inside request coroutines. Uploads
+are normalized once into a master JPEG; smaller renditions (thumb, card, full)
+in WebP or JPEG are generated lazily on first request and cached on disk next
+to the master under ``_renditions/``.
+"""
+
+import asyncio
+import io
+import logging
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels for each rendition
+RENDITIONS: Dict[str, int] = {
+    "thumb": 240,
+    "card": 640,
+    "full": 1600,
+}
+
+FORMATS: Dict[str, Dict[str, str]] = {
+    "webp": {"pil": "WEBP", "ext": ".webp", "media_type": "image/webp"},
+    "jpeg": {"pil": "JPEG", "ext": ".jpg", "media_type": "image/jpeg"},
+}
+
+MASTER_MAX_SIDE = int(os.getenv("IMAGE_MASTER_MAX_SIDE", str(RENDITIONS["full"])))
+MASTER_QUALITY = int(os.getenv("IMAGE_MASTER_QUALITY", "85"))
+RENDITION_QUALITY = int(os.getenv("IMAGE_RENDITION_QUALITY", "80"))
+RENDITIONS_DIRNAME = "_renditions"
+
+# Image content types the pipeline re-encodes; anything else (PDF, GIF, docs) is stored as-is
+PROCESSABLE_TYPES = {"image/jpeg", "image/png", "image/webp"}
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.split()[-1])
+        return background
+    if image.mode != "RGB":
+        return image.convert("RGB")
+    return image
+
+
+def _encode(image: Image.Image, fmt: str, quality: int) -> bytes:
+    output = io.BytesIO()
+    if fmt == "WEBP":
+        image.save(output, format="WEBP", quality=quality, method=4)
+    else:
+        image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def normalize_image(data: bytes, max_side: int = MASTER_MAX_SIDE, quality: int = MASTER_QUALITY) -> bytes:
+    """Decode, orient, flatten and downscale to a master JPEG. Runs in a worker process."""
+    with Image.open(io.BytesIO(data)) as src:
+        image = _flatten(src)
+        if image.width > max_side or image.height > max_side:
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        return _encode(image, "JPEG", quality)
+
+
+def normalize_file(source_path: str, dest_path: str, max_side: int, quality: int) -> int:
+    """normalize_image for a file on disk, written atomically to dest_path. Runs in a worker process."""
+    with open(source_path, "rb") as f:
+        master = normalize_image(f.read(), max_side, quality)
+    tmp = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(master)
+    os.replace(tmp, dest_path)
+    return len(master)
+
+
+def render_file(source_path: str, dest_path: str, max_side: int, pil_format: str, quality: int) -> None:
+    """Write one rendition of source_path to dest_path atomically. Runs in a worker process."""
+    with Image.open(source_path) as src:
+        image = _flatten(src)
+        if image.width > max_side or image.height > max_side:
+            image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        payload = _encode(image, pil_format, quality)
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "wb") as out:
+        out.write(payload)
+    os.replace(tmp, dest_path)
+
+
+def negotiate_format(accept: Optional[str], requested: Optional[str] = None) -> str:
+    """Pick webp or jpeg from an explicit ?format= or the Accept header."""
+    if requested in FORMATS:
+        return requested
+    if accept and "image/webp" in accept:
+        return "webp"
+    return "jpeg"
+
+
+class ImagePipeline:
+    """Process-pool backed image normalization and cached rendition generation."""
+
+    def __init__(self):
+        self.max_workers = int(os.getenv("IMAGE_WORKERS", str(min(2, os.cpu_count() or 1))))
+        self.max_concurrency = int(os.getenv("IMAGE_MAX_CONCURRENCY", str(self.max_workers * 2)))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+
+    async def normalize(self, data: bytes, max_side: int = MASTER_MAX_SIDE, quality: int = MASTER_QUALITY) -> bytes:
+        """Return master JPEG bytes. Raises ValueError for undecodable input."""
+        try:
+            return await self._run(normalize_image, data, max_side, quality)
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {e}") from e
+
+    async def save_master(self, data: bytes, dest_path: str, max_side: int = MASTER_MAX_SIDE) -> int:
+        """Normalize data and write it to dest_path without blocking the loop. Returns size in bytes."""
+        master = await self.normalize(data, max_side=max_side)
+
+        def _write():
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            tmp = f"{dest_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp, "wb") as out:
+                out.write(master)
+            os.replace(tmp, dest_path)
+
+        await asyncio.to_thread(_write)
+        return len(master)
+
+    async def save_master_file(self, source_path: str, dest_path: str, max_side: int = MASTER_MAX_SIDE) -> int:
+        """Normalize an image already on disk (e.g. a streamed upload) into dest_path.
+
+        The bytes are read inside the worker process, never in the event loop process.
+        Returns the master size in bytes. Raises ValueError for undecodable input.
+        """
+        await asyncio.to_thread(os.makedirs, os.path.dirname(dest_path), exist_ok=True)
+        try:
+            return await self._run(normalize_file, source_path, dest_path, max_side, MASTER_QUALITY)
+        except Exception as e:
+            raise ValueError(f"Invalid image file: {e}") from e
+
+    @staticmethod
+    def rendition_path(source_path: str, size: str, fmt: str) -> str:
+        directory, name = os.path.split(source_path)
+        stem = os.path.splitext(name)[0]
+        return os.path.join(directory, RENDITIONS_DIRNAME, f"{stem}.{size}{FORMATS[fmt]['ext']}")
+
+    async def get_rendition(self, source_path: str, size: str, fmt: str) -> str:
+        """Return the path of a cached rendition, generating it on first use.
+
+        Concurrent requests for the same rendition share a single render job.
+        """
+        if size not in RENDITIONS or fmt not in FORMATS:
+            raise ValueError("Unknown rendition")
+        dest = self.rendition_path(source_path, size, fmt)
+        if await asyncio.to_thread(os.path.exists, dest):
+            return dest
+
+        pending = self._inflight.get(dest)
+        if pending is None:
+            pending = asyncio.ensure_future(
+                self._run(render_file, source_path, dest, RENDITIONS[size], FORMATS[fmt]["pil"], RENDITION_QUALITY)
+            )
+            self._inflight[dest] = pending
+            pending.add_done_callback(lambda _f, key=dest: self._inflight.pop(key, None))
+        await asyncio.shield(pending)
+        return dest
+
+    async def delete_renditions(self, source_path: str) -> None:
+        """Remove cached renditions for a master image."""
+        def _delete():
+            for size in RENDITIONS:
+                for fmt in FORMATS:
+                    try:
+                        os.remove(self.rendition_path(source_path, size, fmt))
+                    except FileNotFoundError:
+                        pass
+
+        await asyncio.to_thread(_delete)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,138 @@
+"""
+Job fields denormalized onto interests.
+
+The tradesperson's "my interests" and "completed jobs" views used to
+``$lookup`` the job for every interest the tradesperson had ever made, and
+the completed view only filtered on ``job.status`` after the join. Each
+interest now carries the job fields those views list::
+
+    {"job_status": "completed", "job_title": ..., "job_location": ...,
+     "homeowner_name": ..., "access_fee_naira": 1000, "access_fee_coins": 10}
+
+so both views are one indexed, paginated read:
+``interests_tradesperson_jobStatus_updatedAt`` for a status,
+``interests_tradesperson_createdAt`` for the full history.
+
+* ``create_interest`` copies the fields from the job (``snapshot``).
+* ``Database._set_job_fields`` (status changes, admin edits, access fee
+  updates, soft deletes) and the expiry sweep call ``sync``. A status
+  change also moves the interests' ``updated_at``, so a status view lists
+  the most recently changed jobs first.
+
+Interests written before this have none of the fields; ``backfill`` fills
+them in. The deploy step (``python -m backend.tools.release``) runs it, and
+``python -m backend.tools.interest_jobs backfill`` runs it by hand.
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+# job field -> interest field
+FIELDS = {
+    "status": "job_status",
+    "title": "job_title",
+    "location": "job_location",
+    "access_fee_naira": "access_fee_naira",
+    "access_fee_coins": "access_fee_coins",
+}
+JOB_PROJECTION = {"_id": 0, "id": 1, "homeowner.name": 1, **{f: 1 for f in FIELDS}}
+
+DEFAULT_ACCESS_FEE_NAIRA = 1000
+DEFAULT_ACCESS_FEE_COINS = 10
+
+
+def _v(value):
+    return getattr(value, "value", value)
+
+
+def snapshot(job: dict) -> dict:
+    """The interest fields for ``job``."""
+    out = {target: _v(job.get(source)) for source, target in FIELDS.items()}
+    out["homeowner_name"] = (job.get("homeowner") or {}).get("name")
+    return out
+
+
+def touches(fields: Iterable[str]) -> bool:
+    """Whether a job ``$set`` of ``fields`` changes what interests carry."""
+    return any(f in FIELDS for f in fields)
+
+
+async def sync(database, job_ids: List[str], fields: dict, now: Optional[datetime] = None) -> int:
+    """Copy changed job fields onto the jobs' interests. Returns interests modified."""
+    update = {FIELDS[f]: _v(value) for f, value in fields.items() if f in FIELDS}
+    job_ids = [j for j in job_ids if j]
+    if not update or not job_ids:
+        return 0
+    if "job_status" in update:
+        update["updated_at"] = now or datetime.utcnow()
+    result = await database.interests.update_many({"job_id": {"$in": job_ids}}, {"$set": update})
+    return result.modified_count
+
+
+def _present(interest: dict) -> dict:
+    interest["contact_shared"] = interest.get("status") == "contact_shared"
+    interest["payment_made"] = interest.get("status") == "paid_access"
+    interest["access_fee_naira"] = interest.get("access_fee_naira") or DEFAULT_ACCESS_FEE_NAIRA
+    interest["access_fee_coins"] = interest.get("access_fee_coins") or DEFAULT_ACCESS_FEE_COINS
+    return interest
+
+
+async def page(database, tradesperson_id: str, job_status: Optional[str] = None,
+               skip: int = 0, limit: Optional[int] = 20) -> List[dict]:
+    """One page of a tradesperson's interests: newest first, or most recently changed first within a status.
+
+    ``limit=None`` returns every interest from ``skip`` on.
+    """
+    query = {"tradesperson_id": tradesperson_id}
+    sort = [("created_at", -1)]
+    if job_status:
+        query["job_status"] = job_status
+        sort = [("updated_at", -1)]
+    interests = await database.interests.find(query, {"_id": 0}).sort(sort).skip(skip).limit(limit or 0).to_list(limit)
+    return [_present(i) for i in interests]
+
+
+async def count(database, tradesperson_id: str, job_status: Optional[str] = None) -> int:
+    query = {"tradesperson_id": tradesperson_id}
+    if job_status:
+        query["job_status"] = job_status
+    return await database.interests.count_documents(query)
+
+
+async def _stale_updates(database, interests: List[dict]) -> List[UpdateOne]:
+    jobs = await database.jobs.find(
+        {"id": {"$in": list({i["job_id"] for i in interests})}}, JOB_PROJECTION
+    ).to_list(None)
+    snapshots = {j["id"]: snapshot(j) for j in jobs}
+    ops = []
+    for interest in interests:
+        fields = snapshots.get(interest["job_id"])
+        if fields is None or all(interest.get(k) == v for k, v in fields.items()):
+            continue
+        ops.append(UpdateOne({"_id": interest["_id"]}, {"$set": fields}))
+    return ops
+
+
+async def backfill(database, apply: bool = False, batch_size: int = 500) -> Tuple[int, int]:
+    """Copy current job fields onto every interest missing or out of date. Returns (scanned, stale)."""
+    projection = {"job_id": 1, "homeowner_name": 1, **{f: 1 for f in FIELDS.values()}}
+    scanned, stale, batch = 0, 0, []
+
+    async def flush() -> int:
+        ops = await _stale_updates(database, batch)
+        if apply and ops:
+            await database.interests.bulk_write(ops, ordered=False)
+        batch.clear()
+        return len(ops)
+
+    cursor = database.interests.find({"job_id": {"$type": "string"}}, projection).batch_size(batch_size)
+    async for interest in cursor:
+        scanned += 1
+        batch.append(interest)
+        if len(batch) >= batch_size:
+            stale += await flush()
+    if batch:
+        stale += await flush()
+    return scanned, stale
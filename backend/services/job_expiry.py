@@ -0,0 +1,88 @@
+"""
+Job expiry as a status transition.
+
+Public job queries used to carry ``expires_at > now`` (or an ``$or`` that also
+admitted jobs without one) on every read, and the list and count disagreed
+about jobs with no ``expires_at``. Expiry is now a lifecycle step: ``sweep``
+moves ``active`` jobs whose ``expires_at`` has passed to ``expired`` in
+bounded batches, so public reads are a plain ``status: "active"`` equality
+ordered by ``created_at`` (``jobs_status_createdAt``).
+
+A job stays listed for at most one sweep interval (JOB_EXPIRY_SWEEP_SEC,
+the ``jobs.expire`` scheduler task) after it expires. Sweeps are safe to
+run concurrently (the tool and the task, or an overlapping retry): each
+batch only moves jobs that are still active and past due, and the stats
+hooks are fed from the number actually modified.
+
+Jobs with no usable ``expires_at`` (missing, null or a string written by old
+code paths) are given one by ``backfill``: their ``created_at`` plus
+JOB_TTL, which is what ``create_job`` sets. Until then ``sweep`` cannot see
+them, so the deploy step (``python -m backend.tools.release``) runs the
+backfill and a sweep before the release serves.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from . import interest_jobs, job_feeds, platform_stats, stats_counters
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL = timedelta(days=30)
+SWEEP_INTERVAL_SEC = float(os.getenv("JOB_EXPIRY_SWEEP_SEC", "300"))
+SWEEP_BATCH_SIZE = int(os.getenv("JOB_EXPIRY_BATCH_SIZE", "500"))
+
+# Jobs whose expires_at can't be compared against a date
+MISSING_EXPIRY = {"expires_at": {"$not": {"$type": "date"}}}
+
+
+def _due(now: datetime) -> dict:
+    return {"status": "active", "expires_at": {"$lte": now}}
+
+
+async def sweep(database, now: Optional[datetime] = None, batch_size: int = SWEEP_BATCH_SIZE) -> int:
+    """Move every active job past its ``expires_at`` to ``expired``. Returns the number moved."""
+    now = now or datetime.utcnow()
+    moved = 0
+    while True:
+        # Batches are picked through jobs_status_expiresAt_createdAt and re-checked on update
+        batch = await database.jobs.find(_due(now), {"_id": 1, "id": 1}).limit(batch_size).to_list(batch_size)
+        ids = [d["_id"] for d in batch]
+        if not ids:
+            break
+        result = await database.jobs.update_many(
+            dict(_due(now), _id={"$in": ids}),
+            {"$set": {"status": "expired", "expired_at": now, "updated_at": now}},
+        )
+        if result.modified_count:
+            moved += result.modified_count
+            await platform_stats.bump(database, active_jobs=-result.modified_count)
+            await stats_counters.add(database, {
+                "jobs.status.active": -result.modified_count,
+                "jobs.status.expired": result.modified_count,
+            })
+            job_ids = [d.get("id") for d in batch]
+            await job_feeds.remove_jobs(database, job_ids)
+            await interest_jobs.sync(database, job_ids, {"status": "expired"}, now)
+        if len(ids) < batch_size:
+            break
+    if moved:
+        logger.info(f"job expiry sweep: {moved} job(s) expired")
+    return moved
+
+
+async def backfill(database, now: Optional[datetime] = None, apply: bool = False) -> int:
+    """Give jobs without a date ``expires_at`` one (``created_at`` + JOB_TTL). Returns how many need it."""
+    now = now or datetime.utcnow()
+    missing = await database.jobs.count_documents(MISSING_EXPIRY)
+    if apply and missing:
+        created = {"$convert": {"input": "$created_at", "to": "date", "onError": now, "onNull": now}}
+        await database.jobs.update_many(MISSING_EXPIRY, [{"$set": {"expires_at": {"$ifNull": [
+            # Keep a string expiry that parses; otherwise created_at + JOB_TTL
+            {"$convert": {"input": "$expires_at", "to": "date", "onError": None, "onNull": None}},
+            {"$add": [created, int(JOB_TTL.total_seconds() * 1000)]},
+        ]}}}])
+    return missing
+
@@ -0,0 +1,197 @@
+"""
+Materialized job feeds for tradespeople (fan-out on write).
+
+``GET /api/jobs/for-tradesperson`` used to rebuild every feed on every
+request: it loaded the user, built a category/title-regex filter, fetched
+``limit * 2`` recent jobs and dropped the ones out of travel range in
+Python. Now each matching tradesperson gets a compact ``job_feeds`` entry
+when a job goes live::
+
+    {"_id": "<tradesperson_id>|<job_id>", "tradesperson_id": ..., "job_id": ...,
+     "created_at": <job created_at>, "distance_km": 4.2}
+
+and the feed is one range read on ``job_feeds_tradesperson_createdAt`` plus
+an ``id $in`` fetch of that page of jobs.
+
+A job matches a tradesperson when its category is one of their trades, or
+one of their trades appears in its title. It must also be within their
+``travel_distance_km``, unless either side has no coordinates. Trades are
+compared on the normalized ``directory.trades`` keys (see
+tradesperson_directory), so ``fan_out`` is an indexed query on
+``users_directory_trade_state_rating``.
+
+* ``fan_out`` runs in the background when a job becomes active (approval,
+  reopening, admin reactivation).
+* ``remove_jobs`` runs when a job leaves ``active`` (closed, completed,
+  expired, deleted).
+* ``ensure`` (re)builds a tradesperson's feed when it has none, or when
+  their trades or location changed since it was built. The profile that
+  was used is kept as a signature in ``job_feed_state``. It also writes
+  missing or stale ``directory`` keys, so profiles from before the
+  backfill are reached by later fan-outs too.
+
+Tradespeople without trades, and requests that override the location,
+still use the live query; see ``Database.get_jobs_for_tradesperson``.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import re
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+from . import tradesperson_directory, user_search
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRAVEL_KM = 25
+REBUILD_LIMIT = 500
+WRITE_BATCH = 1000
+
+_TRADESPERSON_FIELDS = {"_id": 0, "id": 1, "latitude": 1, "longitude": 1, "travel_distance_km": 1,
+                        "trade_categories": 1, "profession": 1, "directory.trades": 1}
+_JOB_FIELDS = {"_id": 0, "id": 1, "category": 1, "title": 1, "latitude": 1, "longitude": 1, "created_at": 1}
+
+
+def _coords(doc: dict) -> Optional[tuple]:
+    try:
+        lat, lng = doc.get("latitude"), doc.get("longitude")
+        return (float(lat), float(lng)) if lat is not None and lng is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def distance_km(a: tuple, b: tuple) -> float:
+    """Haversine distance in kilometres, as ``Database.calculate_distance``."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (*a, *b))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * 6371 * math.asin(math.sqrt(h))
+
+
+def trades_of(tradesperson: dict) -> List[str]:
+    """Normalized trades, from the stored directory keys or the profile itself."""
+    directory = tradesperson.get("directory") or tradesperson_directory.directory_fields(
+        dict(tradesperson, role="tradesperson")) or {}
+    return directory.get("trades") or []
+
+
+def signature(tradesperson: dict) -> str:
+    """Fingerprint of the profile fields a feed depends on."""
+    key = [sorted(trades_of(tradesperson)), _coords(tradesperson),
+           tradesperson.get("travel_distance_km") or DEFAULT_TRAVEL_KM]
+    return hashlib.sha1(json.dumps(key).encode()).hexdigest()
+
+
+def matches(job: dict, trades: Iterable[str]) -> bool:
+    category = tradesperson_directory.normalize(job.get("category"))
+    title = tradesperson_directory.normalize(job.get("title"))
+    return any(t == category or (t and t in title) for t in trades)
+
+
+def entry(tradesperson: dict, job: dict) -> Optional[dict]:
+    """The feed entry for this pair, or None when the job is out of travel range."""
+    distance = None
+    here, there = _coords(tradesperson), _coords(job)
+    if here and there:
+        distance = distance_km(here, there)
+        if distance > float(tradesperson.get("travel_distance_km") or DEFAULT_TRAVEL_KM):
+            return None
+        # At least 0.1 so clients don't show "0.0 km"
+        distance = max(0.1, round(distance, 2))
+    created_at = job.get("created_at") if isinstance(job.get("created_at"), datetime) else datetime.utcnow()
+    return {"_id": f"{tradesperson['id']}|{job['id']}", "tradesperson_id": tradesperson["id"], "job_id": job["id"],
+            "created_at": created_at, "distance_km": distance}
+
+
+async def _write(database, entries: List[dict]) -> int:
+    written = 0
+    for i in range(0, len(entries), WRITE_BATCH):
+        batch = entries[i:i + WRITE_BATCH]
+        await database.job_feeds.bulk_write(
+            [UpdateOne({"_id": e["_id"]}, {"$set": e}, upsert=True) for e in batch], ordered=False
+        )
+        written += len(batch)
+    return written
+
+
+async def fan_out(database, job: dict) -> int:
+    """Add an active job to the feed of every tradesperson it matches. Returns entries written."""
+    if not job or not job.get("id"):
+        return 0
+    # Trades are few; only those in this job's category or title can match
+    known = await database.users.distinct("directory.trades", {"role": "tradesperson"})
+    trades = [t for t in known if t and matches(job, [t])]
+    if not trades:
+        return 0
+    cursor = database.users.find(
+        {"role": "tradesperson", "directory.trades": {"$in": trades}, "status": {"$ne": "deleted"}},
+        _TRADESPERSON_FIELDS,
+    )
+    entries = []
+    async for tradesperson in cursor:
+        if tradesperson.get("id"):
+            feed_entry = entry(tradesperson, job)
+            if feed_entry:
+                entries.append(feed_entry)
+    written = await _write(database, entries)
+    logger.info(f"job feeds: job {job['id']} added to {written} feed(s)")
+    return written
+
+
+async def remove_jobs(database, job_ids: List[str]) -> int:
+    """Drop jobs that are no longer active from every feed."""
+    job_ids = [j for j in job_ids if j]
+    if not job_ids:
+        return 0
+    result = await database.job_feeds.delete_many({"job_id": {"$in": job_ids}})
+    return result.deleted_count
+
+
+async def rebuild(database, tradesperson: dict) -> int:
+    """Recompute one tradesperson's feed from the active jobs. Returns entries written."""
+    tradesperson_id = tradesperson["id"]
+    await database.job_feeds.delete_many({"tradesperson_id": tradesperson_id})
+    trades = trades_of(tradesperson)
+    written = 0
+    if trades:
+        raw = list(tradesperson.get("trade_categories") or [])
+        if tradesperson.get("profession"):
+            raw.append(tradesperson["profession"])
+        pattern = "|".join(re.escape(t) for t in set(raw) | set(trades))
+        jobs = await database.jobs.find(
+            {"status": "active", "$or": [{"category": {"$in": raw}}, {"title": {"$regex": pattern, "$options": "i"}},
+                                         {"category": {"$regex": f"^({pattern})$", "$options": "i"}}]},
+            _JOB_FIELDS,
+        ).sort("created_at", -1).limit(REBUILD_LIMIT).to_list(REBUILD_LIMIT)
+        entries = [e for e in (entry(tradesperson, j) for j in jobs if j.get("id") and matches(j, trades)) if e]
+        written = await _write(database, entries)
+    await database.job_feed_state.update_one(
+        {"_id": tradesperson_id},
+        {"$set": {"signature": signature(tradesperson), "built_at": datetime.utcnow(), "entries": written}},
+        upsert=True,
+    )
+    return written
+
+
+async def ensure(database, tradesperson: dict) -> bool:
+    """Make sure the materialized feed reflects the current profile. Returns True if it was rebuilt."""
+    # fan_out selects on directory.trades; a profile without those keys would never get new jobs
+    update = user_search.key_update(tradesperson)
+    if update:
+        await database.users.update_one({"id": tradesperson["id"]}, update)
+    state = await database.job_feed_state.find_one({"_id": tradesperson["id"]}, {"signature": 1})
+    if state and state.get("signature") == signature(tradesperson):
+        return False
+    await rebuild(database, tradesperson)
+    return True
+
+
+async def page(database, tradesperson_id: str, skip: int, limit: int) -> List[dict]:
+    """One page of feed entries, newest job first."""
+    return await database.job_feeds.find(
+        {"tradesperson_id": tradesperson_id}, {"_id": 0, "job_id": 1, "distance_km": 1}
+    ).sort([("created_at", -1), ("job_id", -1)]).skip(skip).limit(limit).to_list(limit)
@@ -0,0 +1,196 @@
+"""
+Relevance-ranked job search on the ``jobs_text_search_weighted`` index.
+
+Queries run as MongoDB ``$text`` searches (English stemming: "plumbing",
+"plumber" and "plumbers" share a stem) against an index weighting title over
+category over description, so results are ordered by text score instead of
+scanning every active job with an unanchored ``$regex``. Ties are broken by
+``created_at`` then ``_id`` so skip/limit pages are stable.
+
+The stemmer knows nothing of local trade vocabulary, so queries are expanded
+first: Nigerian-pidgin and colloquial terms ("plumba", "vulcaniser", "NEPA
+light", "panel beater") add the words job posters actually use.
+
+``JobSuggestions`` offers prefix completions with one-or-two-typo tolerance
+over the category names, the aliases and words from recent active job
+titles, refreshed at most every JOB_SUGGESTIONS_TTL_SEC.
+"""
+
+import logging
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TEXT_WEIGHTS = {"title": 10, "category": 5, "description": 1}
+SUGGESTIONS_TTL_SEC = float(os.getenv("JOB_SUGGESTIONS_TTL_SEC", "600"))
+# Recent active jobs whose titles feed the suggestion vocabulary
+SUGGESTIONS_SAMPLE = 5000
+MIN_QUERY_LENGTH = 2
+
+# Sort and projection for ranked results; the score is returned as ``search_score``
+SCORE_PROJECTION = {"search_score": {"$meta": "textScore"}}
+RANKED_SORT = [("search_score", {"$meta": "textScore"}), ("created_at", -1), ("_id", 1)]
+
+# Local / pidgin trade terms -> words used in job titles and categories
+TRADE_ALIASES: Dict[str, List[str]] = {
+    "plumba": ["plumber", "plumbing"],
+    "pipe": ["plumbing"],
+    "leak": ["plumbing"],
+    "wireman": ["electrician", "electrical"],
+    "electrician": ["electrical"],
+    "nepa": ["electrical"],
+    "phcn": ["electrical"],
+    "light": ["electrical"],
+    "gen": ["generator"],
+    "i better pass my neighbour": ["generator"],
+    "ac": ["air", "conditioning"],
+    "aircon": ["air", "conditioning"],
+    "fridge": ["refrigeration"],
+    "freezer": ["refrigeration"],
+    "inverter": ["solar"],
+    "carpenta": ["carpenter", "carpentry"],
+    "carpenter": ["carpentry"],
+    "furniture": ["carpentry"],
+    "welda": ["welder", "welding"],
+    "welder": ["welding"],
+    "panel beater": ["welding"],
+    "painta": ["painter", "painting"],
+    "painter": ["painting"],
+    "mason": ["building", "bricklaying"],
+    "bricklayer": ["building", "bricklaying"],
+    "block": ["building"],
+    "pop": ["plastering"],
+    "screeding": ["plastering"],
+    "tiler": ["tiling"],
+    "tiles": ["tiling"],
+    "roofer": ["roofing"],
+    "zinc": ["roofing"],
+    "aluminium": ["window", "door"],
+    "burglary": ["window", "door", "welding"],
+    "cctv": ["security"],
+    "locksmith": ["locksmithing"],
+    "vulcaniser": ["tyre"],
+    "vulcanizer": ["tyre"],
+    "cleaner": ["cleaning"],
+    "fumigation": ["cleaning"],
+    "mover": ["moving", "relocation"],
+    "carry go": ["moving", "relocation"],
+    "dirt": ["waste", "disposal"],
+    "refuse": ["waste", "disposal"],
+    "borehole": ["plumbing"],
+    "fixer": ["handyman"],
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    return _WORD.findall((text or "").lower())
+
+
+def expand(query: str) -> str:
+    """The ``$search`` string for ``query``: its words plus alias expansions (OR semantics)."""
+    tokens = tokenize(query)
+    normalized = " ".join(tokens)
+    terms = list(dict.fromkeys(tokens))
+    for alias, extra in TRADE_ALIASES.items():
+        if " " in alias:
+            if re.search(rf"\b{re.escape(alias)}\b", normalized):
+                terms.extend(extra)
+        elif alias in tokens:
+            terms.extend(extra)
+    return " ".join(dict.fromkeys(terms))
+
+
+def is_searchable(query: Optional[str]) -> bool:
+    return bool(query) and len(query.strip()) >= MIN_QUERY_LENGTH and bool(tokenize(query))
+
+
+def text_filter(query: str) -> dict:
+    return {"$text": {"$search": expand(query), "$language": "english"}}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, giving up (returning ``limit + 1``) once it exceeds ``limit``."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _typos_allowed(prefix: str) -> int:
+    return 0 if len(prefix) < 4 else 1 if len(prefix) < 7 else 2
+
+
+class JobSuggestions:
+    """Prefix and typo-tolerant completions over this worker's cached vocabulary."""
+
+    def __init__(self, ttl_sec: float = SUGGESTIONS_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self.vocabulary: Counter = Counter()
+        self._loaded_at = 0.0
+
+    @property
+    def stale(self) -> bool:
+        return not self.vocabulary or time.monotonic() - self._loaded_at >= self.ttl_sec
+
+    async def refresh(self, database, categories: List[str]) -> None:
+        vocabulary: Counter = Counter()
+        for category in categories:
+            vocabulary[category.lower()] += 50
+            for word in tokenize(category):
+                vocabulary[word] += 10
+        for alias in TRADE_ALIASES:
+            vocabulary[alias] += 5
+        try:
+            cursor = (
+                database.jobs.find({"status": "active"}, {"title": 1})
+                .sort("created_at", -1)
+                .limit(SUGGESTIONS_SAMPLE)
+            )
+            async for job in cursor:
+                for word in set(tokenize(job.get("title"))):
+                    if len(word) > 2 and not word.isdigit():
+                        vocabulary[word] += 1
+        except Exception as e:
+            logger.warning(f"Job suggestion vocabulary refresh failed, using categories only: {e}")
+        self.vocabulary = vocabulary
+        self._loaded_at = time.monotonic()
+
+    def suggest(self, text: str, limit: int = 8) -> List[str]:
+        prefix = " ".join(tokenize(text))
+        if len(prefix) < MIN_QUERY_LENGTH:
+            return []
+        typos = _typos_allowed(prefix)
+        scored = []
+        for term, weight in self.vocabulary.items():
+            if term.startswith(prefix):
+                distance = 0
+            elif typos:
+                distance = edit_distance(prefix, term[:len(prefix)], typos)
+                if distance > typos:
+                    # A dropped or doubled letter shifts the prefix by one
+                    distance = min(
+                        edit_distance(prefix, term[:len(prefix) + 1], typos),
+                        edit_distance(prefix, term[:max(len(prefix) - 1, 1)], typos),
+                    )
+                if distance > typos:
+                    continue
+            else:
+                continue
+            scored.append((distance, -weight, len(term), term))
+        return [term for *_, term in sorted(scored)[:limit]]
+
+
+job_suggestions = JobSuggestions()
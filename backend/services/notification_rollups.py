@@ -0,0 +1,238 @@
+"""
+Hourly notification rollups for admin analytics.
+
+``notification_rollups`` holds one bucket per ``(hour, type, channel, status)``
+with the number of notifications *created* in that hour that currently have
+that status::
+
+    {"_id": "2024-06-01T14|job_posted|email|sent", "hour": datetime(2024, 6, 1, 14),
+     "type": "job_posted", "channel": "email", "status": "sent", "count": 37}
+
+``create_notification`` adds to a bucket; status changes move one count from
+the old status bucket to the new one within the same creation hour; deletes
+subtract. Reports therefore match a ``created_at``-filtered aggregation over
+the raw collection, but read a few hundred bucket documents for a 90-day range
+instead of every notification in it.
+
+Date ranges that do not start or end on an hour boundary are answered from
+the buckets for the whole hours inside them plus a raw query for the partial
+hours at either edge, so results stay exact.
+
+Writes that bypass the hooks (account and job purges) leave the buckets
+high; ``python -m backend.tools.notification_rollups backfill --apply``
+rebuilds them from the raw collection (also the initial backfill).
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+DIMENSIONS = ("type", "channel", "status")
+# Fields a notification's bucket is derived from
+PROJECTION = {"created_at": 1, "type": 1, "channel": 1, "status": 1}
+
+BucketKey = Tuple[datetime, str, str, str]
+
+
+def _v(value):
+    return getattr(value, "value", value)
+
+
+def _utc(ts: Any) -> Optional[datetime]:
+    if isinstance(ts, str):
+        try:
+            ts = datetime.fromisoformat(ts)
+        except ValueError:
+            return None
+    if not isinstance(ts, datetime):
+        return None
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def hour_of(ts: Any) -> datetime:
+    """Naive-UTC start of the hour containing ``ts`` (now when unknown)."""
+    ts = _utc(ts) or datetime.utcnow()
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def bucket_key(doc: dict, status: Any = None) -> BucketKey:
+    return (
+        hour_of(doc.get("created_at")),
+        str(_v(doc.get("type"))),
+        str(_v(doc.get("channel"))),
+        str(_v(status if status is not None else doc.get("status"))),
+    )
+
+
+def _op(key: BucketKey, amount: int, now: datetime, rebuilt: bool = False) -> UpdateOne:
+    hour, type_, channel, status = key
+    fields = {"hour": hour, "type": type_, "channel": channel, "status": status, "updated_at": now}
+    if rebuilt:
+        fields.update(count=amount, rebuilt_at=now)
+        update = {"$set": fields}
+    else:
+        update = {"$inc": {"count": amount}, "$set": fields}
+    return UpdateOne({"_id": f"{hour:%Y-%m-%dT%H}|{type_}|{channel}|{status}"}, update, upsert=True)
+
+
+async def apply(database, deltas: Dict[BucketKey, int]) -> None:
+    """Apply bucket deltas in one round trip. Failures are logged, not raised."""
+    deltas = {k: a for k, a in deltas.items() if a}
+    if not deltas or database is None:
+        return
+    now = datetime.utcnow()
+    try:
+        await database.notification_rollups.bulk_write([_op(k, a, now) for k, a in deltas.items()], ordered=False)
+    except Exception as e:
+        logger.warning(f"notification_rollups update failed: {e}")
+
+
+async def created(database, doc: dict) -> None:
+    await apply(database, {bucket_key(doc): 1})
+
+
+async def status_changed(database, before: Optional[dict], new_status: Any) -> None:
+    """``before`` is the notification as it was (at least ``PROJECTION``)."""
+    if not before or str(_v(before.get("status"))) == str(_v(new_status)):
+        return
+    await apply(database, {bucket_key(before): -1, bucket_key(before, new_status): 1})
+
+
+async def removed(database, doc: Optional[dict]) -> None:
+    if doc:
+        await apply(database, {bucket_key(doc): -1})
+
+
+def moved(befores: Iterable[dict], new_status: Any) -> Dict[BucketKey, int]:
+    """Bucket deltas for moving many notifications (``PROJECTION`` docs) to ``new_status``."""
+    deltas: Dict[BucketKey, int] = defaultdict(int)
+    for doc in befores:
+        if str(_v(doc.get("status"))) != str(_v(new_status)):
+            deltas[bucket_key(doc)] -= 1
+            deltas[bucket_key(doc, new_status)] += 1
+    return deltas
+
+
+def _hour_expr(field: str = "$created_at") -> dict:
+    # $dateTrunc needs MongoDB 5.0; this works on every supported server
+    return {"$dateFromParts": {
+        "year": {"$year": field}, "month": {"$month": field},
+        "day": {"$dayOfMonth": field}, "hour": {"$hour": field},
+    }}
+
+
+def parse_filters(filters: Optional[dict]) -> Optional[Tuple[dict, Optional[datetime], Optional[datetime]]]:
+    """Split an admin notifications filter into (equality filters, from, to).
+
+    Returns None when the filter uses anything the buckets cannot answer
+    (e.g. ``user_id``), so callers fall back to the raw collection.
+    """
+    equal, date_from, date_to = {}, None, None
+    for key, value in (filters or {}).items():
+        if key in DIMENSIONS and not isinstance(value, dict):
+            equal[key] = str(_v(value))
+        elif key == "created_at" and isinstance(value, dict) and set(value) <= {"$gte", "$lte"}:
+            date_from, date_to = _utc(value.get("$gte")), _utc(value.get("$lte"))
+        else:
+            return None
+    return equal, date_from, date_to
+
+
+async def _raw_counts(database, group_by: Sequence[str], equal: dict, created: dict) -> Dict[tuple, int]:
+    match = dict(equal)
+    if created:
+        match["created_at"] = created
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": {d: f"${d}" for d in group_by}, "count": {"$sum": 1}}},
+    ]
+    out: Dict[tuple, int] = {}
+    async for row in database.notifications.aggregate(pipeline):
+        out[tuple(str(_v(row["_id"].get(d))) for d in group_by)] = row["count"]
+    return out
+
+
+async def counts(database, group_by: Sequence[str], equal: Optional[dict] = None,
+                 date_from: Any = None, date_to: Any = None) -> Dict[tuple, int]:
+    """Notification counts grouped by ``group_by`` for ``date_from <= created_at <= date_to``."""
+    equal = {k: str(_v(v)) for k, v in (equal or {}).items()}
+    date_from, date_to = _utc(date_from), _utc(date_to)
+
+    # Whole hours [full_from, full_to) come from buckets, partial edge hours from raw documents
+    full_from = full_to = None
+    if date_from:
+        full_from = hour_of(date_from)
+        if full_from != date_from:
+            full_from += HOUR
+    if date_to:
+        full_to = hour_of(date_to)
+
+    totals: Dict[tuple, int] = defaultdict(int)
+    edges: List[dict] = []
+    if full_from and full_to and full_from >= full_to:
+        edges.append({"$gte": date_from, "$lte": date_to})
+    else:
+        if date_from and full_from != date_from:
+            edges.append({"$gte": date_from, "$lt": full_from})
+        if date_to:
+            edges.append({"$gte": full_to, "$lte": date_to})
+        match = dict(equal)
+        hour_range = {}
+        if full_from:
+            hour_range["$gte"] = full_from
+        if full_to:
+            hour_range["$lt"] = full_to
+        if hour_range:
+            match["hour"] = hour_range
+        pipeline = [
+            {"$match": match},
+            {"$group": {"_id": {d: f"${d}" for d in group_by}, "count": {"$sum": "$count"}}},
+        ]
+        async for row in database.notification_rollups.aggregate(pipeline):
+            totals[tuple(row["_id"].get(d) for d in group_by)] += row["count"]
+    for created in edges:
+        for key, count in (await _raw_counts(database, group_by, equal, created)).items():
+            totals[key] += count
+    return {k: v for k, v in totals.items() if v}
+
+
+async def rebuild(database, since: Any = None, apply: bool = False) -> int:
+    """Recompute buckets from the raw collection for hours from ``since`` (all when None).
+
+    With ``apply`` buckets are overwritten in place and buckets in the range
+    that no longer have notifications are removed. Returns the number of
+    buckets derived.
+    """
+    since = hour_of(since) if since else None
+    match = {"created_at": {"$gte": since}} if since else {}
+    pipeline = [
+        {"$match": match},
+        {"$group": {
+            "_id": {"hour": _hour_expr(), "type": "$type", "channel": "$channel", "status": "$status"},
+            "count": {"$sum": 1},
+        }},
+    ]
+    now = datetime.utcnow()
+    ops = []
+    async for row in database.notifications.aggregate(pipeline, allowDiskUse=True):
+        key = row["_id"]
+        if key.get("hour") is None:
+            continue
+        ops.append(_op((key["hour"], str(key.get("type")), str(key.get("channel")), str(key.get("status"))),
+                       row["count"], now, rebuilt=True))
+    if apply:
+        for start in range(0, len(ops), 1000):
+            await database.notification_rollups.bulk_write(ops[start:start + 1000], ordered=False)
+        stale = {"rebuilt_at": {"$ne": now}}
+        if since:
+            stale["hour"] = {"$gte": since}
+        await database.notification_rollups.delete_many(stale)
+    return len(ops)
@@ -1352,6 +1352,34 @@ class NotificationService:
         if not success:
             raise Exception("SMS delivery failed")
 
+    async def deliver(self, notification: Notification) -> Notification:
+        """Send an already recorded notification on its channel, using its metadata as template data.
+
+        Sets ``status`` (and ``sent_at``) by the same rules as ``send_notification``
+        but logs failures instead of raising, so batches can deliver many at once.
+        """
+        failed = []
+        if notification.channel in [NotificationChannel.EMAIL, NotificationChannel.BOTH]:
+            try:
+                await self._send_email_notification(notification, notification.metadata)
+            except Exception as e:
+                failed.append(NotificationChannel.EMAIL)
+                logger.error(f"❌ Email delivery failed for notification {notification.id}: {e}")
+        if notification.channel in [NotificationChannel.SMS, NotificationChannel.BOTH]:
+            try:
+                await self._send_sms_notification(notification, notification.metadata)
+            except Exception as e:
+                failed.append(NotificationChannel.SMS)
+                logger.error(f"❌ SMS delivery failed for notification {notification.id}: {e}")
+
+        # BOTH fails only when neither channel went out
+        if len(failed) == (2 if notification.channel == NotificationChannel.BOTH else 1):
+            notification.status = NotificationStatus.FAILED
+        else:
+            notification.status = NotificationStatus.SENT
+            notification.sent_at = datetime.now(timezone.utc)
+        return notification
+
     async def send_custom_sms(self, phone: str, message: str, metadata: Dict[str, Any] = None) -> bool:
         """Send a direct SMS without using a template (e.g., OTP messages)."""
         # Ensure services are initialized
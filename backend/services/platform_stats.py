@@ -0,0 +1,230 @@
+"""
+Materialized platform statistics for ``/api/stats``.
+
+A single ``platform_stats`` document holds running totals that the write paths
+keep current with ``$inc`` (user registration, job creation and status
+transitions, review creation). Reads never scan collections:
+
+- every worker keeps an in-memory copy refreshed from a change stream on that
+  document (or by polling every PLATFORM_STATS_POLL_SEC where change streams
+  are unavailable, e.g. a standalone mongod);
+- a reconciliation pass recounts from the source collections every
+  PLATFORM_STATS_RECONCILE_SEC to correct drift from deletes, imports and
+  writes that bypass the hooks. Workers claim the pass through
+  ``reconciled_at`` so only one of them runs it per interval.
+
+Hook failures are logged and swallowed: a missed increment is drift for the
+next reconciliation, not a failed user request.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+STATS_DOC_ID = "platform"
+RECONCILE_INTERVAL_SEC = int(os.getenv("PLATFORM_STATS_RECONCILE_SEC", "3600"))
+POLL_INTERVAL_SEC = float(os.getenv("PLATFORM_STATS_POLL_SEC", "5"))
+# Change streams need a replica set or sharded cluster
+_CHANGE_STREAMS_UNSUPPORTED = (40573, 40324)
+
+COUNTERS = ("total_tradespeople", "total_reviews", "rating_sum", "total_jobs", "active_jobs")
+
+
+async def bump(database, **deltas) -> None:
+    """``$inc`` the given counters on the stats document."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if not deltas or database is None:
+        return
+    try:
+        await database.platform_stats.update_one(
+            {"_id": STATS_DOC_ID},
+            {"$inc": deltas, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True,
+        )
+    except Exception as e:
+        logger.warning(f"platform_stats increment {deltas} failed: {e}")
+
+
+async def user_created(database, user: dict) -> None:
+    if _value(user.get("role")) == "tradesperson":
+        await bump(database, total_tradespeople=1)
+
+
+async def job_created(database, job: dict) -> None:
+    await bump(database, total_jobs=1, active_jobs=1 if _value(job.get("status")) == "active" else 0)
+
+
+async def job_status_changed(database, old_status, new_status) -> None:
+    old_status, new_status = _value(old_status), _value(new_status)
+    if old_status == new_status:
+        return
+    await bump(database, active_jobs=(new_status == "active") - (old_status == "active"))
+
+
+async def job_deleted(database, job: dict) -> None:
+    await bump(database, total_jobs=-1, active_jobs=-1 if _value(job.get("status")) == "active" else 0)
+
+
+async def review_created(database, rating) -> None:
+    await bump(database, total_reviews=1, rating_sum=rating or 0)
+
+
+def _value(v):
+    # Enum members (UserRole, JobStatus) and plain strings both end up here
+    return getattr(v, "value", v)
+
+
+async def recount(database) -> dict:
+    """Exact totals from the source collections (the slow path, reconciliation only)."""
+    reviews, tradespeople, total_jobs, active_jobs = await asyncio.gather(
+        database.reviews.aggregate([
+            {"$group": {"_id": None, "count": {"$sum": 1}, "rating_sum": {"$sum": {"$ifNull": ["$rating", 0]}}}},
+        ]).to_list(1),
+        database.users.count_documents({"role": "tradesperson"}),
+        database.jobs.count_documents({}),
+        database.jobs.count_documents({"status": "active"}),
+    )
+    return {
+        "total_tradespeople": tradespeople,
+        "total_reviews": reviews[0]["count"] if reviews else 0,
+        "rating_sum": reviews[0]["rating_sum"] if reviews else 0,
+        "total_jobs": total_jobs,
+        "active_jobs": active_jobs,
+    }
+
+
+async def reconcile(database, total_categories: Optional[int] = None) -> dict:
+    """Overwrite the counters with a fresh recount and return the drift corrected.
+
+    Increments that land while the recount runs may be lost or double counted;
+    the window is a few queries long and the next pass corrects it.
+    """
+    before = await database.platform_stats.find_one({"_id": STATS_DOC_ID}) or {}
+    fresh = await recount(database)
+    fields = dict(fresh)
+    if total_categories is not None:
+        fields["total_categories"] = total_categories
+    now = datetime.utcnow()
+    fields["reconciled_at"] = fields["updated_at"] = now
+    await database.platform_stats.update_one({"_id": STATS_DOC_ID}, {"$set": fields}, upsert=True)
+    drift = {k: fresh[k] - before.get(k, 0) for k in COUNTERS if fresh[k] != before.get(k, 0)}
+    if drift and before:
+        logger.info(f"platform_stats reconciled, drift corrected: {drift}")
+    return drift
+
+
+async def claim_reconcile(database, interval_sec: int = RECONCILE_INTERVAL_SEC) -> bool:
+    """True for exactly one caller per interval (the one that moves ``reconciled_at``)."""
+    now = datetime.utcnow()
+    cutoff = now - timedelta(seconds=interval_sec)
+    try:
+        doc = await database.platform_stats.find_one_and_update(
+            {"_id": STATS_DOC_ID, "$or": [{"reconciled_at": {"$lt": cutoff}}, {"reconciled_at": {"$exists": False}}]},
+            {"$set": {"reconciled_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # The document exists and was reconciled recently; the upsert lost
+        return False
+    except Exception as e:
+        logger.warning(f"platform_stats reconcile claim failed: {e}")
+        return False
+    return doc is not None
+
+
+def to_response(doc: Optional[dict]) -> dict:
+    doc = doc or {}
+    total_reviews = doc.get("total_reviews", 0)
+    average = doc.get("rating_sum", 0) / total_reviews if total_reviews else 0.0
+    return {
+        "total_tradespeople": doc.get("total_tradespeople", 0),
+        "total_categories": doc.get("total_categories", 0),
+        "total_reviews": total_reviews,
+        "average_rating": round(average, 1),
+        "total_jobs": doc.get("total_jobs", 0),
+        "active_jobs": doc.get("active_jobs", 0),
+    }
+
+
+class PlatformStatsCache:
+    """This worker's copy of the stats document, kept fresh in the background."""
+
+    def __init__(self):
+        self.snapshot: Optional[dict] = None
+        self._database = None
+        self._reconcile: Optional[Callable[[], Awaitable[dict]]] = None
+        self._tasks = []
+
+    async def start(self, database, reconcile: Callable[[], Awaitable[dict]]) -> None:
+        self._database = database
+        self._reconcile = reconcile
+        self.snapshot = await database.platform_stats.find_one({"_id": STATS_DOC_ID})
+        # A missing document is built by the first reconciliation pass, which runs right away
+        self._tasks = [
+            asyncio.create_task(self._follow()),
+            asyncio.create_task(self._reconcile_loop()),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks = []
+
+    async def _follow(self) -> None:
+        pipeline = [{"$match": {"documentKey._id": STATS_DOC_ID}}]
+        while True:
+            try:
+                async with self._database.platform_stats.watch(pipeline, full_document="updateLookup") as stream:
+                    # Catch anything written between the initial read and the stream opening
+                    self.snapshot = await self._database.platform_stats.find_one({"_id": STATS_DOC_ID})
+                    async for change in stream:
+                        if change.get("fullDocument") is not None:
+                            self.snapshot = change["fullDocument"]
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable; polling platform_stats instead")
+                    await self._poll()
+                    return
+                logger.warning(f"platform_stats change stream failed: {e}")
+            except Exception as e:
+                logger.warning(f"platform_stats change stream failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SEC)
+
+    async def _poll(self) -> None:
+        while True:
+            try:
+                self.snapshot = await self._database.platform_stats.find_one({"_id": STATS_DOC_ID})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"platform_stats poll failed: {e}")
+            await asyncio.sleep(POLL_INTERVAL_SEC)
+
+    async def _reconcile_loop(self) -> None:
+        while True:
+            try:
+                if await claim_reconcile(self._database):
+                    await self._reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"platform_stats reconciliation failed: {e}")
+            await asyncio.sleep(min(RECONCILE_INTERVAL_SEC, 300))
+
+
+platform_stats_cache = PlatformStatsCache()
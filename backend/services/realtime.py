@@ -0,0 +1,298 @@
+"""
+Real-time event delivery for messaging over WebSockets.
+
+Each uvicorn worker keeps a registry of the WebSocket connections it owns.
+Events are published once to a broker and every worker forwards them to its
+local connections for the addressed users:
+
+    redis     - Redis pub/sub on REALTIME_CHANNEL (used when REDIS_URL is set)
+    inprocess - an in-memory stand-in for single-worker deployments and tests
+
+Every connection has a bounded send queue. A client that cannot keep up is
+disconnected instead of buffering without limit, and it resyncs over REST
+when it reconnects. Heartbeats detect dead sockets that never send a FIN.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+from starlette.websockets import WebSocket, WebSocketState
+
+try:
+    import redis.asyncio as redis
+except Exception:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+REALTIME_CHANNEL = os.getenv("REALTIME_CHANNEL", "servicehub:realtime")
+HEARTBEAT_INTERVAL_SEC = float(os.getenv("REALTIME_HEARTBEAT_SEC", "25"))
+# A connection is considered dead after this long without any client frame
+IDLE_TIMEOUT_SEC = float(os.getenv("REALTIME_IDLE_TIMEOUT_SEC", str(HEARTBEAT_INTERVAL_SEC * 2.5)))
+SEND_QUEUE_SIZE = int(os.getenv("REALTIME_SEND_QUEUE_SIZE", "100"))
+MAX_CONNECTIONS_PER_USER = int(os.getenv("REALTIME_MAX_CONNECTIONS_PER_USER", "5"))
+
+# WebSocket close codes
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_TRY_AGAIN_LATER = 1013
+
+Envelope = Dict[str, Any]
+Handler = Callable[[Envelope], Awaitable[None]]
+
+
+class InProcessBroker:
+    """Delivers published envelopes directly to this process's handler."""
+
+    name = "inprocess"
+
+    def __init__(self):
+        self._handler: Optional[Handler] = None
+
+    async def start(self, handler: Handler) -> None:
+        self._handler = handler
+
+    async def publish(self, envelope: Envelope) -> None:
+        if self._handler is not None:
+            await self._handler(envelope)
+
+    async def stop(self) -> None:
+        self._handler = None
+
+
+class RedisBroker:
+    """Fans envelopes out to every worker through a Redis pub/sub channel."""
+
+    name = "redis"
+
+    def __init__(self, url: str, channel: str = REALTIME_CHANNEL):
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self, handler: Handler) -> None:
+        self._client = redis.from_url(self.url, encoding="utf-8", decode_responses=True)
+        self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen(handler))
+
+    async def _listen(self, handler: Handler) -> None:
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        await handler(json.loads(message["data"]))
+                    except Exception as e:
+                        logger.error(f"Realtime handler failed: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Realtime pub/sub listener error, resubscribing: {e}")
+                await asyncio.sleep(1)
+                try:
+                    await self._pubsub.subscribe(self.channel)
+                except Exception:
+                    pass
+
+    async def publish(self, envelope: Envelope) -> None:
+        await self._client.publish(self.channel, json.dumps(envelope, default=str))
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel)
+                await self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        if self._client is not None:
+            try:
+                await self._client.close()
+            except Exception:
+                pass
+            self._client = None
+
+
+def get_broker():
+    """Build the broker selected by REALTIME_BROKER (redis | inprocess; default redis when REDIS_URL is set)."""
+    kind = os.getenv("REALTIME_BROKER", "").lower()
+    url = os.getenv("REDIS_URL")
+    if kind == "inprocess" or not url or redis is None:
+        if kind == "redis":
+            logger.warning("REALTIME_BROKER=redis but Redis is unavailable; using in-process broker")
+        return InProcessBroker()
+    return RedisBroker(url)
+
+
+class Connection:
+    """One accepted WebSocket with its bounded outbound queue."""
+
+    def __init__(self, websocket: WebSocket, user_id: str):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.last_seen = time.monotonic()
+        self.closed = False
+        self._sender: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._sender = asyncio.create_task(self._send_loop())
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+
+    def touch(self) -> None:
+        self.last_seen = time.monotonic()
+
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """Queue an event without blocking. Returns False when the client is too slow."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send_loop(self) -> None:
+        try:
+            while True:
+                event = await self.queue.get()
+                await self.websocket.send_text(json.dumps(event, default=str))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Socket went away; the receive loop notices and unregisters
+            self.closed = True
+
+    async def _heartbeat_loop(self) -> None:
+        try:
+            while True:
+                await asyncio.sleep(HEARTBEAT_INTERVAL_SEC)
+                if time.monotonic() - self.last_seen > IDLE_TIMEOUT_SEC:
+                    await self.close(CLOSE_POLICY_VIOLATION, "Heartbeat timeout")
+                    return
+                self.offer({"type": "ping", "ts": time.time()})
+        except asyncio.CancelledError:
+            raise
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed and self.websocket.client_state != WebSocketState.CONNECTED:
+            return
+        self.closed = True
+        try:
+            if self.websocket.client_state == WebSocketState.CONNECTED:
+                await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+    async def stop(self) -> None:
+        self.closed = True
+        current = asyncio.current_task()
+        for task in (self._sender, self._heartbeat):
+            if task is not None and task is not current:
+                task.cancel()
+
+
+class RealtimeHub:
+    """Connection registry plus broker fan-out for this worker."""
+
+    def __init__(self, broker=None):
+        self._broker = broker
+        self._connections: Dict[str, Set[Connection]] = {}
+        self._started = False
+        self._lock = asyncio.Lock()
+
+    @property
+    def broker(self):
+        if self._broker is None:
+            self._broker = get_broker()
+        return self._broker
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._started:
+                return
+            try:
+                await self.broker.start(self._deliver)
+            except Exception as e:
+                logger.warning(f"Realtime broker '{self.broker.name}' failed to start ({e}); using in-process broker")
+                self._broker = InProcessBroker()
+                await self._broker.start(self._deliver)
+            self._started = True
+            logger.info(f"Realtime hub started (broker={self.broker.name})")
+
+    async def stop(self) -> None:
+        for conns in list(self._connections.values()):
+            for conn in list(conns):
+                await conn.close(1001, "Server shutting down")
+                await conn.stop()
+        self._connections.clear()
+        if self._started:
+            await self.broker.stop()
+            self._started = False
+
+    async def register(self, websocket: WebSocket, user_id: str) -> Connection:
+        await self.start()
+        conns = self._connections.setdefault(user_id, set())
+        if len(conns) >= MAX_CONNECTIONS_PER_USER:
+            # Evict the oldest connection for this user (e.g. a forgotten tab)
+            oldest = min(conns, key=lambda c: c.last_seen)
+            await self.unregister(oldest)
+            await oldest.close(CLOSE_TRY_AGAIN_LATER, "Too many connections")
+        conn = Connection(websocket, user_id)
+        self._connections.setdefault(user_id, set()).add(conn)
+        conn.start()
+        return conn
+
+    async def unregister(self, conn: Connection) -> None:
+        conns = self._connections.get(conn.user_id)
+        if conns is not None:
+            conns.discard(conn)
+            if not conns:
+                self._connections.pop(conn.user_id, None)
+        await conn.stop()
+
+    def connection_count(self) -> int:
+        return sum(len(c) for c in self._connections.values())
+
+    def is_online(self, user_id: str) -> bool:
+        return bool(self._connections.get(user_id))
+
+    async def _deliver(self, envelope: Envelope) -> None:
+        event = envelope.get("event") or {}
+        for user_id in envelope.get("user_ids") or []:
+            for conn in list(self._connections.get(user_id, ())):
+                if not conn.offer(event):
+                    # Backpressure: drop the slow consumer rather than buffer unbounded
+                    logger.info(f"Disconnecting slow realtime client for user {user_id}")
+                    await self.unregister(conn)
+                    await conn.close(CLOSE_TRY_AGAIN_LATER, "Client too slow")
+
+    async def publish(self, user_ids: Iterable[str], event: Dict[str, Any]) -> None:
+        """Send an event to every connection of the given users on any worker."""
+        ids = sorted({uid for uid in user_ids if uid})
+        if not ids:
+            return
+        await self.start()
+        try:
+            await self.broker.publish({"user_ids": ids, "event": event})
+        except Exception as e:
+            # Realtime delivery is best-effort; clients resync over REST
+            logger.warning(f"Realtime publish failed: {e}")
+
+
+realtime_hub = RealtimeHub()
@@ -0,0 +1,122 @@
+"""
+Review invitations and persisted review reminders.
+
+Hiring a tradesperson used to "schedule" reminders with a log line. The due
+time now lives on the hiring_status record as ``review_reminder_at`` and the
+``reviews.reminders`` scheduler task sends whatever is due
+(``hiring_status_review_reminder_at``), so a restart or a different worker
+doesn't lose them.
+
+Each due record is claimed by an update conditioned on its current
+``review_reminder_at``, so a record is handled once even if two runs
+overlap. A reminder is only sent for a completed job that the homeowner
+hasn't reviewed yet. A job that isn't completed yet is checked again
+REMINDER_INTERVAL later, until the record has had MAX_REMINDERS checks.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .notifications import notification_service
+
+try:
+    from ..models.notifications import NotificationType
+except ImportError:
+    from models.notifications import NotificationType
+
+logger = logging.getLogger(__name__)
+
+# How long after hiring to check in, by the job status reported at hiring time
+FIRST_REMINDER_AFTER = {
+    "completed": timedelta(days=3),  # the invitation went out already; this is the follow-up
+    "in_progress": timedelta(days=7),
+    "not_started": timedelta(days=14),
+}
+REMINDER_INTERVAL = timedelta(days=7)
+MAX_REMINDERS = 3
+REVIEW_WINDOW_DAYS = 30
+BATCH_SIZE = 200
+
+
+def first_reminder_at(job_status: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """When to first remind the homeowner after hiring, or None if no reminder applies."""
+    delay = FIRST_REMINDER_AFTER.get(job_status or "")
+    return (now or datetime.utcnow()) + delay if delay else None
+
+
+async def send(db, notification_type: NotificationType, homeowner: dict, tradesperson: dict, job: dict,
+               **extra) -> None:
+    """Send a review invitation or reminder to ``homeowner`` and store the notification."""
+    preferences = await db.get_user_notification_preferences(homeowner["id"])
+    template_data = {
+        "homeowner_name": homeowner.get("name") or "Homeowner",
+        "tradesperson_name": tradesperson.get("business_name") or tradesperson.get("name", "Tradesperson"),
+        "job_title": job.get("title", "Job"),
+        "completion_date": datetime.utcnow().strftime("%B %d, %Y"),
+        "review_url": f"{os.environ.get('FRONTEND_URL', 'https://servicehub.ng')}/my-jobs?review={job['id']}",
+        **extra,
+    }
+    notification = await notification_service.send_notification(
+        user_id=homeowner["id"],
+        notification_type=notification_type,
+        template_data=template_data,
+        user_preferences=preferences,
+        recipient_email=homeowner.get("email"),
+        recipient_phone=homeowner.get("phone"),
+    )
+    await db.create_notification(notification)
+
+
+async def _remind(db, record: dict, now: datetime) -> str:
+    job = await db.database.jobs.find_one({"id": record["job_id"]}, {"_id": 0, "id": 1, "title": 1, "status": 1})
+    if not job or job.get("status") in ("cancelled", "expired"):
+        return "dropped"
+    reviewed = await db.database.reviews.find_one(
+        {"job_id": record["job_id"], "reviewer_id": record["homeowner_id"]}, {"_id": 1}
+    )
+    if reviewed:
+        return "reviewed"
+    if job.get("status") != "completed":
+        return "pending"
+    homeowner = await db.get_user_by_id(record["homeowner_id"])
+    tradesperson = await db.get_user_by_id(record["tradesperson_id"])
+    if not homeowner or not tradesperson:
+        return "dropped"
+    hired_at = record.get("created_at")
+    days_left = REVIEW_WINDOW_DAYS
+    if isinstance(hired_at, datetime):
+        days_left = max(REVIEW_WINDOW_DAYS - (now - hired_at).days, 1)
+    await send(db, NotificationType.REVIEW_REMINDER, homeowner, tradesperson, job, days_remaining=days_left)
+    return "sent"
+
+
+async def send_due(db, now: Optional[datetime] = None, batch_size: int = BATCH_SIZE) -> dict:
+    """Handle hiring records whose ``review_reminder_at`` has passed. Returns counts by outcome."""
+    now = now or datetime.utcnow()
+    outcomes = {}
+    due = await db.database.hiring_status.find(
+        {"review_reminder_at": {"$lte": now}},
+        {"_id": 0, "id": 1, "job_id": 1, "homeowner_id": 1, "tradesperson_id": 1, "created_at": 1,
+         "review_reminder_at": 1, "review_reminders": 1},
+    ).sort("review_reminder_at", 1).limit(batch_size).to_list(batch_size)
+    for record in due:
+        checks = record.get("review_reminders", 0) + 1
+        claimed = await db.database.hiring_status.update_one(
+            {"id": record["id"], "review_reminder_at": record["review_reminder_at"]},
+            {"$set": {"review_reminders": checks, "updated_at": now}, "$unset": {"review_reminder_at": ""}},
+        )
+        if not claimed.modified_count:
+            continue  # handled by an overlapping run
+        try:
+            outcome = await _remind(db, record, now)
+        except Exception as e:
+            logger.warning(f"review reminder for hiring record {record['id']} failed: {e}")
+            outcome = "failed"
+        if outcome in ("sent", "pending", "failed") and checks < MAX_REMINDERS:
+            await db.database.hiring_status.update_one(
+                {"id": record["id"]}, {"$set": {"review_reminder_at": now + REMINDER_INTERVAL}}
+            )
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return outcomes
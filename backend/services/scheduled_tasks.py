@@ -0,0 +1,75 @@
+"""
+The backend's periodic tasks, registered on the shared ``scheduler``.
+
+=========================  ====================  =====================================
+task                       schedule              does
+=========================  ====================  =====================================
+policies.activate          every 60s             activate scheduled policies now due
+jobs.expire                JOB_EXPIRY_SWEEP_SEC  move past-due active jobs to expired
+reviews.reminders          every 15 min          send due review reminders
+jobs.orphans               daily 03:30 UTC       report jobs whose homeowner is gone
+stats.seed                 every 10 min          build stats_counters if it is empty
+stats.rebuild              daily 04:15 UTC       recompute stats_counters (drift repair)
+=========================  ====================  =====================================
+
+``jobs.orphans`` only reports (in its run history) unless
+SCHEDULER_DELETE_ORPHANED_JOBS is set, in which case it hard-deletes
+orphans older than ORPHANED_JOB_MIN_AGE_DAYS, like
+``tools/cleanup_orphaned_jobs.py --delete``.
+
+Expired OTPs and verification/reset tokens are removed by TTL indexes on
+their ``expires_at`` (see index_manifest), so they need no task here.
+"""
+
+import logging
+import os
+
+from . import job_expiry, review_reminders, stats_counters
+from .scheduler import Scheduler
+
+logger = logging.getLogger(__name__)
+
+DELETE_ORPHANED_JOBS = os.getenv("SCHEDULER_DELETE_ORPHANED_JOBS", "false").lower() in ("1", "true", "yes")
+ORPHANED_JOB_MIN_AGE_DAYS = int(os.getenv("ORPHANED_JOB_MIN_AGE_DAYS", "7"))
+ORPHANED_JOB_SAMPLE = 20
+
+
+def register(scheduler: Scheduler, db) -> None:
+    """Register every periodic task against the ``Database`` facade ``db``."""
+
+    async def activate_policies():
+        return {"activated": await db.activate_scheduled_policies()}
+
+    async def expire_jobs():
+        return {"expired": await job_expiry.sweep(db.database)}
+
+    async def send_review_reminders():
+        return await review_reminders.send_due(db)
+
+    async def orphaned_jobs():
+        orphans = await db.find_orphaned_jobs(min_age_days=ORPHANED_JOB_MIN_AGE_DAYS)
+        result = {"orphaned": len(orphans), "sample": [j.get("id") for j in orphans[:ORPHANED_JOB_SAMPLE]]}
+        if orphans and DELETE_ORPHANED_JOBS:
+            deleted = 0
+            for job in orphans:
+                try:
+                    deleted += (await db.delete_job_completely(job["id"])).get("jobs_deleted", 0)
+                except Exception as e:
+                    logger.warning(f"deleting orphaned job {job.get('id')} failed: {e}")
+            result["deleted"] = deleted
+        elif orphans:
+            logger.info(f"{len(orphans)} orphaned job(s) found; set SCHEDULER_DELETE_ORPHANED_JOBS to remove them")
+        return result
+
+    async def seed_stats():
+        return {"rows": await stats_counters.rebuild_if_empty(db.database)}
+
+    async def rebuild_stats():
+        return {"rows": len(await stats_counters.rebuild(db.database, apply=True))}
+
+    scheduler.register("policies.activate", activate_policies, every=60, jitter_sec=10, lease_sec=120)
+    scheduler.register("jobs.expire", expire_jobs, every=job_expiry.SWEEP_INTERVAL_SEC, jitter_sec=30)
+    scheduler.register("reviews.reminders", send_review_reminders, every=900, jitter_sec=60)
+    scheduler.register("jobs.orphans", orphaned_jobs, cron="30 3 * * *", jitter_sec=600, lease_sec=1800)
+    scheduler.register("stats.seed", seed_stats, every=600, jitter_sec=60, lease_sec=1800)
+    scheduler.register("stats.rebuild", rebuild_stats, cron="15 4 * * *", jitter_sec=600, lease_sec=1800)
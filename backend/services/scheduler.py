@@ -0,0 +1,290 @@
+"""
+Periodic tasks that run once per deployment, however many workers there are.
+
+Every worker (each uvicorn process in each container) runs the same
+``Scheduler`` loop, waking every SCHEDULER_TICK_SEC plus a random jitter.
+Which worker runs a task is decided in MongoDB: each task has a
+``scheduler_leases`` document::
+
+    {"_id": "jobs.expire", "next_run_at": ..., "owner": "web-1:4211:9f2c1a",
+     "lease_until": ..., "last_status": "ok", "runs": 812, "failures": 3, ...}
+
+A worker runs a task only if its ``find_one_and_update`` moves the lease
+(``next_run_at <= now`` and ``lease_until <= now``). The lease is extended
+while the task runs, so a slow run keeps it. A worker that dies
+mid-run lets the lease lapse, and the task is retried by whoever ticks next.
+On completion the owner sets ``next_run_at`` from the task's schedule (an
+interval or a five-field cron expression, UTC) plus up to ``jitter_sec``.
+
+Each run is recorded in ``scheduler_runs`` (kept SCHEDULER_RUN_HISTORY_DAYS
+by a TTL index); ``status`` summarizes both for the admin console.
+
+Tasks must tolerate an occasional repeat: a run whose lease lapsed (say the
+worker stalled for longer than ``lease_sec``) can overlap a retry.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+TICK_SEC = float(os.getenv("SCHEDULER_TICK_SEC", "15"))
+TICK_JITTER_SEC = float(os.getenv("SCHEDULER_TICK_JITTER_SEC", "5"))
+RUN_HISTORY_DAYS = int(os.getenv("SCHEDULER_RUN_HISTORY_DAYS", "30"))
+DEFAULT_LEASE_SEC = 300
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _field(spec: str, low: int, high: int) -> set:
+    values = set()
+    for part in spec.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if step < 1 or not low <= start <= end <= high:
+            raise ValueError(f"cron field {spec!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class Cron:
+    """``minute hour day-of-month month day-of-week`` with ``*``, ``a-b``, ``a,b`` and ``/n``."""
+
+    def __init__(self, expression: str):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron expression needs 5 fields: {expression!r}")
+        self.expression = expression
+        self.minutes = _field(fields[0], 0, 59)
+        self.hours = _field(fields[1], 0, 23)
+        self.days = _field(fields[2], 1, 31)
+        self.months = _field(fields[3], 1, 12)
+        self.weekdays = {d % 7 for d in _field(fields[4], 0, 7)}  # 0 and 7 are Sunday
+        self._any_day, self._any_weekday = fields[2] == "*", fields[4] == "*"
+
+    def _day_matches(self, t: datetime) -> bool:
+        in_month, in_week = t.day in self.days, t.isoweekday() % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return in_month and in_week
+        # Both restricted: either matches, as in cron(8)
+        return in_month or in_week
+
+    def next_after(self, t: datetime) -> datetime:
+        t = t.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"cron expression never matches: {self.expression!r}")
+
+
+class ScheduledTask:
+    def __init__(self, name: str, fn: Callable[[], Awaitable[Optional[dict]]], every: Optional[float] = None,
+                 cron: Optional[str] = None, jitter_sec: float = 0, lease_sec: float = DEFAULT_LEASE_SEC):
+        if (every is None) == (cron is None):
+            raise ValueError(f"task {name}: pass exactly one of every= or cron=")
+        self.name = name
+        self.fn = fn
+        self.every = every
+        self.cron = Cron(cron) if cron else None
+        self.jitter_sec = jitter_sec
+        self.lease_sec = lease_sec
+
+    @property
+    def schedule(self) -> str:
+        return self.cron.expression if self.cron else f"every {self.every:g}s"
+
+    def next_after(self, t: datetime) -> datetime:
+        due = self.cron.next_after(t) if self.cron else t + timedelta(seconds=self.every)
+        return due + timedelta(seconds=random.uniform(0, self.jitter_sec))
+
+    def first_run(self, now: datetime) -> datetime:
+        # Interval tasks are due at once after a deploy; cron tasks wait for their slot
+        if self.cron:
+            return self.next_after(now)
+        return now + timedelta(seconds=random.uniform(0, self.jitter_sec))
+
+
+class Scheduler:
+    def __init__(self, tick_sec: float = TICK_SEC, owner: Optional[str] = None):
+        self.tick_sec = tick_sec
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.tasks: Dict[str, ScheduledTask] = {}
+        self._ensured: set = set()
+        self._running: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, fn: Callable[[], Awaitable[Optional[dict]]], **schedule) -> ScheduledTask:
+        """Add a task: ``every=<seconds>`` or ``cron="m h dom mon dow"``, plus ``jitter_sec`` / ``lease_sec``."""
+        task = ScheduledTask(name, fn, **schedule)
+        self.tasks[name] = task
+        return task
+
+    async def _ensure(self, database, task: ScheduledTask, now: datetime) -> None:
+        if task.name in self._ensured:
+            return
+        try:
+            await database.scheduler_leases.update_one(
+                {"_id": task.name},
+                {"$setOnInsert": {"next_run_at": task.first_run(now), "lease_until": _EPOCH, "owner": None,
+                                  "runs": 0, "failures": 0}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            pass  # another worker created it first
+        self._ensured.add(task.name)
+
+    async def _claim(self, database, task: ScheduledTask, now: datetime) -> bool:
+        await self._ensure(database, task, now)
+        claimed = await database.scheduler_leases.find_one_and_update(
+            {"_id": task.name, "next_run_at": {"$lte": now}, "lease_until": {"$lte": now}},
+            {"$set": {"owner": self.owner, "lease_until": now + timedelta(seconds=task.lease_sec),
+                      "last_started_at": now, "schedule": task.schedule}},
+            projection={"_id": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        return claimed is not None
+
+    async def _heartbeat(self, database, task: ScheduledTask) -> None:
+        while True:
+            await asyncio.sleep(task.lease_sec / 3)
+            try:
+                await database.scheduler_leases.update_one(
+                    {"_id": task.name, "owner": self.owner},
+                    {"$set": {"lease_until": datetime.utcnow() + timedelta(seconds=task.lease_sec)}},
+                )
+            except Exception as e:
+                logger.warning(f"scheduler: lease renewal for {task.name} failed: {e}")
+
+    async def _run(self, database, task: ScheduledTask, started_at: datetime) -> None:
+        heartbeat = asyncio.create_task(self._heartbeat(database, task))
+        clock = time.perf_counter()
+        status, error, result = "ok", None, None
+        try:
+            result = await task.fn()
+        except Exception as e:
+            status, error = "failed", f"{type(e).__name__}: {e}"
+            logger.error(f"scheduler: task {task.name} failed: {error}")
+        finally:
+            heartbeat.cancel()
+        finished_at = datetime.utcnow()
+        duration_ms = round((time.perf_counter() - clock) * 1000, 1)
+        try:
+            released = await database.scheduler_leases.update_one(
+                {"_id": task.name, "owner": self.owner},
+                {"$set": {"lease_until": finished_at, "next_run_at": task.next_after(finished_at),
+                          "last_finished_at": finished_at, "last_status": status, "last_error": error,
+                          "last_duration_ms": duration_ms},
+                 "$inc": {"runs": 1, "failures": int(status != "ok")}},
+            )
+            if not released.matched_count:
+                logger.warning(f"scheduler: lost the lease on {task.name} while it ran ({duration_ms} ms)")
+            await database.scheduler_runs.insert_one({
+                "task": task.name, "owner": self.owner, "started_at": started_at, "finished_at": finished_at,
+                "duration_ms": duration_ms, "status": status, "error": error, "result": result,
+            })
+        except Exception as e:
+            logger.warning(f"scheduler: recording run of {task.name} failed: {e}")
+
+    async def run_due(self, database, now: Optional[datetime] = None, wait: bool = False) -> List[str]:
+        """Claim and start every due task this worker wins. Returns their names."""
+        now = now or datetime.utcnow()
+        started = []
+        for task in self.tasks.values():
+            if task.name in self._running:
+                continue
+            try:
+                if not await self._claim(database, task, now):
+                    continue
+            except Exception as e:
+                logger.warning(f"scheduler: claiming {task.name} failed: {e}")
+                continue
+            run = asyncio.create_task(self._run(database, task, now))
+            self._running[task.name] = run
+            run.add_done_callback(lambda _, name=task.name: self._running.pop(name, None))
+            started.append(task.name)
+        if wait:
+            await asyncio.gather(*(self._running[name] for name in started if name in self._running))
+        return started
+
+    async def status(self, database) -> List[dict]:
+        """Per-task schedule, lease and last-run state, plus the latest runs."""
+        leases = {d["_id"]: d async for d in database.scheduler_leases.find({})}
+        out = []
+        for name, task in sorted(self.tasks.items()):
+            lease = leases.get(name, {})
+            recent = await database.scheduler_runs.find(
+                {"task": name}, {"_id": 0, "task": 0}
+            ).sort("started_at", -1).limit(5).to_list(5)
+            out.append({
+                "name": name,
+                "schedule": task.schedule,
+                "next_run_at": lease.get("next_run_at"),
+                "owner": lease.get("owner"),
+                "running": lease.get("lease_until", _EPOCH) > datetime.utcnow(),
+                "last_status": lease.get("last_status"),
+                "last_error": lease.get("last_error"),
+                "last_duration_ms": lease.get("last_duration_ms"),
+                "runs": lease.get("runs", 0),
+                "failures": lease.get("failures", 0),
+                "recent_runs": recent,
+            })
+        return out
+
+    def start(self, database) -> None:
+        if self._loop_task is None and ENABLED:
+            self._loop_task = asyncio.create_task(self._loop(database))
+
+    async def stop(self) -> None:
+        """Stop ticking; runs in progress are cancelled and their leases left to lapse."""
+        if self._loop_task is not None:
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._loop_task = None
+        for run in list(self._running.values()):
+            run.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+
+    async def _loop(self, database) -> None:
+        while True:
+            # Spread workers so they don't all query the leases at the same instant
+            await asyncio.sleep(self.tick_sec + random.uniform(0, TICK_JITTER_SEC))
+            try:
+                await self.run_due(database)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"scheduler tick failed: {e}")
+
+
+scheduler = Scheduler()
@@ -0,0 +1,301 @@
+"""
+Daily rollup counters for the admin dashboards.
+
+``stats_counters`` holds one document per ``(metric, day)``::
+
+    {"_id": "jobs.status.active|2024-06-01", "metric": "jobs.status.active",
+     "day": "2024-06-01", "value": 12}
+
+Two kinds of metric share the collection:
+
+- gauges ("how many jobs are active") are stored as net daily deltas. Every
+  tracked document contributes to a set of metrics (``CONTRIBUTIONS``); an
+  insert adds its contributions, an update adds after-minus-before, a delete
+  subtracts them, always on the day the change happened. A gauge's current
+  value is the sum over all its days.
+- events ("jobs approved today") are plain per-day counts written by
+  ``record``.
+
+Dashboards therefore read O(days) small documents per metric instead of
+scanning the source collections. Hard deletes that bypass the hooks (account
+purges, scripts) drift the gauges; ``rebuild`` recomputes everything from the
+source collections. The scheduler runs it nightly (``stats.rebuild``) and, via
+``rebuild_if_empty``, as soon as a deployment starts with no rollups at all
+(``stats.seed``); ``python -m backend.tools.stats_counters rebuild`` runs it
+by hand.
+"""
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+Contribution = Dict[str, float]
+
+
+def day_of(value: Any = None) -> str:
+    """UTC day bucket ("YYYY-MM-DD") for a datetime or ISO string; today when unknown."""
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, str) and len(value) >= 10 and value[4] == "-":
+        return value[:10]
+    return datetime.utcnow().strftime("%Y-%m-%d")
+
+
+def _v(value):
+    return getattr(value, "value", value)
+
+
+def _get(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _job(doc: dict) -> Contribution:
+    out = {"jobs.total": 1, "jobs.access_fee_naira": doc.get("access_fee_naira") or 1500}
+    if doc.get("status"):
+        out[f"jobs.status.{_v(doc['status'])}"] = 1
+    return out
+
+
+def _hiring_status(doc: dict) -> Contribution:
+    out = {"hiring.total": 1}
+    if doc.get("hired") is True:
+        out["hiring.hired"] = 1
+        if doc.get("job_status"):
+            out[f"hiring.job_status.{_v(doc['job_status'])}"] = 1
+    elif doc.get("hired") is False:
+        out["hiring.not_hired"] = 1
+    return out
+
+
+def _hiring_feedback(doc: dict) -> Contribution:
+    return {f"hiring_feedback.type.{_v(doc['feedback_type'])}": 1} if doc.get("feedback_type") else {}
+
+
+def _content_item(doc: dict) -> Contribution:
+    out = {"content.total": 1}
+    for field in ("status", "content_type", "category"):
+        if doc.get(field):
+            out[f"content.{field}.{_v(doc[field])}"] = 1
+    if _v(doc.get("content_type")) == "job_posting":
+        out["job_postings.total"] = 1
+        if doc.get("status"):
+            out[f"job_postings.status.{_v(doc['status'])}"] = 1
+        for field, name in (("settings.department", "department"), ("settings.job_type", "job_type")):
+            value = _get(doc, field)
+            if value:
+                out[f"job_postings.{name}.{_v(value)}"] = 1
+    return out
+
+
+def _job_application(doc: dict) -> Contribution:
+    out = {"job_applications.total": 1}
+    if doc.get("status"):
+        out[f"job_applications.status.{_v(doc['status'])}"] = 1
+    return out
+
+
+# collection -> (fields the contribution reads, contribution function, creation timestamp field)
+CONTRIBUTIONS: Dict[str, tuple] = {
+    "jobs": (("status", "access_fee_naira"), _job, "created_at"),
+    "hiring_status": (("hired", "job_status"), _hiring_status, "created_at"),
+    "hiring_feedback": (("feedback_type",), _hiring_feedback, "created_at"),
+    "content_items": (("status", "content_type", "category", "settings"), _content_item, "created_at"),
+    "job_applications": (("status",), _job_application, "applied_at"),
+}
+
+
+def tracked_fields(collection: str) -> tuple:
+    return CONTRIBUTIONS[collection][0]
+
+
+def projection(collection: str) -> dict:
+    return {field: 1 for field in tracked_fields(collection)}
+
+
+def touches(collection: str, fields: Iterable[str]) -> bool:
+    """Whether a ``$set`` of ``fields`` can change ``collection``'s contributions."""
+    roots = {f.split(".")[0] for f in fields}
+    return bool(roots & {f.split(".")[0] for f in tracked_fields(collection)})
+
+
+def created_day(collection: str, doc: dict) -> str:
+    return day_of(doc.get(CONTRIBUTIONS[collection][2]))
+
+
+def contribution(collection: str, doc: Optional[dict]) -> Contribution:
+    return CONTRIBUTIONS[collection][1](doc) if doc else {}
+
+
+def apply_set(doc: dict, fields: dict) -> dict:
+    """``doc`` as it reads after ``{"$set": fields}`` (dotted paths included)."""
+    after = {k: (dict(v) if isinstance(v, dict) else v) for k, v in doc.items()}
+    for path, value in fields.items():
+        target = after
+        parts = path.split(".")
+        for part in parts[:-1]:
+            if not isinstance(target.get(part), dict):
+                target[part] = {}
+            target = target[part]
+        target[parts[-1]] = value
+    return after
+
+
+def diff(collection: str, before: Optional[dict], after: Optional[dict]) -> Contribution:
+    out: Contribution = defaultdict(int)
+    for metric, amount in contribution(collection, after).items():
+        out[metric] += amount
+    for metric, amount in contribution(collection, before).items():
+        out[metric] -= amount
+    return {m: a for m, a in out.items() if a}
+
+
+def _ops(deltas: Dict[tuple, float], now: datetime) -> List[UpdateOne]:
+    return [
+        UpdateOne(
+            {"_id": f"{metric}|{day}"},
+            {"$inc": {"value": amount}, "$set": {"metric": metric, "day": day, "updated_at": now}},
+            upsert=True,
+        )
+        for (metric, day), amount in deltas.items() if amount
+    ]
+
+
+async def add(database, deltas: Contribution, day: Optional[str] = None) -> None:
+    """Apply metric deltas to one day in a single round trip. Failures are logged, not raised."""
+    deltas = {m: a for m, a in deltas.items() if a}
+    if not deltas or database is None:
+        return
+    day = day or day_of()
+    try:
+        await database.stats_counters.bulk_write(
+            _ops({(m, day): a for m, a in deltas.items()}, datetime.utcnow()), ordered=False
+        )
+    except Exception as e:
+        logger.warning(f"stats_counters update {deltas} failed: {e}")
+
+
+async def inserted(database, collection: str, doc: dict) -> None:
+    await add(database, contribution(collection, doc), created_day(collection, doc))
+
+
+async def updated(database, collection: str, before: Optional[dict], fields: dict) -> None:
+    if before is not None:
+        await add(database, diff(collection, before, apply_set(before, fields)))
+
+
+async def deleted(database, collection: str, doc: Optional[dict]) -> None:
+    await add(database, diff(collection, doc, None))
+
+
+async def record(database, metric: str, amount: float = 1, when: Any = None) -> None:
+    """Count an event on its day (e.g. ``jobs.approved``)."""
+    await add(database, {metric: amount}, day_of(when))
+
+
+async def totals(database, prefixes: Iterable[str]) -> Dict[str, float]:
+    """Gauge values: every metric under ``prefixes`` summed over all days."""
+    pipeline = [
+        {"$match": _family_filter(prefixes)},
+        {"$group": {"_id": "$metric", "value": {"$sum": "$value"}}},
+    ]
+    return {doc["_id"]: doc["value"] async for doc in database.stats_counters.aggregate(pipeline)}
+
+
+async def on_day(database, metrics: Iterable[str], day: Optional[str] = None) -> Dict[str, float]:
+    """Event counts for one day."""
+    day = day or day_of()
+    cursor = database.stats_counters.find({"metric": {"$in": list(metrics)}, "day": day}, {"metric": 1, "value": 1})
+    return {doc["metric"]: doc["value"] async for doc in cursor}
+
+
+def breakdown(values: Dict[str, float], prefix: str) -> Dict[str, int]:
+    """``{"jobs.status.active": 3, ...}`` -> ``{"active": 3}`` for one prefix, zeros dropped."""
+    prefix = prefix.rstrip(".") + "."
+    return {m[len(prefix):]: _int(v) for m, v in values.items() if m.startswith(prefix) and v}
+
+
+def _int(value: float):
+    return int(value) if float(value).is_integer() else value
+
+
+# Event metrics derivable from stored documents, for rebuilds:
+#   metric -> (collection, filter, timestamp field)
+EVENT_SOURCES: Dict[str, tuple] = {
+    "jobs.approved": ("jobs", {"status": "active", "approved_at": {"$ne": None}}, "approved_at"),
+    "jobs.rejected": ("jobs", {"status": "rejected", "approved_at": {"$ne": None}}, "approved_at"),
+}
+# Metric families owned by this module; a rebuild replaces all of their rows
+FAMILIES = ("jobs.", "hiring.", "hiring_feedback.", "content.", "job_postings.", "job_applications.")
+
+
+def _family_filter(families: Iterable[str]) -> dict:
+    # Separate anchored prefixes so each one is an index range on (metric, day)
+    return {"metric": {"$in": [re.compile("^" + re.escape(f)) for f in families]}}
+
+
+async def rebuild(database, apply: bool = False, batch_size: int = 1000,
+                  progress: Optional[Callable[[str, int], None]] = None) -> Dict[tuple, float]:
+    """Recompute every rollup in ``FAMILIES`` from the source collections.
+
+    Gauges are re-derived by bucketing each document's contribution on its
+    creation day (``jobs.interests`` from the jobs' ``interests_count``),
+    events from ``EVENT_SOURCES``. With ``apply`` each row is overwritten in
+    place and rows the rebuild did not produce are removed afterwards, so the
+    dashboards never read an empty collection. Increments that land while the
+    scan runs can be lost; run it in a quiet period.
+    """
+    values: Dict[tuple, float] = defaultdict(int)
+    for collection in CONTRIBUTIONS:
+        fields = dict(projection(collection), **{CONTRIBUTIONS[collection][2]: 1})
+        if collection == "jobs":
+            fields["interests_count"] = 1
+        count = 0
+        async for doc in database[collection].find({}, fields).batch_size(batch_size):
+            day = created_day(collection, doc)
+            for metric, amount in contribution(collection, doc).items():
+                values[(metric, day)] += amount
+            if collection == "jobs" and doc.get("interests_count"):
+                values[("jobs.interests", day)] += doc["interests_count"]
+            count += 1
+        if progress:
+            progress(collection, count)
+    for metric, (collection, query, field) in EVENT_SOURCES.items():
+        async for doc in database[collection].find(query, {field: 1}).batch_size(batch_size):
+            values[(metric, day_of(doc.get(field)))] += 1
+
+    if apply:
+        now = datetime.utcnow()
+        ops = [
+            UpdateOne(
+                {"_id": f"{metric}|{day}"},
+                {"$set": {"metric": metric, "day": day, "value": value, "updated_at": now, "rebuilt_at": now}},
+                upsert=True,
+            )
+            for (metric, day), value in values.items()
+        ]
+        for start in range(0, len(ops), batch_size):
+            await database.stats_counters.bulk_write(ops[start:start + batch_size], ordered=False)
+        await database.stats_counters.delete_many({"$and": [_family_filter(FAMILIES), {"rebuilt_at": {"$ne": now}}]})
+    return dict(values)
+
+
+async def rebuild_if_empty(database) -> Optional[int]:
+    """Build the rollups when ``stats_counters`` has none yet (a deployment that predates it).
+
+    Returns the number of rows written, or None when rollups already exist.
+    """
+    if await database.stats_counters.find_one({}, {"_id": 1}):
+        return None
+    values = await rebuild(database, apply=True)
+    logger.info(f"stats_counters was empty; built {len(values)} rollup rows")
+    return len(values)
@@ -0,0 +1,183 @@
+"""
+Faceted tradesperson directory search.
+
+Every tradesperson's user document carries a ``directory`` subdocument of
+normalized (lowercase, accent-free, whitespace-collapsed) search keys, kept
+in step by ``create_user`` / ``update_user`` and backfilled with
+``python -m backend.tools.user_search_keys backfill --apply``::
+
+    "directory": {
+        "trades": ["plumbing", "tiling"],            # trade_categories + legacy profession
+        "state": "lagos",                            # state, else location
+        "keys": ["ade", "plumbing", "ikeja", ...],   # words of name, business, trades and places
+    }
+
+Searches become index lookups instead of unanchored ``$regex`` over seven
+fields: trade and state are equality matches on
+``users_directory_trade_state_rating``, and free text matches word prefixes
+in ``directory.keys``.
+
+Facet counts (by trade, state and rating band) come from one ``$facet``
+aggregation. Facets are disjunctive: each is counted with every filter
+except its own, so picking "Lagos" still shows how many plumbers there are
+in the other states.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Fields the directory keys are derived from; updates touching them rebuild the keys
+SOURCE_FIELDS = ("role", "name", "business_name", "company_name", "profession", "trade_categories",
+                 "city", "state", "location")
+
+# (label, lower bound inclusive, upper bound exclusive); a missing or zero rating is "unrated"
+RATING_BANDS: List[Tuple[str, float, float]] = [
+    ("4.5+", 4.5, 99),
+    ("4-4.5", 4.0, 4.5),
+    ("3-4", 3.0, 4.0),
+    ("below_3", 0, 3.0),
+]
+UNRATED = "unrated"
+FACET_LIMIT = 50
+
+SORTS = {
+    "rating": [("average_rating", -1), ("total_reviews", -1), ("_id", 1)],
+    "reviews": [("total_reviews", -1), ("average_rating", -1), ("_id", 1)],
+    "experience": [("years_experience", -1), ("average_rating", -1), ("_id", 1)],
+    "recent": [("created_at", -1), ("_id", 1)],
+}
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(value: Any) -> str:
+    text = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode()
+    return " ".join(text.lower().split())
+
+
+def words(value: Any) -> List[str]:
+    return _WORD.findall(normalize(value))
+
+
+def directory_fields(user: dict) -> Optional[dict]:
+    """The ``directory`` subdocument for a user, or None for non-tradespeople."""
+    if str(getattr(user.get("role"), "value", user.get("role"))) != "tradesperson":
+        return None
+    trades = [normalize(t) for t in (user.get("trade_categories") or []) if normalize(t)]
+    if normalize(user.get("profession")) and normalize(user.get("profession")) not in trades:
+        trades.append(normalize(user.get("profession")))
+    keys = set()
+    for field in ("name", "business_name", "company_name", "city", "state", "location"):
+        keys.update(words(user.get(field)))
+    for trade in trades:
+        keys.update(words(trade))
+    return {
+        "trades": trades,
+        "state": normalize(user.get("state") or user.get("location")) or None,
+        "keys": sorted(keys),
+    }
+
+
+def touches(fields) -> bool:
+    return any(f.split(".")[0] in SOURCE_FIELDS for f in fields)
+
+
+def _prefix(word: str) -> re.Pattern:
+    # Anchored, case-sensitive prefix regexes are index range scans on directory.keys
+    return re.compile("^" + re.escape(word))
+
+
+def filters(search: Optional[str] = None, trade: Optional[str] = None, state: Optional[str] = None,
+            location: Optional[str] = None, min_rating: Optional[float] = None,
+            known_states: Iterable[str] = ()) -> Dict[str, dict]:
+    """Per-facet filter clauses: ``{"base", "trade", "state", "rating"}``.
+
+    ``base`` (role and free text) always applies; the others are dropped from
+    their own facet's count. A free-form ``location`` naming one of
+    ``known_states`` filters like ``state``; anything else (a city, an LGA)
+    matches words in the keys.
+    """
+    base: Dict[str, Any] = {"role": "tradesperson"}
+    search_words = words(search)
+    out: Dict[str, dict] = {"base": base, "trade": {}, "state": {}, "rating": {}}
+    if normalize(trade):
+        out["trade"] = {"directory.trades": normalize(trade)}
+    if normalize(state):
+        out["state"] = {"directory.state": normalize(state)}
+    if normalize(location):
+        if not out["state"] and normalize(location) in {normalize(s) for s in known_states}:
+            out["state"] = {"directory.state": normalize(location)}
+        else:
+            search_words += words(location)
+    if search_words:
+        base["directory.keys"] = {"$all": [_prefix(w) for w in dict.fromkeys(search_words)]}
+    if min_rating is not None:
+        out["rating"] = {"average_rating": {"$gte": min_rating}}
+    return out
+
+
+def combined(parts: Dict[str, dict], *names: str) -> dict:
+    query: Dict[str, Any] = {}
+    for name in names:
+        query.update(parts[name])
+    return query
+
+
+def _band_expression() -> dict:
+    rating = {"$ifNull": ["$average_rating", 0]}
+    branches = [{"case": {"$lte": [rating, 0]}, "then": UNRATED}] + [
+        {"case": {"$and": [{"$gte": [rating, low]}, {"$lt": [rating, high]}]}, "then": label}
+        for label, low, high in RATING_BANDS
+    ]
+    return {"$switch": {"branches": branches, "default": UNRATED}}
+
+
+def facet_pipeline(parts: Dict[str, dict]) -> List[dict]:
+    """One aggregation returning the total and the trade/state/rating-band counts."""
+    return [
+        {"$match": parts["base"]},
+        {"$facet": {
+            "total": [{"$match": combined(parts, "trade", "state", "rating")}, {"$count": "n"}],
+            "trades": [
+                {"$match": combined(parts, "state", "rating")},
+                {"$unwind": "$directory.trades"},
+                {"$group": {"_id": "$directory.trades", "count": {"$sum": 1}}},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": FACET_LIMIT},
+            ],
+            "states": [
+                {"$match": combined(parts, "trade", "rating")},
+                {"$group": {
+                    "_id": "$directory.state", "count": {"$sum": 1},
+                    "label": {"$first": {"$ifNull": ["$state", "$location"]}},
+                }},
+                {"$sort": {"count": -1, "_id": 1}},
+                {"$limit": FACET_LIMIT},
+            ],
+            "rating_bands": [
+                {"$match": combined(parts, "trade", "state")},
+                {"$group": {"_id": _band_expression(), "count": {"$sum": 1}}},
+            ],
+        }},
+    ]
+
+
+def format_facets(row: dict, trade_labels: Dict[str, str]) -> Tuple[int, dict]:
+    """(total, facets) from the ``$facet`` output row."""
+    total = (row.get("total") or [{}])[0].get("n", 0)
+    bands = {label: 0 for label, _, _ in RATING_BANDS}
+    bands[UNRATED] = 0
+    for band in row.get("rating_bands", []):
+        bands[band["_id"]] = band["count"]
+    return total, {
+        "trades": [
+            {"value": t["_id"], "label": trade_labels.get(t["_id"], t["_id"].title()), "count": t["count"]}
+            for t in row.get("trades", []) if t["_id"]
+        ],
+        "states": [
+            {"value": s["_id"], "label": s.get("label") or s["_id"].title(), "count": s["count"]}
+            for s in row.get("states", []) if s["_id"]
+        ],
+        "rating_bands": bands,
+    }
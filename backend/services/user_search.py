@@ -0,0 +1,163 @@
+"""
+Indexed admin user lookup.
+
+Every user document carries a ``search`` subdocument of normalized lookup
+keys, written by ``create_user`` / ``update_user`` and backfilled (together
+with the tradesperson ``directory`` keys) by ``backfill``, which the deploy
+step runs (``python -m backend.tools.release``)::
+
+    "search": {
+        "prefixes": ["ad", "ada", "ok", "oka", "okaf", ...],  # name and skill word prefixes
+        "email": "ada.okafor@example.com",                  # lowercase
+        "phone": "+2348031234567",                          # E.164 via format_nigerian_phone
+    }
+
+The admin console's search box used to OR seven ``$regex`` clauses, most of
+them unanchored, so every keystroke scanned ``users``. ``query_for`` now
+routes the input by its shape to one indexed lookup:
+
+- contains "@": the email, by equality once it looks complete, else by
+  anchored prefix
+- digits (optionally with +, spaces or dashes): a complete Nigerian number
+  is an E.164 phone equality; shorter input is also tried as a
+  ``user_id`` / ``public_id``, alongside an anchored phone prefix
+- a UUID: the ``id`` equality
+- anything else: every word (of two or more characters) must be a stored
+  name/skill prefix. Prefixes are stored up to PREFIX_MAX_LENGTH characters,
+  so each word is an equality match on ``users_search_prefixes_createdAt``
+  and the newest-first order comes straight from the index.
+"""
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+
+try:
+    from ..auth.security import format_nigerian_phone, validate_nigerian_phone
+except ImportError:
+    from auth.security import format_nigerian_phone, validate_nigerian_phone
+
+from . import tradesperson_directory
+
+# Fields the search keys are derived from; updates touching them rebuild the keys
+SOURCE_FIELDS = ("name", "email", "phone", "skills")
+
+PREFIX_MIN_LENGTH = 2
+PREFIX_MAX_LENGTH = 16
+# Numeric inputs this long can only be (partial) phone numbers, not short user ids
+PHONE_ONLY_DIGITS = 8
+
+_WORD = re.compile(r"[a-z0-9]+")
+_UUID = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+_NUMERIC = re.compile(r"^\+?[\d\s\-()]+$")
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[a-z]{2,}$")
+
+
+def words(value: Any) -> List[str]:
+    text = unicodedata.normalize("NFKD", str(value or "")).encode("ascii", "ignore").decode()
+    return _WORD.findall(text.lower())
+
+
+def prefixes(word: str) -> List[str]:
+    return [word[:n] for n in range(PREFIX_MIN_LENGTH, min(len(word), PREFIX_MAX_LENGTH) + 1)]
+
+
+def e164(phone: Any) -> Optional[str]:
+    """The +234 form of a Nigerian number, or None if it isn't one."""
+    if not phone or not validate_nigerian_phone(str(phone)):
+        return None
+    return format_nigerian_phone(str(phone))
+
+
+def _phone_prefix(digits: str) -> str:
+    """Map a partially typed local or international number onto the stored E.164 prefix."""
+    if digits.startswith("234"):
+        return "+" + digits
+    if digits.startswith("0"):
+        return "+234" + digits[1:]
+    return "+234" + digits
+
+
+def search_fields(user: dict) -> dict:
+    """The ``search`` subdocument for a user."""
+    keys = set()
+    skills = user.get("skills") or []
+    for value in [user.get("name")] + (skills if isinstance(skills, list) else [skills]):
+        for word in words(value):
+            keys.update(prefixes(word))
+    return {
+        "prefixes": sorted(keys),
+        "email": (user.get("email") or "").strip().lower() or None,
+        "phone": e164(user.get("phone")),
+    }
+
+
+def touches(fields) -> bool:
+    return any(f.split(".")[0] in SOURCE_FIELDS for f in fields)
+
+
+def key_update(user: dict) -> Optional[dict]:
+    """The update bringing a user's ``search`` and ``directory`` keys up to date, or None if current."""
+    update: Dict[str, dict] = {}
+    search = search_fields(user)
+    if search != user.get("search"):
+        update.setdefault("$set", {})["search"] = search
+    directory = tradesperson_directory.directory_fields(user)
+    if directory != user.get("directory"):
+        if directory:
+            update.setdefault("$set", {})["directory"] = directory
+        else:
+            update["$unset"] = {"directory": ""}
+    return update or None
+
+
+async def backfill(database, apply: bool = False, batch_size: int = 500) -> Tuple[int, int]:
+    """Bring every user's ``search`` and ``directory`` keys up to date. Returns (scanned, stale)."""
+    fields = tradesperson_directory.SOURCE_FIELDS + SOURCE_FIELDS + ("directory", "search")
+    scanned, stale, ops = 0, 0, []
+    async for user in database.users.find({}, {f: 1 for f in fields}).batch_size(batch_size):
+        scanned += 1
+        update = key_update(user)
+        if not update:
+            continue
+        stale += 1
+        if apply:
+            ops.append(UpdateOne({"_id": user["_id"]}, update))
+        if len(ops) >= batch_size:
+            await database.users.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await database.users.bulk_write(ops, ordered=False)
+    return scanned, stale
+
+
+def query_for(search: str) -> Optional[dict]:
+    """The indexed filter clause for an admin search box input, or None if blank."""
+    text = (search or "").strip()
+    if not text:
+        return None
+    lowered = text.lower()
+    if "@" in lowered:
+        if _EMAIL.match(lowered):
+            return {"search.email": lowered}
+        return {"search.email": {"$regex": "^" + re.escape(lowered)}}
+    if _NUMERIC.match(text):
+        digits = re.sub(r"\D", "", text)
+        if not digits:
+            # Only separators ("()", "- "): nothing to look up
+            return None
+        phone = e164(digits)
+        if phone:
+            return {"search.phone": phone}
+        phone_prefix = {"search.phone": {"$regex": "^" + re.escape(_phone_prefix(digits))}}
+        if len(digits) >= PHONE_ONLY_DIGITS or text.startswith("+"):
+            return phone_prefix
+        return {"$or": [{"user_id": digits}, {"public_id": digits}, phone_prefix]}
+    if _UUID.match(lowered):
+        return {"id": lowered}
+    terms = [w[:PREFIX_MAX_LENGTH] for w in words(text) if len(w) >= PREFIX_MIN_LENGTH]
+    if not terms:
+        return None
+    return {"search.prefixes": {"$all": list(dict.fromkeys(terms))}}
@@ -0,0 +1,195 @@
+"""
+Wallet ledger: every balance change is one conditional ``$inc`` on ``wallets``
+paired with one ``wallet_transactions`` entry.
+
+- Debits only match while ``balance_coins >= amount``, so concurrent charges
+  can never drive a wallet negative; there is no read-then-write.
+- Each operation carries an ``idempotency_key`` (unique index on
+  ``wallet_transactions``); replaying it returns the original entry instead of
+  moving coins again.
+- The entry and the balance change are written in one session transaction
+  when the deployment supports it (replica set / mongos). On a standalone
+  server the same steps run without a session, with the entry marked
+  ``applying`` until the balance change has landed so a crash in between is
+  visible to reconciliation.
+"""
+
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+try:
+    from .id_allocator import duplicate_key_field
+except ImportError:
+    from services.id_allocator import duplicate_key_field
+
+logger = logging.getLogger(__name__)
+
+APPLYING = "applying"
+# IllegalOperation: "Transaction numbers are only allowed on a replica set member or mongos"
+_NO_TRANSACTIONS_CODE = 20
+
+_transactions_supported: Optional[bool] = None
+
+
+class InsufficientFunds(Exception):
+    """The wallet balance did not cover a debit; nothing was written."""
+
+
+class _NotPending(Exception):
+    """The funding request was already processed by someone else."""
+
+
+async def _run(client, work: Callable[[Any], Awaitable[Any]]) -> Any:
+    """Run ``work(session)`` in a transaction, or ``work(None)`` where unsupported."""
+    global _transactions_supported
+    if client is not None and _transactions_supported is not False:
+        try:
+            async with await client.start_session() as session:
+                result = await session.with_transaction(work)
+            _transactions_supported = True
+            return result
+        except OperationFailure as e:
+            if e.code != _NO_TRANSACTIONS_CODE:
+                raise
+            _transactions_supported = False
+            logger.warning("MongoDB transactions unavailable; wallet ledger writes run without a session")
+    return await work(None)
+
+
+async def ensure_wallet(database, user_id: str) -> dict:
+    """The user's wallet, created empty on first use (safe under concurrent callers)."""
+    now = datetime.utcnow()
+    try:
+        return await database.wallets.find_one_and_update(
+            {"user_id": user_id},
+            {"$setOnInsert": {"id": str(uuid.uuid4()), "user_id": user_id, "balance_coins": 0,
+                              "created_at": now, "updated_at": now}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+    except DuplicateKeyError:
+        # Lost an upsert race on wallets_user_id_unique; the winner's wallet is there now
+        return await database.wallets.find_one({"user_id": user_id})
+
+
+async def _move(database, user_id: str, delta: int, session) -> Optional[dict]:
+    query: Dict[str, Any] = {"user_id": user_id}
+    if delta < 0:
+        query["balance_coins"] = {"$gte": -delta}
+    return await database.wallets.find_one_and_update(
+        query,
+        {"$inc": {"balance_coins": delta}, "$set": {"updated_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+        session=session,
+    )
+
+
+async def post(
+    client,
+    database,
+    user_id: str,
+    delta: int,
+    idempotency_key: str,
+    entry: dict,
+    then: Optional[Callable[[Any], Awaitable[None]]] = None,
+) -> Tuple[dict, bool]:
+    """Apply ``delta`` coins to ``user_id``'s wallet and record ``entry``.
+
+    Returns ``(entry, applied)``; ``applied`` is False when ``idempotency_key``
+    was already used, in which case the stored entry is returned unchanged.
+    ``then(session)`` runs after the balance change inside the same
+    transaction, for bookkeeping that must commit or roll back with it.
+    Raises ``InsufficientFunds`` if a debit is not covered.
+    """
+    wallet = await ensure_wallet(database, user_id)
+    status = entry.get("status", "confirmed")
+
+    async def work(session):
+        now = datetime.utcnow()
+        doc = dict(entry)
+        doc.update({
+            "id": str(uuid.uuid4()),
+            "wallet_id": wallet["id"],
+            "user_id": user_id,
+            "idempotency_key": idempotency_key,
+            "status": status,
+            "created_at": now,
+            "processed_at": now,
+        })
+        doc.setdefault("amount_coins", abs(delta))
+
+        if session is not None:
+            # A replayed key fails the insert and aborts the whole transaction
+            updated = await _move(database, user_id, delta, session)
+            if updated is None:
+                raise InsufficientFunds(user_id)
+            doc["balance_after"] = updated["balance_coins"]
+            await database.wallet_transactions.insert_one(doc, session=session)
+            if then is not None:
+                await then(session)
+            return doc
+
+        # No transactions: claim the key first, then move coins, then finalise
+        doc["status"] = APPLYING
+        await database.wallet_transactions.insert_one(doc)
+        updated = await _move(database, user_id, delta, None)
+        if updated is None:
+            await database.wallet_transactions.delete_one({"id": doc["id"]})
+            raise InsufficientFunds(user_id)
+        if then is not None:
+            await then(None)
+        doc["status"] = status
+        doc["balance_after"] = updated["balance_coins"]
+        await database.wallet_transactions.update_one(
+            {"id": doc["id"]}, {"$set": {"status": status, "balance_after": doc["balance_after"]}}
+        )
+        return doc
+
+    try:
+        return await _run(client, work), True
+    except DuplicateKeyError as e:
+        if duplicate_key_field(e) != "idempotency_key":
+            raise
+        existing = await database.wallet_transactions.find_one({"idempotency_key": idempotency_key})
+        return existing, False
+
+
+async def settle_pending(client, database, transaction_id: str, updates: dict) -> Optional[dict]:
+    """Confirm a pending credit (e.g. a wallet funding request) exactly once.
+
+    The status flip from ``pending`` is the idempotency guard: only the caller
+    whose conditional update matched credits the wallet. Returns the settled
+    entry, or None if it was missing or already processed.
+    """
+    pending = await database.wallet_transactions.find_one({"id": transaction_id, "status": "pending"})
+    if not pending:
+        return None
+    await ensure_wallet(database, pending["user_id"])
+    status = updates.get("status", "confirmed")
+
+    async def work(session):
+        fields = dict(updates)
+        fields["status"] = status if session else APPLYING
+        txn = await database.wallet_transactions.find_one_and_update(
+            {"id": transaction_id, "status": "pending"},
+            {"$set": fields},
+            return_document=ReturnDocument.AFTER,
+            session=session,
+        )
+        if txn is None:
+            raise _NotPending(transaction_id)
+        updated = await _move(database, txn["user_id"], int(txn["amount_coins"]), session)
+        final = {"status": status, "balance_after": updated["balance_coins"]}
+        await database.wallet_transactions.update_one({"id": transaction_id}, {"$set": final}, session=session)
+        txn.update(final)
+        return txn
+
+    try:
+        return await _run(client, work)
+    except _NotPending:
+        return None
@@ -0,0 +1,94 @@
+"""
+Manage MongoDB indexes from the declarative manifest in backend/index_manifest.py.
+
+Usage:
+    python -m backend.tools.indexes diff                 # show missing / changed / unmanaged indexes
+    python -m backend.tools.indexes verify               # exit 1 if anything declared is missing or changed
+    python -m backend.tools.indexes sync                 # build missing indexes
+    python -m backend.tools.indexes sync --rebuild       # also drop and rebuild changed indexes
+    python -m backend.tools.indexes sync --drop-extra    # also drop indexes not in the manifest
+
+Limit any command to some collections with --collection (repeatable).
+The deploy step (python -m backend.tools.release) runs the same sync.
+The API itself only builds missing unique and text indexes on startup; see index_manifest.
+"""
+import asyncio
+import argparse
+import os
+import sys
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# The CLI does its own index work; keep connect_to_mongo from starting a background check
+os.environ["INDEX_STARTUP_MODE"] = "off"
+
+from backend.database import database
+from backend.index_manifest import INDEXES, diff_indexes, sync_indexes
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Diff, verify or build MongoDB indexes from the manifest")
+    p.add_argument('command', choices=['sync', 'diff', 'verify'])
+    p.add_argument('--collection', action='append', dest='collections', help='Only this collection (repeatable)')
+    p.add_argument('--rebuild', action='store_true', help='sync: drop and rebuild indexes whose definition changed')
+    p.add_argument('--drop-extra', action='store_true', help='sync: drop indexes that are not in the manifest')
+    return p.parse_args()
+
+
+def print_diff(report) -> bool:
+    clean = True
+    for collection, diff in report.items():
+        if not any(diff.values()):
+            continue
+        print(f"{collection}:")
+        for label in ("missing", "changed", "extra"):
+            for name in diff[label]:
+                print(f"  {label:8} {name}")
+        if diff["missing"] or diff["changed"]:
+            clean = False
+    if clean:
+        print("All declared indexes are present.")
+    return clean
+
+
+async def main() -> int:
+    args = parse_args()
+    unknown = [c for c in args.collections or [] if c not in INDEXES]
+    if unknown:
+        print(f"Unknown collection(s): {', '.join(unknown)}")
+        return 2
+
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+
+    try:
+        if args.command == 'sync':
+            summary = await sync_indexes(
+                database.database, args.collections, rebuild=args.rebuild, drop_extra=args.drop_extra
+            )
+            failed = False
+            for collection, outcome in summary.items():
+                for label in ("created", "rebuilt", "dropped", "failed"):
+                    for name in outcome[label]:
+                        print(f"{collection}: {label} {name}")
+                failed = failed or bool(outcome["failed"])
+            report = await diff_indexes(database.database, args.collections)
+            print_diff(report)
+            return 1 if failed else 0
+
+        report = await diff_indexes(database.database, args.collections)
+        clean = print_diff(report)
+        if args.command == 'verify':
+            return 0 if clean else 1
+        return 0
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,59 @@
+"""
+Backfill the job fields denormalized onto interests (services/interest_jobs.py).
+
+Usage:
+    python -m backend.tools.interest_jobs backfill            # dry run: count stale interests
+    python -m backend.tools.interest_jobs backfill --apply    # write them
+
+Interests created, and jobs changed, through the API keep the fields
+current. The deploy step (``python -m backend.tools.release``) runs the
+backfill with --apply, since the "completed jobs" view only lists interests
+that carry ``job_status``; run it by hand after changing job documents
+directly.
+"""
+import asyncio
+import argparse
+import os
+import sys
+import time
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services import interest_jobs
+
+BATCH = 500
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Backfill job fields denormalized onto interests")
+    p.add_argument('command', choices=['backfill'])
+    p.add_argument('--apply', action='store_true', help='write the job fields')
+    return p.parse_args()
+
+
+async def backfill(apply: bool) -> int:
+    started = time.monotonic()
+    scanned, stale = await interest_jobs.backfill(database.database, apply=apply, batch_size=BATCH)
+    print(f"{scanned} interests scanned, {stale} stale, in {time.monotonic() - started:.1f}s")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        return await backfill(args.apply)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,73 @@
+"""
+Backfill job expiry dates and run the expiry sweep by hand.
+
+Usage:
+    python -m backend.tools.job_expiry backfill            # dry run: count jobs without a date expires_at
+    python -m backend.tools.job_expiry backfill --apply    # set them to created_at + 30 days
+    python -m backend.tools.job_expiry sweep               # dry run: count active jobs past expires_at
+    python -m backend.tools.job_expiry sweep --apply       # move them to "expired" now
+
+The deploy step (``python -m backend.tools.release``) runs ``backfill
+--apply`` and then ``sweep --apply`` before the new release serves, so jobs
+with a missing or string ``expires_at`` are dated and jobs already past due
+leave the public listings without waiting for the first background sweep.
+"""
+import asyncio
+import argparse
+import os
+import sys
+from datetime import datetime
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services import job_expiry
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Backfill job expiry dates or sweep expired jobs")
+    p.add_argument('command', choices=['backfill', 'sweep'])
+    p.add_argument('--apply', action='store_true', help='write the changes')
+    p.add_argument('--batch-size', type=int, default=job_expiry.SWEEP_BATCH_SIZE, help='sweep: jobs per update')
+    return p.parse_args()
+
+
+async def backfill(apply: bool) -> int:
+    missing = await job_expiry.backfill(database.database, apply=apply)
+    print(f"{missing} job(s) without a date expires_at")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def sweep(apply: bool, batch_size: int) -> int:
+    if not apply:
+        due = await database.database.jobs.count_documents(
+            {"status": "active", "expires_at": {"$lte": datetime.utcnow()}}
+        )
+        print(f"{due} active job(s) past expires_at")
+        print('Dry run; pass --apply to write.')
+        return 0
+    moved = await job_expiry.sweep(database.database, batch_size=batch_size)
+    print(f"{moved} job(s) moved to expired")
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        if args.command == 'backfill':
+            return await backfill(args.apply)
+        return await sweep(args.apply, args.batch_size)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
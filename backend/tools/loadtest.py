@@ -0,0 +1,343 @@
+"""
+Replay realistic traffic mixes against a running API and report latency percentiles.
+
+Scenarios (weights set the mix; each iteration runs one scenario's request sequence):
+    homepage            stats, categories, featured reviews, first page of jobs
+    browse_jobs         job list pages, category filter, search, nearby, job detail
+    tradesperson_feed   matching jobs feed, my interests, wallet
+    messaging           conversation list, messages, delta sync
+    admin_dashboard     dashboard stats, user list, job statistics
+
+Users come from backend/tools/synthetic_data.py (same email pattern and password).
+Results are grouped by endpoint template with count, errors, throughput and p50/p95/p99.
+
+Usage:
+    python backend/tools/loadtest.py --base-url http://localhost:8001 --duration 60 --concurrency 20
+    python backend/tools/loadtest.py --mix browse_jobs=3,messaging=1 --requests 5000 --json report.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.tools.synthetic_data import DEFAULT_PASSWORD, STATE_CENTERS, synthetic_email
+
+DEFAULT_MIX = {
+    "homepage": 30,
+    "browse_jobs": 35,
+    "tradesperson_feed": 15,
+    "messaging": 15,
+    "admin_dashboard": 5,
+}
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Run load-test scenarios against a ServiceHub API")
+    p.add_argument('--base-url', default=os.getenv('LOADTEST_BASE_URL', 'http://localhost:8001'))
+    p.add_argument('--concurrency', type=int, default=10, help='Concurrent virtual users')
+    p.add_argument('--duration', type=float, default=30, help='Seconds to run (ignored when --requests is set)')
+    p.add_argument('--requests', type=int, default=0, help='Stop after this many HTTP requests')
+    p.add_argument('--mix', default='', help='Scenario weights, e.g. homepage=3,browse_jobs=2 (default: built-in mix)')
+    p.add_argument('--accounts', type=int, default=20, help='Synthetic homeowners/tradespeople to log in as')
+    p.add_argument('--password', default=DEFAULT_PASSWORD)
+    p.add_argument('--admin-token', default=os.getenv('LOADTEST_ADMIN_TOKEN'), help='Bearer token for admin endpoints')
+    p.add_argument('--timeout', type=float, default=15, help='Per-request timeout in seconds')
+    p.add_argument('--seed', type=int, default=7)
+    p.add_argument('--json', dest='json_path', help='Also write the report as JSON to this path')
+    return p.parse_args()
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Thread-safe latency samples per endpoint template."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.total = 0
+
+    def record(self, name: str, elapsed_ms: float, status, ok: bool):
+        with self.lock:
+            self.samples[name].append(elapsed_ms)
+            self.statuses[name][status] += 1
+            self.total += 1
+            if not ok:
+                self.errors[name] += 1
+
+    def report(self, wall_seconds: float) -> dict:
+        rows = []
+        for name in sorted(self.samples):
+            values = sorted(self.samples[name])
+            rows.append({
+                "endpoint": name,
+                "count": len(values),
+                "errors": self.errors[name],
+                "rps": len(values) / wall_seconds if wall_seconds else 0.0,
+                "p50_ms": percentile(values, 50),
+                "p95_ms": percentile(values, 95),
+                "p99_ms": percentile(values, 99),
+                "max_ms": values[-1],
+                "statuses": dict(self.statuses[name]),
+            })
+        every = sorted(v for values in self.samples.values() for v in values)
+        return {
+            "duration_s": wall_seconds,
+            "requests": self.total,
+            "errors": sum(self.errors.values()),
+            "rps": self.total / wall_seconds if wall_seconds else 0.0,
+            "p50_ms": percentile(every, 50),
+            "p95_ms": percentile(every, 95),
+            "p99_ms": percentile(every, 99),
+            "endpoints": rows,
+        }
+
+
+class Client:
+    """One requests.Session per worker thread; every call is timed and recorded."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float, budget):
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.timeout = timeout
+        self.budget = budget
+        self.local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        if not hasattr(self.local, "session"):
+            self.local.session = requests.Session()
+        return self.local.session
+
+    def call(self, method: str, name: str, path: str, token: str = None, **kwargs):
+        if not self.budget.take():
+            raise BudgetExhausted()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        started = time.perf_counter()
+        status, body = "error", None
+        try:
+            response = self.session.request(
+                method, self.base_url + path, headers=headers, timeout=self.timeout, **kwargs
+            )
+            status = response.status_code
+            if response.headers.get("content-type", "").startswith("application/json"):
+                body = response.json()
+        except requests.RequestException:
+            pass
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.recorder.record(f"{method} {name}", elapsed_ms, status, isinstance(status, int) and status < 400)
+        return body
+
+    def get(self, name: str, path: str, token: str = None, **kwargs):
+        return self.call("GET", name, path, token, **kwargs)
+
+
+class Budget:
+    """Stops the run after --requests HTTP calls, or at the deadline when no count is set."""
+
+    def __init__(self, max_requests: int, deadline: float):
+        self.lock = threading.Lock()
+        self.remaining = max_requests
+        self.deadline = deadline
+
+    def take(self) -> bool:
+        if self.remaining or not self.deadline:
+            with self.lock:
+                if self.remaining <= 0:
+                    return False
+                self.remaining -= 1
+                return True
+        return time.monotonic() < self.deadline
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+# -- scenarios -----------------------------------------------------------
+def homepage(client: Client, ctx: dict, rng: random.Random):
+    client.get("/api/stats", "/api/stats")
+    client.get("/api/stats/categories", "/api/stats/categories")
+    client.get("/api/reviews/featured", "/api/reviews/featured", params={"limit": 6})
+    client.get("/api/jobs/", "/api/jobs/", params={"page": 1, "limit": 10})
+
+
+def browse_jobs(client: Client, ctx: dict, rng: random.Random):
+    page = rng.choices([1, 2, 3, 5, 10], weights=[50, 20, 12, 10, 8])[0]
+    body = client.get("/api/jobs/", "/api/jobs/", params={"page": page, "limit": 10})
+    client.get("/api/jobs/search", "/api/jobs/search", params={"category": rng.choice(ctx["categories"]), "limit": 20})
+    if rng.random() < 0.4:
+        client.get("/api/jobs/search", "/api/jobs/search",
+                   params={"q": rng.choice(["repair", "install", "leak", "paint"]), "limit": 20})
+    if rng.random() < 0.3:
+        lat, lng = rng.choice(list(STATE_CENTERS.values()))
+        client.get("/api/jobs/nearby", "/api/jobs/nearby",
+                   params={"latitude": lat, "longitude": lng, "max_distance_km": 25})
+    jobs = (body or {}).get("jobs") or []
+    job_ids = [j.get("id") for j in jobs if j.get("id")] or ctx["job_ids"]
+    if job_ids:
+        client.get("/api/jobs/{job_id}", f"/api/jobs/{rng.choice(job_ids)}")
+
+
+def tradesperson_feed(client: Client, ctx: dict, rng: random.Random):
+    if not ctx["tradespeople"]:
+        return
+    token = rng.choice(ctx["tradespeople"])
+    client.get("/api/jobs/for-tradesperson", "/api/jobs/for-tradesperson", token, params={"skip": 0, "limit": 20})
+    client.get("/api/interests/my-interests", "/api/interests/my-interests", token)
+    if rng.random() < 0.5:
+        client.get("/api/wallet/balance", "/api/wallet/balance", token)
+
+
+def messaging(client: Client, ctx: dict, rng: random.Random):
+    tokens = ctx["homeowners"] + ctx["tradespeople"]
+    if not tokens:
+        return
+    token = rng.choice(tokens)
+    body = client.get("/api/messages/conversations", "/api/messages/conversations", token, params={"limit": 20})
+    conversations = (body or {}).get("conversations") or []
+    if conversations:
+        conversation_id = rng.choice(conversations)["id"]
+        client.get("/api/messages/conversations/{id}/messages",
+                   f"/api/messages/conversations/{conversation_id}/messages", token, params={"limit": 50})
+    # Reconnecting clients resync with a since-token instead of refetching everything
+    sync = client.get("/api/messages/conversations?since", "/api/messages/conversations", token, params={"since": "0"})
+    next_since = (sync or {}).get("next_since")
+    if next_since:
+        client.get("/api/messages/conversations?since", "/api/messages/conversations", token,
+                   params={"since": next_since})
+
+
+def admin_dashboard(client: Client, ctx: dict, rng: random.Random):
+    token = ctx["admin_token"]
+    client.get("/api/admin/dashboard/stats", "/api/admin/dashboard/stats", token)
+    client.get("/api/admin/users", "/api/admin/users", token,
+               params={"skip": rng.choice([0, 0, 50, 100]), "limit": 50,
+                       "role": rng.choice([None, "homeowner", "tradesperson"])})
+    client.get("/api/admin/jobs/statistics", "/api/admin/jobs/statistics", token)
+
+
+SCENARIOS = {
+    "homepage": homepage,
+    "browse_jobs": browse_jobs,
+    "tradesperson_feed": tradesperson_feed,
+    "messaging": messaging,
+    "admin_dashboard": admin_dashboard,
+}
+
+
+def parse_mix(spec: str) -> dict:
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Choose from: {', '.join(SCENARIOS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def login(base_url: str, email: str, password: str, timeout: float):
+    try:
+        response = requests.post(f"{base_url}/api/auth/login", json={"email": email, "password": password},
+                                 timeout=timeout)
+    except requests.RequestException:
+        return None
+    return response.json().get("access_token") if response.status_code == 200 else None
+
+
+def prepare(args) -> dict:
+    """Log in synthetic users and collect ids the scenarios draw from (not timed)."""
+    base_url = args.base_url.rstrip("/")
+    ctx = {"homeowners": [], "tradespeople": [], "admin_token": args.admin_token, "job_ids": [], "categories": []}
+    for role, key in (("homeowner", "homeowners"), ("tradesperson", "tradespeople")):
+        for index in range(args.accounts):
+            token = login(base_url, synthetic_email(role, index), args.password, args.timeout)
+            if token:
+                ctx[key].append(token)
+    try:
+        response = requests.get(f"{base_url}/api/jobs/", params={"limit": 50}, timeout=args.timeout)
+        jobs = response.json().get("jobs") or []
+        ctx["job_ids"] = [j["id"] for j in jobs if j.get("id")]
+        ctx["categories"] = sorted({j["category"] for j in jobs if j.get("category")})
+    except (requests.RequestException, ValueError):
+        pass
+    ctx["categories"] = ctx["categories"] or ["Plumbing"]
+    return ctx
+
+
+def worker(client: Client, ctx: dict, mix: dict, seed: int):
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    while True:
+        scenario = SCENARIOS[rng.choices(names, weights=weights)[0]]
+        try:
+            scenario(client, ctx, rng)
+        except BudgetExhausted:
+            return
+
+
+def print_report(report: dict):
+    header = f"{'endpoint':58} {'count':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+    print(header)
+    print("-" * len(header))
+    for row in report["endpoints"]:
+        print(f"{row['endpoint'][:58]:58} {row['count']:>7} {row['errors']:>5} {row['rps']:>8.1f} "
+              f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}")
+    print("-" * len(header))
+    print(f"{'TOTAL':58} {report['requests']:>7} {report['errors']:>5} {report['rps']:>8.1f} "
+          f"{report['p50_ms']:>8.1f} {report['p95_ms']:>8.1f} {report['p99_ms']:>8.1f}")
+    print(f"Latencies in ms over {report['duration_s']:.1f}s")
+
+
+def main():
+    args = parse_args()
+    mix = parse_mix(args.mix)
+    ctx = prepare(args)
+    print(f"Logged in {len(ctx['homeowners'])} homeowners and {len(ctx['tradespeople'])} tradespeople; "
+          f"running {args.concurrency} workers against {args.base_url}")
+    if not ctx["homeowners"] and not ctx["tradespeople"]:
+        print("No synthetic accounts could log in; authenticated scenarios will be skipped. "
+              "Seed data with backend/tools/synthetic_data.py --apply")
+
+    recorder = Recorder()
+    deadline = 0 if args.requests else time.monotonic() + args.duration
+    client = Client(args.base_url, recorder, args.timeout, Budget(args.requests, deadline))
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        for i in range(args.concurrency):
+            pool.submit(worker, client, ctx, mix, args.seed + i)
+    report = recorder.report(time.monotonic() - started)
+    report["mix"] = mix
+    report["concurrency"] = args.concurrency
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote {args.json_path}")
+
+
+if __name__ == '__main__':
+    main()
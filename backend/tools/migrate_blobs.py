@@ -0,0 +1,119 @@
+"""
+Move base64 payloads embedded in Mongo documents into the content-addressed blob store.
+
+Sources:
+    tradespeople_verifications.documents_base64 / work_photos_base64 / partner_id_documents_base64
+    wallet_transactions.proof_image_base64
+    user_verifications.document_image_base64
+
+Each payload is written once per SHA-256 digest via services.blob_store, a ``blobs``
+metadata record is upserted, and the embedded field is $unset from the source document.
+
+Usage:
+    python backend/tools/migrate_blobs.py --dry-run
+    python backend/tools/migrate_blobs.py --apply
+    python backend/tools/migrate_blobs.py --apply --keep-source
+
+By default the script runs a dry-run and prints counts. Use --apply to write blobs and
+--keep-source to leave the embedded base64 in place after copying.
+"""
+import asyncio
+import argparse
+import base64
+import os
+import sys
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services.blob_store import blob_store
+
+VERIFICATION_ARRAYS = ("documents_base64", "work_photos_base64", "partner_id_documents_base64")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Extract embedded base64 files into the blob store")
+    p.add_argument('--apply', action='store_true', help='Write blobs and update source documents')
+    p.add_argument('--keep-source', action='store_true', help='Do not $unset embedded base64 after copying')
+    p.add_argument('--limit', type=int, default=0,
+                   help='Limit number of source documents per collection (0 = no limit)')
+    return p.parse_args()
+
+
+def decode(b64: str) -> bytes:
+    return base64.b64decode(b64.split(",")[-1])
+
+
+async def migrate_tradespeople_verifications(args, stats):
+    coll = database.tradespeople_verifications_collection
+    query = {"$or": [{f"{key}.0": {"$exists": True}} for key in VERIFICATION_ARRAYS]}
+    projection = {"_id": 1, "user_id": 1, **{key: 1 for key in VERIFICATION_ARRAYS}}
+    cursor = coll.find(query, projection)
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+    async for v in cursor:
+        stats["tradespeople_verifications"] += 1
+        for key in VERIFICATION_ARRAYS:
+            for item in v.get(key) or []:
+                if not item or not item.get("filename") or not item.get("base64"):
+                    continue
+                stats["files"] += 1
+                if args.apply:
+                    await blob_store.put(
+                        "tradespeople_verifications",
+                        item["filename"],
+                        decode(item["base64"]),
+                        item.get("content_type"),
+                        owner_id=v.get("user_id"),
+                    )
+        if args.apply and not args.keep_source:
+            await coll.update_one({"_id": v["_id"]}, {"$unset": {key: "" for key in VERIFICATION_ARRAYS}})
+
+
+async def migrate_single_field(args, stats, coll, field, filename_field, namespace, content_type):
+    cursor = coll.find({field: {"$type": "string"}}, {"_id": 1, "user_id": 1, field: 1, filename_field: 1})
+    if args.limit:
+        cursor = cursor.limit(args.limit)
+    async for doc in cursor:
+        stats[coll.name] += 1
+        filename = doc.get(filename_field)
+        if not filename:
+            continue
+        stats["files"] += 1
+        if args.apply:
+            await blob_store.put(namespace, filename, decode(doc[field]), content_type, owner_id=doc.get("user_id"))
+            if not args.keep_source:
+                await coll.update_one({"_id": doc["_id"]}, {"$unset": {field: ""}})
+
+
+async def main():
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return
+
+    stats = {"tradespeople_verifications": 0, "wallet_transactions": 0, "user_verifications": 0, "files": 0}
+    await migrate_tradespeople_verifications(args, stats)
+    await migrate_single_field(
+        args, stats, database.wallet_transactions_collection,
+        "proof_image_base64", "proof_image", "payment_proofs", "image/jpeg",
+    )
+    await migrate_single_field(
+        args, stats, database.user_verifications_collection,
+        "document_image_base64", "document_url", "verification_documents", "image/jpeg",
+    )
+
+    print(f"Backend: {blob_store.backend.name}")
+    for k, v in stats.items():
+        print(f"- {k}: {v}")
+    if not args.apply:
+        print('\nDry-run only. To copy files into the blob store run with --apply.')
+    await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
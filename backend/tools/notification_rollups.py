@@ -0,0 +1,117 @@
+"""
+Backfill the hourly notification_rollups buckets, or benchmark reports on them.
+
+Usage:
+    python -m backend.tools.notification_rollups backfill                       # dry run: count buckets
+    python -m backend.tools.notification_rollups backfill --apply               # rebuild every bucket
+    python -m backend.tools.notification_rollups backfill --since 2024-06-01 --apply
+    python -m backend.tools.notification_rollups bench --days 90 --repeat 5
+
+``bench`` times the admin delivery report (counts by type, channel and status)
+for the last --days both ways: the aggregation over raw notifications it used
+to run, and the bucket query it runs now. It also checks both return the same
+counts, so it doubles as a drift check. Generate volume first with
+``backend/tools/synthetic_data.py --apply`` followed by a backfill.
+"""
+import asyncio
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services import notification_rollups
+
+DIMENSIONS = ("type", "channel", "status")
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Backfill or benchmark notification_rollups")
+    p.add_argument('command', choices=['backfill', 'bench'])
+    p.add_argument('--since', type=datetime.fromisoformat, help='backfill: only rebuild hours from this date')
+    p.add_argument('--apply', action='store_true', help='backfill: write the rebuilt buckets')
+    p.add_argument('--days', type=int, default=90, help='bench: report window ending now (default 90)')
+    p.add_argument('--repeat', type=int, default=5, help='bench: timed runs per variant (default 5)')
+    return p.parse_args()
+
+
+async def backfill(since, apply: bool) -> int:
+    started = time.monotonic()
+    buckets = await notification_rollups.rebuild(database.database, since=since, apply=apply)
+    scope = f"since {since:%Y-%m-%d %H:00}" if since else "all hours"
+    print(f"{buckets} buckets ({scope}) derived in {time.monotonic() - started:.1f}s")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def raw_report(date_from: datetime, date_to: datetime) -> dict:
+    pipeline = [
+        {"$match": {"created_at": {"$gte": date_from, "$lte": date_to}}},
+        {"$group": {"_id": {d: f"${d}" for d in DIMENSIONS}, "count": {"$sum": 1}}},
+    ]
+    return {
+        tuple(str(row["_id"].get(d)) for d in DIMENSIONS): row["count"]
+        async for row in database.database.notifications.aggregate(pipeline)
+    }
+
+
+async def rollup_report(date_from: datetime, date_to: datetime) -> dict:
+    return await notification_rollups.counts(database.database, DIMENSIONS, date_from=date_from, date_to=date_to)
+
+
+async def timed(fn, repeat: int, *args):
+    timings, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = await fn(*args)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings, result
+
+
+async def bench(days: int, repeat: int) -> int:
+    date_to = datetime.utcnow()
+    date_from = date_to - timedelta(days=days)
+    window = {"$gte": date_from, "$lte": date_to}
+    raw_docs = await database.database.notifications.count_documents({"created_at": window})
+    bucket_docs = await database.database.notification_rollups.count_documents({"hour": window})
+    print(f"{days}-day window: {raw_docs} notifications, {bucket_docs} hourly buckets")
+
+    raw_ms, raw = await timed(raw_report, repeat, date_from, date_to)
+    rollup_ms, rollup = await timed(rollup_report, repeat, date_from, date_to)
+    for name, ms in (("raw", raw_ms), ("rollup", rollup_ms)):
+        print(f"  {name:7} median {statistics.median(ms):9.1f} ms   min {min(ms):9.1f} ms   ({repeat} runs)")
+    print(f"  speedup x{statistics.median(raw_ms) / max(statistics.median(rollup_ms), 1e-6):.1f}")
+
+    drift = sorted(k for k in set(raw) | set(rollup) if raw.get(k, 0) != rollup.get(k, 0))
+    for key in drift:
+        print(f"  drift {'/'.join(key):60} raw={raw.get(key, 0):>8} rollup={rollup.get(key, 0):>8}")
+    if drift:
+        print(f"{len(drift)} group(s) differ; run 'backfill --apply'")
+        return 1
+    print("Reports match.")
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        if args.command == 'backfill':
+            return await backfill(args.since, args.apply)
+        return await bench(args.days, args.repeat)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
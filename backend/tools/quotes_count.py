@@ -0,0 +1,78 @@
+"""
+Reconcile ``jobs.quotes_count`` with the quotes collection.
+
+Usage:
+    python -m backend.tools.quotes_count reconcile            # dry run: count jobs whose counter is off
+    python -m backend.tools.quotes_count reconcile --apply    # rewrite those counters
+
+``create_quote`` keeps the counter current and the quoting feed filters on it
+(``Database.get_jobs_for_quoting``). Run this once when deploying that, since
+older jobs may have no counter or a stale one, and again after deleting quotes
+by hand.
+"""
+import asyncio
+import argparse
+import os
+import sys
+import time
+
+from pymongo import UpdateOne
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+
+BATCH = 500
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Reconcile job quote counters with the quotes collection")
+    p.add_argument('command', choices=['reconcile'])
+    p.add_argument('--apply', action='store_true', help='write the corrected counters')
+    return p.parse_args()
+
+
+async def reconcile(apply: bool) -> int:
+    started = time.monotonic()
+    db = database.database
+    counts = {
+        row["_id"]: row["count"]
+        async for row in db.quotes.aggregate([{"$group": {"_id": "$job_id", "count": {"$sum": 1}}}])
+    }
+    scanned, stale, ops = 0, 0, []
+    async for job in db.jobs.find({}, {"id": 1, "quotes_count": 1}):
+        scanned += 1
+        actual = counts.get(job.get("id"), 0)
+        if job.get("quotes_count") == actual:
+            continue
+        stale += 1
+        if not apply:
+            continue
+        ops.append(UpdateOne({"_id": job["_id"]}, {"$set": {"quotes_count": actual}}))
+        if len(ops) >= BATCH:
+            await db.jobs.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        await db.jobs.bulk_write(ops, ordered=False)
+    print(f"{scanned} jobs scanned, {stale} with a wrong quotes_count, in {time.monotonic() - started:.1f}s")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        return await reconcile(args.apply)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
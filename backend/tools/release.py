@@ -0,0 +1,116 @@
+"""
+Deploy-time data steps, run once before a new release starts serving.
+
+Usage:
+    python -m backend.tools.release
+
+Steps, in order:
+    1. drop retired indexes and build missing ones from the manifest
+       (as ``tools/indexes.py sync``)
+    2. bring users' search and directory keys up to date
+       (as ``tools/user_search_keys.py backfill --apply``)
+    3. give jobs without a date expires_at one, then expire jobs already past it
+       (as ``tools/job_expiry.py backfill --apply`` and ``sweep --apply``)
+    4. copy job fields onto interests that lack them
+       (as ``tools/interest_jobs.py backfill --apply``)
+
+Every step runs even if an earlier one failed. The exit status is 1 if any
+did, and 3 (BLOCKED) if a unique or text index could not be built, e.g. over
+duplicate data: the duplicate keys are printed and the release must not
+serve, since writes would stop rejecting duplicates. backend/Dockerfile,
+start.sh and railway.toml (preDeployCommand) run it; the first two start the
+server after a status of 1 but not after 3.
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# This tool does the index work itself; keep connect_to_mongo from starting a background check
+os.environ["INDEX_STARTUP_MODE"] = "off"
+
+from backend.database import database
+from backend.index_manifest import INDEXES, duplicate_keys, required, sync_indexes
+from backend.services import interest_jobs, job_expiry, user_search
+
+
+FAILED = 1
+BLOCKED = 3
+
+
+async def sync_all_indexes() -> int:
+    summary = await sync_indexes(database.database)
+    created = sum(len(o["created"]) for o in summary.values())
+    dropped = [f"{c}.{name}" for c, o in summary.items() for name in o["dropped"]]
+    failed = [(c, name) for c, o in summary.items() for name in o["failed"]]
+    print(f"indexes: {created} created"
+          + (f", retired: {', '.join(dropped)}" if dropped else "")
+          + (f", failed: {', '.join(f'{c}.{name}' for c, name in failed)}" if failed else ""))
+    status = FAILED if failed else 0
+    for collection, name in failed:
+        spec = next(s for s in INDEXES[collection] if s["name"] == name)
+        if not required(spec):
+            continue
+        status = BLOCKED
+        print(f"indexes: required index {collection}.{name} is missing; fix the data and redeploy")
+        if spec.get("unique"):
+            for dup in await duplicate_keys(database.database, collection, name):
+                print(f"  duplicate {dup['key']}: {dup['count']} documents")
+    return status
+
+
+async def backfill_user_keys() -> int:
+    scanned, stale = await user_search.backfill(database.database, apply=True)
+    print(f"user search keys: {scanned} users scanned, {stale} updated")
+    return 0
+
+
+async def expire_jobs() -> int:
+    # Listings no longer filter on expires_at themselves, so undated jobs must get one before traffic
+    missing = await job_expiry.backfill(database.database, apply=True)
+    moved = await job_expiry.sweep(database.database)
+    print(f"job expiry: {missing} job(s) dated, {moved} moved to expired")
+    return 0
+
+
+async def backfill_interest_jobs() -> int:
+    scanned, stale = await interest_jobs.backfill(database.database, apply=True)
+    print(f"interest job fields: {scanned} interests scanned, {stale} updated")
+    return 0
+
+
+STEPS = (
+    ("indexes", sync_all_indexes),
+    ("user search keys", backfill_user_keys),
+    ("job expiry", expire_jobs),
+    ("interest job fields", backfill_interest_jobs),
+)
+
+
+async def main() -> int:
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    status = 0
+    try:
+        for name, step in STEPS:
+            started = time.monotonic()
+            try:
+                status = max(status, await step())
+            except Exception as e:
+                print(f"{name}: failed: {e}")
+                status = max(status, FAILED)
+            print(f"{name}: {time.monotonic() - started:.1f}s")
+        return status
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,76 @@
+"""
+Rebuild or inspect the daily rollups in the stats_counters collection.
+
+Usage:
+    python -m backend.tools.stats_counters rebuild            # dry run: recompute and compare with stored totals
+    python -m backend.tools.stats_counters rebuild --apply    # replace the stored rollups with the recomputed ones
+    python -m backend.tools.stats_counters show jobs.status.  # current totals for metrics under a prefix
+
+Run a rebuild once after deploying the counters (backfill) and whenever the
+dashboards drift from the source collections, e.g. after bulk deletes.
+"""
+import asyncio
+import argparse
+import os
+import sys
+from collections import defaultdict
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services import stats_counters
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Rebuild or inspect stats_counters daily rollups")
+    p.add_argument('command', choices=['rebuild', 'show'])
+    p.add_argument('prefix', nargs='?', default='', help='show: metric prefix, e.g. jobs.status.')
+    p.add_argument('--apply', action='store_true', help='rebuild: write the recomputed rollups')
+    p.add_argument('--batch-size', type=int, default=1000)
+    return p.parse_args()
+
+
+async def rebuild(apply: bool, batch_size: int) -> int:
+    before = await stats_counters.totals(database.database, stats_counters.FAMILIES)
+    values = await stats_counters.rebuild(
+        database.database, apply=apply, batch_size=batch_size,
+        progress=lambda collection, count: print(f"scanned {collection}: {count}"),
+    )
+    after = defaultdict(int)
+    for (metric, _), value in values.items():
+        after[metric] += value
+
+    drift = sorted(m for m in set(before) | set(after) if before.get(m, 0) != after.get(m, 0))
+    for metric in drift:
+        print(f"  {metric:50} stored={before.get(metric, 0):>10} recomputed={after.get(metric, 0):>10}")
+    print(f"{len(values)} rollup rows, {len(drift)} metric(s) differ from the stored totals")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def show(prefix: str) -> int:
+    totals = await stats_counters.totals(database.database, [prefix] if prefix else stats_counters.FAMILIES)
+    for metric in sorted(totals):
+        print(f"{metric:50} {totals[metric]:>10}")
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        if args.command == 'rebuild':
+            return await rebuild(args.apply, args.batch_size)
+        return await show(args.prefix)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,542 @@
+"""
+Bulk-load scalable synthetic data for load testing and query-plan checks.
+
+Generates linked users, jobs, interests, conversations/messages, reviews, wallets,
+wallet transactions and notifications with skewed, marketplace-like distributions:
+
+- users sign up over --days with growth towards the present; ~70% homeowners
+- states are weighted by market size, with LGAs and zip codes from models/nigerian_lgas.py
+- a few heavy homeowners post most jobs (Pareto) and categories follow a Zipf curve
+- interest counts per job, message counts per conversation and ratings are long-tailed
+- wallet balances equal confirmed funding minus access fees actually paid
+- notifications follow the events above (job posted, new interest, contact shared,
+  funding confirmed) with a mostly-delivered status mix; notification_rollups are
+  not written, run ``python -m backend.tools.notification_rollups backfill --apply``
+- the derived data the app maintains on its write paths is written too: users'
+  ``search`` / ``directory`` keys, the job fields on interests, every synthetic
+  tradesperson's ``job_feeds``, and (rebuilt after loading) ``stats_counters``
+
+Every document carries ``synthetic: True`` so the whole set can be purged.
+Synthetic users log in with --password (see synthetic_email for the address pattern).
+
+Usage:
+    python backend/tools/synthetic_data.py --users 2000                 # dry-run: print counts
+    python backend/tools/synthetic_data.py --users 20000 --jobs 100000 --apply
+    python backend/tools/synthetic_data.py --purge --apply
+"""
+import asyncio
+import argparse
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.auth.security import get_password_hash
+from backend.models.nigerian_lgas import NIGERIAN_LGAS, LGA_ZIP_CODES
+from backend.models.trade_categories import NIGERIAN_TRADE_CATEGORIES
+from backend.services import interest_jobs, job_feeds, stats_counters, tradesperson_directory, user_search
+
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.servicehub.test"
+DEFAULT_PASSWORD = "LoadTest#2024"
+
+COLLECTIONS = ("users", "jobs", "interests", "conversations", "messages", "reviews", "wallets", "wallet_transactions",
+               "notifications")
+
+# Relative market size per state
+STATE_WEIGHTS = {
+    "Lagos": 35, "Abuja": 18, "Rivers State": 12, "Delta": 8,
+    "Benin": 8, "Enugu": 8, "Cross Rivers": 6, "Bayelsa": 5,
+}
+# Approximate state capital coordinates, jittered per job
+STATE_CENTERS = {
+    "Lagos": (6.5244, 3.3792), "Abuja": (9.0765, 7.3986), "Rivers State": (4.8156, 7.0498),
+    "Delta": (6.2000, 6.7333), "Benin": (6.3350, 5.6037), "Enugu": (6.4584, 7.5464),
+    "Cross Rivers": (4.9757, 8.3417), "Bayelsa": (4.9267, 6.2676),
+}
+JOB_STATUS_WEIGHTS = {
+    "active": 55, "completed": 17, "in_progress": 10, "pending_approval": 8, "cancelled": 7, "expired": 3,
+}
+INTEREST_COUNT_WEIGHTS = {0: 15, 1: 22, 2: 20, 3: 15, 4: 12, 6: 10, 9: 6}
+INTEREST_STATUS_WEIGHTS = {"interested": 60, "contact_shared": 25, "paid_access": 15}
+RATING_WEIGHTS = {5: 50, 4: 33, 3: 10, 2: 4, 1: 3}
+FUNDING_STATUS_WEIGHTS = {"confirmed": 80, "pending": 12, "rejected": 8}
+NOTIFICATION_STATUS_WEIGHTS = {"delivered": 45, "sent": 30, "read": 15, "failed": 6, "pending": 4}
+NOTIFICATION_CHANNEL_WEIGHTS = {"email": 50, "both": 35, "sms": 15}
+TITLE_VERBS = ["Install", "Repair", "Replace", "Fix", "Service", "Upgrade", "Renovate", "Inspect"]
+JOB_LIFETIME_DAYS = 30
+
+
+def synthetic_email(role: str, index: int) -> str:
+    return f"{role}{index}@{SYNTHETIC_EMAIL_DOMAIN}"
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Bulk-load synthetic ServiceHub data")
+    p.add_argument('--users', type=int, default=2000, help='Number of users (default 2000)')
+    p.add_argument('--jobs', type=int, default=0, help='Number of jobs (default 3x users)')
+    p.add_argument('--homeowner-share', type=float, default=0.7, help='Fraction of users who are homeowners')
+    p.add_argument('--days', type=int, default=365, help='History window in days')
+    p.add_argument('--seed', type=int, default=42, help='Random seed for reproducible datasets')
+    p.add_argument('--batch-size', type=int, default=1000, help='Documents per insert_many')
+    p.add_argument('--password', default=DEFAULT_PASSWORD, help='Password for every synthetic user')
+    p.add_argument('--apply', action='store_true', help='Write to the database (default: dry-run counts only)')
+    p.add_argument('--purge', action='store_true', help='Delete previously generated synthetic documents')
+    return p.parse_args()
+
+
+def weighted(rng: random.Random, weights: dict):
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+class BatchWriter:
+    """Buffers documents per collection and writes them with insert_many."""
+
+    def __init__(self, db, apply: bool, batch_size: int):
+        self.db = db
+        self.apply = apply
+        self.batch_size = batch_size
+        self.buffers = defaultdict(list)
+        self.counts = Counter()
+
+    async def add(self, collection: str, doc: dict):
+        doc["synthetic"] = True
+        buffer = self.buffers[collection]
+        buffer.append(doc)
+        self.counts[collection] += 1
+        if len(buffer) >= self.batch_size:
+            await self.flush(collection)
+
+    async def flush(self, collection: str = None):
+        for name in [collection] if collection else list(self.buffers):
+            buffer = self.buffers[name]
+            if buffer and self.apply:
+                await self.db[name].insert_many(buffer, ordered=False)
+            self.buffers[name] = []
+
+
+class Generator:
+    def __init__(self, args, writer: BatchWriter):
+        self.args = args
+        self.writer = writer
+        self.rng = random.Random(args.seed)
+        self.now = datetime.utcnow()
+        self.password_hash = get_password_hash(args.password) if args.apply else ""
+        self.homeowners = []
+        self.tradespeople = []
+        self.by_category = defaultdict(list)
+        self.category_weights = [1 / (rank + 1) for rank in range(len(NIGERIAN_TRADE_CATEGORIES))]
+
+    # -- helpers -------------------------------------------------------
+    def new_id(self) -> str:
+        # Drawn from the seeded RNG so the same --seed reproduces the same ids
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def ago(self, days: float) -> datetime:
+        return self.now - timedelta(days=days)
+
+    def signup_time(self) -> datetime:
+        # Skewed towards recent signups (a growing platform)
+        return self.ago(self.args.days * (self.rng.random() ** 1.8))
+
+    def after(self, start: datetime, mean_hours: float) -> datetime:
+        return min(self.now, start + timedelta(hours=self.rng.expovariate(1 / mean_hours)))
+
+    def place(self) -> dict:
+        state = weighted(self.rng, STATE_WEIGHTS)
+        lga = self.rng.choice(NIGERIAN_LGAS[state])
+        state_zips = LGA_ZIP_CODES.get(state, {})
+        zips = state_zips.get(lga) or [z for codes in state_zips.values() for z in codes]
+        lat, lng = STATE_CENTERS[state]
+        return {
+            "state": state,
+            "lga": lga,
+            "zip_code": self.rng.choice(zips) if zips else None,
+            "latitude": round(lat + self.rng.gauss(0, 0.08), 6),
+            "longitude": round(lng + self.rng.gauss(0, 0.08), 6),
+        }
+
+    async def notify(self, user: dict, notification_type: str, created: datetime, **metadata):
+        status = weighted(self.rng, NOTIFICATION_STATUS_WEIGHTS)
+        notification_id = self.new_id()
+        await self.writer.add("notifications", {
+            "_id": notification_id,
+            "id": notification_id,
+            "user_id": user["id"],
+            "type": notification_type,
+            "channel": weighted(self.rng, NOTIFICATION_CHANNEL_WEIGHTS),
+            "recipient_email": user["email"],
+            "recipient_phone": user["phone"],
+            "subject": notification_type.replace("_", " ").title(),
+            "content": "",
+            "status": status,
+            "metadata": metadata,
+            "created_at": created,
+            "updated_at": created,
+            "sent_at": created if status in ("sent", "delivered", "read") else None,
+        })
+
+    # -- users ---------------------------------------------------------
+    def build_users(self):
+        n_homeowners = int(self.args.users * self.args.homeowner_share)
+        for i in range(self.args.users):
+            role = "homeowner" if i < n_homeowners else "tradesperson"
+            index = i if role == "homeowner" else i - n_homeowners
+            where = self.place()
+            user = {
+                "id": self.new_id(),
+                "user_id": f"SYN{i:07d}",
+                "public_id": f"SYN{i:07d}",
+                "name": f"Synthetic {role.title()} {index}",
+                "email": synthetic_email(role, index),
+                "phone": f"+23480{i:08d}",
+                "password_hash": self.password_hash,
+                "role": role,
+                "status": "active" if self.rng.random() > 0.02 else "suspended",
+                "location": where["state"],
+                "state": where["state"],
+                "lga": where["lga"],
+                "postcode": where["zip_code"],
+                "latitude": where["latitude"],
+                "longitude": where["longitude"],
+                "email_verified": True,
+                "phone_verified": self.rng.random() < 0.8,
+                "created_at": self.signup_time(),
+            }
+            user["updated_at"] = user["created_at"]
+            user["last_login"] = self.after(user["created_at"], 24 * 20)
+            if role == "homeowner":
+                user["_job_weight"] = self.rng.paretovariate(1.2)
+                self.homeowners.append(user)
+            else:
+                k = self.rng.choices([1, 2, 3], weights=[50, 35, 15])[0]
+                categories = set()
+                while len(categories) < k:
+                    categories.add(self.rng.choices(NIGERIAN_TRADE_CATEGORIES, weights=self.category_weights)[0])
+                user.update({
+                    "trade_categories": sorted(categories),
+                    "experience_years": self.rng.randint(1, 25),
+                    "company_name": f"{user['name']} Services",
+                    "verification_status": self.rng.choices(["verified", "pending", "unverified"], [60, 15, 25])[0],
+                    "_ratings": [],
+                    "_balance": 0,
+                    "_wallet_id": self.new_id(),
+                })
+                self.tradespeople.append(user)
+                for category in categories:
+                    self.by_category[category].append(user)
+
+    # -- jobs and everything hanging off them --------------------------
+    async def build_jobs(self):
+        n_jobs = self.args.jobs or self.args.users * 3
+        owners = self.rng.choices(self.homeowners, weights=[h["_job_weight"] for h in self.homeowners], k=n_jobs)
+        for owner in owners:
+            category = self.rng.choices(NIGERIAN_TRADE_CATEGORIES, weights=self.category_weights)[0]
+            created = max(self.signup_time(), owner["created_at"] + timedelta(hours=1))
+            created = min(created, self.now)
+            status = weighted(self.rng, JOB_STATUS_WEIGHTS)
+            fee_coins = self.rng.choice([10, 10, 15, 20, 25])
+            budget_min = self.rng.choice([5, 10, 20, 50, 100, 250]) * 1000
+            if self.rng.random() < 0.3:
+                where = self.place()
+            else:
+                where = {k: owner[k] for k in ("state", "lga", "latitude", "longitude")}
+                where["zip_code"] = owner["postcode"]
+            job = {
+                "id": self.new_id(),
+                "title": f"{self.rng.choice(TITLE_VERBS)} {category.lower()} in {where['lga']}",
+                "description": (f"Looking for an experienced {category.lower()} professional "
+                                f"in {where['lga']}, {where['state']}."),
+                "category": category,
+                "state": where["state"],
+                "lga": where["lga"],
+                "town": where["lga"],
+                "zip_code": where["zip_code"],
+                "location": where["state"],
+                "postcode": where["zip_code"],
+                "latitude": where["latitude"],
+                "longitude": where["longitude"],
+                "budget_min": budget_min,
+                "budget_max": budget_min * self.rng.choice([2, 3, 5]),
+                "timeline": self.rng.choice(["ASAP", "Within a week", "Within a month", "Flexible"]),
+                "homeowner_id": owner["id"],
+                "homeowner": {k: owner[k] for k in ("id", "name", "email", "phone")},
+                "status": status,
+                "access_fee_coins": fee_coins,
+                "access_fee_naira": fee_coins * 100,
+                "created_at": created,
+                "updated_at": created,
+                "expires_at": created + timedelta(days=JOB_LIFETIME_DAYS),
+            }
+            interests = []
+            if status in ("active", "in_progress", "completed", "expired"):
+                interests = await self.build_interests(job, owner)
+            job["interests_count"] = len(interests)
+            job["quotes_count"] = 0
+            await self.writer.add("jobs", job)
+            await self.notify(owner, "job_posted", created, job_id=job["id"])
+
+    async def build_interests(self, job: dict, owner: dict):
+        pool = self.by_category.get(job["category"]) or self.tradespeople
+        count = min(len(pool), weighted(self.rng, INTEREST_COUNT_WEIGHTS))
+        chosen = self.rng.sample(pool, count)
+        hired = chosen[0] if chosen and job["status"] in ("in_progress", "completed") else None
+        interests = []
+        for tp in chosen:
+            created = self.after(job["created_at"], 18)
+            status = "paid_access" if tp is hired else weighted(self.rng, INTEREST_STATUS_WEIGHTS)
+            interest = {
+                "id": self.new_id(),
+                "job_id": job["id"],
+                "tradesperson_id": tp["id"],
+                "status": status,
+                "created_at": created,
+                "updated_at": created,
+                **interest_jobs.snapshot(job),
+            }
+            if status in ("contact_shared", "paid_access"):
+                interest["contact_shared_at"] = self.after(created, 12)
+            if status == "paid_access":
+                interest["payment_made_at"] = self.after(interest["contact_shared_at"], 6)
+                interest["access_fee"] = job["access_fee_naira"]
+                tp["_balance"] -= job["access_fee_coins"]
+                await self.writer.add("wallet_transactions", {
+                    "id": self.new_id(),
+                    "wallet_id": tp["_wallet_id"],
+                    "user_id": tp["id"],
+                    "transaction_type": "access_fee_deduction",
+                    "amount_coins": job["access_fee_coins"],
+                    "amount_naira": job["access_fee_naira"],
+                    "status": "confirmed",
+                    "description": f"Access fee for job: {job['title']}",
+                    "job_id": job["id"],
+                    "created_at": interest["payment_made_at"],
+                    "processed_at": interest["payment_made_at"],
+                })
+            if status == "paid_access" or (status == "contact_shared" and self.rng.random() < 0.5):
+                await self.build_conversation(job, owner, tp, interest.get("contact_shared_at") or created)
+            if tp is hired and job["status"] == "completed" and self.rng.random() < 0.7:
+                await self.build_review(job, owner, tp)
+            interests.append(interest)
+            await self.writer.add("interests", interest)
+            await self.notify(owner, "new_interest", created, job_id=job["id"])
+            if "contact_shared_at" in interest:
+                await self.notify(tp, "contact_shared", interest["contact_shared_at"], job_id=job["id"])
+        return interests
+
+    async def build_conversation(self, job: dict, owner: dict, tp: dict, started: datetime):
+        conversation_id = self.new_id()
+        n_messages = 1 + min(199, int(self.rng.lognormvariate(2.0, 0.9)))
+        sent_at = started
+        last = None
+        for _ in range(n_messages):
+            sent_at = self.after(sent_at, 3)
+            sender = owner if self.rng.random() < 0.5 else tp
+            last = {
+                "id": self.new_id(),
+                "conversation_id": conversation_id,
+                "sender_id": sender["id"],
+                "sender_name": sender["name"],
+                "sender_type": sender["role"],
+                "message_type": "text",
+                "content": self.rng.choice([
+                    "Hello, is this job still available?", "Yes it is. When can you come?",
+                    "I can come tomorrow morning.", "What is your best price?", "Okay, see you then.",
+                ]),
+                "status": "read",
+                "created_at": sent_at,
+                "updated_at": sent_at,
+            }
+            await self.writer.add("messages", last)
+        receiver = "tradesperson" if last["sender_type"] == "homeowner" else "homeowner"
+        unread = self.rng.choices([0, 1, 2], weights=[70, 20, 10])[0]
+        watermark = {"last_read_at": last["created_at"], "last_read_message_id": last["id"]}
+        conversation = {
+            "id": conversation_id,
+            "job_id": job["id"],
+            "job_title": job["title"],
+            "homeowner_id": owner["id"],
+            "homeowner_name": owner["name"],
+            "tradesperson_id": tp["id"],
+            "tradesperson_name": tp["name"],
+            "last_message": last["content"],
+            "last_message_id": last["id"],
+            "last_message_at": last["created_at"],
+            "unread_count_homeowner": unread if receiver == "homeowner" else 0,
+            "unread_count_tradesperson": unread if receiver == "tradesperson" else 0,
+            "created_at": started,
+            "updated_at": last["created_at"],
+        }
+        for role in ("homeowner", "tradesperson"):
+            if role == receiver and unread:
+                continue
+            conversation[f"last_read_at_{role}"] = watermark["last_read_at"]
+            conversation[f"last_read_message_id_{role}"] = watermark["last_read_message_id"]
+        await self.writer.add("conversations", conversation)
+
+    async def build_review(self, job: dict, owner: dict, tp: dict):
+        rating = weighted(self.rng, RATING_WEIGHTS)
+        created = self.after(job["created_at"], 24 * 10)
+        tp["_ratings"].append(rating)
+        await self.writer.add("reviews", {
+            "id": self.new_id(),
+            "job_id": job["id"],
+            "job_title": job["title"],
+            "job_category": job["category"],
+            "reviewer_id": owner["id"],
+            "reviewer_name": owner["name"],
+            "reviewee_id": tp["id"],
+            "reviewee_name": tp["name"],
+            "review_type": "homeowner_to_tradesperson",
+            "rating": rating,
+            "title": "Great work" if rating >= 4 else "Could be better",
+            "content": "Synthetic review generated for load testing.",
+            "would_recommend": rating >= 4,
+            "status": "published",
+            "helpful_count": int(self.rng.expovariate(0.5)),
+            # Legacy review fields read by /api/reviews and the homepage
+            "tradesperson_id": tp["id"],
+            "homeowner_name": owner["name"],
+            "comment": "Synthetic review generated for load testing.",
+            "location": job["state"],
+            "featured": rating == 5 and self.rng.random() < 0.05,
+            "created_at": created,
+            "updated_at": created,
+        })
+
+    # -- wallets, funding and the user documents themselves ------------
+    async def build_wallets(self):
+        for tp in self.tradespeople:
+            fundings = self.rng.choices([0, 1, 2, 3, 5], weights=[20, 35, 25, 12, 8])[0]
+            confirmed = 0
+            for _ in range(fundings):
+                amount = self.rng.choice([10, 20, 50, 100])
+                status = weighted(self.rng, FUNDING_STATUS_WEIGHTS)
+                confirmed += amount if status == "confirmed" else 0
+                await self.add_funding(tp, amount, status)
+            shortfall = -(tp["_balance"] + confirmed)
+            if shortfall > 0:
+                # Fees already paid must have been funded
+                await self.add_funding(tp, shortfall, "confirmed")
+                confirmed += shortfall
+            balance = tp["_balance"] + confirmed
+            await self.writer.add("wallets", {
+                "id": tp["_wallet_id"],
+                "user_id": tp["id"],
+                "balance_coins": balance,
+                "created_at": tp["created_at"],
+                "updated_at": self.now,
+            })
+
+    async def add_funding(self, tp: dict, amount: int, status: str):
+        created = self.after(tp["created_at"], 24 * 30)
+        await self.writer.add("wallet_transactions", {
+            "id": self.new_id(),
+            "wallet_id": tp["_wallet_id"],
+            "user_id": tp["id"],
+            "transaction_type": "wallet_funding",
+            "amount_coins": amount,
+            "amount_naira": amount * 100,
+            "status": status,
+            "description": "Wallet funding via bank transfer",
+            "reference": f"SYN-{self.new_id()[:8].upper()}",
+            "created_at": created,
+            "processed_at": created + timedelta(hours=6) if status != "pending" else None,
+        })
+        if status == "confirmed":
+            await self.notify(tp, "payment_confirmation", min(self.now, created + timedelta(hours=6)),
+                              amount_coins=amount)
+
+    async def write_users(self):
+        for user in self.homeowners + self.tradespeople:
+            ratings = user.pop("_ratings", None)
+            user.pop("_balance", None)
+            user.pop("_wallet_id", None)
+            user.pop("_job_weight", None)
+            if ratings is not None:
+                user["total_reviews"] = len(ratings)
+                user["average_rating"] = round(sum(ratings) / len(ratings), 2) if ratings else 0
+            user["search"] = user_search.search_fields(user)
+            directory = tradesperson_directory.directory_fields(user)
+            if directory:
+                user["directory"] = directory
+            await self.writer.add("users", user)
+
+    async def build_feeds(self):
+        # Feeds read the stored jobs, so they are built once everything is written
+        if not self.writer.apply:
+            return
+        for tp in self.tradespeople:
+            self.writer.counts["job_feeds"] += await job_feeds.rebuild(self.writer.db, tp)
+
+    async def run(self):
+        self.build_users()
+        await self.build_jobs()
+        await self.build_wallets()
+        await self.write_users()
+        await self.writer.flush()
+        await self.build_feeds()
+
+
+async def purge(apply: bool):
+    # Feed entries are keyed by tradesperson, not flagged; drop them before the users go
+    tradesperson_ids = await database.database.users.distinct("id", {"synthetic": True, "role": "tradesperson"})
+    if apply:
+        result = await database.database.job_feeds.delete_many({"tradesperson_id": {"$in": tradesperson_ids}})
+        await database.database.job_feed_state.delete_many({"_id": {"$in": tradesperson_ids}})
+        print(f"job_feeds: deleted {result.deleted_count}")
+    else:
+        count = await database.database.job_feeds.count_documents({"tradesperson_id": {"$in": tradesperson_ids}})
+        print(f"job_feeds: {count} synthetic documents (dry-run)")
+    for name in COLLECTIONS:
+        if apply:
+            result = await database.database[name].delete_many({"synthetic": True})
+            print(f"{name}: deleted {result.deleted_count}")
+        else:
+            count = await database.database[name].count_documents({"synthetic": True})
+            print(f"{name}: {count} synthetic documents (dry-run)")
+
+
+async def main():
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return
+    try:
+        if args.purge:
+            await purge(args.apply)
+            if args.apply:
+                await stats_counters.rebuild(database.database, apply=True)
+            return
+        started = time.monotonic()
+        writer = BatchWriter(database.database, args.apply, args.batch_size)
+        await Generator(args, writer).run()
+        if args.apply:
+            # The bulk inserts bypass the dashboard rollup hooks
+            await stats_counters.rebuild(database.database, apply=True)
+        elapsed = time.monotonic() - started
+        total = sum(writer.counts.values())
+        verb = "Inserted" if args.apply else "Would insert"
+        for name in COLLECTIONS + ("job_feeds",):
+            print(f"{name:22} {writer.counts[name]:>10}")
+        print(f"{verb} {total} documents in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} docs/s)")
+        if args.apply:
+            print(f"Log in as {synthetic_email('homeowner', 0)} / {synthetic_email('tradesperson', 0)} "
+                  f"with password '{args.password}'")
+        else:
+            print("Dry-run only. Re-run with --apply to write.")
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""
+Backfill the derived lookup keys on users: ``search`` (admin user search,
+services/user_search.py) and, for tradespeople, ``directory`` (directory
+search, services/tradesperson_directory.py).
+
+Usage:
+    python -m backend.tools.user_search_keys backfill            # dry run: count stale users
+    python -m backend.tools.user_search_keys backfill --apply    # write them
+
+Users created or edited through the API keep their keys current. The deploy
+step (``python -m backend.tools.release``) runs the backfill with --apply
+after syncing indexes; run it by hand to check what a change to either
+service's keys would touch.
+"""
+import asyncio
+import argparse
+import os
+import sys
+import time
+
+# Ensure package imports work when running as a script from repo root
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.database import database
+from backend.services import user_search
+
+BATCH = 500
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Backfill user search and tradesperson directory keys")
+    p.add_argument('command', choices=['backfill'])
+    p.add_argument('--apply', action='store_true', help='write the recomputed keys')
+    return p.parse_args()
+
+
+async def backfill(apply: bool) -> int:
+    started = time.monotonic()
+    scanned, stale = await user_search.backfill(database.database, apply=apply, batch_size=BATCH)
+    print(f"{scanned} users scanned, {stale} stale, in {time.monotonic() - started:.1f}s")
+    print('Applied.' if apply else 'Dry run; pass --apply to write.')
+    return 0
+
+
+async def main() -> int:
+    args = parse_args()
+    await database.connect_to_mongo()
+    if not database.connected:
+        print('Database unavailable; aborting.')
+        return 2
+    try:
+        return await backfill(args.apply)
+    finally:
+        await database.close_mongo_connection()
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
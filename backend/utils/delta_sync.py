@@ -0,0 +1,125 @@
+"""
+Helpers for ``since``-token delta sync.
+
+A sync token is an opaque, URL-safe encoding of ``(updated_at, id)`` for the
+last row a client has seen. Rows are ordered by ``updated_at`` with ``id`` as a
+tie-breaker, so a delta query is one range scan on an ``(owner, updated_at, id)``
+index. Deleted rows are reported from the ``sync_tombstones`` collection and
+merged into the same ordering. The special token ``"0"`` starts a full
+sync from the beginning.
+
+``updated_at`` is stamped by the writer before its commit is visible, so a row
+can land behind a key a client has already read. Once a client is caught up,
+its next token is never later than ``SYNC_OVERLAP_SEC`` before now, so such
+late rows are picked up on the following refresh. Rows and deletions from
+that recent window may be returned again; clients apply them as upserts and
+removals by id. Once no writes are in flight the token settles on the last
+key and a refresh returns nothing.
+"""
+
+import base64
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+SYNC_PAGE_LIMIT = int(os.getenv("SYNC_PAGE_LIMIT", "200"))
+# Tombstones expire after this many days; older tokens must resync from scratch
+TOMBSTONE_TTL_DAYS = int(os.getenv("SYNC_TOMBSTONE_TTL_DAYS", "30"))
+# How far a caught-up token is rewound to cover writes that commit late
+SYNC_OVERLAP_SEC = float(os.getenv("SYNC_OVERLAP_SEC", "5"))
+
+SyncKey = Tuple[datetime, str]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    # Mongo stores milliseconds; truncate so tokens round-trip exactly
+    return value.replace(microsecond=(value.microsecond // 1000) * 1000)
+
+
+def encode_sync_token(updated_at: datetime, doc_id: str) -> str:
+    millis = int((_to_naive_utc(updated_at) - _EPOCH).total_seconds() * 1000)
+    raw = f"{millis}:{doc_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> Optional[SyncKey]:
+    """Return the (updated_at, id) key, or None for a from-the-beginning token. Raises ValueError."""
+    if token in ("", "0"):
+        return None
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        millis_s, _, doc_id = base64.urlsafe_b64decode(padded.encode()).decode().partition(":")
+        millis = int(millis_s)
+    except Exception as e:
+        raise ValueError("Invalid sync token") from e
+    return _EPOCH + timedelta(milliseconds=millis), doc_id
+
+
+def parse_since(token: str):
+    """Decode a ``?since=`` value: () means full sync, otherwise an (updated_at, id) key."""
+    key = decode_sync_token(token)
+    return () if key is None else key
+
+
+def delta_filter(base: Dict[str, Any], since: Optional[SyncKey], id_field: str = "id") -> Dict[str, Any]:
+    """Restrict ``base`` to rows strictly after ``since`` in (updated_at, id) order."""
+    if since is None:
+        return dict(base)
+    ts, doc_id = since
+    return {
+        **base,
+        # Redundant with the $or, but gives the planner a tight range on the updated_at index key
+        "updated_at": {"$gte": ts},
+        "$or": [
+            {"updated_at": {"$gt": ts}},
+            {"updated_at": ts, id_field: {"$gt": doc_id}},
+        ],
+    }
+
+
+def row_key(doc: Dict[str, Any], id_field: str = "id") -> SyncKey:
+    return _to_naive_utc(doc["updated_at"]), str(doc.get(id_field))
+
+
+def is_expired(since) -> bool:
+    """True when tombstones older than the token may already have been purged."""
+    if not since:
+        return False
+    age = datetime.utcnow() - since[0]
+    return age.days >= TOMBSTONE_TTL_DAYS
+
+
+def merge_delta(
+    rows: List[Dict[str, Any]],
+    tombstones: List[Dict[str, Any]],
+    limit: int,
+    id_field: str = "id",
+    overlap_sec: float = SYNC_OVERLAP_SEC,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Merge changed rows and tombstones (each fetched with limit + 1) into one page.
+
+    Returns ``{"items", "deleted", "next_since", "has_more"}``. While more pages
+    follow, the next token is the key of the last entry kept, so anything cut
+    from either stream is returned again on the next call. On the last page it
+    is the earlier of that key and ``now - overlap_sec`` (see the module docstring).
+    """
+    merged = [(row_key(r, id_field), False, r) for r in rows]
+    merged += [(row_key(t), True, t) for t in tombstones]
+    merged.sort(key=lambda entry: entry[0])
+    has_more = len(merged) > limit
+    page = merged[:limit]
+    items = [doc for _, deleted, doc in page if not deleted]
+    deleted_ids = [doc["id"] for _, deleted, doc in page if deleted]
+    next_since = None
+    if page:
+        last_key = page[-1][0]
+        if not has_more and overlap_sec > 0:
+            settled = _to_naive_utc((now or datetime.utcnow()) - timedelta(seconds=overlap_sec))
+            last_key = min(last_key, (settled, ""))
+        next_since = encode_sync_token(*last_key)
+    return {"items": items, "deleted": deleted_ids, "next_since": next_since, "has_more": has_more}
@@ -0,0 +1,224 @@
+"""
+Raw file delivery for authenticated upload endpoints.
+
+Sends bytes straight from disk (or the blob store) with Content-Type, ETag,
+Last-Modified and single byte-range support, reading in fixed-size chunks off
+the event loop so the whole file is never held in memory. When
+FILE_ACCEL_REDIRECT_PREFIX is set (e.g. ``/protected-uploads/``), the response
+only carries an ``X-Accel-Redirect`` header and nginx streams the file itself
+after the route's auth dependency has passed.
+"""
+
+import asyncio
+import mimetypes
+import os
+from email.utils import formatdate
+from typing import Iterable, Optional, Tuple
+
+from fastapi import HTTPException, Request
+from starlette.responses import RedirectResponse, Response, StreamingResponse
+
+try:
+    from ..services.blob_store import blob_store
+    from ..services.image_pipeline import image_pipeline, negotiate_format, FORMATS, RENDITIONS
+except ImportError:
+    from services.blob_store import blob_store
+    from services.image_pipeline import image_pipeline, negotiate_format, FORMATS, RENDITIONS
+
+CHUNK_SIZE = int(os.getenv("FILE_STREAM_CHUNK_BYTES", str(64 * 1024)))
+CACHE_CONTROL = os.getenv("FILE_CACHE_CONTROL", "private, max-age=3600")
+
+
+def uploads_root() -> str:
+    return os.environ.get("UPLOADS_DIR", os.path.join(os.getcwd(), "uploads"))
+
+
+def guess_media_type(filename: str, default: str = "application/octet-stream") -> str:
+    return mimetypes.guess_type(filename)[0] or default
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.replace("W/", "")
+    return any(tag.strip().replace("W/", "") == bare for tag in header.split(","))
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=start-end`` range into inclusive offsets.
+
+    Returns None when there is no usable Range header (serve the full file) and
+    raises 416 when the range cannot be satisfied. Multi-range requests are
+    served in full, which RFC 9110 permits.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_s, _, end_s = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_s == "":
+            length = int(end_s)
+            if length <= 0:
+                raise ValueError
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(start_s)
+            end = int(end_s) if end_s else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, min(end, size - 1)
+
+
+def _accel_location(path: str) -> Optional[str]:
+    prefix = os.getenv("FILE_ACCEL_REDIRECT_PREFIX")
+    if not prefix:
+        return None
+    root = os.path.realpath(uploads_root())
+    real = os.path.realpath(path)
+    if os.path.commonpath([root, real]) != root:
+        return None
+    return prefix.rstrip("/") + "/" + os.path.relpath(real, root).replace(os.sep, "/")
+
+
+async def _iter_file(path: str, start: int, length: int):
+    f = await asyncio.to_thread(open, path, "rb")
+    try:
+        await asyncio.to_thread(f.seek, start)
+        remaining = length
+        while remaining > 0:
+            chunk = await asyncio.to_thread(f.read, min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        await asyncio.to_thread(f.close)
+
+
+async def send_file(
+    request: Request,
+    path: str,
+    media_type: Optional[str] = None,
+    etag: Optional[str] = None,
+) -> Response:
+    """Stream a file with ETag/304, Range/206 and optional X-Accel-Redirect."""
+    st = await asyncio.to_thread(os.stat, path)
+    size = st.st_size
+    media_type = media_type or guess_media_type(path)
+    etag = etag or f'"{size:x}-{st.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Accept-Ranges": "bytes",
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    accel = _accel_location(path)
+    if accel:
+        headers["X-Accel-Redirect"] = accel
+        return Response(status_code=200, media_type=media_type, headers=headers)
+
+    byte_range = None
+    if_range = request.headers.get("if-range")
+    if if_range is None or if_range.strip() == etag:
+        byte_range = parse_range(request.headers.get("range"), size)
+
+    if byte_range is None:
+        headers["Content-Length"] = str(size)
+        if request.method == "HEAD":
+            return Response(status_code=200, media_type=media_type, headers=headers)
+        return StreamingResponse(_iter_file(path, 0, size), media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    length = end - start + 1
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(length)
+    if request.method == "HEAD":
+        return Response(status_code=206, media_type=media_type, headers=headers)
+    return StreamingResponse(_iter_file(path, start, length), status_code=206, media_type=media_type, headers=headers)
+
+
+async def send_image(
+    request: Request,
+    path: str,
+    size: Optional[str] = None,
+    fmt: Optional[str] = None,
+    media_type: Optional[str] = None,
+) -> Response:
+    """Serve an image, or a cached rendition of it when ``size`` is given.
+
+    Without an explicit ``fmt`` the rendition format follows the Accept header
+    (WebP when supported), so the response varies on Accept.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if not size or ext not in (".jpg", ".jpeg", ".png", ".webp"):
+        return await send_file(request, path, media_type)
+    if size not in RENDITIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown image size. Use one of: {', '.join(RENDITIONS)}")
+    chosen = negotiate_format(request.headers.get("accept"), fmt)
+    try:
+        rendition = await image_pipeline.get_rendition(path, size, chosen)
+    except Exception:
+        # Undecodable source: fall back to the stored file rather than failing the page
+        return await send_file(request, path, media_type)
+    response = await send_file(request, rendition, FORMATS[chosen]["media_type"])
+    if fmt not in FORMATS:
+        response.headers["Vary"] = "Accept"
+    return response
+
+
+def upload_candidates(subdir: str, filename: str) -> list:
+    """Locations where legacy uploads may live across environments."""
+    project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return [
+        os.path.join(uploads_root(), subdir, filename),
+        os.path.join(project_root, "uploads", subdir, filename),
+        os.path.join(project_root, "backend", "uploads", subdir, filename),
+        os.path.join(os.getcwd(), "uploads", subdir, filename),
+        os.path.join("/app", "uploads", subdir, filename),
+    ]
+
+
+async def send_upload(
+    request: Request,
+    namespace: str,
+    filename: str,
+    fallback_paths: Optional[Iterable[str]] = None,
+    not_found_detail: str = "File not found",
+) -> Response:
+    """Serve an uploaded file from the blob store, falling back to legacy disk paths.
+
+    ``namespace`` doubles as the uploads subdirectory for the disk fallback.
+    """
+    if os.path.basename(filename) != filename:
+        raise HTTPException(status_code=400, detail="Invalid filename")
+
+    try:
+        meta = await blob_store.get_meta(namespace, filename)
+    except Exception:
+        meta = None
+    if meta:
+        digest = meta["sha256"]
+        backend = blob_store.backend
+        path = backend.local_path(digest)
+        if path and os.path.exists(path):
+            return await send_file(request, path, meta.get("content_type"), etag=f'"{digest}"')
+        url = await backend.presigned_url(digest, meta.get("content_type"))
+        if url:
+            return RedirectResponse(url, status_code=307)
+
+    paths = list(fallback_paths) if fallback_paths is not None else upload_candidates(namespace, filename)
+    for fp in paths:
+        if os.path.exists(fp):
+            return await send_file(request, fp)
+    raise HTTPException(status_code=404, detail=not_found_detail)
@@ -0,0 +1,97 @@
+"""
+Streaming helpers for FastAPI ``UploadFile`` bodies.
+
+Uploads are copied in fixed-size chunks to a temp file in the destination
+directory, with file writes running in a worker thread. A SHA-256 digest is
+computed on the fly for deduplication, and the temp file is atomically
+renamed into place. Peak memory of the copy is bounded by the chunk size.
+
+By the time a handler runs, Starlette's multipart parser has already received
+the whole body and spooled it (to memory, then to a temp file past 1 MB). The
+size limit here therefore cannot refuse the transfer itself: it rejects a part
+whose declared size is over the limit without copying it, and otherwise stops
+the copy one chunk past the limit. Cap request bodies at the proxy (e.g.
+nginx ``client_max_body_size``) to stop oversized uploads on the wire.
+"""
+
+import asyncio
+import hashlib
+import os
+import uuid
+from typing import Any, Dict, Optional
+
+from fastapi import HTTPException, UploadFile
+
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_BYTES", str(1024 * 1024)))
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def discard(path: Optional[str]) -> None:
+    """Delete a temp file produced by stream_to_temp, ignoring missing files."""
+    if path:
+        await asyncio.to_thread(_remove_quietly, path)
+
+
+async def stream_to_temp(
+    file: UploadFile,
+    directory: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Copy an upload into a temp file inside ``directory``.
+
+    Returns ``{"path", "size", "sha256"}``. The caller owns the temp file and must
+    rename it into place or discard() it. Raises HTTPException(413) when the part's
+    size, or the running size of the copy, passes ``max_bytes``; no temp file is
+    left behind.
+    """
+    if max_bytes is not None and file.size is not None and file.size > max_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+
+    await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+    tmp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+    out = await asyncio.to_thread(open, tmp_path, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                raise HTTPException(status_code=413, detail="File too large")
+            digest.update(chunk)
+            await asyncio.to_thread(out.write, chunk)
+        await asyncio.to_thread(out.close)
+    except BaseException:
+        await asyncio.to_thread(out.close)
+        await discard(tmp_path)
+        raise
+    return {"path": tmp_path, "size": size, "sha256": digest.hexdigest()}
+
+
+async def stream_to_file(
+    file: UploadFile,
+    dest_path: str,
+    max_bytes: Optional[int] = None,
+    chunk_size: int = UPLOAD_CHUNK_SIZE,
+) -> Dict[str, Any]:
+    """Stream an upload to ``dest_path`` via a temp file and atomic rename.
+
+    Returns ``{"path", "size", "sha256"}``.
+    """
+    stored = await stream_to_temp(file, os.path.dirname(dest_path), max_bytes, chunk_size)
+    try:
+        await asyncio.to_thread(os.replace, stored["path"], dest_path)
+    except BaseException:
+        await discard(stored["path"])
+        raise
+    stored["path"] = dest_path
+    return stored
@@ -74,6 +74,12 @@ export const jobsAPI = {
     return response.data;
   },
 
+  // Prefix / typo-tolerant completions for the search box
+  getSearchSuggestions: async (q, limit = 8) => {
+    const response = await apiClient.get('/jobs/search-suggestions', { params: { q, limit } });
+    return response.data;
+  },
+
   // Get jobs by category
   getJobsByCategory: async (category, params = {}) => {
     const response = await apiClient.get(`/jobs/category/${category}`, { params });
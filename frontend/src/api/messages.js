@@ -43,6 +43,53 @@ export const messagesAPI = {
     return `${base}/messages/attachments/${filename}`;
   },
 
+  // Real-time push channel (new messages, read receipts, unread counts).
+  // Returns a handle with send() and close(); reconnects with backoff until closed.
+  connectSocket: (onEvent) => {
+    const base = (import.meta?.env?.VITE_BACKEND_URL ? `${import.meta.env.VITE_BACKEND_URL}/api` : (apiClient?.defaults?.baseURL || '/api'));
+    const httpUrl = new URL(`${base}/messages/ws`, window.location.origin);
+    httpUrl.protocol = httpUrl.protocol === 'https:' ? 'wss:' : 'ws:';
+    let socket = null;
+    let closed = false;
+    let retry = 0;
+    let timer = null;
+
+    const open = () => {
+      const token = localStorage.getItem('token');
+      if (!token || closed) return;
+      httpUrl.searchParams.set('token', token);
+      socket = new WebSocket(httpUrl.toString());
+      socket.onopen = () => { retry = 0; };
+      socket.onmessage = (e) => {
+        let event;
+        try { event = JSON.parse(e.data); } catch { return; }
+        if (event.type === 'ping') {
+          socket.send(JSON.stringify({ type: 'pong' }));
+          return;
+        }
+        onEvent?.(event);
+      };
+      socket.onclose = () => {
+        if (closed) return;
+        retry = Math.min(retry + 1, 6);
+        timer = setTimeout(open, 500 * 2 ** retry);
+        onEvent?.({ type: 'disconnected' });
+      };
+    };
+    open();
+
+    return {
+      send: (frame) => {
+        if (socket && socket.readyState === WebSocket.OPEN) socket.send(JSON.stringify(frame));
+      },
+      close: () => {
+        closed = true;
+        clearTimeout(timer);
+        socket?.close();
+      },
+    };
+  },
+
   markConversationAsRead: async (conversationId) => {
     const response = await apiClient.put(`/messages/conversations/${conversationId}/read`);
     return response.data;
@@ -97,9 +97,10 @@ export const adminReferralsAPI = {
     return response.data;
   },
 
-  // Get verification document image URL (admin)
-  getDocumentUrl(filename) {
-    return `${(process.env.REACT_APP_BACKEND_URL ? process.env.REACT_APP_BACKEND_URL + '/api' : (apiClient?.defaults?.baseURL || '/api'))}/admin/verifications/document/${filename}`;
+  // Get a short-lived signed URL for a verification document image (admin), for direct <img src>
+  async getDocumentUrl(filename) {
+    const response = await apiClient.get(`/admin/verifications/document/${encodeURIComponent(filename)}/url`);
+    return `${apiClient.defaults.baseURL.replace(/\/api$/, '')}${response.data.url}`;
   }
 };
 
@@ -148,9 +149,9 @@ export const adminVerificationAPI = {
     });
     return response.data;
   },
-  // Build URL to view tradespeople verification files (work photos, documents)
-  getTradespeopleVerificationFileUrl(filename) {
-    const base = (process.env.REACT_APP_BACKEND_URL ? process.env.REACT_APP_BACKEND_URL + '/api' : (apiClient?.defaults?.baseURL || '/api'));
-    return `${base}/admin/tradespeople-verifications/document/${filename}`;
+  // Get a short-lived signed URL to view a tradespeople verification file (work photos, documents)
+  async getTradespeopleVerificationFileUrl(filename) {
+    const response = await apiClient.get(`/admin/tradespeople-verifications/document/${encodeURIComponent(filename)}/url`);
+    return `${apiClient.defaults.baseURL.replace(/\/api$/, '')}${response.data.url}`;
   }
 };
\ No newline at end of file
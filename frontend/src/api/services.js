@@ -276,6 +276,12 @@ export const jobsAPI = {
     return response.data;
   },
 
+  // Prefix / typo-tolerant completions for the search box
+  getSearchSuggestions: async (q, limit = 8) => {
+    const response = await apiClient.get('/jobs/search-suggestions', { params: { q, limit } });
+    return response.data;
+  },
+
   updateJob: async (jobId, jobData) => {
     const response = await apiClient.put(`/jobs/${jobId}`, jobData);
     return response.data;
@@ -39,9 +39,10 @@ export const walletAPI = {
     return response.data;
   },
 
-  // Get payment proof image
-  getPaymentProofUrl(filename) {
-    return `${(process.env.REACT_APP_BACKEND_URL ? process.env.REACT_APP_BACKEND_URL + '/api' : (apiClient?.defaults?.baseURL || '/api'))}/wallet/payment-proof/${filename}`;
+  // Get a short-lived signed URL for a payment proof image, usable directly as <img src>
+  async getPaymentProofUrl(filename) {
+    const response = await apiClient.get(`/wallet/payment-proof/${encodeURIComponent(filename)}/url`);
+    return `${apiClient.defaults.baseURL.replace(/\/api$/, '')}${response.data.url}`;
   }
 ,
   // Get payment proof as base64
@@ -208,9 +209,10 @@ export const adminAPI = {
     return response.data;
   },
 
-  // Get payment proof image (admin)
-  getPaymentProofUrl(filename) {
-    return `${(process.env.REACT_APP_BACKEND_URL ? process.env.REACT_APP_BACKEND_URL + '/api' : (apiClient?.defaults?.baseURL || '/api'))}/admin/wallet/payment-proof/${filename}`;
+  // Get a short-lived signed URL for a payment proof image (admin), usable directly as <img src>
+  async getPaymentProofUrl(filename) {
+    const response = await apiClient.get(`/admin/wallet/payment-proof/${encodeURIComponent(filename)}/url`);
+    return `${apiClient.defaults.baseURL.replace(/\/api$/, '')}${response.data.url}`;
   },
   // Get payment proof as base64 (admin)
   getPaymentProofBase64Url(filename) {
@@ -54,6 +54,28 @@ const ChatModal = ({
     scrollToBottom();
   }, [messages]);
 
+  // Live updates for the open conversation instead of re-fetching the message list
+  useEffect(() => {
+    if (!isOpen || !conversationId) return undefined;
+    const socket = messagesAPI.connectSocket((event) => {
+      if (event.conversation_id !== conversationId) return;
+      if (event.type === 'message.new' && event.message) {
+        setMessages(prev => {
+          if (prev.some(m => m.id === event.message.id)) return prev;
+          const next = [...prev, event.message];
+          setMessageCount(next.length);
+          return next;
+        });
+        if (event.message.sender_id !== user?.id) {
+          socket.send({ type: 'read', conversation_id: conversationId });
+        }
+      } else if (event.type === 'message.read' && event.reader_id !== user?.id) {
+        setMessages(prev => prev.map(m => (m.sender_id === user?.id ? { ...m, status: 'read' } : m)));
+      }
+    });
+    return () => socket.close();
+  }, [isOpen, conversationId, user?.id]);
+
   const initializeConversation = async () => {
     let response = null;
     
@@ -1,70 +1,26 @@
 import React, { useEffect, useState } from 'react';
-import apiClient from '../../api/client';
 import { walletAPI, adminAPI } from '../../api/wallet';
 import { Dialog, DialogContent } from '../ui/dialog';
 
-// Simple in-memory cache for base64 payloads to avoid refetching the same image
-const base64Cache = new Map();
-
 const PaymentProofImage = ({ filename, isAdmin = false, className = '', alt = 'Payment proof' }) => {
   const [src, setSrc] = useState('');
   const [error, setError] = useState('');
   const [viewerOpen, setViewerOpen] = useState(false);
 
   useEffect(() => {
-    let isMounted = true;
-    setSrc('');
+    let cancelled = false;
     setError('');
-
+    setSrc('');
     if (!filename) {
       setError('No file provided');
-      return () => { isMounted = false; };
+      return;
     }
-
-    // Prefer authenticated base64 endpoint first (includes auth headers).
-    const base64Url = isAdmin
-      ? adminAPI.getPaymentProofBase64Url(filename)
-      : walletAPI.getPaymentProofBase64Url(filename);
-
-    const directUrl = isAdmin
-      ? adminAPI.getPaymentProofUrl(filename)
-      : walletAPI.getPaymentProofUrl(filename);
-
-    // If a cached base64 exists for this filename, use it immediately
-    if (base64Cache.has(filename)) {
-      setSrc(base64Cache.get(filename));
-      return () => { isMounted = false; };
-    }
-
-    const fetchBase64 = async (attempt = 1) => {
-      try {
-        const resp = await apiClient.get(base64Url);
-        const b64 = resp?.data?.image_base64;
-        if (!b64) throw new Error('Base64 not returned');
-        const dataUri = `data:image/jpeg;base64,${b64}`;
-        base64Cache.set(filename, dataUri);
-        if (isMounted) setSrc(dataUri);
-        return true;
-      } catch (e) {
-        if (attempt < 2) {
-          // small backoff then retry once
-          await new Promise(res => setTimeout(res, 250));
-          return fetchBase64(attempt + 1);
-        }
-        console.warn('PaymentProofImage base64 fetch failed:', e?.response?.data || e?.message);
-        return false;
-      }
-    };
-
-    (async () => {
-      const ok = await fetchBase64();
-      if (!ok && isMounted) {
-        // fall back to letting the browser load the direct image URL (public images)
-        setSrc(directUrl);
-      }
-    })();
-
-    return () => { isMounted = false; };
+    // The backend streams raw bytes (with ETag/Range) from a short-lived signed URL,
+    // so the browser can load the image directly without a token in the URL.
+    (isAdmin ? adminAPI.getPaymentProofUrl(filename) : walletAPI.getPaymentProofUrl(filename))
+      .then((url) => { if (!cancelled) setSrc(url); })
+      .catch(() => { if (!cancelled) setError('Failed to load image'); });
+    return () => { cancelled = true; };
   }, [filename, isAdmin]);
 
   if (error) {
@@ -104,8 +104,9 @@ const PortfolioItem = ({ item, isOwner = false, onUpdate, onDelete }) => {
     <Card className="overflow-hidden hover:shadow-lg transition-shadow duration-300 group">
       <div className="relative">
         <img
-          src={item.image_url}
+          src={item.card_url || `${item.image_url}?size=card`}
           alt={item.title}
+          loading="lazy"
           className="w-full h-48 object-cover"
           onError={(e) => {
             e.target.src = 'data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjIwMCIgdmlld0JveD0iMCAwIDMwMCAyMDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CjxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iMjAwIiBmaWxsPSIjRjNGNEY2Ii8+CjxwYXRoIGQ9Ik0xNTAgMTAwTDEyNSA3NUwxNzUgNzVMMTUwIDEwMFoiIGZpbGw9IiM5Q0EzQUYiLz4KPC9zdmc+';
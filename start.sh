@@ -23,7 +23,18 @@ echo "- FRONTEND_URL: ${FRONTEND_URL}"
 echo "- PORT: ${PORT}"
 echo "- DB_NAME: ${DB_NAME:-test_database}"
 
+# Release steps: build missing MongoDB indexes, backfill derived fields
+echo "🗂️  Running release steps..."
+cd /app/backend
+python tools/release.py
+release_status=$?
+if [ $release_status -eq 3 ]; then
+    echo "❌ A required unique/text index could not be built (duplicates listed above); not starting"
+    exit 3
+elif [ $release_status -ne 0 ]; then
+    echo "⚠️  Warning: release steps failed; startup will build required indexes"
+fi
+
 # Start the application
 echo "🔧 Starting backend server..."
-cd /app/backend
 python server.py
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Shared fixtures for tests that need a real MongoDB.
+
+A throwaway ``mongod`` is started once per session as a single-node replica set
+(so transactions and change streams work) with its data in a temp directory.
+Set ``TEST_MONGO_URL`` to use an already running server instead; tests that
+need MongoDB are skipped when neither is available.
+"""
+import asyncio
+import os
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import uuid
+
+import pytest
+
+MONGOD_BIN = os.getenv("MONGOD_BIN", "mongod")
+MONGOD_START_TIMEOUT_SEC = float(os.getenv("MONGOD_START_TIMEOUT_SEC", "30"))
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _mongod_major_version(binary: str) -> int:
+    try:
+        out = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10).stdout
+    except Exception:
+        return 0
+    match = re.search(r"db version v(\d+)\.", out)
+    return int(match.group(1)) if match else 0
+
+
+def _engine_parameters(major: int):
+    """Force the classic query engine so explain output has one stable shape across versions."""
+    if major >= 6:
+        return ["--setParameter", "internalQueryFrameworkControl=forceClassicEngine"]
+    if major == 5:
+        return ["--setParameter", "internalQueryForceClassicEngine=true"]
+    return []
+
+
+def _wait_for_primary(pymongo, port: int, deadline: float) -> None:
+    """Initiate the single-member replica set and wait until it accepts writes."""
+    config = {"_id": "rs0", "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}]}
+    # No replicaSet option here: the member has no set name until it is initiated
+    client = pymongo.MongoClient(f"mongodb://127.0.0.1:{port}/?directConnection=true", serverSelectionTimeoutMS=500)
+    try:
+        initiated = False
+        while time.monotonic() < deadline:
+            try:
+                if not initiated:
+                    client.admin.command("replSetInitiate", config)
+                    initiated = True
+                if client.admin.command("hello").get("isWritablePrimary"):
+                    return
+            except pymongo.errors.OperationFailure as e:
+                # Already initiated (e.g. a restarted data dir)
+                if e.code == 23:
+                    initiated = True
+            except pymongo.errors.PyMongoError:
+                pass
+            time.sleep(0.2)
+        raise RuntimeError("mongod did not become primary in time")
+    finally:
+        client.close()
+
+
+@pytest.fixture(scope="session")
+def mongo_url():
+    """URL of a MongoDB replica set primary for this test session."""
+    pymongo = pytest.importorskip("pymongo")
+    pytest.importorskip("motor")
+
+    external = os.getenv("TEST_MONGO_URL")
+    if external:
+        yield external
+        return
+
+    binary = shutil.which(MONGOD_BIN)
+    if not binary:
+        pytest.skip("mongod not found; install MongoDB or set TEST_MONGO_URL")
+
+    port = _free_port()
+    dbpath = tempfile.mkdtemp(prefix="servicehub-mongod-")
+    cmd = [
+        binary,
+        "--dbpath", dbpath,
+        "--port", str(port),
+        "--bind_ip", "127.0.0.1",
+        "--replSet", "rs0",
+        "--quiet",
+        "--nounixsocket",
+        *_engine_parameters(_mongod_major_version(binary)),
+    ]
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"mongodb://127.0.0.1:{port}/?replicaSet=rs0&directConnection=true"
+    try:
+        _wait_for_primary(pymongo, port, time.monotonic() + MONGOD_START_TIMEOUT_SEC)
+        yield url
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        shutil.rmtree(dbpath, ignore_errors=True)
+
+
+@pytest.fixture(scope="module")
+def event_loop_runner():
+    """A module-wide event loop; Motor clients are bound to the loop they were first used on."""
+    loop = asyncio.new_event_loop()
+    try:
+        yield loop.run_until_complete
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+
+@pytest.fixture(scope="module")
+def mongo_db_name():
+    """A fresh database name per test module, dropped afterwards."""
+    return f"servicehub_test_{uuid.uuid4().hex[:8]}"
+
+
+@pytest.fixture(scope="module")
+def sync_db(mongo_url, mongo_db_name):
+    """A blocking pymongo handle on the module's test database."""
+    import pymongo
+
+    client = pymongo.MongoClient(mongo_url)
+    try:
+        yield client[mongo_db_name]
+    finally:
+        client.drop_database(mongo_db_name)
+        client.close()
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    """Collections whose manifest indexes are built for the module's ``db``; override in a module."""
+    return []
+
+
+@pytest.fixture(scope="module")
+def event_listeners():
+    """pymongo command listeners attached to the module's ``db`` client; override in a module."""
+    return []
+
+
+@pytest.fixture(scope="module")
+def db(event_loop_runner, mongo_url, mongo_db_name, sync_db, index_collections, event_listeners):
+    """A connected ``Database`` on the module's test database, closed afterwards.
+
+    Modules that seed data override ``db`` and request this one by the same name.
+    """
+    from backend.index_manifest import sync_indexes
+
+    database = make_database(event_loop_runner, mongo_url, mongo_db_name, event_listeners)
+    if index_collections:
+        event_loop_runner(sync_indexes(database.database, index_collections))
+    yield database
+    event_loop_runner(database.close_mongo_connection())
+
+
+def make_database(run, mongo_url: str, db_name: str, event_listeners=None):
+    """Build a connected ``backend.database.Database`` pointed at the test server.
+
+    ``connect_to_mongo`` is bypassed so tests can attach command listeners and
+    skip the Atlas TLS setup; nothing else about the instance differs.
+    """
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from backend.database import Database
+
+    async def _connect():
+        db = Database()
+        db.client = AsyncIOMotorClient(mongo_url, event_listeners=list(event_listeners or []))
+        await db.client.admin.command("ping")
+        db.database = db.client[db_name]
+        db.connected = True
+        return db
+
+    return run(_connect())
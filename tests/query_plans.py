@@ -0,0 +1,143 @@
+"""
+Capture the commands a ``Database`` method sends and check their query plans.
+
+``CommandCapture`` is a pymongo command listener attached to the Motor client.
+Every captured read is replayed through ``explain`` with executionStats and
+its plan is checked for:
+
+- COLLSCAN anywhere in the winning plan
+- a blocking SORT stage, or a ``$sort`` left in the pipeline after ``$cursor``
+- a ``$lookup`` that scanned the foreign collection
+- a FETCH/COLLSCAN that examined far more documents than it passed on
+"""
+import copy
+import os
+from typing import Any, Dict, Iterator, List, Tuple
+
+from pymongo import monitoring
+
+# Docs examined per doc returned by a FETCH before a plan counts as wasteful
+MAX_EXAMINED_RATIO = float(os.getenv("QUERY_PLAN_MAX_EXAMINED_RATIO", "10"))
+# Ratios are ignored below this many examined docs (tiny result sets are noisy)
+MIN_EXAMINED_DOCS = int(os.getenv("QUERY_PLAN_MIN_EXAMINED_DOCS", "50"))
+
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "findAndModify"}
+# Session / transport fields the explain command rejects or doesn't need
+_DROP_FIELDS = {"lsid", "txnNumber", "autocommit", "startTransaction", "readConcern", "writeConcern"}
+
+
+class CommandCapture(monitoring.CommandListener):
+    """Records explainable commands while ``active`` is set."""
+
+    def __init__(self):
+        self.active = False
+        self.commands: List[Tuple[str, Dict[str, Any]]] = []
+
+    def started(self, event):
+        if self.active and event.command_name in EXPLAINABLE_COMMANDS:
+            self.commands.append((event.database_name, copy.deepcopy(dict(event.command))))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+    def reset(self) -> None:
+        self.commands = []
+
+
+def explainable(command: Dict[str, Any]) -> Dict[str, Any]:
+    """Strip driver-added fields so the command can be wrapped in ``explain``."""
+    return {k: v for k, v in command.items() if not k.startswith("$") and k not in _DROP_FIELDS}
+
+
+def explain(sync_db, command: Dict[str, Any]) -> Dict[str, Any]:
+    return sync_db.command({"explain": explainable(command), "verbosity": "executionStats"})
+
+
+def _children(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    if "inputStage" in node:
+        yield node["inputStage"]
+    for child in node.get("inputStages", []):
+        yield child
+    for key in ("thenStage", "elseStage", "outerStage", "innerStage"):
+        if key in node:
+            yield node[key]
+
+
+def _walk(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+    for child in _children(node):
+        yield from _walk(child)
+
+
+def describe_plan(node: Dict[str, Any]) -> str:
+    """Compact one-line rendering, e.g. ``LIMIT > FETCH > IXSCAN(jobs_status_createdAt)``."""
+    label = node.get("stage", "?")
+    if node.get("indexName"):
+        label += f"({node['indexName']})"
+    children = list(_children(node))
+    if not children:
+        return label
+    if len(children) == 1:
+        return f"{label} > {describe_plan(children[0])}"
+    return f"{label}[{' | '.join(describe_plan(c) for c in children)}]"
+
+
+def _ranks_text_matches(node: Dict[str, Any]) -> bool:
+    # Relevance order only exists after $text matching; the sort is bounded by the matched set,
+    # and the docsExamined ratio below still catches broad matches
+    return any(isinstance(v, dict) and v.get("$meta") == "textScore" for v in (node.get("sortPattern") or {}).values())
+
+
+def _check_execution_stages(root: Dict[str, Any], problems: List[str]) -> None:
+    for node in _walk(root):
+        stage = node.get("stage")
+        if stage == "COLLSCAN":
+            problems.append("COLLSCAN")
+        elif stage == "SORT" and not _ranks_text_matches(node):
+            problems.append(f"in-memory SORT on {node.get('sortPattern')}")
+        if stage in ("FETCH", "COLLSCAN"):
+            examined = node.get("docsExamined", 0)
+            returned = max(node.get("nReturned", 0), 1)
+            if examined >= MIN_EXAMINED_DOCS and examined / returned > MAX_EXAMINED_RATIO:
+                problems.append(
+                    f"{stage} examined {examined} docs for {node.get('nReturned', 0)} returned "
+                    f"(ratio {examined / returned:.1f} > {MAX_EXAMINED_RATIO:g})"
+                )
+
+
+def _query_layer(explain_doc: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of an explain that has queryPlanner/executionStats (top level or under $cursor)."""
+    if "executionStats" in explain_doc:
+        return explain_doc
+    for stage in explain_doc.get("stages", []):
+        if "$cursor" in stage:
+            return stage["$cursor"]
+    return {}
+
+
+def plan_problems(explain_doc: Dict[str, Any]) -> Tuple[List[str], str]:
+    """Return (problems, plan summary) for one explain result."""
+    problems: List[str] = []
+    layer = _query_layer(explain_doc)
+    stats = layer.get("executionStats", {})
+    execution = stats.get("executionStages")
+    if execution:
+        _check_execution_stages(execution, problems)
+    winning = layer.get("queryPlanner", {}).get("winningPlan", {})
+    summary = describe_plan(winning.get("queryPlan", winning)) if winning else "?"
+
+    stages = explain_doc.get("stages", [])
+    for position, stage in enumerate(stages):
+        name = next((k for k in stage if k.startswith("$")), None)
+        if name == "$sort" and position > 0:
+            problems.append(f"blocking $sort after {next(k for k in stages[position - 1] if k.startswith('$'))}")
+        elif name == "$lookup" and stage.get("collectionScans", 0):
+            problems.append(
+                f"$lookup from {stage['$lookup'].get('from')} ran {stage['collectionScans']} collection scan(s)"
+            )
+    if len(stages) > 1:
+        summary += " | " + " > ".join(next(k for k in s if k.startswith("$")) for s in stages[1:])
+    return problems, summary
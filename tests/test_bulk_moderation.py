@@ -0,0 +1,85 @@
+"""
+Bulk admin moderation: one result per distinct id, only still-pending items
+change, activities and notifications are written once per applied item,
+and funding confirmations credit each wallet exactly once.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import bulk_moderation
+
+ADMIN = {"id": "admin-1", "username": "moderator"}
+
+
+def _homeowner(sync_db):
+    user = {"id": str(uuid.uuid4()), "name": "Ngozi", "email": f"{uuid.uuid4().hex[:8]}@example.com",
+            "role": "homeowner"}
+    sync_db.users.insert_one(dict(user))
+    return user
+
+
+def test_bulk_job_approval(db, sync_db, event_loop_runner):
+    owner = _homeowner(sync_db)
+    jobs = [{"id": str(uuid.uuid4()), "title": f"Job {i}", "status": "pending_approval",
+             "homeowner": {"id": owner["id"], "email": owner["email"]}, "created_at": datetime.utcnow()}
+            for i in range(4)]
+    jobs[3]["status"] = "active"
+    sync_db.jobs.insert_many([dict(j) for j in jobs])
+    ids = [j["id"] for j in jobs] + ["missing", jobs[0]["id"]]
+
+    report, notifications, approved = event_loop_runner(
+        bulk_moderation.moderate_jobs(db, ids, "approve", ADMIN, "looks good"))
+
+    assert [r["status"] for r in report["results"]] == ["approved"] * 3 + ["not_pending", "not_found"]
+    assert report["summary"] == {"approved": 3, "not_pending": 1, "not_found": 1}
+    assert sync_db.jobs.count_documents({"id": {"$in": ids[:3]}, "status": "active", "approved_by": "admin-1"}) == 3
+    assert sorted(j["id"] for j in approved) == sorted(ids[:3])
+    assert sync_db.admin_activities.count_documents({"metadata.batch_id": report["batch_id"]}) == 3
+    assert len(notifications) == 3
+    assert sync_db.notifications.count_documents(
+        {"_id": {"$in": [n.id for n in notifications]}, "status": "pending", "type": "job_approved"}) == 3
+
+    # A second pass finds nothing left to approve
+    again, notifications, _ = event_loop_runner(bulk_moderation.moderate_jobs(db, ids[:3], "approve", ADMIN))
+    assert again["summary"] == {"not_pending": 3} and notifications == []
+
+
+def test_bulk_verification_approval(db, sync_db, event_loop_runner):
+    owner = _homeowner(sync_db)
+    tradesperson = {"id": str(uuid.uuid4()), "role": "tradesperson"}
+    sync_db.users.insert_one(dict(tradesperson))
+    verifications = [
+        {"id": "v-owner", "user_id": owner["id"], "status": "pending"},
+        {"id": "v-trade", "user_id": tradesperson["id"], "status": "pending"},
+        {"id": "v-done", "user_id": owner["id"], "status": "rejected"},
+    ]
+    sync_db.user_verifications.insert_many(verifications)
+
+    report = event_loop_runner(bulk_moderation.approve_verifications(
+        db, ["v-owner", "v-trade", "v-done"], ADMIN))
+    assert [r["status"] for r in report["results"]] == ["verified", "verified", "not_pending"]
+    owner_doc = sync_db.users.find_one({"id": owner["id"]})
+    trade_doc = sync_db.users.find_one({"id": tradesperson["id"]})
+    assert owner_doc["identity_verified"] and owner_doc["is_verified"]
+    assert trade_doc["identity_verified"] and not trade_doc.get("is_verified")
+
+
+def test_bulk_funding_confirmation_credits_once(db, sync_db, event_loop_runner):
+    user_id = str(uuid.uuid4())
+    sync_db.wallet_transactions.insert_many([
+        {"id": f"t{i}", "user_id": user_id, "transaction_type": "wallet_funding", "amount_coins": 10,
+         "status": "pending", "created_at": datetime.utcnow()}
+        for i in range(3)
+    ])
+    report = event_loop_runner(bulk_moderation.confirm_funding(db, ["t0", "t1", "t2", "t0"], ADMIN))
+    assert report["summary"] == {"confirmed": 3}
+    assert sync_db.wallets.find_one({"user_id": user_id})["balance_coins"] == 30
+
+    replay = event_loop_runner(bulk_moderation.confirm_funding(db, ["t0", "t1", "t2"], ADMIN))
+    assert replay["summary"] == {"not_pending": 3}
+    assert sync_db.wallets.find_one({"user_id": user_id})["balance_coins"] == 30
@@ -0,0 +1,86 @@
+"""
+Write-behind counters: a burst of blog events on one post becomes a single
+update per collection, and the flush on stop lands every event on both the
+item's counters and its content_analytics day.
+"""
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from pymongo import monitoring
+
+from backend.services.counter_buffer import counter_buffer
+
+
+class UpdateCapture(monitoring.CommandListener):
+    def __init__(self):
+        self.updates = []
+
+    def started(self, event):
+        if event.command_name == "update":
+            self.updates.append((event.command["update"], len(event.command["updates"])))
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+@pytest.fixture(scope="module")
+def capture():
+    return UpdateCapture()
+
+
+@pytest.fixture(scope="module")
+def event_listeners(capture):
+    return [capture]
+
+
+def test_burst_is_coalesced_and_flushed_on_stop(db, sync_db, capture, event_loop_runner):
+    post_id, job_id = str(uuid.uuid4()), str(uuid.uuid4())
+    sync_db.content_items.insert_many([
+        {"id": post_id, "content_type": "blog_post", "view_count": 0, "like_count": 0, "share_count": 0},
+        {"id": job_id, "content_type": "job_posting", "settings": {"applications_count": 0}},
+    ])
+
+    async def burst():
+        counter_buffer.start(db.database)
+        try:
+            await asyncio.gather(
+                *(db.increment_content_view_count(post_id) for _ in range(150)),
+                *(db.increment_content_like_count(post_id) for _ in range(20)),
+                *(db.increment_content_share_count(post_id) for _ in range(5)),
+                *(db.increment_job_applications_count(job_id) for _ in range(3)),
+            )
+            buffered = sync_db.content_items.find_one({"id": post_id})["view_count"]
+            capture.updates.clear()
+        finally:
+            await counter_buffer.stop()
+        return buffered
+
+    assert event_loop_runner(burst()) == 0
+    # One bulk update per collection: two content_items documents, one analytics day
+    assert sorted(capture.updates) == [("content_analytics", 1), ("content_items", 2)]
+
+    post = sync_db.content_items.find_one({"id": post_id})
+    assert (post["view_count"], post["like_count"], post["share_count"]) == (150, 20, 5)
+    assert sync_db.content_items.find_one({"id": job_id})["settings"]["applications_count"] == 3
+
+    analytics = event_loop_runner(db.get_content_analytics(post_id, days=1))
+    assert (analytics["total_views"], analytics["total_likes"], analytics["total_shares"]) == (150, 20, 5)
+    assert analytics["daily_data"][0]["date"] == datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def test_writes_through_when_not_started(db, sync_db, event_loop_runner):
+    post_id = str(uuid.uuid4())
+    sync_db.content_items.insert_one({"id": post_id, "content_type": "blog_post", "view_count": 0})
+
+    event_loop_runner(db.increment_content_view_count(post_id))
+    assert counter_buffer.pending == 0
+    assert sync_db.content_items.find_one({"id": post_id})["view_count"] == 1
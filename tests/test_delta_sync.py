@@ -0,0 +1,86 @@
+"""
+Delta sync tokens: pages chain on the exact last key, a caught-up token
+stays an overlap window behind now so a row committed late with an earlier
+``updated_at`` is still delivered, and once writes stop a refresh is empty.
+"""
+from datetime import datetime, timedelta
+
+from backend.utils.delta_sync import decode_sync_token, merge_delta
+
+T0 = datetime(2026, 5, 1, 12, 0, 0)
+
+
+def _row(doc_id, seconds):
+    return {"id": doc_id, "updated_at": T0 + timedelta(seconds=seconds)}
+
+
+def _matches(doc, since):
+    """The range delta_filter asks Mongo for, evaluated in Python."""
+    ts, doc_id = since
+    return doc["updated_at"] > ts or (doc["updated_at"] == ts and doc["id"] > doc_id)
+
+
+def _sync(table, token, limit, overlap_sec, now):
+    since = decode_sync_token(token)
+    rows = sorted((r for r in table if since is None or _matches(r, since)),
+                  key=lambda r: (r["updated_at"], r["id"]))
+    return merge_delta(rows[:limit + 1], [], limit, overlap_sec=overlap_sec, now=now)
+
+
+def _at(seconds):
+    return T0 + timedelta(seconds=seconds)
+
+
+def test_pages_chain_on_the_exact_last_key():
+    page = merge_delta([_row("a", 1), _row("b", 2), _row("c", 3)], [], 2, overlap_sec=5, now=_at(4))
+    assert page["has_more"] and [r["id"] for r in page["items"]] == ["a", "b"]
+    assert decode_sync_token(page["next_since"]) == (_at(2), "b")
+
+
+def test_caught_up_token_stays_an_overlap_behind_now():
+    page = merge_delta([_row("a", 1)], [{"id": "gone", "updated_at": _at(2)}], 10, overlap_sec=5, now=_at(4))
+    assert not page["has_more"] and page["deleted"] == ["gone"]
+    assert decode_sync_token(page["next_since"]) == (_at(-1), "")
+    # Rows older than the window need no overlap: the token is their own key
+    settled = merge_delta([_row("a", 1)], [], 10, overlap_sec=5, now=_at(60))
+    assert decode_sync_token(settled["next_since"]) == (_at(1), "a")
+    assert merge_delta([], [], 10)["next_since"] is None
+
+
+def test_late_commit_is_delivered_on_the_next_refresh():
+    table = [_row("a", 1), _row("c", 3)]
+    first = _sync(table, "0", 50, overlap_sec=5, now=_at(4))
+    assert [r["id"] for r in first["items"]] == ["a", "c"]
+
+    # Stamped at t=2 but committed only after the first sync read up to t=3
+    table.append(_row("b", 2))
+    second = _sync(table, first["next_since"], 50, overlap_sec=5, now=_at(5))
+    assert "b" in [r["id"] for r in second["items"]]
+
+    without_overlap = _sync(table[:2], "0", 50, overlap_sec=0, now=_at(4))
+    assert _sync(table, without_overlap["next_since"], 50, overlap_sec=0, now=_at(5))["items"] == []
+
+
+def test_refresh_after_catching_up_returns_nothing():
+    table = [_row("a", 1), _row("b", 2)]
+    token = _sync(table, "0", 50, overlap_sec=5, now=_at(3))["next_since"]
+    # The first refresh after the window passes may repeat the tail once, then the token settles
+    repeat = _sync(table, token, 50, overlap_sec=5, now=_at(30))
+    token = repeat["next_since"]
+    assert decode_sync_token(token) == (_at(2), "b")
+    for seconds in (31, 32, 33):
+        page = _sync(table, token, 50, overlap_sec=5, now=_at(seconds))
+        assert page["items"] == [] and page["deleted"] == [] and page["next_since"] is None
+
+
+def test_paging_through_a_busy_overlap_window_terminates():
+    table = [_row(f"r{i:02d}", 1) for i in range(12)]
+    token, seen = "0", []
+    for _ in range(6):
+        page = _sync(table, token, 5, overlap_sec=5, now=_at(2))
+        seen += [r["id"] for r in page["items"]]
+        token = page["next_since"]
+        if not page["has_more"]:
+            break
+    assert not page["has_more"]
+    assert sorted(set(seen)) == sorted(r["id"] for r in table)
@@ -0,0 +1,35 @@
+"""
+Signed file URLs: a signature only opens the path it was issued for, and
+only until it expires.
+"""
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+pytest.importorskip("jwt")
+pytest.importorskip("passlib")
+
+from backend.auth.security import sign_file_path, verify_file_signature
+
+PROOF = "/api/wallet/payment-proof/user-1_proof.jpg"
+
+
+def _parts(url):
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    return unquote(parts.path), query["expires"][0], query["signature"][0]
+
+
+def test_signature_opens_only_its_own_path():
+    path, expires, signature = _parts(sign_file_path(PROOF))
+    assert path == PROOF
+    assert verify_file_signature(PROOF, expires, signature)
+    assert not verify_file_signature("/api/wallet/payment-proof/user-2_proof.jpg", expires, signature)
+    assert not verify_file_signature(PROOF, str(int(expires) + 60), signature)
+    assert not verify_file_signature(PROOF, expires, None)
+    assert not verify_file_signature(PROOF, "soon", signature)
+
+
+def test_expired_signature_is_rejected():
+    _, expires, signature = _parts(sign_file_path(PROOF, ttl_sec=-1))
+    assert not verify_file_signature(PROOF, expires, signature)
@@ -0,0 +1,91 @@
+"""
+Block ID allocation against a real MongoDB: no duplicates across concurrent
+allocators, floors move new IDs past legacy ranges, and inserts that hit an
+existing ID are re-allocated through the unique index.
+"""
+import asyncio
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend import database as database_module
+from backend.services.id_allocator import BlockAllocator, get_allocator
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["jobs", "users", "referral_codes"]
+
+
+def test_concurrent_workers_never_share_ids(db, event_loop_runner):
+    # Two allocators on one counter stand in for two worker processes
+    workers = [BlockAllocator("test_seq", block_size=7), BlockAllocator("test_seq", block_size=7)]
+
+    async def draw():
+        return await asyncio.gather(*(workers[i % 2].next(db.database.counters) for i in range(500)))
+
+    values = event_loop_runner(draw())
+    assert len(set(values)) == len(values) == 500
+
+
+def test_floor_skips_legacy_range(db, event_loop_runner):
+    allocator = BlockAllocator("test_floor", block_size=3, floor=9999)
+    assert event_loop_runner(allocator.next(db.database.counters)) == 10000
+
+
+def test_create_job_reallocates_taken_number(db, event_loop_runner, sync_db):
+    allocator = get_allocator("jobs")
+    allocator.reset()
+    sync_db.counters.delete_one({"_id": "jobs"})
+    # A legacy job already holds the number the counter hands out next
+    sync_db.jobs.insert_one({"id": "000001", "title": "legacy"})
+
+    async def create():
+        job_id = await db.generate_job_id(digits=6)
+        return job_id, await db.create_job({"id": job_id, "title": "new"})
+
+    first_id, job = event_loop_runner(create())
+    assert first_id == "000001"
+    assert job["id"] != "000001"
+    assert sync_db.jobs.count_documents({"id": job["id"]}) == 1
+    allocator.reset()
+
+
+def test_allocated_insert_requires_the_unique_index(db, event_loop_runner, sync_db, monkeypatch):
+    sync_db.referral_codes.drop_index("referral_codes_code_unique")
+    db._allocator_indexes_ok.clear()
+    sync_db.users.insert_one({"id": "ref-user", "name": "Tunde Bello"})
+
+    code = event_loop_runner(db.generate_referral_code("ref-user"))
+    assert code.startswith("TUND")
+    assert "referral_codes_code_unique" in sync_db.referral_codes.index_information()
+
+    # A duplicate already in the collection keeps the index from building, so inserts are refused
+    sync_db.referral_codes.drop_index("referral_codes_code_unique")
+    sync_db.referral_codes.insert_one({"id": "dup", "user_id": "other", "code": code})
+    db._allocator_indexes_ok.clear()
+    with pytest.raises(RuntimeError, match="referral_codes.code"):
+        event_loop_runner(db.generate_referral_code("ref-user"))
+    assert ("referral_codes", "code") in db._allocator_index_retry_at
+
+    # ...but only referral codes: users and jobs still insert, and the failed build is not retried per request
+    async def create_user_and_job():
+        job_id = await db.generate_job_id()
+        await db.create_job({"id": job_id, "title": "still works"})
+        return await db.create_user({"id": "after-dup", "name": "Ada", "email": "ada@example.com"})
+
+    assert event_loop_runner(create_user_and_job())["id"] == "after-dup"
+
+    builds = []
+
+    async def recording_sync(*args, **kwargs):
+        builds.append(kwargs.get("names"))
+        return {}
+
+    monkeypatch.setattr(database_module, "sync_indexes", recording_sync)
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="referral_codes.code"):
+            event_loop_runner(db.generate_referral_code("ref-user"))
+    assert builds == []
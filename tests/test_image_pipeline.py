@@ -0,0 +1,84 @@
+"""
+Image pipeline: uploads are normalized to a bounded master JPEG in the
+process pool, renditions are rendered once and then served from the
+on-disk cache, and an undecodable source falls back to the stored file.
+"""
+import asyncio
+import io
+
+import pytest
+
+pytest.importorskip("PIL")
+
+from PIL import Image
+from starlette.requests import Request
+
+from backend.services.image_pipeline import RENDITIONS, ImagePipeline
+from backend.utils.file_response import send_image
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    monkeypatch.setenv("IMAGE_WORKERS", "1")
+    pipeline = ImagePipeline()
+    renders = []
+    run = pipeline._run
+
+    async def counting_run(fn, *args):
+        renders.append(fn.__name__)
+        return await run(fn, *args)
+
+    pipeline._run = counting_run
+    pipeline.renders = renders
+    yield pipeline
+    pipeline.shutdown()
+
+
+def _png(width, height):
+    out = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 40, 40, 128)).save(out, format="PNG")
+    return out.getvalue()
+
+
+def _head(accept="image/webp"):
+    return Request({"type": "http", "method": "HEAD", "path": "/", "query_string": b"",
+                    "headers": [(b"accept", accept.encode())]})
+
+
+def test_renders_once_and_serves_from_cache(pipeline, tmp_path, event_loop_runner):
+    master = str(tmp_path / "photo.jpg")
+
+    async def scenario():
+        await pipeline.save_master(_png(2400, 1200), master)
+        first = await asyncio.gather(*(pipeline.get_rendition(master, "thumb", "webp") for _ in range(3)))
+        again = await pipeline.get_rendition(master, "thumb", "webp")
+        return first, again
+
+    first, again = event_loop_runner(scenario())
+    with Image.open(master) as image:
+        assert image.format == "JPEG" and max(image.size) == RENDITIONS["full"] and image.mode == "RGB"
+    assert len(set(first)) == 1 and again == first[0]
+    with Image.open(again) as thumb:
+        assert thumb.format == "WEBP" and max(thumb.size) == RENDITIONS["thumb"]
+    # Concurrent first requests share one render; later ones hit the cache
+    assert pipeline.renders == ["normalize_image", "render_file"]
+
+    event_loop_runner(pipeline.delete_renditions(master))
+    assert not (tmp_path / "_renditions" / "photo.thumb.webp").exists()
+
+
+def test_undecodable_source_falls_back_to_the_stored_file(pipeline, tmp_path, event_loop_runner, monkeypatch):
+    broken = tmp_path / "broken.jpg"
+    broken.write_bytes(b"not really a jpeg")
+
+    with pytest.raises(ValueError, match="Invalid image file"):
+        event_loop_runner(pipeline.normalize(broken.read_bytes()))
+    with pytest.raises(OSError):
+        event_loop_runner(pipeline.get_rendition(str(broken), "card", "webp"))
+    assert not (tmp_path / "_renditions" / "broken.card.webp").exists()
+
+    monkeypatch.setattr("backend.utils.file_response.image_pipeline", pipeline)
+    response = event_loop_runner(send_image(_head(), str(broken), size="card"))
+    assert response.status_code == 200
+    assert response.media_type == "image/jpeg"
+    assert response.headers["Content-Length"] == str(len(b"not really a jpeg"))
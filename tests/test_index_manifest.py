@@ -0,0 +1,51 @@
+"""
+Index startup check: in the default verify mode, missing unique and text
+indexes are built in the background while other drift is only reported.
+"""
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.index_manifest import duplicate_keys, missing_required, sync_indexes
+
+
+def test_verify_builds_only_required_indexes(db, sync_db, event_loop_runner):
+    sync_db.quotes.insert_one({"id": "q1", "job_id": "j1", "tradesperson_id": "t1"})
+    assert "quotes_tradesperson_job" in event_loop_runner(missing_required(db.database))["quotes"]
+
+    event_loop_runner(db._check_indexes("verify"))
+
+    names = set(sync_db.quotes.index_information())
+    assert "quotes_tradesperson_job" in names
+    assert "quotes_job_createdAt" not in names
+    assert "jobs_text_search_weighted" in sync_db.jobs.index_information()
+    assert event_loop_runner(missing_required(db.database)) == {}
+
+
+def test_sync_replaces_a_retired_text_index(db, sync_db, event_loop_runner):
+    # A database still on the baseline title/category text index
+    sync_db.jobs.drop_index("jobs_text_search_weighted")
+    sync_db.jobs.create_index([("title", "text"), ("category", "text")], name="jobs_text_search")
+
+    summary = event_loop_runner(sync_indexes(db.database, ["jobs"], names=["jobs_text_search_weighted"]))
+
+    assert summary["jobs"]["dropped"] == ["jobs_text_search"]
+    assert summary["jobs"]["created"] == ["jobs_text_search_weighted"]
+    names = sync_db.jobs.index_information()
+    assert "jobs_text_search" not in names
+    assert names["jobs_text_search_weighted"]["weights"] == {"title": 10, "category": 5, "description": 1}
+
+
+def test_duplicate_keys_name_what_blocks_a_unique_index(db, sync_db, event_loop_runner):
+    # The verify test above may already have built it
+    if "wallets_user_id_unique" in sync_db.wallets.index_information():
+        sync_db.wallets.drop_index("wallets_user_id_unique")
+    sync_db.wallets.insert_many([{"user_id": "u1"}, {"user_id": "u1"}, {"user_id": "u1"}, {"user_id": "u2"},
+                                 {"user_id": None}, {"user_id": None}])
+
+    summary = event_loop_runner(sync_indexes(db.database, ["wallets"]))
+    assert summary["wallets"]["failed"] == ["wallets_user_id_unique"]
+    # Only documents the partial filter covers count: the null user_ids do not block the index
+    dups = event_loop_runner(duplicate_keys(db.database, "wallets", "wallets_user_id_unique"))
+    assert dups == [{"key": {"user_id": "u1"}, "count": 3}]
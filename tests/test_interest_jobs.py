@@ -0,0 +1,95 @@
+"""
+Job fields on interests: copied when the interest is made, kept in step by
+the job status paths and the expiry sweep, and read back a page at a time
+by the "my interests" and "completed jobs" views.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import interest_jobs, job_expiry
+
+
+def _job(sync_db, title, **extra):
+    now = datetime.utcnow()
+    job = {"id": str(uuid.uuid4()), "title": title, "category": "Plumbing", "status": "active",
+           "location": "Ikeja", "homeowner": {"id": "h1", "name": "Ngozi"}, "access_fee_naira": 1500,
+           "access_fee_coins": 15, "created_at": now, "expires_at": now + timedelta(days=30), **extra}
+    sync_db.jobs.insert_one(dict(job))
+    return job
+
+
+def _interest(db, run, job, tradesperson_id):
+    now = datetime.utcnow()
+    return run(db.create_interest({"id": str(uuid.uuid4()), "job_id": job["id"], "tradesperson_id": tradesperson_id,
+                                   "status": "interested", "created_at": now, "updated_at": now}))
+
+
+def test_interest_carries_job_fields_and_follows_status(db, sync_db, event_loop_runner):
+    tp = str(uuid.uuid4())
+    job = _job(sync_db, "Fix kitchen leak")
+    interest = _interest(db, event_loop_runner, job, tp)
+    stored = sync_db.interests.find_one({"id": interest["id"]})
+    assert (stored["job_status"], stored["job_title"], stored["job_location"], stored["homeowner_name"],
+            stored["access_fee_naira"]) == ("active", "Fix kitchen leak", "Ikeja", "Ngozi", 1500)
+
+    event_loop_runner(db.update_job_access_fee(job["id"], 2000))
+    event_loop_runner(db.update_job_status(job["id"], "completed"))
+    stored = sync_db.interests.find_one({"id": interest["id"]})
+    assert (stored["job_status"], stored["access_fee_naira"], stored["access_fee_coins"]) == ("completed", 2000, 20)
+    assert stored["updated_at"] > interest["updated_at"]
+
+    deleted = _job(sync_db, "Old job")
+    _interest(db, event_loop_runner, deleted, tp)
+    event_loop_runner(db.soft_delete_job_admin(deleted["id"]))
+    assert sync_db.interests.find_one({"job_id": deleted["id"]})["job_status"] == "deleted"
+
+
+def test_expiry_sweep_updates_interests(db, sync_db, event_loop_runner):
+    job = _job(sync_db, "Paint fence", expires_at=datetime.utcnow() - timedelta(minutes=1))
+    _interest(db, event_loop_runner, job, str(uuid.uuid4()))
+    event_loop_runner(job_expiry.sweep(db.database))
+    assert sync_db.interests.find_one({"job_id": job["id"]})["job_status"] == "expired"
+
+
+def test_views_page_by_job_status(db, sync_db, event_loop_runner):
+    tp = str(uuid.uuid4())
+    jobs = [_job(sync_db, f"Job {i}") for i in range(7)]
+    for job in jobs:
+        _interest(db, event_loop_runner, job, tp)
+    for job in jobs[:5]:
+        event_loop_runner(db.update_job_status(job["id"], "completed"))
+
+    first = event_loop_runner(db.get_completed_jobs_for_tradesperson(tp, skip=0, limit=3))
+    second = event_loop_runner(db.get_completed_jobs_for_tradesperson(tp, skip=3, limit=3))
+    titles = [j["job_title"] for j in first + second]
+    assert len(titles) == 5 and set(titles) == {f"Job {i}" for i in range(5)}
+    assert first[0]["homeowner_name"] == "Ngozi" and first[0]["job_category"] == "Plumbing"
+    assert event_loop_runner(db.get_tradesperson_interests_count(tp, job_status="completed")) == 5
+
+    history = event_loop_runner(db.get_tradesperson_interests(tp, skip=0, limit=10))
+    assert len(history) == 7 and {i["job_status"] for i in history} == {"active", "completed"}
+    assert event_loop_runner(db.get_tradesperson_interests_count(tp)) == 7
+    # Unpaged callers get everything
+    assert len(event_loop_runner(db.get_tradesperson_interests(tp, limit=None))) == 7
+    assert len(event_loop_runner(db.get_completed_jobs_for_tradesperson(tp, limit=None))) == 5
+
+
+def test_backfill_fills_legacy_interests(db, sync_db, event_loop_runner):
+    tp = str(uuid.uuid4())
+    job = _job(sync_db, "Rewire flat", status="completed")
+    # Written before the fields existed
+    sync_db.interests.insert_one({"id": str(uuid.uuid4()), "job_id": job["id"], "tradesperson_id": tp,
+                                  "status": "paid_access", "created_at": datetime.utcnow()})
+    assert event_loop_runner(interest_jobs.page(db.database, tp, job_status="completed")) == []
+
+    scanned, stale = event_loop_runner(interest_jobs.backfill(db.database, apply=False, batch_size=2))
+    assert stale >= 1 and sync_db.interests.find_one({"tradesperson_id": tp}).get("job_status") is None
+    assert event_loop_runner(interest_jobs.backfill(db.database, apply=True, batch_size=2))[1] == stale
+    assert event_loop_runner(interest_jobs.backfill(db.database, apply=True))[1] == 0
+    (listed,) = event_loop_runner(interest_jobs.page(db.database, tp, job_status="completed"))
+    assert listed["job_title"] == "Rewire flat"
@@ -0,0 +1,75 @@
+"""
+Job expiry sweeper: past-due active jobs move to ``expired`` in batches,
+legacy jobs get an expiry, concurrent sweeps don't double count, and the
+public list and count agree once expiry is a status.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import job_expiry, platform_stats, stats_counters
+
+
+def _job(status="active", **fields):
+    return {"id": str(uuid.uuid4()), "title": "Fix sink", "status": status, **fields}
+
+
+def test_sweep_expires_past_due_jobs_in_batches(db, sync_db, event_loop_runner):
+    now = datetime.utcnow()
+    created = [event_loop_runner(db.create_job(_job(created_at=now))) for _ in range(2)]
+    past_due = [_job(expires_at=now - timedelta(hours=h), created_at=now - timedelta(days=40)) for h in range(1, 8)]
+    sync_db.jobs.insert_many(past_due + [_job("completed", expires_at=now - timedelta(days=1))])
+    event_loop_runner(db.reconcile_platform_stats())
+    active_before = sync_db.platform_stats.find_one({"_id": platform_stats.STATS_DOC_ID})["active_jobs"]
+    counted_before = event_loop_runner(stats_counters.totals(db.database, ["jobs.status."]))
+
+    async def concurrent_sweeps():
+        return await asyncio.gather(*(job_expiry.sweep(db.database, batch_size=2) for _ in range(3)))
+
+    assert sum(event_loop_runner(concurrent_sweeps())) == 7
+    assert event_loop_runner(job_expiry.sweep(db.database)) == 0
+
+    statuses = {
+        j["id"]: (j["status"], j.get("expired_at"))
+        for j in sync_db.jobs.find({}, {"id": 1, "status": 1, "expired_at": 1})
+    }
+    assert all(statuses[j["id"]][0] == "expired" and statuses[j["id"]][1] for j in past_due)
+    assert all(statuses[j["id"]][0] == "active" for j in created)
+    assert sync_db.platform_stats.find_one({"_id": platform_stats.STATS_DOC_ID})["active_jobs"] == active_before - 7
+    counted = event_loop_runner(stats_counters.totals(db.database, ["jobs.status."]))
+    assert counted.get("jobs.status.expired", 0) - counted_before.get("jobs.status.expired", 0) == 7
+    assert counted_before.get("jobs.status.active", 0) - counted.get("jobs.status.active", 0) == 7
+
+
+def test_backfill_gives_legacy_jobs_an_expiry(db, sync_db, event_loop_runner):
+    now = datetime.utcnow()
+    legacy = {
+        "old": _job(created_at=now - timedelta(days=45)),
+        "recent": _job(created_at=now - timedelta(days=5), expires_at=None),
+        "string": _job(created_at=now, expires_at=(now - timedelta(days=1)).isoformat()),
+    }
+    sync_db.jobs.insert_many(list(legacy.values()))
+
+    assert event_loop_runner(job_expiry.backfill(db.database)) == 3
+    assert sync_db.jobs.count_documents(job_expiry.MISSING_EXPIRY) == 3
+    event_loop_runner(job_expiry.backfill(db.database, apply=True))
+    assert sync_db.jobs.count_documents(job_expiry.MISSING_EXPIRY) == 0
+
+    recent = sync_db.jobs.find_one({"id": legacy["recent"]["id"]})
+    assert abs(recent["expires_at"] - (legacy["recent"]["created_at"] + job_expiry.JOB_TTL)) < timedelta(seconds=1)
+
+    event_loop_runner(job_expiry.sweep(db.database))
+    status = {k: sync_db.jobs.find_one({"id": j["id"]})["status"] for k, j in legacy.items()}
+    assert status == {"old": "expired", "recent": "active", "string": "expired"}
+
+
+def test_public_list_and_count_agree(db, sync_db, event_loop_runner):
+    event_loop_runner(job_expiry.sweep(db.database))
+    jobs = event_loop_runner(db.get_jobs(skip=0, limit=100))
+    assert len(jobs) == event_loop_runner(db.get_jobs_count()) == sync_db.jobs.count_documents({"status": "active"})
+    assert all(j["expires_at"] > datetime.utcnow() for j in jobs)
@@ -0,0 +1,114 @@
+"""
+Materialized tradesperson feeds: fan-out matches trade and travel radius,
+the feed endpoint reads entries newest first, entries leave with the job,
+and a profile change rebuilds the feed.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import job_expiry, job_feeds
+
+IKEJA = (6.60, 3.35)
+ABUJA = (9.06, 7.49)
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner):
+    def tradesperson(name, trades, at=None, **extra):
+        lat, lng = at or (None, None)
+        return event_loop_runner(db.create_user({
+            "id": str(uuid.uuid4()), "name": name, "email": f"{uuid.uuid4().hex[:8]}@example.com",
+            "role": "tradesperson", "status": "active", "trade_categories": trades,
+            "latitude": lat, "longitude": lng, "travel_distance_km": 25, **extra,
+        }))
+
+    db.people = {
+        "plumber": tradesperson("Ade", ["Plumbing"], IKEJA),
+        "far_plumber": tradesperson("Bola", ["Plumbing"], ABUJA),
+        "tiler": tradesperson("Chi", ["Tiling"], IKEJA),
+        "roaming_tiler": tradesperson("Dayo", ["Tiling"]),
+    }
+    return db
+
+
+def _job(sync_db, title, category, at=IKEJA, age_hours=0, status="active"):
+    now = datetime.utcnow()
+    job = {"id": str(uuid.uuid4()), "title": title, "category": category, "status": status,
+           "latitude": at[0] if at else None, "longitude": at[1] if at else None,
+           "created_at": now - timedelta(hours=age_hours), "expires_at": now + timedelta(days=30)}
+    sync_db.jobs.insert_one(job)
+    return job
+
+
+def _feed(db, run, who):
+    jobs = run(db.get_jobs_for_tradesperson(db.people[who]["id"], skip=0, limit=50))
+    return [j["title"] for j in jobs]
+
+
+def test_fan_out_matches_trade_and_radius(db, sync_db, event_loop_runner):
+    leak = _job(sync_db, "Fix kitchen leak", "Plumbing")
+    floor = _job(sync_db, "Bathroom floor with new tiling", "Bathroom Fitting", at=None, age_hours=1)
+    assert [event_loop_runner(job_feeds.fan_out(db.database, job)) for job in (leak, floor)] == [1, 2]
+    (entry,) = sync_db.job_feeds.find({"tradesperson_id": db.people["plumber"]["id"]})
+    assert entry["job_id"] == leak["id"] and entry["distance_km"] == 0.1
+
+    expected = {
+        "plumber": ["Fix kitchen leak"],
+        "far_plumber": [],
+        "tiler": ["Bathroom floor with new tiling"],
+        "roaming_tiler": ["Bathroom floor with new tiling"],
+    }
+    assert {who: _feed(db, event_loop_runner, who) for who in db.people} == expected
+    # A second read is served from the entries as they stand
+    assert {who: _feed(db, event_loop_runner, who) for who in db.people} == expected
+
+
+def test_entries_leave_with_the_job(db, sync_db, event_loop_runner):
+    closing = _job(sync_db, "Burst pipe", "Plumbing")
+    stale = _job(sync_db, "Blocked drain plumbing", "Drainage")
+    for job in (closing, stale):
+        event_loop_runner(job_feeds.fan_out(db.database, job))
+    assert {"Burst pipe", "Blocked drain plumbing"} <= set(_feed(db, event_loop_runner, "plumber"))
+
+    event_loop_runner(db.update_job_status(closing["id"], "completed"))
+    sync_db.jobs.update_one({"id": stale["id"]}, {"$set": {"expires_at": datetime.utcnow() - timedelta(minutes=1)}})
+    event_loop_runner(job_expiry.sweep(db.database))
+
+    assert sync_db.job_feeds.count_documents({"job_id": {"$in": [closing["id"], stale["id"]]}}) == 0
+    assert "Burst pipe" not in _feed(db, event_loop_runner, "plumber")
+
+
+def test_profile_change_rebuilds_feed(db, sync_db, event_loop_runner):
+    _job(sync_db, "Retile the patio", "Tiling", at=ABUJA)
+    far = db.people["far_plumber"]["id"]
+    assert _feed(db, event_loop_runner, "far_plumber") == []
+
+    event_loop_runner(db.update_user(far, {"trade_categories": ["Plumbing", "Tiling"]}))
+    assert _feed(db, event_loop_runner, "far_plumber") == ["Retile the patio", "Bathroom floor with new tiling"]
+    state = sync_db.job_feed_state.find_one({"_id": far})
+    assert state["signature"] == job_feeds.signature(sync_db.users.find_one({"id": far}))
+
+    # Location overrides are answered live
+    live = event_loop_runner(db.get_jobs_for_tradesperson(
+        far, skip=0, limit=50, latitude=IKEJA[0], longitude=IKEJA[1], max_distance_km=10))
+    assert "Retile the patio" not in [j["title"] for j in live]
+
+
+def test_profile_without_directory_keys_gets_new_jobs(db, sync_db, event_loop_runner):
+    # Written before the directory keys existed and never backfilled
+    legacy = {"id": str(uuid.uuid4()), "name": "Emeka", "email": "emeka@example.com", "role": "tradesperson",
+              "status": "active", "trade_categories": ["Roofing"], "latitude": IKEJA[0], "longitude": IKEJA[1],
+              "travel_distance_km": 25, "created_at": datetime.utcnow()}
+    sync_db.users.insert_one(dict(legacy))
+    db.people["legacy"] = legacy
+    assert _feed(db, event_loop_runner, "legacy") == []
+    assert sync_db.users.find_one({"id": legacy["id"]})["directory"]["trades"] == ["roofing"]
+
+    roof = _job(sync_db, "Fix roof leak", "Roofing")
+    assert event_loop_runner(job_feeds.fan_out(db.database, roof)) == 1
+    assert _feed(db, event_loop_runner, "legacy") == ["Fix roof leak"]
@@ -0,0 +1,81 @@
+"""
+Ranked job search: $text on the jobs_text_search_weighted index ranks title
+matches above description matches, expands local trade terms, honours the
+public filters, pages stably, and the suggestion box tolerates typos.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import job_expiry
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["jobs"]
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner, sync_db):
+    now = datetime.utcnow()
+    live = now + timedelta(days=10)
+
+    def job(title, category="Plumbing", description="", status="active", expires_at=live, age_days=0):
+        return {"id": str(uuid.uuid4()), "title": title, "category": category, "description": description,
+                "status": status, "expires_at": expires_at, "created_at": now - timedelta(days=age_days),
+                "search_fixture": True}
+
+    sync_db.jobs.insert_many([
+        job("Fix leaking kitchen sink", description="Water everywhere", age_days=3),
+        job("Bathroom renovation", category="Renovations", description="Also a small leak under the sink"),
+        job("Leak in roof", category="Roofing", age_days=1),
+        job("Install new plumbing for extension", age_days=2),
+        job("Old leak job", status="completed"),
+        job("Expired leak job", expires_at=now - timedelta(days=1)),
+        job("Repair generator", category="Generator Services", description="Gen no dey start"),
+        *[job(f"Leak repair {i}", age_days=10) for i in range(7)],
+    ])
+    event_loop_runner(job_expiry.sweep(db.database))
+    return db
+
+
+def _titles(jobs):
+    return [j["title"] for j in jobs]
+
+
+def test_title_matches_outrank_description_matches(db, event_loop_runner):
+    jobs, total = event_loop_runner(db.search_jobs_text("leak", skip=0, limit=20))
+    titles = _titles(jobs)
+    assert total == len(jobs) == 10
+    assert titles.index("Bathroom renovation") == len(titles) - 1
+    assert "Old leak job" not in titles and "Expired leak job" not in titles
+
+
+def test_pidgin_terms_expand_and_filters_combine(db, event_loop_runner):
+    jobs, _ = event_loop_runner(db.search_jobs_text("plumba", skip=0, limit=20))
+    assert "Install new plumbing for extension" in _titles(jobs)
+
+    jobs, total = event_loop_runner(db.search_jobs_text("leak", category="Roofing", skip=0, limit=20))
+    assert (_titles(jobs), total) == (["Leak in roof"], 1)
+
+
+def test_pagination_is_stable(db, event_loop_runner):
+    full, _ = event_loop_runner(db.search_jobs_text("leak", skip=0, limit=20))
+    pages = []
+    for skip in range(0, 10, 3):
+        page, _ = event_loop_runner(db.search_jobs_text("leak", skip=skip, limit=3))
+        pages.extend(page)
+    assert [j["id"] for j in pages] == [j["id"] for j in full]
+
+    located = event_loop_runner(db.search_jobs_with_location(search_query="leak", limit=20))
+    assert _titles(located) == _titles(full)
+
+
+def test_suggestions_tolerate_typos(db, event_loop_runner):
+    assert "plumbing" in event_loop_runner(db.suggest_job_search_terms("plu"))
+    assert "generator" in event_loop_runner(db.suggest_job_search_terms("genrat"))
+    assert "leak" in event_loop_runner(db.suggest_job_search_terms("lea"))
@@ -0,0 +1,123 @@
+"""
+Hourly notification rollups: buckets maintained by the write paths agree with
+an aggregation over the raw notifications, for whole and partial-hour ranges,
+and a backfill corrects drift.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.models.notifications import Notification, NotificationStatus
+from backend.services import notification_rollups
+
+DIMENSIONS = ("type", "channel", "status")
+
+
+def _raw(sync_db, date_from=None, date_to=None) -> dict:
+    created = {}
+    if date_from:
+        created["$gte"] = date_from
+    if date_to:
+        created["$lte"] = date_to
+    pipeline = [
+        {"$match": {"created_at": created} if created else {}},
+        {"$group": {"_id": {d: f"${d}" for d in DIMENSIONS}, "count": {"$sum": 1}}},
+    ]
+    return {tuple(row["_id"][d] for d in DIMENSIONS): row["count"] for row in sync_db.notifications.aggregate(pipeline)}
+
+
+def _notification(user_id: str, created_at: datetime, channel: str = "email") -> Notification:
+    return Notification(
+        id=str(uuid.uuid4()), user_id=user_id, type="job_posted", channel=channel,
+        subject="Job posted", content="", created_at=created_at,
+    )
+
+
+def test_write_paths_match_raw(db, sync_db, event_loop_runner):
+    base = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(days=3)
+    user_id = str(uuid.uuid4())
+
+    async def write_paths():
+        created = []
+        for i in range(12):
+            channel = ("email", "sms", "both")[i % 3]
+            notification = _notification(user_id, base + timedelta(minutes=25 * i), channel)
+            created.append(await db.create_notification(notification))
+        await db.update_notification_status(created[0].id, NotificationStatus.SENT)
+        await db.update_notification_status(created[1].id, NotificationStatus.FAILED)
+        await db.update_notification_status(created[1].id, NotificationStatus.FAILED)  # no-op move
+        await db.update_notification_status_admin(created[2].id, "delivered", "checked")
+        await db.mark_notification_as_read(created[3].id, user_id)
+        await db.delete_notification(created[4].id, user_id)
+        await db.delete_notification_admin(created[5].id)
+        await db.mark_all_notifications_as_read(user_id)
+        return await notification_rollups.counts(db.database, DIMENSIONS)
+
+    maintained = event_loop_runner(write_paths())
+    assert maintained == _raw(sync_db)
+    assert sum(v for k, v in maintained.items() if k[2] == "read") == 10
+
+
+def test_concurrent_mark_all_read_moves_each_notification_once(db, sync_db, event_loop_runner):
+    user_id = str(uuid.uuid4())
+    now = datetime.now(timezone.utc)
+
+    async def race():
+        for i in range(7):
+            await db.create_notification(_notification(user_id, now - timedelta(minutes=i)))
+        # Small batches so the calls interleave over the same documents
+        return await asyncio.gather(*(db.mark_all_notifications_as_read(user_id, batch_size=2) for _ in range(3)))
+
+    marked = event_loop_runner(race())
+    assert sum(marked) == 7
+    assert event_loop_runner(notification_rollups.counts(db.database, DIMENSIONS)) == _raw(sync_db)
+
+
+def test_partial_hour_ranges(db, sync_db, event_loop_runner):
+    date_from = datetime.utcnow() - timedelta(days=3, minutes=-37)
+    date_to = date_from + timedelta(hours=3, minutes=11)
+
+    async def report():
+        return (
+            await notification_rollups.counts(db.database, DIMENSIONS, date_from=date_from, date_to=date_to),
+            await notification_rollups.counts(db.database, DIMENSIONS, date_from=date_from,
+                                              date_to=date_from + timedelta(minutes=20)),
+        )
+
+    wide, narrow = event_loop_runner(report())
+    assert wide == _raw(sync_db, date_from, date_to)
+    assert narrow == _raw(sync_db, date_from, date_from + timedelta(minutes=20))
+
+
+def test_admin_reports_read_rollups(db, sync_db, event_loop_runner):
+    async def read():
+        return (
+            await db.get_notification_analytics(),
+            await db.get_notification_delivery_report("job_posted"),
+            await db.get_notification_status_counts({"channel": "email"}),
+        )
+
+    analytics, report, email = event_loop_runner(read())
+    total = sync_db.notifications.count_documents({})
+    assert analytics["total_notifications"] == total
+    assert report["job_posted"]["total"] == total
+    assert email["total_notifications"] == sync_db.notifications.count_documents({"channel": "email"})
+
+
+def test_backfill_corrects_drift(db, sync_db, event_loop_runner):
+    # An import that bypassed the hooks, and a purge of one user's notifications
+    sync_db.notifications.insert_many([
+        {"_id": str(uuid.uuid4()), "type": "new_interest", "channel": "sms", "status": "sent",
+         "created_at": datetime.utcnow() - timedelta(days=40)}
+        for _ in range(3)
+    ])
+    sync_db.notifications.delete_one({"status": "read"})
+    assert event_loop_runner(notification_rollups.counts(db.database, DIMENSIONS)) != _raw(sync_db)
+
+    event_loop_runner(notification_rollups.rebuild(db.database, apply=True))
+    assert event_loop_runner(notification_rollups.counts(db.database, DIMENSIONS)) == _raw(sync_db)
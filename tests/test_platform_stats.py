@@ -0,0 +1,66 @@
+"""
+Materialized platform statistics: write-path hooks keep ``platform_stats`` in
+step with a full recount, and reconciliation corrects drift.
+"""
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import platform_stats
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner):
+    event_loop_runner(db.reconcile_platform_stats())
+    return db
+
+
+def _counters(sync_db) -> dict:
+    doc = sync_db.platform_stats.find_one({"_id": platform_stats.STATS_DOC_ID})
+    return {k: doc.get(k, 0) for k in platform_stats.COUNTERS}
+
+
+def test_hooks_match_recount(db, sync_db, event_loop_runner):
+    async def write_paths():
+        await db.create_user({"id": str(uuid.uuid4()), "email": f"{uuid.uuid4()}@example.com", "role": "tradesperson"})
+        await db.create_user({"id": str(uuid.uuid4()), "email": f"{uuid.uuid4()}@example.com", "role": "homeowner"})
+        jobs = [await db.create_job({"id": str(uuid.uuid4()), "status": "pending_approval"}) for _ in range(3)]
+        await db.update_job_approval_status(jobs[0]["id"], {"status": "active"})
+        await db.update_job_status_admin(jobs[1]["id"], "active")
+        await db.update_job_status(jobs[1]["id"], "completed")
+        # Repeating a status is not a transition
+        await db.update_job_status_admin(jobs[0]["id"], "active")
+        for rating in (5, 4, 2):
+            sync_db.reviews.insert_one({"id": str(uuid.uuid4()), "rating": rating})
+            await platform_stats.review_created(db.database, rating)
+        return await platform_stats.recount(db.database)
+
+    fresh = event_loop_runner(write_paths())
+    assert _counters(sync_db) == fresh
+    assert fresh["active_jobs"] == 1
+
+    stats = event_loop_runner(db.get_platform_stats())
+    assert stats["average_rating"] == round(11 / 3, 1)
+
+
+def test_reconcile_corrects_drift(db, sync_db, event_loop_runner):
+    # Writes that bypass the hooks
+    sync_db.jobs.insert_many([{"id": str(uuid.uuid4()), "status": "active"} for _ in range(4)])
+    before = _counters(sync_db)
+
+    drift = event_loop_runner(db.reconcile_platform_stats())
+    assert drift == {"total_jobs": 4, "active_jobs": 4}
+    assert _counters(sync_db)["total_jobs"] == before["total_jobs"] + 4
+
+
+def test_only_one_worker_claims_reconciliation(db, event_loop_runner):
+    async def claim_twice():
+        return [
+            await platform_stats.claim_reconcile(db.database, interval_sec=0),
+            await platform_stats.claim_reconcile(db.database, interval_sec=3600),
+        ]
+
+    assert event_loop_runner(claim_twice()) == [True, False]
@@ -0,0 +1,256 @@
+"""
+Query-plan regression suite for the hot ``Database`` read paths.
+
+Each case calls a real ``Database`` method against a seeded throwaway MongoDB
+with the manifest's indexes built, captures every read it issues, explains
+each one, and fails on COLLSCAN, in-memory SORT, unindexed ``$lookup`` or a
+docs-examined/returned ratio above QUERY_PLAN_MAX_EXAMINED_RATIO.
+
+    pytest tests/test_query_plans.py                      # starts a local mongod
+    TEST_MONGO_URL=mongodb://... pytest tests/test_query_plans.py
+"""
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from tests.conftest import make_database
+from tests.query_plans import CommandCapture, explain, plan_problems
+from backend.services import job_expiry, user_search
+
+SEED = 20240601
+SCALE = 1
+
+CATEGORIES = [
+    "Plumbing", "Electrical Repairs", "Carpentry", "Painting", "Tiling", "Roofing",
+    "Welding", "Generator Services", "Air Conditioning", "Cleaning", "Masonry", "Landscaping",
+]
+STATES = ["Lagos", "Abuja", "Kano", "Rivers", "Oyo", "Enugu"]
+TITLE_WORDS = ["install", "repair", "replace", "fix", "service", "upgrade", "paint", "build"]
+
+
+def _uid() -> str:
+    return str(uuid.uuid4())
+
+
+def seed_dataset(db, scale: int = SCALE) -> dict:
+    """Bulk-load a deterministic dataset and return ids of representative users/rows."""
+    rng = random.Random(SEED)
+    now = datetime.utcnow()
+
+    def ago(days_max: float) -> datetime:
+        return now - timedelta(days=rng.uniform(0, days_max))
+
+    homeowners, tradespeople, users = [], [], []
+    for i in range(400 * scale):
+        role = "homeowner" if i % 4 != 3 else "tradesperson"
+        user = {
+            "id": _uid(),
+            "user_id": f"U{i:05d}",
+            "public_id": f"P{i:06d}",
+            "name": f"User {i}",
+            "email": f"user{i}@example.com",
+            "phone": f"+234803{i:07d}",
+            "role": role,
+            "status": "deleted" if i % 50 == 0 else "active",
+            "trade_categories": rng.sample(CATEGORIES, 2) if role == "tradesperson" else [],
+            "created_at": ago(365),
+        }
+        user["search"] = user_search.search_fields(user)
+        users.append(user)
+        (homeowners if role == "homeowner" else tradespeople).append(user)
+    db.users.insert_many(users)
+
+    jobs = []
+    for i in range(3000 * scale):
+        owner = rng.choice(homeowners)
+        created = ago(120)
+        status = rng.choices(["active", "completed", "cancelled", "pending_approval"], [70, 15, 10, 5])[0]
+        job = {
+            "id": _uid(),
+            "title": f"{rng.choice(TITLE_WORDS)} {rng.choice(CATEGORIES).lower()} job {i}",
+            "description": "Need a reliable professional" + (" to fix a leak" if i % 20 == 0 else ""),
+            "category": rng.choice(CATEGORIES),
+            "location": rng.choice(STATES),
+            "status": status,
+            "homeowner_id": owner["id"],
+            "homeowner": {"id": owner["id"], "name": owner["name"], "email": owner["email"]},
+            "latitude": 6.4 + rng.uniform(-1, 1),
+            "longitude": 3.4 + rng.uniform(-1, 1),
+            "budget_min": 10000,
+            "budget_max": 50000,
+            "created_at": created,
+            "updated_at": created,
+        }
+        # Legacy rows: some active jobs have already expired, a few never had expires_at
+        roll = rng.random()
+        if roll < 0.85:
+            job["expires_at"] = now + timedelta(days=rng.uniform(1, 30))
+        elif roll < 0.95:
+            job["expires_at"] = now - timedelta(days=rng.uniform(1, 30))
+        job["quotes_count"] = 0
+        jobs.append(job)
+
+    quotes, interests = [], []
+    for job in rng.sample(jobs, len(jobs) // 2):
+        for tp in rng.sample(tradespeople, rng.randint(1, 4)):
+            job["quotes_count"] += 1
+            quotes.append({"id": _uid(), "job_id": job["id"], "tradesperson_id": tp["id"], "created_at": ago(60)})
+            interests.append({
+                "id": _uid(), "job_id": job["id"], "tradesperson_id": tp["id"],
+                "status": rng.choice(["interested", "contact_shared", "paid_access"]), "created_at": ago(60),
+            })
+    db.jobs.insert_many(jobs)
+    db.quotes.insert_many(quotes)
+    db.interests.insert_many(interests)
+
+    conversations, messages = [], []
+    for interest in interests[: 800 * scale]:
+        updated = ago(30)
+        conv = {
+            "id": _uid(),
+            "job_id": interest["job_id"],
+            "homeowner_id": rng.choice(homeowners)["id"],
+            "tradesperson_id": interest["tradesperson_id"],
+            "last_message_at": updated,
+            "created_at": updated - timedelta(days=1),
+            "updated_at": updated,
+        }
+        conversations.append(conv)
+        for m in range(10):
+            sent = updated - timedelta(minutes=10 - m)
+            messages.append({
+                "id": _uid(), "conversation_id": conv["id"], "sender_type": rng.choice(["homeowner", "tradesperson"]),
+                "content": f"message {m}", "status": "sent", "created_at": sent, "updated_at": sent,
+            })
+    db.conversations.insert_many(conversations)
+    db.messages.insert_many(messages)
+
+    notifications = []
+    for user in users:
+        for n in range(12):
+            created = ago(90)
+            notifications.append({
+                "id": _uid(), "user_id": user["id"], "type": "job_posted", "channel": "email",
+                "subject": "Update", "content": f"Notification {n}",
+                "status": rng.choice(["pending", "sent", "read"]), "metadata": {},
+                "created_at": created, "updated_at": created,
+            })
+    db.notifications.insert_many(notifications)
+
+    wallets, transactions = [], []
+    for tp in tradespeople:
+        wallets.append({"id": _uid(), "user_id": tp["id"], "balance_coins": rng.randint(0, 200),
+                        "created_at": tp["created_at"]})
+        for _ in range(15):
+            transactions.append({
+                "id": _uid(), "user_id": tp["id"],
+                "transaction_type": rng.choice(["wallet_funding", "access_fee_deduction"]),
+                "status": rng.choice(["pending", "confirmed"]), "amount_coins": 10, "created_at": ago(180),
+            })
+    db.wallets.insert_many(wallets)
+    db.wallet_transactions.insert_many(transactions)
+
+    busiest_tp = max(tradespeople, key=lambda t: sum(1 for i in interests if i["tradesperson_id"] == t["id"]))
+    busiest_conv_owner = max(homeowners, key=lambda h: sum(1 for c in conversations if c["homeowner_id"] == h["id"]))
+    return {
+        "homeowner": busiest_conv_owner,
+        "tradesperson": busiest_tp,
+        "job": next(j for j in jobs if j["status"] == "active"),
+        "conversation": conversations[0],
+        "now": now,
+    }
+
+
+@pytest.fixture(scope="module")
+def capture():
+    return CommandCapture()
+
+
+@pytest.fixture(scope="module")
+def seeded(event_loop_runner, mongo_url, mongo_db_name, sync_db, capture):
+    from backend.index_manifest import sync_indexes
+
+    sample = seed_dataset(sync_db)
+    db = make_database(event_loop_runner, mongo_url, mongo_db_name, event_listeners=[capture])
+    summary = event_loop_runner(sync_indexes(db.database))
+    failed = {c: o["failed"] for c, o in summary.items() if o["failed"]}
+    assert not failed, f"manifest indexes failed to build: {failed}"
+    yield db, sample
+    event_loop_runner(db.close_mongo_connection())
+
+
+def _since(sample, days: int):
+    return (sample["now"] - timedelta(days=days), "")
+
+
+CASES = [
+    ("get_jobs", lambda db, s: db.get_jobs(skip=0, limit=10)),
+    ("get_jobs_page_5", lambda db, s: db.get_jobs(skip=40, limit=10)),
+    ("get_jobs_category", lambda db, s: db.get_jobs(skip=0, limit=10, filters={"category": "Plumbing"})),
+    ("get_jobs_homeowner", lambda db, s: db.get_jobs(skip=0, limit=10, filters={"homeowner_id": s["homeowner"]["id"]})),
+    ("get_jobs_count", lambda db, s: db.get_jobs_count()),
+    ("get_job_by_id", lambda db, s: db.get_job_by_id(s["job"]["id"])),
+    ("get_quotes_by_job", lambda db, s: db.get_quotes_by_job(s["job"]["id"])),
+    ("search_jobs_with_location", lambda db, s: db.search_jobs_with_location(limit=20)),
+    ("search_jobs_with_location_category", lambda db, s: db.search_jobs_with_location(category="Plumbing", limit=20)),
+    ("search_jobs_with_location_radius", lambda db, s: db.search_jobs_with_location(
+        user_latitude=6.5, user_longitude=3.4, max_distance_km=25, limit=20)),
+    ("search_jobs_with_location_text", lambda db, s: db.search_jobs_with_location(search_query="leak", limit=50)),
+    ("search_jobs_text", lambda db, s: db.search_jobs_text("leak", skip=0, limit=10)),
+    ("get_jobs_for_quoting", lambda db, s: db.get_jobs_for_quoting(
+        s["tradesperson"]["id"], s["tradesperson"]["trade_categories"], skip=0, limit=10)),
+    ("get_available_jobs_count_for_quoting", lambda db, s: db.get_available_jobs_count_for_quoting(
+        s["tradesperson"]["id"], s["tradesperson"]["trade_categories"])),
+    ("get_tradesperson_interests", lambda db, s: db.get_tradesperson_interests(s["tradesperson"]["id"])),
+    ("get_user_conversations", lambda db, s: db.get_user_conversations(s["homeowner"]["id"], "homeowner")),
+    ("get_user_conversations_tradesperson", lambda db, s: db.get_user_conversations(
+        s["tradesperson"]["id"], "tradesperson")),
+    ("get_user_conversations_since", lambda db, s: db.get_user_conversations(
+        s["homeowner"]["id"], "homeowner", since=_since(s, 7))),
+    ("get_conversation_messages", lambda db, s: db.get_conversation_messages(s["conversation"]["id"])),
+    ("get_conversation_messages_since", lambda db, s: db.get_conversation_messages(
+        s["conversation"]["id"], since=_since(s, 60))),
+    ("get_user_notifications", lambda db, s: db.get_user_notifications(s["homeowner"]["id"], limit=20)),
+    ("get_user_notifications_since", lambda db, s: db.get_user_notifications(
+        s["homeowner"]["id"], limit=20, since=_since(s, 30))),
+    ("get_user_notifications_count", lambda db, s: db.get_user_notifications_count(
+        s["homeowner"]["id"], status="pending")),
+    ("get_wallet_by_user_id", lambda db, s: db.get_wallet_by_user_id(s["tradesperson"]["id"])),
+    ("get_wallet_transactions", lambda db, s: db.get_wallet_transactions(s["tradesperson"]["id"])),
+    ("get_user_by_email", lambda db, s: db.get_user_by_email(s["homeowner"]["email"])),
+    ("get_all_users_for_admin", lambda db, s: db.get_all_users_for_admin(skip=0, limit=50)),
+    ("get_all_users_for_admin_role", lambda db, s: db.get_all_users_for_admin(skip=0, limit=50, role="tradesperson")),
+    ("get_all_users_for_admin_search", lambda db, s: db.get_all_users_for_admin(skip=0, limit=50, search="user12")),
+    ("get_all_users_for_admin_search_email", lambda db, s: db.get_all_users_for_admin(
+        skip=0, limit=50, search=s["homeowner"]["email"].upper())),
+    ("get_all_users_for_admin_search_phone", lambda db, s: db.get_all_users_for_admin(
+        skip=0, limit=50, search="0" + s["homeowner"]["phone"][4:])),
+    ("get_users_total_count_filtered_search", lambda db, s: db.get_users_total_count_filtered(search="user12")),
+    # Last: it moves the seeded past-due jobs to "expired"
+    ("job_expiry_sweep", lambda db, s: job_expiry.sweep(db.database, batch_size=50)),
+]
+
+
+@pytest.mark.parametrize("name, call", CASES)
+def test_query_plan(name, call, seeded, capture, sync_db, event_loop_runner):
+    db, sample = seeded
+    capture.reset()
+    capture.active = True
+    try:
+        event_loop_runner(call(db, sample))
+    finally:
+        capture.active = False
+
+    assert capture.commands, f"{name} issued no reads"
+    failures = []
+    for _, command in capture.commands:
+        problems, summary = plan_problems(explain(sync_db, command))
+        if problems:
+            collection = next(iter(command.values()))
+            failures.append(f"{next(iter(command))} on {collection}: {'; '.join(problems)}\n    plan: {summary}")
+    assert not failures, f"{name}:\n  " + "\n  ".join(failures)
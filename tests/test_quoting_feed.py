@@ -0,0 +1,109 @@
+"""
+Quoting feed: quote slots are counted on the job at create time, the feed
+excludes the tradesperson's own quotes and full jobs, and its pages and
+count stay exact past the old 100-job window.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.database import MAX_QUOTES_PER_JOB
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["quotes"]
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner, sync_db):
+    now = datetime.utcnow()
+    db.jobs = [
+        {"id": str(uuid.uuid4()), "title": f"Job {i}", "category": "Plumbing", "status": "active",
+         "quotes_count": 0, "created_at": now - timedelta(minutes=i)}
+        for i in range(130)
+    ]
+    sync_db.jobs.insert_many([dict(j) for j in db.jobs])
+    sync_db.jobs.insert_one({"id": "tiling", "category": "Tiling", "status": "active", "quotes_count": 0,
+                             "created_at": now})
+    return db
+
+
+def _quote(db, run, job_id, tradesperson_id):
+    return run(db.create_quote({"id": str(uuid.uuid4()), "job_id": job_id, "tradesperson_id": tradesperson_id,
+                                "status": "pending", "created_at": datetime.utcnow()}))
+
+
+def _feed_ids(db, run, tradesperson_id, page_size=50):
+    ids, skip = [], 0
+    while True:
+        page = run(db.get_jobs_for_quoting(tradesperson_id, ["Plumbing"], skip=skip, limit=page_size))
+        ids += [j["id"] for j in page]
+        if len(page) < page_size:
+            return ids
+        skip += page_size
+
+
+def test_concurrent_quotes_cannot_overfill_a_job(db, sync_db, event_loop_runner):
+    job_id = db.jobs[0]["id"]
+
+    async def rush():
+        return await asyncio.gather(*(
+            db.create_quote({"id": str(uuid.uuid4()), "job_id": job_id, "tradesperson_id": f"tp-{i}"})
+            for i in range(MAX_QUOTES_PER_JOB + 3)
+        ), return_exceptions=True)
+
+    results = event_loop_runner(rush())
+    assert sum(not isinstance(r, Exception) for r in results) == MAX_QUOTES_PER_JOB
+    assert sync_db.quotes.count_documents({"job_id": job_id}) == MAX_QUOTES_PER_JOB
+    assert sync_db.jobs.find_one({"id": job_id})["quotes_count"] == MAX_QUOTES_PER_JOB
+
+
+def test_double_submit_takes_one_slot(db, sync_db, event_loop_runner):
+    job_id = db.jobs[5]["id"]
+
+    async def double_submit():
+        return await asyncio.gather(*(
+            db.create_quote({"id": str(uuid.uuid4()), "job_id": job_id, "tradesperson_id": "tp-double"})
+            for _ in range(2)
+        ), return_exceptions=True)
+
+    results = event_loop_runner(double_submit())
+    (error,) = [r for r in results if isinstance(r, Exception)]
+    assert str(error) == "You have already quoted for this job"
+    assert sync_db.quotes.count_documents({"job_id": job_id}) == 1
+    assert sync_db.jobs.find_one({"id": job_id})["quotes_count"] == 1
+
+
+def test_feed_excludes_own_quotes_and_full_jobs_exactly(db, event_loop_runner):
+    me = str(uuid.uuid4())
+    full = db.jobs[0]["id"]  # filled by the previous test
+    quoted = [j["id"] for j in db.jobs[10:13]]
+    for job_id in quoted:
+        _quote(db, event_loop_runner, job_id, me)
+
+    ids = _feed_ids(db, event_loop_runner, me)
+    expected = [j["id"] for j in db.jobs if j["id"] not in quoted and j["id"] != full]
+    assert ids == expected
+    assert len(ids) == 126
+    assert event_loop_runner(db.get_available_jobs_count_for_quoting(me, ["Plumbing"])) == 126
+    assert event_loop_runner(db.get_available_jobs_count_for_quoting(me, [])) == 127  # plus the tiling job
+    assert event_loop_runner(db.has_quoted(quoted[0], me))
+
+
+def test_deleting_a_tradesperson_releases_their_slots(db, sync_db, event_loop_runner):
+    tradesperson = event_loop_runner(db.create_user({
+        "id": str(uuid.uuid4()), "name": "Quoter", "email": "quoter@example.com", "role": "tradesperson",
+        "status": "active",
+    }))
+    job_id = db.jobs[20]["id"]
+    _quote(db, event_loop_runner, job_id, tradesperson["id"])
+    assert sync_db.jobs.find_one({"id": job_id})["quotes_count"] == 1
+
+    assert event_loop_runner(db.delete_user_completely(tradesperson["id"]))
+    assert sync_db.jobs.find_one({"id": job_id})["quotes_count"] == 0
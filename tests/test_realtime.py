@@ -0,0 +1,197 @@
+"""
+Realtime delivery: events fan out to every connection of the addressed
+users only, heartbeats ping live sockets and close silent ones, a client
+that falls behind its send queue is dropped without holding up the rest,
+and the messages WebSocket endpoint authenticates and answers frames.
+"""
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from starlette.websockets import WebSocketState
+
+from backend.services import realtime
+from backend.services.realtime import (
+    CLOSE_POLICY_VIOLATION, CLOSE_TRY_AGAIN_LATER, InProcessBroker, RealtimeHub,
+)
+
+
+class FakeSocket:
+    """Records sent frames; ``blocked`` sockets stall in send_text until released."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed_with = None
+        self.client_state = WebSocketState.CONNECTED
+        self.released = asyncio.Event()
+        if not blocked:
+            self.released.set()
+
+    async def send_text(self, text):
+        await self.released.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=""):
+        self.closed_with = (code, reason)
+        self.client_state = WebSocketState.DISCONNECTED
+
+    def types(self):
+        return [frame["type"] for frame in self.sent]
+
+
+async def _settle():
+    await asyncio.sleep(0.02)
+
+
+def test_publish_fans_out_to_addressed_users_only(event_loop_runner):
+    async def scenario():
+        hub = RealtimeHub(InProcessBroker())
+        phone, laptop, other = FakeSocket(), FakeSocket(), FakeSocket()
+        for socket, user_id in ((phone, "u1"), (laptop, "u1"), (other, "u2")):
+            await hub.register(socket, user_id)
+        assert hub.connection_count() == 3 and hub.is_online("u1") and not hub.is_online("u3")
+
+        await hub.publish(["u1", None, "u1", "u3"], {"type": "message", "id": "m1"})
+        await hub.publish([], {"type": "message", "id": "never"})
+        await _settle()
+        await hub.stop()
+        return phone, laptop, other, hub
+
+    phone, laptop, other, hub = event_loop_runner(scenario())
+    assert phone.sent == laptop.sent == [{"type": "message", "id": "m1"}]
+    assert other.sent == []
+    assert {s.closed_with[0] for s in (phone, laptop, other)} == {1001}
+    assert hub.connection_count() == 0
+
+
+def test_oldest_connection_is_evicted_past_the_per_user_limit(event_loop_runner, monkeypatch):
+    monkeypatch.setattr(realtime, "MAX_CONNECTIONS_PER_USER", 2)
+
+    async def scenario():
+        hub = RealtimeHub(InProcessBroker())
+        sockets = [FakeSocket() for _ in range(3)]
+        for socket in sockets:
+            await hub.register(socket, "u1")
+            await asyncio.sleep(0.001)
+        count = hub.connection_count()
+        await hub.stop()
+        return sockets, count
+
+    sockets, count = event_loop_runner(scenario())
+    assert count == 2
+    assert sockets[0].closed_with == (CLOSE_TRY_AGAIN_LATER, "Too many connections")
+
+
+def test_heartbeat_pings_live_clients_and_closes_silent_ones(event_loop_runner, monkeypatch):
+    monkeypatch.setattr(realtime, "HEARTBEAT_INTERVAL_SEC", 0.01)
+    monkeypatch.setattr(realtime, "IDLE_TIMEOUT_SEC", 0.05)
+
+    async def scenario():
+        hub = RealtimeHub(InProcessBroker())
+        live, silent = FakeSocket(), FakeSocket()
+        live_conn = await hub.register(live, "u1")
+        await hub.register(silent, "u2")
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+            live_conn.touch()
+        await hub.stop()
+        return live, silent
+
+    live, silent = event_loop_runner(scenario())
+    assert live.types().count("ping") >= 3
+    assert live.closed_with[0] == 1001
+    assert silent.closed_with == (CLOSE_POLICY_VIOLATION, "Heartbeat timeout")
+
+
+def test_slow_client_is_dropped_without_stalling_others(event_loop_runner, monkeypatch):
+    monkeypatch.setattr(realtime, "SEND_QUEUE_SIZE", 2)
+
+    async def scenario():
+        hub = RealtimeHub(InProcessBroker())
+        slow, fast = FakeSocket(blocked=True), FakeSocket()
+        await hub.register(slow, "u1")
+        await hub.register(fast, "u1")
+        for i in range(5):
+            await hub.publish(["u1"], {"type": "message", "id": i})
+            await _settle()
+        count = hub.connection_count()
+        await hub.stop()
+        return slow, fast, count
+
+    slow, fast, count = event_loop_runner(scenario())
+    # One frame in flight plus a full queue; the next one overflows
+    assert slow.closed_with == (CLOSE_TRY_AGAIN_LATER, "Client too slow")
+    assert count == 1
+    assert [frame["id"] for frame in fast.sent] == [0, 1, 2, 3, 4]
+
+
+def test_broker_defaults_to_in_process_without_redis(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setenv("REALTIME_BROKER", "redis")
+    assert isinstance(realtime.get_broker(), InProcessBroker)
+
+
+@pytest.fixture
+def ws_client(monkeypatch):
+    """TestClient for the messages router with token auth stubbed to a fixed user per token."""
+    pytest.importorskip("httpx")
+    messages = pytest.importorskip("backend.routes.messages")
+    from fastapi import FastAPI, HTTPException
+    from fastapi.testclient import TestClient
+    from backend.models.auth import User, UserRole, UserStatus
+
+    users = {
+        "good": User(id="u1", name="Ada", email="ada@example.com", phone="", role=UserRole.HOMEOWNER,
+                     location="", postcode=""),
+        "suspended": User(id="u2", name="Bo", email="bo@example.com", phone="", role=UserRole.HOMEOWNER,
+                          status=UserStatus.SUSPENDED, location="", postcode=""),
+    }
+
+    async def fake_current_user(credentials):
+        if credentials.credentials not in users:
+            raise HTTPException(status_code=401, detail="Could not validate credentials")
+        return users[credentials.credentials]
+
+    hub = RealtimeHub(InProcessBroker())
+    monkeypatch.setattr(messages, "get_current_user", fake_current_user)
+    monkeypatch.setattr(messages, "realtime_hub", hub)
+    app = FastAPI()
+    app.include_router(messages.router)
+    with TestClient(app) as client:
+        yield client, hub
+
+
+@pytest.mark.parametrize("query", ["", "?token=bad", "?token=suspended"])
+def test_websocket_rejects_missing_bad_or_inactive_tokens(ws_client, query):
+    from starlette.websockets import WebSocketDisconnect
+
+    client, _ = ws_client
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect(f"/api/messages/ws{query}") as ws:
+            ws.receive_json()
+    assert closed.value.code == CLOSE_POLICY_VIOLATION
+
+
+def test_websocket_answers_frames_and_receives_published_events(ws_client):
+    client, hub = ws_client
+    with client.websocket_connect("/api/messages/ws?token=good") as ws:
+        ready = ws.receive_json()
+        assert ready["type"] == "ready" and ready["user_id"] == "u1"
+
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "Invalid JSON"}
+        ws.send_json({"type": "bogus"})
+        assert ws.receive_json() == {"type": "error", "detail": "Unknown frame type"}
+        ws.send_json({"type": "pong"})  # heartbeat replies get no answer
+        ws.send_json({"type": "ping"})
+        assert ws.receive_json() == {"type": "pong"}
+        ws.send_json({"type": "read"})
+        assert ws.receive_json()["detail"] == "conversation_id is required"
+
+        ws.portal.call(hub.publish, ["u1"], {"type": "message", "id": "m1"})
+        assert ws.receive_json() == {"type": "message", "id": "m1"}
+        assert hub.is_online("u1")
+    assert not hub.is_online("u1")
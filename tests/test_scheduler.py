@@ -0,0 +1,124 @@
+"""
+Periodic task scheduler: cron parsing, one runner per task across workers,
+lease takeover after a crashed worker, and run history; plus the orphaned
+job query behind ``jobs.orphans``.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services.scheduler import Cron, Scheduler
+
+
+@pytest.mark.parametrize("expression,after,expected", [
+    ("*/15 * * * *", datetime(2025, 3, 1, 10, 7, 30), datetime(2025, 3, 1, 10, 15)),
+    ("30 3 * * *", datetime(2025, 3, 1, 3, 30), datetime(2025, 3, 2, 3, 30)),
+    ("0 9-17/4 * * 1-5", datetime(2025, 3, 1, 12, 0), datetime(2025, 3, 3, 9, 0)),  # Sat -> Mon
+    ("0 0 1 * 0", datetime(2025, 3, 3, 0, 0), datetime(2025, 3, 9, 0, 0)),  # 1st of month OR Sunday
+    ("0 0 29 2 *", datetime(2025, 3, 1), datetime(2028, 2, 29)),
+])
+def test_cron_next_after(expression, after, expected):
+    assert Cron(expression).next_after(after) == expected
+
+
+@pytest.mark.parametrize("expression", ["* * * *", "60 * * * *", "* 24 * * *", "*/0 * * * *", "0 0 31 2 *"])
+def test_cron_rejects_invalid(expression):
+    with pytest.raises(ValueError):
+        Cron(expression).next_after(datetime(2025, 1, 1))
+
+
+def _workers(name, fn, count=3, **schedule):
+    workers = [Scheduler(owner=f"worker-{i}") for i in range(count)]
+    for w in workers:
+        w.register(name, fn, **schedule)
+    return workers
+
+
+def test_only_one_worker_runs_a_due_task(db, sync_db, event_loop_runner):
+    calls = []
+
+    async def task():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"done": True}
+
+    workers = _workers("test.once", task, every=60)
+    now = datetime.utcnow()
+
+    async def tick(at):
+        return await asyncio.gather(*(w.run_due(db.database, now=at, wait=True) for w in workers))
+
+    started = event_loop_runner(tick(now))
+    assert sum(len(s) for s in started) == len(calls) == 1
+
+    # Not due again until the interval has passed
+    assert sum(len(s) for s in event_loop_runner(tick(now + timedelta(seconds=30)))) == 0
+    assert sum(len(s) for s in event_loop_runner(tick(now + timedelta(seconds=120)))) == 1
+
+    lease = sync_db.scheduler_leases.find_one({"_id": "test.once"})
+    assert lease["runs"] == 2 and lease["failures"] == 0 and lease["last_status"] == "ok"
+    runs = list(sync_db.scheduler_runs.find({"task": "test.once"}))
+    assert len(runs) == 2 and all(r["result"] == {"done": True} for r in runs)
+
+
+def test_lapsed_lease_is_taken_over(db, sync_db, event_loop_runner):
+    ran_by = []
+    crashed, survivor = _workers("test.takeover", lambda: None, count=2, every=60, lease_sec=30)
+
+    async def task():
+        ran_by.append("survivor")
+
+    survivor.tasks["test.takeover"].fn = task
+    now = datetime.utcnow()
+    # The first worker claims the task and dies before finishing or renewing
+    assert event_loop_runner(crashed._claim(db.database, crashed.tasks["test.takeover"], now))
+
+    def run_at(seconds):
+        return event_loop_runner(survivor.run_due(db.database, now=now + timedelta(seconds=seconds), wait=True))
+
+    assert run_at(10) == []
+    assert run_at(31) == ["test.takeover"]
+    assert ran_by == ["survivor"]
+    assert sync_db.scheduler_leases.find_one({"_id": "test.takeover"})["owner"] == "worker-1"
+
+
+def test_failures_are_recorded(db, sync_db, event_loop_runner):
+    async def task():
+        raise RuntimeError("smtp down")
+
+    (worker,) = _workers("test.fails", task, count=1, cron="*/5 * * * *")
+    # Cron tasks first run at their next slot, not at once
+    now = datetime.utcnow()
+    assert event_loop_runner(worker.run_due(db.database, now=now, wait=True)) == []
+    event_loop_runner(worker.run_due(db.database, now=now + timedelta(minutes=6), wait=True))
+
+    (status,) = event_loop_runner(worker.status(db.database))
+    assert status["runs"] == 1 and status["failures"] == 1 and status["last_status"] == "failed"
+    assert status["last_error"] == "RuntimeError: smtp down"
+    assert status["recent_runs"][0]["status"] == "failed"
+    assert status["next_run_at"].minute % 5 == 0
+
+
+def test_find_orphaned_jobs(db, sync_db, event_loop_runner):
+    owner = {"id": str(uuid.uuid4()), "name": "Ada"}
+    sync_db.users.insert_one(owner)
+    old = datetime.utcnow() - timedelta(days=10)
+    jobs = {
+        "owned": {"homeowner_id": owner["id"]},
+        "owned_legacy": {"homeowner": {"id": owner["id"]}},
+        "gone": {"homeowner_id": str(uuid.uuid4())},
+        "gone_legacy": {"homeowner": {"id": str(uuid.uuid4())}},
+        "no_owner": {},
+    }
+    sync_db.jobs.insert_many([{"id": key, "title": key, "created_at": old, **fields} for key, fields in jobs.items()])
+    sync_db.jobs.insert_one({"id": "gone_recent", "homeowner_id": "nobody", "created_at": datetime.utcnow()})
+
+    found = event_loop_runner(db.find_orphaned_jobs(min_age_days=7))
+    assert sorted(j["id"] for j in found) == ["gone", "gone_legacy", "no_owner"]
+    assert len(event_loop_runner(db.find_orphaned_jobs())) == 4
+    assert len(event_loop_runner(db.find_orphaned_jobs(limit=2))) == 2
@@ -0,0 +1,98 @@
+"""
+Daily rollups: counters maintained by the write paths agree with a rebuild
+from the source collections, and the dashboards read them back.
+"""
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import stats_counters
+
+
+def _uid() -> str:
+    return str(uuid.uuid4())
+
+
+def test_write_paths_match_rebuild(db, event_loop_runner):
+    now = datetime.utcnow()
+
+    async def write_paths():
+        jobs = []
+        for i in range(6):
+            jobs.append(await db.create_job({
+                "id": _uid(), "status": "pending_approval", "created_at": now - timedelta(days=i),
+            }))
+        await db.update_job_approval_status(jobs[0]["id"], {"status": "active", "approved_at": now})
+        await db.update_job_approval_status(jobs[1]["id"], {"status": "rejected", "approved_at": now})
+        await db.update_job_status_admin(jobs[2]["id"], "completed")
+        await db.update_job_access_fee(jobs[3]["id"], 2500)
+        await db.soft_delete_job_admin(jobs[4]["id"])
+        await db.delete_job_completely(jobs[5]["id"])
+
+        posting = {"id": _uid(), "content_type": "job_posting", "status": "draft", "category": "careers",
+                   "settings": {"department": "Engineering", "job_type": "full_time"}, "created_at": now}
+        await db.create_content_item(posting)
+        await db.update_content_item(posting["id"], {"status": "published", "settings.department": "Operations"})
+        article = {"id": _uid(), "content_type": "blog_post", "status": "draft", "created_at": now}
+        await db.create_content_item(article)
+        await db.bulk_update_content_items([article["id"]], {"status": "archived"})
+
+        application = {"id": _uid(), "job_id": posting["id"], "status": "pending", "applied_at": now}
+        await db.create_job_application(application)
+        await db.update_job_application(application["id"], {"status": "reviewed"})
+
+        hiring = {"id": _uid(), "job_id": jobs[0]["id"], "tradesperson_id": _uid(), "hired": False, "created_at": now}
+        await db.create_hiring_status(hiring)
+        await db.update_hiring_status(hiring["id"], {"hired": True, "job_status": "in_progress"})
+        await db.create_hiring_feedback({"id": _uid(), "feedback_type": "price", "created_at": now})
+
+        maintained = await stats_counters.totals(db.database, stats_counters.FAMILIES)
+        rebuilt = await stats_counters.rebuild(db.database)
+        return maintained, rebuilt
+
+    maintained, rebuilt = event_loop_runner(write_paths())
+    recomputed = defaultdict(int)
+    for (metric, _), value in rebuilt.items():
+        recomputed[metric] += value
+    assert {m: v for m, v in maintained.items() if v} == {m: v for m, v in recomputed.items() if v}
+
+
+def test_dashboards_read_rollups(db, event_loop_runner):
+    async def read():
+        return (
+            await db.get_jobs_statistics_admin(),
+            await db.get_content_statistics(),
+            await db.get_job_statistics(),
+            await db.get_hiring_statistics(),
+        )
+
+    jobs, content, postings, hiring = event_loop_runner(read())
+    assert jobs["total_jobs"] == 5
+    assert jobs["active_jobs"] == 1 and jobs["completed_jobs"] == 1 and jobs["rejected_jobs"] == 1
+    assert jobs["approved_today"] == 1 and jobs["rejected_today"] == 1
+    assert content["total_content"] == 2 and content["archived_content"] == 1
+    assert postings["jobs_by_department"] == {"Operations": 1}
+    assert postings["applications_by_status"] == {"reviewed": 1}
+    assert hiring["hired_count"] == 1 and hiring["not_hired_count"] == 0
+    assert hiring["job_status_distribution"] == {"in_progress": 1}
+
+
+def test_rebuild_apply_replaces_drifted_rows(db, sync_db, event_loop_runner):
+    # A bulk import that bypassed the hooks
+    sync_db.jobs.insert_many([{"id": _uid(), "status": "active", "created_at": datetime.utcnow()} for _ in range(3)])
+    event_loop_runner(stats_counters.rebuild(db.database, apply=True))
+    stats = event_loop_runner(db.get_jobs_statistics_admin())
+    assert stats["total_jobs"] == 8
+    assert stats["active_jobs"] == 4
+
+
+def test_rebuild_if_empty_seeds_an_existing_deployment(db, sync_db, event_loop_runner):
+    assert event_loop_runner(stats_counters.rebuild_if_empty(db.database)) is None
+    sync_db.stats_counters.delete_many({})
+    assert event_loop_runner(stats_counters.rebuild_if_empty(db.database)) > 0
+    assert event_loop_runner(db.get_jobs_statistics_admin())["total_jobs"] == 8
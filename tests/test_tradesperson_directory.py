@@ -0,0 +1,103 @@
+"""
+Tradesperson directory: profiles carry normalized search keys maintained on
+create/update, searches match word prefixes instead of substrings, and one
+call returns the page, the total and disjunctive trade/state/rating facets.
+"""
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+FIXTURE = str(uuid.uuid4())
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["users"]
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner, sync_db):
+    def tradesperson(name, trades, state, rating, city=""):
+        user = event_loop_runner(db.create_user({
+            "id": str(uuid.uuid4()), "name": name, "email": f"{uuid.uuid4().hex}@example.com",
+            "role": "tradesperson", "trade_categories": trades, "location": state, "city": city,
+            "fixture": FIXTURE,
+        }))
+        sync_db.users.update_one({"id": user["id"]}, {"$set": {"average_rating": rating, "total_reviews": int(rating)}})
+        return user
+
+    people = {
+        "ade": tradesperson("Adébáyọ̀ Okafor", ["Plumbing"], "Lagos", 4.8, city="Ikeja"),
+        "chi": tradesperson("Chinedu Plumbing Ltd", ["Plumbing", "Tiling"], "Lagos", 4.2),
+        "ngo": tradesperson("Ngozi Eze", ["Plumbing"], "Abuja", 3.5),
+        "tunde": tradesperson("Tunde Bello", ["Electrical Repairs"], "Lagos", 0),
+    }
+    event_loop_runner(db.create_user({
+        "id": str(uuid.uuid4()), "name": "Ade Homeowner", "email": f"{uuid.uuid4().hex}@example.com",
+        "role": "homeowner", "location": "Lagos", "fixture": FIXTURE,
+    }))
+    db.people = people
+    return db
+
+
+def _names(page):
+    return [p["name"] for p in page]
+
+
+def test_keys_are_normalized_on_create(db, sync_db):
+    ade = sync_db.users.find_one({"id": db.people["ade"]["id"]})
+    assert ade["directory"]["trades"] == ["plumbing"]
+    assert ade["directory"]["state"] == "lagos"
+    assert {"adebayo", "okafor", "ikeja", "plumbing", "lagos"} <= set(ade["directory"]["keys"])
+    assert "directory" not in sync_db.users.find_one({"fixture": FIXTURE, "role": "homeowner"})
+
+
+def test_search_matches_word_prefixes_and_ranks_by_rating(db, event_loop_runner):
+    page, total, _ = event_loop_runner(db.search_tradespeople_directory(search="ADEBAYO plumb"))
+    assert (_names(page), total) == (["Adébáyọ̀ Okafor"], 1)
+
+    page, total, _ = event_loop_runner(db.search_tradespeople_directory(trade="plumbing", location="lagos"))
+    assert (_names(page), total) == (["Adébáyọ̀ Okafor", "Chinedu Plumbing Ltd"], 2)
+
+    page, _, _ = event_loop_runner(db.search_tradespeople_directory(location="ikeja"))
+    assert _names(page) == ["Adébáyọ̀ Okafor"]
+
+
+def test_facets_are_disjunctive(db, event_loop_runner):
+    page, total, facets = event_loop_runner(db.search_tradespeople_directory(
+        trade="Plumbing", state="Lagos", min_rating=4, limit=1))
+    assert (len(page), total) == (1, 2)
+    # Each facet ignores only its own filter: Tiling shows up, Abuja (rated 3.5) does not
+    assert {s["value"]: s["count"] for s in facets["states"]} == {"lagos": 2}
+    assert {t["value"]: t["count"] for t in facets["trades"]} == {"plumbing": 2, "tiling": 1}
+    assert {t["value"]: t["label"] for t in facets["trades"]}["plumbing"] == "Plumbing"
+    assert facets["rating_bands"] == {"4.5+": 1, "4-4.5": 1, "3-4": 0, "below_3": 0, "unrated": 0}
+
+    _, _, facets = event_loop_runner(db.search_tradespeople_directory(trade="plumbing"))
+    assert {s["value"]: s["count"] for s in facets["states"]} == {"lagos": 2, "abuja": 1}
+    assert facets["rating_bands"]["3-4"] == 1
+
+    _, total, facets = event_loop_runner(db.search_tradespeople_directory(state="lagos"))
+    assert total == 3 and facets["rating_bands"]["unrated"] == 1
+
+
+def test_profile_update_refreshes_keys(db, sync_db, event_loop_runner):
+    ngozi = db.people["ngo"]["id"]
+    event_loop_runner(db.update_user(ngozi, {"location": "Enugu", "trade_categories": ["Tiling"]}))
+    directory = sync_db.users.find_one({"id": ngozi})["directory"]
+    assert (directory["state"], directory["trades"]) == ("enugu", ["tiling"])
+
+    page, _, _ = event_loop_runner(db.search_tradespeople_directory(trade="tiling", state="enugu"))
+    assert _names(page) == ["Ngozi Eze"]
+
+
+def test_listing_stats_are_batched(db, sync_db, event_loop_runner):
+    ade = db.people["ade"]["id"]
+    sync_db.reviews.insert_many([{"reviewee_id": ade, "rating": r} for r in (5, 4)])
+    sync_db.jobs.insert_one({"assigned_tradesperson_id": ade, "status": "completed"})
+    stats = event_loop_runner(db.get_tradespeople_listing_stats([ade, db.people["tunde"]["id"]]))
+    assert stats[ade] == {"portfolio_items": 0, "total_reviews": 2, "avg_rating": 4.5, "completed_jobs": 1}
+    assert stats[db.people["tunde"]["id"]]["total_reviews"] == 0
@@ -0,0 +1,70 @@
+"""
+Streamed uploads: the copy is hashed as it goes, stops with 413 past the
+size limit without leaving a temp file, and identical content lands on one
+blob keyed by the streamed SHA-256.
+"""
+import hashlib
+import io
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException, UploadFile
+
+from backend.utils.uploads import stream_to_file, stream_to_temp
+
+
+def _upload(data, declare_size=True):
+    return UploadFile(file=io.BytesIO(data), filename="upload.bin", size=len(data) if declare_size else None)
+
+
+def test_streams_in_chunks_and_hashes(tmp_path, event_loop_runner):
+    data = os.urandom(2500)
+    stored = event_loop_runner(stream_to_temp(_upload(data), str(tmp_path), max_bytes=2500, chunk_size=1000))
+    assert stored["size"] == 2500
+    assert stored["sha256"] == hashlib.sha256(data).hexdigest()
+    assert os.path.dirname(stored["path"]) == str(tmp_path)
+    with open(stored["path"], "rb") as f:
+        assert f.read() == data
+
+    dest = tmp_path / "final" / "file.bin"
+    os.makedirs(dest.parent)
+    moved = event_loop_runner(stream_to_file(_upload(data), str(dest), chunk_size=1000))
+    assert moved["path"] == str(dest) and dest.read_bytes() == data
+    assert os.listdir(dest.parent) == ["file.bin"]
+
+
+@pytest.mark.parametrize("declare_size", [True, False])
+def test_size_limit_rejects_without_leaving_a_temp_file(tmp_path, event_loop_runner, declare_size):
+    upload = _upload(os.urandom(3000), declare_size=declare_size)
+    with pytest.raises(HTTPException) as rejected:
+        event_loop_runner(stream_to_temp(upload, str(tmp_path), max_bytes=2048, chunk_size=1000))
+    assert rejected.value.status_code == 413
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".part")] == []
+    # An undeclared size is only caught once the copy passes the limit: one chunk past it at most
+    assert upload.file.tell() == (0 if declare_size else 3000)
+
+
+def test_identical_uploads_share_one_blob(tmp_path, event_loop_runner):
+    pytest.importorskip("motor")
+    from backend.services.blob_store import LocalBlobBackend
+
+    backend = LocalBlobBackend(root=str(tmp_path / "blobs"))
+    data = b"same scan, uploaded twice"
+
+    async def upload_twice():
+        digests = []
+        for _ in range(2):
+            stored = await stream_to_temp(_upload(data), str(tmp_path / "incoming"))
+            await backend.put_file(stored["sha256"], stored["path"], "image/jpeg")
+            digests.append(stored["sha256"])
+        return digests
+
+    first, second = event_loop_runner(upload_twice())
+    assert first == second
+    with open(backend.local_path(first), "rb") as f:
+        assert f.read() == data
+    assert sum(len(files) for _, _, files in os.walk(tmp_path / "blobs")) == 1
+    assert os.listdir(tmp_path / "incoming") == []
@@ -0,0 +1,91 @@
+"""
+Admin user search: inputs are routed by shape to indexed lookups on keys
+written at create/update, and the list and its pagination total agree.
+"""
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+from backend.services import user_search
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["users"]
+
+
+@pytest.fixture(scope="module")
+def db(db, event_loop_runner):
+    def user(name, email, phone, role="homeowner", **extra):
+        return event_loop_runner(db.create_user({
+            "id": str(uuid.uuid4()), "name": name, "email": email, "phone": phone, "role": role, "status": "active",
+            **extra,
+        }))
+
+    db.people = {
+        "ada": user("Adaeze Okafor", "Ada.Okafor@Example.com", "0803 123 4567"),
+        "adamu": user("Adamu Bello", "adamu@example.com", "+2348091112222", role="tradesperson",
+                      skills=["Solar installation"]),
+        "chi": user("Chioma Adeyemi", "chioma@example.com", "8109998888"),
+    }
+    return db
+
+
+def _search(db, run, text):
+    users = run(db.get_all_users_for_admin(skip=0, limit=50, search=text))
+    total = run(db.get_users_total_count_filtered(search=text))
+    assert total == len(users)
+    return sorted(u["name"] for u in users)
+
+
+def test_keys_are_normalized_on_create(sync_db, db):
+    ada = sync_db.users.find_one({"id": db.people["ada"]["id"]})
+    assert ada["search"]["email"] == "ada.okafor@example.com"
+    assert ada["search"]["phone"] == "+2348031234567"
+    assert {"ad", "ada", "adaeze", "ok", "okafor"} <= set(ada["search"]["prefixes"])
+
+
+def test_name_and_skill_prefixes(db, event_loop_runner):
+    assert _search(db, event_loop_runner, "ada") == ["Adaeze Okafor", "Adamu Bello"]
+    assert _search(db, event_loop_runner, "ADA oka") == ["Adaeze Okafor"]
+    assert _search(db, event_loop_runner, "ade") == ["Chioma Adeyemi"]
+    assert _search(db, event_loop_runner, "sol") == ["Adamu Bello"]
+    assert _search(db, event_loop_runner, "zz") == []
+
+
+def test_email_and_phone_routes(db, event_loop_runner):
+    assert _search(db, event_loop_runner, "ADA.OKAFOR@example.com") == ["Adaeze Okafor"]
+    assert _search(db, event_loop_runner, "adamu@") == ["Adamu Bello"]
+    for phone in ("08031234567", "+234 803 123 4567", "2348031234567"):
+        assert _search(db, event_loop_runner, phone) == ["Adaeze Okafor"]
+    assert _search(db, event_loop_runner, "0810999") == ["Chioma Adeyemi"]
+    assert _search(db, event_loop_runner, db.people["adamu"]["user_id"]) == ["Adamu Bello"]
+    assert _search(db, event_loop_runner, db.people["chi"]["id"]) == ["Chioma Adeyemi"]
+
+
+def test_profile_update_refreshes_keys(db, sync_db, event_loop_runner):
+    chi = db.people["chi"]["id"]
+    event_loop_runner(db.update_user(chi, {"name": "Chioma Nwosu", "phone": "07012345678"}))
+    assert _search(db, event_loop_runner, "nwo") == ["Chioma Nwosu"]
+    assert _search(db, event_loop_runner, "07012345678") == ["Chioma Nwosu"]
+    assert _search(db, event_loop_runner, "adeyemi") == []
+    assert user_search.key_update(sync_db.users.find_one({"id": chi})) is None
+
+
+def test_separator_only_input_is_blank():
+    for text in ("()", "- ", "+"):
+        assert user_search.query_for(text) is None
+
+
+def test_backfill_makes_legacy_users_searchable(db, sync_db, event_loop_runner):
+    sync_db.users.insert_one({"id": "legacy-user", "name": "Obinna Legacy", "email": "obinna@example.com",
+                              "phone": "08055556666", "role": "homeowner", "status": "active"})
+    assert _search(db, event_loop_runner, "obinna") == []
+
+    scanned, stale = event_loop_runner(user_search.backfill(db.database, apply=True))
+    assert stale == 1 and scanned == sync_db.users.count_documents({})
+    assert _search(db, event_loop_runner, "obinna") == ["Obinna Legacy"]
+    assert _search(db, event_loop_runner, "08055556666") == ["Obinna Legacy"]
@@ -0,0 +1,89 @@
+"""
+Wallet ledger under concurrency against a real MongoDB replica set: balances
+never go negative, every coin moved has exactly one ledger entry, and replayed
+operations are not applied twice.
+"""
+import asyncio
+import uuid
+
+import pytest
+
+pytest.importorskip("pymongo")
+pytest.importorskip("motor")
+
+
+@pytest.fixture(scope="module")
+def index_collections():
+    return ["wallets", "wallet_transactions", "referrals"]
+
+
+def _funded_wallet(sync_db, coins: int) -> str:
+    user_id = str(uuid.uuid4())
+    sync_db.wallets.insert_one({"id": str(uuid.uuid4()), "user_id": user_id, "balance_coins": coins})
+    return user_id
+
+
+def _ledger_total(sync_db, user_id: str) -> int:
+    total = 0
+    for txn in sync_db.wallet_transactions.find({"user_id": user_id}):
+        sign = -1 if txn["transaction_type"] == "access_fee_deduction" else 1
+        total += sign * txn["amount_coins"]
+    return total
+
+
+def test_concurrent_access_fees_never_overdraw(db, sync_db, event_loop_runner):
+    user_id = _funded_wallet(sync_db, 100)
+
+    async def charge_all():
+        return await asyncio.gather(*(db.deduct_access_fee(user_id, f"job-{i}", 7) for i in range(60)))
+
+    results = event_loop_runner(charge_all())
+    balance = sync_db.wallets.find_one({"user_id": user_id})["balance_coins"]
+
+    assert sum(results) == 14
+    assert balance == 2
+    assert 100 + _ledger_total(sync_db, user_id) == balance
+
+
+def test_replayed_access_fee_is_charged_once(db, sync_db, event_loop_runner):
+    user_id = _funded_wallet(sync_db, 50)
+
+    async def charge_same_job():
+        return await asyncio.gather(*(db.deduct_access_fee(user_id, "job-1", 10) for _ in range(20)))
+
+    assert all(event_loop_runner(charge_same_job()))
+    assert sync_db.wallets.find_one({"user_id": user_id})["balance_coins"] == 40
+    assert sync_db.wallet_transactions.count_documents({"user_id": user_id}) == 1
+
+
+def test_concurrent_funding_confirmations_credit_once(db, sync_db, event_loop_runner):
+    user_id = _funded_wallet(sync_db, 0)
+    transaction_id = str(uuid.uuid4())
+    sync_db.wallet_transactions.insert_one({
+        "id": transaction_id, "user_id": user_id, "transaction_type": "wallet_funding",
+        "amount_coins": 25, "status": "pending",
+    })
+
+    async def confirm_many():
+        return await asyncio.gather(*(db.confirm_wallet_funding(transaction_id, f"admin-{i}") for i in range(10)))
+
+    assert sum(event_loop_runner(confirm_many())) == 1
+    assert sync_db.wallets.find_one({"user_id": user_id})["balance_coins"] == 25
+    assert sync_db.wallet_transactions.find_one({"id": transaction_id})["status"] == "confirmed"
+
+
+def test_concurrent_referral_rewards_pay_once(db, sync_db, event_loop_runner):
+    referrer_id, referred_id = str(uuid.uuid4()), str(uuid.uuid4())
+    sync_db.users.insert_one({"id": referrer_id, "total_referrals": 0})
+    sync_db.referrals.insert_one({
+        "id": str(uuid.uuid4()), "referrer_id": referrer_id, "referred_user_id": referred_id, "status": "pending",
+    })
+
+    async def reward_many():
+        await asyncio.gather(*(db._process_referral_rewards(referred_id) for _ in range(10)))
+
+    event_loop_runner(reward_many())
+    assert sync_db.wallets.find_one({"user_id": referrer_id})["balance_coins"] == 5
+    assert sync_db.wallet_transactions.count_documents({"user_id": referrer_id}) == 1
+    assert sync_db.users.find_one({"id": referrer_id})["total_referrals"] == 1
+    assert sync_db.referrals.find_one({"referred_user_id": referred_id})["status"] == "verified"